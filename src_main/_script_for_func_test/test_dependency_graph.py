@@ -0,0 +1,136 @@
+"""
+依赖图测试脚本
+验证传递闭包、反向依赖与依赖深度的查询结果与逐层遍历一致，以及循环依赖时的处理
+"""
+
+import os
+import random
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from libs.dependency_graph import DependencyGraph
+
+
+def _walk(start: str, adjacency):
+    """逐层遍历，返回从start出发可到达的全部节点"""
+    reached = set()
+    stack = list(adjacency.get(start, []))
+    while stack:
+        node = stack.pop()
+        if node in reached:
+            continue
+        reached.add(node)
+        stack.extend(adjacency.get(node, []))
+    return reached
+
+
+def _longest_chain(node: str, dependent_relation) -> int:
+    deps = dependent_relation.get(node, [])
+    return max((_longest_chain(dep, dependent_relation) + 1 for dep in deps), default=0)
+
+
+def test_graph_queries():
+    """测试随机无环依赖表上的各类查询"""
+    print("\n测试 graph_queries 函数...")
+
+    try:
+        rng = random.Random(20240701)
+        for _ in range(50):
+            files = [f"src/mod_{i}" for i in range(rng.randint(1, 30))]
+            # 只依赖编号更小的文件，保证无环；偶尔依赖未在键中出现的外部文件
+            dependent_relation = {
+                file: rng.sample(files[:i], rng.randint(0, min(i, 4))) + (["lib/extra"] if rng.random() < 0.1 else [])
+                for i, file in enumerate(files)
+            }
+            reverse = {}
+            for file, deps in dependent_relation.items():
+                for dep in deps:
+                    reverse.setdefault(dep, []).append(file)
+
+            graph = DependencyGraph(dependent_relation)
+            assert not graph.has_cycle
+            for file in files:
+                assert graph.get_dependencies(file) == dependent_relation[file]
+                assert graph.get_dependents(file) == reverse.get(file, [])
+                assert set(graph.get_all_dependencies(file)) == _walk(file, dependent_relation)
+                assert set(graph.get_all_dependents(file)) == _walk(file, reverse)
+                assert graph.get_depth(file) == _longest_chain(file, dependent_relation)
+                other = rng.choice(files)
+                assert graph.is_reachable(file, other) == (other in _walk(file, dependent_relation))
+                assert graph.is_direct_dependency(file, other) == (other in dependent_relation[file])
+
+            changed = rng.sample(files, min(3, len(files)))
+            expected = set().union(*(_walk(file, reverse) for file in changed))
+            assert set(graph.get_all_dependents_of(changed)) == expected
+
+        graph = DependencyGraph({"a": []})
+        assert graph.get_all_dependents("unknown") == [] and graph.get_depth("unknown") == -1
+        assert not graph.is_reachable("a", "unknown")
+        print("  ✓ 依赖图查询结果与逐层遍历一致")
+        return True
+    except Exception as e:
+        print(f"  ❌ 测试失败: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_cyclic_graph():
+    """测试循环依赖时的闭包与深度"""
+    print("\n测试 cyclic_graph 函数...")
+
+    try:
+        dependent_relation = {
+            "a": ["b"],
+            "b": ["c"],
+            "c": ["a"],
+            "d": ["a"],
+            "e": [],
+        }
+        graph = DependencyGraph(dependent_relation)
+        assert graph.has_cycle, "应识别循环依赖"
+        assert set(graph.get_all_dependencies("a")) == {"a", "b", "c"}, "环上的文件可到达自身"
+        assert set(graph.get_all_dependents("c")) == {"a", "b", "c", "d"}
+        assert graph.get_depth("d") == -1 and graph.get_depth("e") == 0
+        print("  ✓ 循环依赖处理正确")
+        return True
+    except Exception as e:
+        print(f"  ❌ 测试失败: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("依赖图测试")
+    print("=" * 60)
+
+    test_results = []
+    test_results.append(("依赖图查询", test_graph_queries()))
+    test_results.append(("循环依赖", test_cyclic_graph()))
+
+    print("\n" + "=" * 60)
+    print("测试结果汇总")
+    print("=" * 60)
+
+    passed = 0
+    failed = 0
+
+    for test_name, result in test_results:
+        status = "✓ 通过" if result else "❌ 失败"
+        print(f"{test_name:20} {status}")
+        if result:
+            passed += 1
+        else:
+            failed += 1
+
+    print("=" * 60)
+    print(f"总计: {passed} 通过, {failed} 失败")
+
+    if failed == 0:
+        print("所有测试通过！✓")
+    else:
+        print(f"⚠️  有 {failed} 个测试失败")
+    print("=" * 60)
@@ -0,0 +1,273 @@
+"""
+逐文件任务调度器测试脚本
+验证并行调度满足依赖顺序与并发上限，失败后停止开始新文件，各文件输出不交错，
+以及被中断时立即通知已开始的文件停止并写出已捕获的输出
+"""
+
+import contextvars
+import io
+import os
+import random
+import signal
+import sys
+import threading
+import time
+from contextlib import redirect_stdout
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from libs.dependency_graph import DependencyGraph
+from libs.dir_json_funcs import DirJsonFuncs
+from libs.file_task_scheduler import (FileTaskScheduler, is_task_cancelled,
+                                     on_task_cancel)
+
+
+def _random_relation(rng: random.Random, file_count: int):
+    files = [f"src/mod_{i}" for i in range(file_count)]
+    return {
+        file_path: rng.sample(files[:i], rng.randint(0, min(i, 3)))
+        for i, file_path in enumerate(files)
+    }
+
+
+def test_dependency_order_and_limit():
+    """测试依赖顺序与并发上限"""
+    print("\n测试 dependency_order_and_limit 函数...")
+
+    try:
+        rng = random.Random(20240710)
+        for _ in range(10):
+            dependent_relation = _random_relation(rng, rng.randint(5, 20))
+            file_list = DirJsonFuncs.build_file_creation_order(dependent_relation)
+            max_workers = rng.randint(2, 4)
+
+            lock = threading.Lock()
+            finished = set()
+            in_flight = [0]
+            peak = [0]
+            violations = []
+
+            def task(file_path):
+                with lock:
+                    missing = [dep for dep in dependent_relation[file_path] if dep not in finished]
+                    if missing:
+                        violations.append((file_path, missing))
+                    in_flight[0] += 1
+                    peak[0] = max(peak[0], in_flight[0])
+                time.sleep(0.002)
+                with lock:
+                    in_flight[0] -= 1
+                    finished.add(file_path)
+                return True
+
+            scheduler = FileTaskScheduler(DependencyGraph(dependent_relation), file_list, max_workers=max_workers)
+            assert scheduler.run(task), "全部任务应成功"
+            assert not violations, f"依赖尚未完成就开始处理: {violations}"
+            assert peak[0] <= max_workers, f"同时处理的文件数超过上限: {peak[0]}"
+            assert sorted(scheduler.completed_files) == sorted(file_list)
+
+        # 相互独立的文件应并行处理
+        independent = {f"src/leaf_{i}": [] for i in range(4)}
+        start = time.time()
+        scheduler = FileTaskScheduler(DependencyGraph(independent), list(independent), max_workers=4)
+        assert scheduler.run(lambda file_path: time.sleep(0.2) or True)
+        assert time.time() - start < 0.6, "相互独立的文件未并行处理"
+        print("  ✓ 依赖完成后才开始处理，并发数不超过上限")
+        return True
+    except Exception as e:
+        print(f"  ❌ 测试失败: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_failure_and_output():
+    """测试失败处理与输出分组"""
+    print("\n测试 failure_and_output 函数...")
+
+    try:
+        dependent_relation = {
+            "a": [],
+            "b": ["a"],
+            "c": [],
+            "d": ["c"],
+        }
+        file_list = ["a", "c", "b", "d"]
+
+        def task(file_path):
+            for i in range(3):
+                print(f"{file_path}-{i}")
+                time.sleep(0.01)
+            if file_path == "a":
+                return False
+            if file_path == "c":
+                raise RuntimeError("模拟异常")
+            return True
+
+        output = io.StringIO()
+        scheduler = FileTaskScheduler(DependencyGraph(dependent_relation), file_list, max_workers=2)
+        with redirect_stdout(output):
+            result = scheduler.run(task)
+        assert not result
+        assert sorted(scheduler.failed_files) == ["a", "c"]
+        assert isinstance(scheduler.errors.get("c"), RuntimeError)
+        assert scheduler.skipped_files == ["b", "d"], "失败后不应开始新的文件"
+        lines = output.getvalue().split()
+        assert sorted(lines) == ["a-0", "a-1", "a-2", "c-0", "c-1", "c-2"]
+        assert lines[:3] in (["a-0", "a-1", "a-2"], ["c-0", "c-1", "c-2"]), "同一文件的输出应连续"
+
+        # 逐个处理时在当前线程中按文件列表顺序执行
+        order = []
+        scheduler = FileTaskScheduler(DependencyGraph(dependent_relation), file_list, max_workers=1)
+        assert scheduler.run(lambda file_path: order.append((file_path, threading.current_thread())) or True)
+        assert [file_path for file_path, _ in order] == file_list
+        assert all(thread is threading.current_thread() for _, thread in order)
+        print("  ✓ 失败后停止开始新文件，各文件输出连续")
+        return True
+    except Exception as e:
+        print(f"  ❌ 测试失败: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_output_in_submitted_context():
+    """测试在调用方上下文中运行的代码输出同样被捕获"""
+    print("\n测试 output_in_submitted_context 函数...")
+
+    try:
+        dependent_relation = {"a": [], "b": [], "c": []}
+        file_list = ["a", "b", "c"]
+
+        def task(file_path):
+            # 模拟异步运行时：在其他线程中以调用方上下文的副本执行
+            context = contextvars.copy_context()
+            thread = threading.Thread(target=context.run, args=(print, f"{file_path}-stream"))
+            thread.start()
+            thread.join()
+            print(f"{file_path}-done")
+            return True
+
+        output = io.StringIO()
+        scheduler = FileTaskScheduler(DependencyGraph(dependent_relation), file_list, max_workers=3)
+        with redirect_stdout(output):
+            assert scheduler.run(task)
+        lines = output.getvalue().split()
+        assert sorted(lines) == sorted(f"{f}-{s}" for f in file_list for s in ("stream", "done"))
+        for i in range(0, len(lines), 2):
+            file_path = lines[i].split("-")[0]
+            assert lines[i:i + 2] == [f"{file_path}-stream", f"{file_path}-done"], "同一文件的输出应连续"
+        print("  ✓ 其他线程中以调用方上下文输出的内容归入对应文件")
+        return True
+    except Exception as e:
+        print(f"  ❌ 测试失败: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_cyclic_dependency():
+    """测试循环依赖时仍处理全部文件"""
+    print("\n测试 cyclic_dependency 函数...")
+
+    try:
+        dependent_relation = {"a": ["c"], "b": ["a"], "c": ["b"], "d": []}
+        file_list = ["a", "b", "c", "d"]
+        processed = []
+        scheduler = FileTaskScheduler(DependencyGraph(dependent_relation), file_list, max_workers=3)
+        assert scheduler.run(lambda file_path: processed.append(file_path) or True)
+        assert sorted(processed) == file_list, "循环依赖中的文件也应被处理"
+        print("  ✓ 循环依赖时按文件列表顺序处理")
+        return True
+    except Exception as e:
+        print(f"  ❌ 测试失败: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_interrupt_cancels_running():
+    """测试调度被中断时不等待已开始的文件"""
+    print("\n测试 interrupt_cancels_running 函数...")
+
+    try:
+        dependent_relation = {"a": [], "b": [], "c": ["a"]}
+        file_list = ["a", "b", "c"]
+        started = []
+        cancelled = []
+        stopped = threading.Event()
+
+        def task(file_path):
+            started.append(file_path)
+            print(f"{file_path}-begin")
+            # 模拟阻塞在模型请求上的文件：中断时通过回调结束等待
+            released = threading.Event()
+            on_task_cancel(released.set)
+            released.wait(6)
+            cancelled.append((file_path, is_task_cancelled()))
+            if len(cancelled) == 2:
+                stopped.set()
+            return True
+
+        output = io.StringIO()
+        scheduler = FileTaskScheduler(DependencyGraph(dependent_relation), file_list, max_workers=2)
+        # 与命令行一致，以真实的SIGINT中断阻塞在等待中的主线程
+        timer = threading.Timer(0.3, os.kill, args=(os.getpid(), signal.SIGINT))
+        start_time = time.monotonic()
+        timer.start()
+        try:
+            with redirect_stdout(output):
+                scheduler.run(task)
+            assert False, "中断应重新抛出"
+        except KeyboardInterrupt:
+            pass
+        elapsed = time.monotonic() - start_time
+        assert elapsed < 2, f"中断后应立即返回，实际耗时 {elapsed:.1f}s"
+        assert stopped.wait(2), "已开始的文件应收到取消通知"
+        assert sorted(cancelled) == [("a", True), ("b", True)], f"取消状态不正确: {cancelled}"
+        assert started == ["a", "b"] or started == ["b", "a"], f"中断后不应开始新文件: {started}"
+        assert output.getvalue().split() == ["a-begin", "b-begin"], f"已捕获的输出应写出: {output.getvalue()!r}"
+        print(f"  ✓ 中断后 {elapsed:.2f}s 返回，已开始的文件收到取消通知")
+        return True
+    except Exception as e:
+        print(f"  ❌ 测试失败: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("逐文件任务调度器测试")
+    print("=" * 60)
+
+    test_results = []
+    test_results.append(("依赖顺序与并发上限", test_dependency_order_and_limit()))
+    test_results.append(("失败处理与输出分组", test_failure_and_output()))
+    test_results.append(("上下文输出捕获", test_output_in_submitted_context()))
+    test_results.append(("循环依赖", test_cyclic_dependency()))
+    test_results.append(("中断处理", test_interrupt_cancels_running()))
+
+    print("\n" + "=" * 60)
+    print("测试结果汇总")
+    print("=" * 60)
+
+    passed = 0
+    failed = 0
+
+    for test_name, result in test_results:
+        status = "✓ 通过" if result else "❌ 失败"
+        print(f"{test_name:20} {status}")
+        if result:
+            passed += 1
+        else:
+            failed += 1
+
+    print("=" * 60)
+    print(f"总计: {passed} 通过, {failed} 失败")
+
+    if failed == 0:
+        print("所有测试通过！✓")
+    else:
+        print(f"⚠️  有 {failed} 个测试失败")
+    print("=" * 60)
@@ -0,0 +1,243 @@
+"""
+全局符号索引测试脚本
+验证各类查找、保存时的增量更新、外部修改的同步以及快照的保存与加载
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from data_store.global_symbol_index import GlobalSymbolIndex
+from data_store.symbol_table_manager import SymbolTableManager
+from typedef.ibc_data_types import (ClassMetadata, FunctionMetadata,
+                                    VariableMetadata)
+
+
+def _save_ball_entity(ibc_root: str) -> str:
+    """保存 src/ball/ball_entity 的符号表，返回symbols.json路径"""
+    symbols_path = SymbolTableManager.build_symbols_path(ibc_root, "src/ball/ball_entity")
+    SymbolTableManager.save_symbols(
+        symbols_path,
+        "ball_entity",
+        {"BallEntity": {"move": {}, "速度": {}}},
+        {
+            "BallEntity": ClassMetadata(description="小球实体"),
+            "BallEntity.move": FunctionMetadata(parameters={"dt": "时间步长"}),
+            "BallEntity.速度": VariableMetadata(visibility="private", scope="field"),
+        }
+    )
+    return symbols_path
+
+
+def _save_physics(ibc_root: str, class_name: str = "PhysicsEngine") -> str:
+    """保存 src/engine/physics 的符号表，返回symbols.json路径"""
+    symbols_path = SymbolTableManager.build_symbols_path(ibc_root, "src/engine/physics")
+    SymbolTableManager.save_symbols(
+        symbols_path,
+        "physics",
+        {class_name: {"move": {}}},
+        {
+            class_name: ClassMetadata(visibility="protected"),
+            f"{class_name}.move": FunctionMetadata(),
+        }
+    )
+    return symbols_path
+
+
+def test_index_lookups():
+    """测试按完整路径、名称、类型、可见性与文件的查找"""
+    print("\n测试 index_lookups 函数...")
+
+    try:
+        with tempfile.TemporaryDirectory() as ibc_root:
+            _save_ball_entity(ibc_root)
+            _save_physics(ibc_root)
+
+            index = GlobalSymbolIndex(ibc_root)
+            assert index.refresh(), "首次同步应发现所有符号表"
+            assert len(index) == 5
+
+            entry = index.get_symbol("src.ball.ball_entity.BallEntity.move")
+            assert entry is not None and entry.file_path == "src/ball/ball_entity"
+            assert entry.symbol_path == "BallEntity.move" and entry.symbol_type == "func"
+            assert entry.to_metadata().parameters == {"dt": "时间步长"}
+
+            # 条目的元数据为只读副本，不能借此修改符号表缓存
+            for mutate in (lambda: entry.metadata_dict.update(type="var"),
+                           lambda: entry.metadata_dict["parameters"].update(dt="已修改")):
+                try:
+                    mutate()
+                    assert False, "条目元数据应为只读"
+                except (TypeError, AttributeError):
+                    pass
+            symbols_path = SymbolTableManager.build_symbols_path(ibc_root, "src/ball/ball_entity")
+            cached_meta = SymbolTableManager.load_dir_symbols(symbols_path)["ball_entity"]["symbols_metadata"]["BallEntity.move"]
+            assert entry.metadata_dict is not cached_meta and entry.metadata_dict["parameters"] is not cached_meta["parameters"], \
+                "条目不应引用符号表缓存中的原始数据"
+            metadata = entry.to_metadata()
+            metadata.parameters["dt"] = "已修改"
+            assert entry.to_metadata().parameters == {"dt": "时间步长"}, "修改元数据对象不应影响索引"
+
+            locations = sorted(e.file_path for e in index.find_by_name("move"))
+            assert locations == ["src/ball/ball_entity", "src/engine/physics"], f"同名符号应全部列出: {locations}"
+
+            public_classes = [e.full_path for e in index.find_by_type("class", visibility="public")]
+            assert public_classes == ["src.ball.ball_entity.BallEntity"], f"public类: {public_classes}"
+            assert [e.name for e in index.find_by_visibility("private")] == ["速度"]
+            assert len(index.get_file_symbols("src/engine/physics")) == 2
+            assert sorted(index.get_file_paths()) == ["src/ball/ball_entity", "src/engine/physics"]
+            assert not index.refresh(), "符号表未变化时不应重新索引"
+        print("  ✓ 全局符号索引查找正确")
+        return True
+    except Exception as e:
+        print(f"  ❌ 测试失败: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_incremental_update_and_snapshot():
+    """测试保存时的增量更新、外部修改同步与快照加载"""
+    print("\n测试 incremental_update_and_snapshot 函数...")
+
+    try:
+        with tempfile.TemporaryDirectory() as ibc_root:
+            _save_ball_entity(ibc_root)
+            index = GlobalSymbolIndex(ibc_root)
+            index.refresh()
+            index.attach()
+            try:
+                # 保存符号表后索引随之更新，快照延迟到detach时写出
+                physics_path = _save_physics(ibc_root)
+                assert "src.engine.physics.PhysicsEngine" in index, "保存后应增量加入索引"
+                _save_physics(ibc_root, class_name="ForceSolver")
+                assert "src.engine.physics.PhysicsEngine" not in index, "重新保存后旧符号应移除"
+                assert index.get_symbol("src.engine.physics.ForceSolver").visibility == "protected"
+                assert not os.path.exists(index.snapshot_path), "增量更新时不应每次写出整个快照"
+            finally:
+                index.detach()
+            assert os.path.exists(index.snapshot_path), "detach时应写出快照"
+            assert not index.flush_snapshot(), "快照已写出后不应重复写出"
+            with open(index.snapshot_path, 'rb') as f:
+                snapshot_data = f.read()
+            assert snapshot_data[:8] == b'IBCSYM\x02\x00', "快照文件头应为版本2"
+            assert "dir_stamps" in json.loads(snapshot_data[8:].decode('utf-8')), "快照内容应为JSON"
+
+            # 快照加载后与原索引一致，且无需重新读取符号表
+            restored = GlobalSymbolIndex(ibc_root)
+            assert restored.load_snapshot(), "快照应可加载"
+            assert sorted(e.full_path for e in restored.find_by_name("move")) == \
+                sorted(e.full_path for e in index.find_by_name("move"))
+            assert not restored.refresh(), "快照与磁盘一致时不应重新索引"
+
+            # 外部修改与删除
+            with open(physics_path, 'r', encoding='utf-8') as f:
+                dir_symbols = json.load(f)
+            dir_symbols["physics"]["symbols_metadata"]["ForceSolver.reset"] = {"type": "func"}
+            with open(physics_path, 'w', encoding='utf-8') as f:
+                json.dump(dir_symbols, f, ensure_ascii=False)
+            assert restored.refresh() and "src.engine.physics.ForceSolver.reset" in restored
+            os.remove(physics_path)
+            assert restored.refresh() and restored.get_file_symbols("src/engine/physics") == []
+
+            # 损坏的快照不可加载
+            with open(restored.snapshot_path, 'wb') as f:
+                f.write(b'broken')
+            assert not GlobalSymbolIndex(ibc_root).load_snapshot(), "损坏的快照应加载失败"
+            with open(restored.snapshot_path, 'wb') as f:
+                f.write(b'IBCSYM\x01\x00' + snapshot_data[8:])
+            assert not GlobalSymbolIndex(ibc_root).load_snapshot(), "旧版本快照应加载失败"
+        print("  ✓ 增量更新与快照正确")
+        return True
+    except Exception as e:
+        print(f"  ❌ 测试失败: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_concurrent_saves():
+    """测试多线程同时保存符号表时索引与快照保持一致"""
+    print("\n测试 concurrent_saves 函数...")
+
+    try:
+        with tempfile.TemporaryDirectory() as ibc_root:
+            index = GlobalSymbolIndex(ibc_root)
+            index.attach()
+            errors = []
+
+            def save_module(worker_id: int) -> None:
+                try:
+                    for round_id in range(5):
+                        file_path = f"src/mod_{worker_id}/file_{round_id}"
+                        symbols_path = SymbolTableManager.build_symbols_path(ibc_root, file_path)
+                        SymbolTableManager.save_symbols(
+                            symbols_path,
+                            f"file_{round_id}",
+                            {f"Worker{worker_id}": {}},
+                            {f"Worker{worker_id}": ClassMetadata()}
+                        )
+                        index.find_by_type("class")
+                        index.flush_snapshot()
+                except Exception as e:
+                    errors.append(e)
+
+            threads = [threading.Thread(target=save_module, args=(worker_id,)) for worker_id in range(12)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            index.detach()
+
+            assert not errors, f"并发保存出现异常: {errors[:3]}"
+            assert len(index) == 60, f"索引应包含全部符号: {len(index)}"
+            assert not [name for name in os.listdir(ibc_root) if name.endswith('.tmp')], "不应残留临时文件"
+            restored = GlobalSymbolIndex(ibc_root)
+            assert restored.load_snapshot() and len(restored) == 60, "快照应包含全部符号"
+            assert not restored.refresh(), "快照应与磁盘上的符号表一致"
+        print("  ✓ 并发保存时索引与快照一致")
+        return True
+    except Exception as e:
+        print(f"  ❌ 测试失败: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("全局符号索引测试")
+    print("=" * 60)
+
+    test_results = []
+    test_results.append(("索引查找", test_index_lookups()))
+    test_results.append(("增量更新与快照", test_incremental_update_and_snapshot()))
+    test_results.append(("并发保存", test_concurrent_saves()))
+
+    print("\n" + "=" * 60)
+    print("测试结果汇总")
+    print("=" * 60)
+
+    passed = 0
+    failed = 0
+
+    for test_name, result in test_results:
+        status = "✓ 通过" if result else "❌ 失败"
+        print(f"{test_name:20} {status}")
+        if result:
+            passed += 1
+        else:
+            failed += 1
+
+    print("=" * 60)
+    print(f"总计: {passed} 通过, {failed} 失败")
+
+    if failed == 0:
+        print("所有测试通过！✓")
+    else:
+        print(f"⚠️  有 {failed} 个测试失败")
+    print("=" * 60)
@@ -0,0 +1,194 @@
+"""
+IBC分析缓存测试脚本
+验证缓存命中结果与重新分析一致、有错误的结果不会被缓存、超出大小上限时按LRU淘汰
+"""
+
+import os
+import pickle
+import sys
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.ibc_analyzer.ibc_analysis_cache import \
+    get_instance as get_ibc_analysis_cache
+from utils.ibc_analyzer.ibc_analyzer import analyze_ibc_content
+from utils.issue_recorder import IbcIssueRecorder
+
+
+SAMPLE_CODE = """module json: 标准JSON解析库
+
+description: 配置管理器
+class ConfigManager():
+    var configPath: 配置文件路径
+
+    func 加载配置(路径: 字符串路径):
+        文件内容 = 读取文件(self.configPath)
+        返回 $json.parse(文件内容)"""
+
+
+def test_cache_hit():
+    """测试缓存命中时返回与完整分析一致的结果"""
+    print("\n测试 cache_hit 函数...")
+
+    analysis_cache = get_ibc_analysis_cache()
+    try:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            analysis_cache.set_cache_dir(cache_dir)
+            first_ast, first_tree, first_metadata = analyze_ibc_content(SAMPLE_CODE)
+            hit_count = analysis_cache.hit_count
+            cached_ast, cached_tree, cached_metadata = analyze_ibc_content(SAMPLE_CODE)
+            assert analysis_cache.hit_count == hit_count + 1, "第二次分析应命中缓存"
+            assert len(os.listdir(cache_dir)) == 1, "相同文本只应产生一个缓存条目"
+
+            assert cached_ast == first_ast, "缓存的AST与分析结果不一致"
+            assert cached_tree == first_tree, "缓存的符号树与分析结果不一致"
+            assert {k: v.to_dict() for k, v in cached_metadata.items()} == \
+                {k: v.to_dict() for k, v in first_metadata.items()}, "缓存的符号元数据与分析结果不一致"
+
+            # 每次命中都返回独立的对象，调用方的修改不会影响缓存
+            cached_ast[0].children_uids.clear()
+            again_ast, _, _ = analyze_ibc_content(SAMPLE_CODE)
+            assert again_ast == first_ast, "调用方的修改不应写回缓存"
+        print("  ✓ 缓存命中结果与完整分析一致")
+        return True
+    except Exception as e:
+        print(f"  ❌ 测试失败: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+    finally:
+        analysis_cache.set_cache_dir("")
+
+
+def test_errors_not_cached():
+    """测试存在语法错误的分析结果不会被缓存"""
+    print("\n测试 errors_not_cached 函数...")
+
+    analysis_cache = get_ibc_analysis_cache()
+    try:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            analysis_cache.set_cache_dir(cache_dir)
+            broken_code = SAMPLE_CODE.replace("class ConfigManager():", "class ConfigManager(:")
+            for _ in range(2):
+                recorder = IbcIssueRecorder()
+                analyze_ibc_content(broken_code, recorder, recover_errors=True)
+                assert recorder.get_issue_count() == 1, "每次分析都应重新记录语法错误"
+            assert not os.listdir(cache_dir), "有错误的分析结果不应写入缓存"
+        print("  ✓ 有错误的分析结果不会被缓存")
+        return True
+    except Exception as e:
+        print(f"  ❌ 测试失败: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+    finally:
+        analysis_cache.set_cache_dir("")
+
+
+def test_lru_eviction():
+    """测试超出大小上限时淘汰最久未使用的条目"""
+    print("\n测试 lru_eviction 函数...")
+
+    analysis_cache = get_ibc_analysis_cache()
+    original_max_bytes = analysis_cache.max_bytes
+    try:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            codes = [SAMPLE_CODE.replace("ConfigManager", f"Manager{i}") for i in range(3)]
+            analysis_cache.set_cache_dir(cache_dir)
+            analyze_ibc_content(codes[0])
+            entry_size = os.path.getsize(os.path.join(cache_dir, os.listdir(cache_dir)[0]))
+
+            # 上限只能容纳两个条目
+            analysis_cache.set_cache_dir(cache_dir, max_bytes=entry_size * 2 + entry_size // 2)
+            analyze_ibc_content(codes[1])
+            analyze_ibc_content(codes[0])  # 命中后成为最近使用
+            analyze_ibc_content(codes[2])
+
+            cached_keys = {name[:-len('.json')] for name in os.listdir(cache_dir)}
+            expected_keys = {analysis_cache.build_key(codes[0]), analysis_cache.build_key(codes[2])}
+            assert cached_keys == expected_keys, "应淘汰最久未使用的条目"
+        print("  ✓ 超出上限时按LRU淘汰")
+        return True
+    except Exception as e:
+        print(f"  ❌ 测试失败: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+    finally:
+        analysis_cache.set_cache_dir("", max_bytes=original_max_bytes)
+
+
+class _TouchOnLoad:
+    """反序列化时会创建标记文件的对象，用于检查缓存是否执行了pickle数据"""
+
+    def __init__(self, marker_path):
+        self.marker_path = marker_path
+
+    def __reduce__(self):
+        return (open, (self.marker_path, 'w'))
+
+
+def test_legacy_pickle_not_loaded():
+    """测试旧版pickle缓存条目不会被反序列化，并在重建索引时删除"""
+    print("\n测试 legacy_pickle_not_loaded 函数...")
+
+    analysis_cache = get_ibc_analysis_cache()
+    try:
+        with tempfile.TemporaryDirectory() as cache_dir, tempfile.TemporaryDirectory() as marker_dir:
+            marker_path = os.path.join(marker_dir, "executed")
+            analysis_cache.set_cache_dir(cache_dir)
+            legacy_path = os.path.join(cache_dir, analysis_cache.build_key(SAMPLE_CODE) + '.pkl')
+            with open(legacy_path, 'wb') as f:
+                pickle.dump(_TouchOnLoad(marker_path), f)
+
+            analyze_ibc_content(SAMPLE_CODE)
+            analyze_ibc_content(SAMPLE_CODE)
+            assert not os.path.exists(marker_path), "缓存不应反序列化pickle数据"
+            assert not os.path.exists(legacy_path), "旧版pickle条目应被删除"
+            assert all(name.endswith('.json') for name in os.listdir(cache_dir)), "缓存条目应为JSON"
+        print("  ✓ 旧版pickle条目未被加载")
+        return True
+    except Exception as e:
+        print(f"  ❌ 测试失败: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+    finally:
+        analysis_cache.set_cache_dir("")
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("IBC分析缓存测试")
+    print("=" * 60)
+
+    test_results = []
+    test_results.append(("缓存命中", test_cache_hit()))
+    test_results.append(("错误结果不缓存", test_errors_not_cached()))
+    test_results.append(("LRU淘汰", test_lru_eviction()))
+    test_results.append(("不加载pickle条目", test_legacy_pickle_not_loaded()))
+
+    print("\n" + "=" * 60)
+    print("测试结果汇总")
+    print("=" * 60)
+
+    passed = 0
+    failed = 0
+
+    for test_name, result in test_results:
+        status = "✓ 通过" if result else "❌ 失败"
+        print(f"{test_name:20} {status}")
+        if result:
+            passed += 1
+        else:
+            failed += 1
+
+    print("=" * 60)
+    print(f"总计: {passed} 通过, {failed} 失败")
+
+    if failed == 0:
+        print("所有测试通过！✓")
+    else:
+        print(f"⚠️  有 {failed} 个测试失败")
+    print("=" * 60)
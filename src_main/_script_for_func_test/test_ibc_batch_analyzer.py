@@ -0,0 +1,170 @@
+"""
+IBC批量分析器测试脚本
+验证批量分析能够一次汇总所有文件的语法错误与符号引用问题，且多进程与单进程结果一致
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.ibc_analyzer.ibc_batch_analyzer import IbcBatchAnalyzer
+
+
+PROJ_ROOT_DICT = {
+    "src": {
+        "ball": {"ball_entity": "球体实体"},
+        "physics": "物理计算",
+        "game": "游戏主循环"
+    }
+}
+
+DEPENDENT_RELATION = {
+    "src/ball/ball_entity": [],
+    "src/physics": ["src/ball/ball_entity"],
+    "src/game": ["src/physics", "src/ball/ball_entity"]
+}
+
+IBC_CONTENTS = {
+    "src/ball/ball_entity": """description: 球体实体
+class BallEntity():
+    var position: 位置
+
+    func 移动(距离: 数值):
+        position 增加 距离
+""",
+    "src/physics": """module src.ball.ball_entity: 球体实体
+
+func 更新(球: 球体对象):
+    调用 $ball_entity.BallEntity(球)
+    调用 $ball_entity.Missing()
+""",
+    "src/game": """module src.physics: 物理计算
+module src.ball.ball_entity: 球体实体
+
+func 主循环():
+    执行 $physics.更新(球)
+    func 坏函数(
+    结束
+""",
+}
+
+
+def summarize(report):
+    """提取报告中与执行方式无关的内容"""
+    return [
+        (result.file_path, result.reference_checked,
+         [issue.to_dict() for issue in result.syntax_issues],
+         [issue.to_dict() for issue in result.reference_issues])
+        for result in report.file_results
+    ]
+
+
+def test_batch_report():
+    """测试汇总报告的内容与顺序"""
+    print("\n测试 batch_report 函数...")
+
+    try:
+        analyzer = IbcBatchAnalyzer(PROJ_ROOT_DICT, DEPENDENT_RELATION, max_workers=1)
+        report = analyzer.analyze_files(IBC_CONTENTS)
+        results = {result.file_path: result for result in report.file_results}
+
+        assert [result.file_path for result in report.file_results] == \
+            ["src/ball/ball_entity", "src/physics", "src/game"], "报告应按依赖顺序排列"
+        assert all(result.reference_checked for result in report.file_results), "所有文件都应完成符号引用验证"
+        assert results["src/ball/ball_entity"].is_valid(), "被依赖文件不应有问题"
+        assert results["src/ball/ball_entity"].symbols_count > 0, "应统计符号数量"
+
+        physics = results["src/physics"]
+        assert not physics.syntax_issues, "src/physics不应有语法错误"
+        assert len(physics.reference_issues) == 1 and "Missing" in physics.reference_issues[0].message, \
+            f"src/physics应报告1个符号引用错误: {physics.reference_issues}"
+
+        game = results["src/game"]
+        assert [issue.line_num for issue in game.syntax_issues] == [7], f"src/game应在第7行报告语法错误: {game.syntax_issues}"
+        assert not game.reference_issues, "src/game的部分AST仍应通过符号引用验证"
+
+        assert not report.is_all_valid() and report.get_issue_count() == 2, "问题总数应为2"
+        assert [result.file_path for result in report.get_invalid_results()] == ["src/physics", "src/game"]
+        print(f"  ✓ 报告包含 {report.get_issue_count()} 个问题，顺序与依赖顺序一致")
+        return True
+    except Exception as e:
+        print(f"  ❌ 测试失败: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_missing_dependency():
+    """测试依赖文件未参与分析时跳过符号引用验证"""
+    print("\n测试 missing_dependency 函数...")
+
+    try:
+        contents = {path: content for path, content in IBC_CONTENTS.items() if path != "src/physics"}
+        analyzer = IbcBatchAnalyzer(PROJ_ROOT_DICT, DEPENDENT_RELATION, max_workers=1)
+        report = analyzer.analyze_files(contents)
+        results = {result.file_path: result for result in report.file_results}
+
+        assert "src/physics" not in results, "未提供内容的文件不应出现在报告中"
+        assert results["src/ball/ball_entity"].reference_checked, "无依赖的文件应完成符号引用验证"
+        assert not results["src/game"].reference_checked, "依赖缺失的文件应跳过符号引用验证"
+        assert results["src/game"].syntax_issues, "跳过引用验证时仍应报告语法错误"
+        print("  ✓ 依赖缺失时正确跳过符号引用验证")
+        return True
+    except Exception as e:
+        print(f"  ❌ 测试失败: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_process_pool_consistency():
+    """测试多进程执行结果与单进程一致"""
+    print("\n测试 process_pool_consistency 函数...")
+
+    try:
+        serial_report = IbcBatchAnalyzer(PROJ_ROOT_DICT, DEPENDENT_RELATION, max_workers=1).analyze_files(IBC_CONTENTS)
+        parallel_report = IbcBatchAnalyzer(PROJ_ROOT_DICT, DEPENDENT_RELATION, max_workers=3).analyze_files(IBC_CONTENTS)
+        assert summarize(serial_report) == summarize(parallel_report), "多进程与单进程结果不一致"
+        print("  ✓ 多进程与单进程结果一致")
+        return True
+    except Exception as e:
+        print(f"  ❌ 测试失败: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("IBC批量分析器测试")
+    print("=" * 60)
+
+    test_results = []
+    test_results.append(("汇总报告", test_batch_report()))
+    test_results.append(("依赖缺失", test_missing_dependency()))
+    test_results.append(("多进程一致性", test_process_pool_consistency()))
+
+    print("\n" + "=" * 60)
+    print("测试结果汇总")
+    print("=" * 60)
+
+    passed = 0
+    failed = 0
+
+    for test_name, result in test_results:
+        status = "✓ 通过" if result else "❌ 失败"
+        print(f"{test_name:20} {status}")
+        if result:
+            passed += 1
+        else:
+            failed += 1
+
+    print("=" * 60)
+    print(f"总计: {passed} 通过, {failed} 失败")
+
+    if failed == 0:
+        print("所有测试通过！✓")
+    else:
+        print(f"⚠️  有 {failed} 个测试失败")
+    print("=" * 60)
@@ -0,0 +1,158 @@
+"""
+紧凑AST容器测试脚本
+验证 IbcCompactAst 与 Dict[int, IbcBaseAstNode] 之间的互相转换，以及只读消费者在两种容器上的结果一致
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from libs.symbol_replacer import SymbolReplacer
+from typedef.ibc_data_types import AstNodeType, ClassNode, FunctionNode
+from utils.ibc_analyzer.ibc_analyzer import analyze_ibc_content
+from utils.ibc_analyzer.ibc_compact_ast import IbcCompactAst
+from utils.ibc_analyzer.ibc_symbol_processor import IbcSymbolProcessor
+
+
+SAMPLE_CODE = """module json: 标准JSON解析库
+var 全局计数: 计数器
+
+description: 配置管理器
+@ 线程安全
+class ConfigManager($Base: 父类):
+    var configPath: 配置文件路径，类型为 $json.Path
+
+    func 加载配置(路径: 字符串路径, 编码: 文本编码):
+        文件内容 = 读取文件(self.configPath)
+        如果 文件内容 为空:
+            返回 $json.parse(文件内容)
+        返回 空
+
+func 计算(a: 数字, b: 数字):
+    结果 = a 加 b
+    返回 结果"""
+
+
+def test_round_trip():
+    """测试与字典形式的互相转换"""
+    print("\n测试 round_trip 函数...")
+
+    try:
+        ast_dict, _, _ = analyze_ibc_content(SAMPLE_CODE)
+        compact = IbcCompactAst.from_ast_dict(ast_dict)
+
+        assert len(compact) == len(ast_dict), "节点数量不一致"
+        assert list(compact.keys()) == list(ast_dict.keys()), "节点uid顺序不一致"
+        assert compact.to_ast_dict() == ast_dict, "转换回字典后与原AST不一致"
+
+        for uid, node in ast_dict.items():
+            assert compact.get(uid) == node, f"节点 {uid} 内容不一致"
+            assert list(compact.iter_children_uids(uid)) == node.children_uids, f"节点 {uid} 子节点不一致"
+            assert compact.get_parent_uid(uid) == node.parent_uid, f"节点 {uid} 父节点不一致"
+            assert compact.get_node_type(uid) == node.node_type, f"节点 {uid} 类型不一致"
+        assert compact.get(9999) is None, "不存在的uid应返回None"
+        print(f"  ✓ {len(compact)} 个节点转换前后完全一致")
+        return True
+    except Exception as e:
+        print(f"  ❌ 测试失败: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_snapshot_isolation():
+    """测试容器返回的节点是只读快照"""
+    print("\n测试 snapshot_isolation 函数...")
+
+    try:
+        ast_dict, _, _ = analyze_ibc_content(SAMPLE_CODE)
+        compact = IbcCompactAst.from_ast_dict(ast_dict)
+        func_uid = next(uid for uid, node in ast_dict.items() if isinstance(node, FunctionNode) and node.identifier == "加载配置")
+
+        original_params = dict(ast_dict[func_uid].params)
+        node = compact[func_uid]
+        node.params["新参数"] = "不应写回容器"
+        node.children_uids.clear()
+        ast_dict[func_uid].params["另一个参数"] = "修改原字典也不应影响容器"
+
+        fresh = compact[func_uid]
+        assert fresh.params == original_params, f"参数被意外修改: {fresh.params}"
+        assert fresh.children_uids, "子节点列表被意外修改"
+        assert compact.get_identifier(func_uid) == "加载配置"
+        print("  ✓ 节点快照与容器内部数据互不影响")
+        return True
+    except Exception as e:
+        print(f"  ❌ 测试失败: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_consumers_on_compact_ast():
+    """测试符号处理器与符号替换器在紧凑容器上的结果与字典一致"""
+    print("\n测试 consumers_on_compact_ast 函数...")
+
+    try:
+        ast_dict, _, _ = analyze_ibc_content(SAMPLE_CODE)
+        compact = IbcCompactAst.from_ast_dict(ast_dict)
+
+        tree_dict, metadata_dict = IbcSymbolProcessor(ast_dict).build_symbol_tree()
+        tree_compact, metadata_compact = IbcSymbolProcessor(compact).build_symbol_tree()
+        assert tree_dict == tree_compact, "符号树不一致"
+        assert {k: v.to_dict() for k, v in metadata_dict.items()} == \
+            {k: v.to_dict() for k, v in metadata_compact.items()}, "符号元数据不一致"
+
+        for meta in metadata_dict.values():
+            meta.normalized_name = "n_" + meta.type
+        replaced_dict = SymbolReplacer.replace_symbols_with_normalized_names(
+            SAMPLE_CODE, ast_dict, metadata_dict, "sample")
+        replaced_compact = SymbolReplacer.replace_symbols_with_normalized_names(
+            SAMPLE_CODE, compact, metadata_dict, "sample")
+        assert replaced_dict == replaced_compact, "符号替换结果不一致"
+
+        class_uids = [uid for uid in compact if compact.get_node_type(uid) == AstNodeType.CLASS]
+        assert len(class_uids) == 1, f"预期1个类节点，实际{len(class_uids)}"
+        assert isinstance(compact[class_uids[0]], ClassNode), "类节点应构造为ClassNode"
+        print("  ✓ 符号处理器与符号替换器结果一致")
+        return True
+    except Exception as e:
+        print(f"  ❌ 测试失败: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("紧凑AST容器测试")
+    print("=" * 60)
+
+    test_results = []
+    test_results.append(("字典互相转换", test_round_trip()))
+    test_results.append(("节点快照隔离", test_snapshot_isolation()))
+    test_results.append(("只读消费者一致", test_consumers_on_compact_ast()))
+
+    print("\n" + "=" * 60)
+    print("测试结果汇总")
+    print("=" * 60)
+
+    passed = 0
+    failed = 0
+
+    for test_name, result in test_results:
+        status = "✓ 通过" if result else "❌ 失败"
+        print(f"{test_name:20} {status}")
+        if result:
+            passed += 1
+        else:
+            failed += 1
+
+    print("=" * 60)
+    print(f"总计: {passed} 通过, {failed} 失败")
+
+    if failed == 0:
+        print("所有测试通过！✓")
+    else:
+        print(f"⚠️  有 {failed} 个测试失败")
+    print("=" * 60)
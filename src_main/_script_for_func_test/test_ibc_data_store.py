@@ -7,14 +7,19 @@ IBC数据管理器测试
 3. 校验数据管理
 4. 符号表数据管理
 5. 真实IBC代码的AST持久化测试
+6. AST二进制格式（子树读取、JSON导出与旧版JSON兼容）
 """
+import json
 import os
+import struct
 import sys
+import tempfile
 from typing import Any, Dict
 
 # 添加src_main到路径
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from data_store.ibc_ast_binary_format import IbcAstBinaryFormat
 from data_store.ibc_data_store import get_instance as get_ibc_data_store
 from libs.ibc_funcs import IbcFuncs
 from typedef.ibc_data_types import (AstNodeType, BehaviorStepNode,
@@ -370,6 +375,90 @@ def test_verify_data_management():
         print(f"   ✗ 不存在文件应返回空字典")
         return False
     
+    # 测试用例5: 校验数据会话
+    print("\n4.5 测试校验数据会话...")
+    with tempfile.TemporaryDirectory() as data_dir:
+        if not _run_verify_session_cases(data_dir):
+            return False
+    
+    return True
+
+
+def _run_verify_session_cases(data_dir: str) -> bool:
+    """校验数据会话的各测试用例：批量提交、异常回滚、并发写入合并"""
+    import threading
+    from data_store.verify_data_manager import VerifyDataManager, VerifyDataSession
+
+    ibc_data_store = get_ibc_data_store()
+    verify_file_path = os.path.join(data_dir, 'icp_verify_data.json')
+
+    write_count = [0]
+    original_write = VerifyDataManager._write_verify_file
+
+    def counting_write(path, data):
+        write_count[0] += 1
+        return original_write(path, data)
+
+    VerifyDataManager._write_verify_file = staticmethod(counting_write)
+    try:
+        with ibc_data_store.open_verify_data_session(data_dir) as session:
+            for i in range(20):
+                ibc_data_store.update_file_verify_data(data_dir, f"src/file_{i}", {'ibc_verify_code': str(i)})
+            session.update("src/file_0", {'symbols_count': '3'})
+            if os.path.exists(verify_file_path):
+                print(f"   ✗ 会话提交前不应写入verify文件")
+                return False
+            if ibc_data_store.load_file_verify_data(data_dir, "src/file_0") != {'ibc_verify_code': '0', 'symbols_count': '3'}:
+                print(f"   ✗ 会话内读取应包含尚未提交的修改")
+                return False
+    finally:
+        VerifyDataManager._write_verify_file = staticmethod(original_write)
+
+    all_verify_data = ibc_data_store.load_all_verify_data(data_dir)
+    if write_count[0] != 1 or len(all_verify_data) != 20 or all_verify_data["src/file_19"] != {'ibc_verify_code': '19'}:
+        print(f"   ✗ 会话批量提交结果错误，写入次数: {write_count[0]}")
+        return False
+    print(f"   ✓ 会话内20次修改只写入1次verify文件")
+
+    try:
+        with ibc_data_store.open_verify_data_session(data_dir):
+            ibc_data_store.save_file_verify_data(data_dir, "src/file_1", {})
+            raise RuntimeError("模拟中途失败")
+    except RuntimeError:
+        pass
+    if ibc_data_store.load_file_verify_data(data_dir, "src/file_1") != {'ibc_verify_code': '1'}:
+        print(f"   ✗ 会话异常退出时应丢弃未提交的修改")
+        return False
+    print(f"   ✓ 会话异常退出时未提交的修改被丢弃")
+
+    # 会话期间其他进程提交的修改不会被覆盖
+    with ibc_data_store.open_verify_data_session(data_dir) as session:
+        session.update("src/file_2", {'ibc_verify_code': 'changed'})
+        other_worker = VerifyDataSession(data_dir)
+        other_worker.update("src/other", {'ibc_verify_code': 'other'})
+        other_worker.commit()
+
+    def worker(index: int):
+        for j in range(10):
+            VerifyDataManager.update_file_verify_data(data_dir, f"thread/{index}", {f'code_{j}': str(j)})
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    all_verify_data = VerifyDataManager.load_all_verify_data(data_dir)
+    if all_verify_data.get("src/file_2") != {'ibc_verify_code': 'changed'} or "src/other" not in all_verify_data:
+        print(f"   ✗ 提交时应合并其他会话的修改")
+        return False
+    if any(len(all_verify_data.get(f"thread/{i}", {})) != 10 for i in range(4)):
+        print(f"   ✗ 并发写入存在丢失")
+        return False
+    if [name for name in os.listdir(data_dir) if name.endswith('.tmp')]:
+        print(f"   ✗ 存在残留的临时文件")
+        return False
+    print(f"   ✓ 并发提交的修改均被保留")
     return True
 
 
@@ -440,7 +529,284 @@ def test_symbol_management():
 
     print(f"   ✓ 符号表保存和加载成功，共 {len(loaded_metadata)} 条元数据")
 
+    # 测试用例2: 符号表缓存
+    print("\n5.2 测试符号表缓存...")
+    with tempfile.TemporaryDirectory() as cache_ibc_root:
+        if not _run_symbols_cache_cases(cache_ibc_root, symbols_tree, symbols_metadata):
+            return False
+
+    # 测试用例3: 分片存储
+    print("\n5.3 测试符号表分片存储...")
+    with tempfile.TemporaryDirectory() as shard_ibc_root:
+        try:
+            ibc_data_store.set_symbols_storage_mode("sharded")
+            if not _run_symbols_shard_cases(shard_ibc_root, symbols_tree, symbols_metadata):
+                return False
+        finally:
+            ibc_data_store.set_symbols_storage_mode("directory")
+
+    return True
+
+
+def _run_symbols_shard_cases(
+    test_ibc_root: str,
+    symbols_tree: Dict[str, Any],
+    symbols_metadata: Dict[str, Any]
+) -> bool:
+    """分片存储的各测试用例：并发保存、读取合并、合并回symbols.json"""
+    import threading
+
+    ibc_data_store = get_ibc_data_store()
+    symbols_path = ibc_data_store.build_symbols_path(test_ibc_root, "user/manager")
+    shard_dir = os.path.join(os.path.dirname(symbols_path), "symbols.d")
+    file_names = [f"manager_{i}" for i in range(8)]
+
+    # 同一目录下不同文件的并发保存互不覆盖
+    threads = [
+        threading.Thread(target=ibc_data_store.save_symbols, args=(symbols_path, name, symbols_tree, symbols_metadata))
+        for name in file_names
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    if os.path.exists(symbols_path) or sorted(os.listdir(shard_dir)) != sorted(f"{name}.json" for name in file_names):
+        print(f"   ✗ 分片模式下应只写入各文件的分片: {os.listdir(shard_dir)}")
+        return False
+    for name in file_names:
+        loaded_tree, loaded_metadata = ibc_data_store.load_symbols(symbols_path, name)
+        if loaded_tree != symbols_tree or set(loaded_metadata) != set(symbols_metadata):
+            print(f"   ✗ 分片中的符号加载不一致: {name}")
+            return False
+
+    # 合并回symbols.json后读取结果不变
+    if ibc_data_store.compact_symbols(symbols_path) != len(file_names):
+        print(f"   ✗ 应合并全部分片")
+        return False
+    if os.path.exists(shard_dir):
+        print(f"   ✗ 合并后分片目录应被删除")
+        return False
+    loaded_tree, _ = ibc_data_store.load_symbols(symbols_path, file_names[0])
+    if loaded_tree != symbols_tree:
+        print(f"   ✗ 合并后加载的符号树不一致")
+        return False
+
+    # 分片优先于symbols.json中的同名条目，目录模式保存时合并并清理分片
+    ibc_data_store.save_symbols(symbols_path, file_names[0], {"新类": {}}, {})
+    if ibc_data_store.load_symbols(symbols_path, file_names[0])[0] != {"新类": {}}:
+        print(f"   ✗ 分片应覆盖symbols.json中的旧条目")
+        return False
+    ibc_data_store.set_symbols_storage_mode("directory")
+    ibc_data_store.save_symbols(symbols_path, file_names[1], {}, {})
+    with open(symbols_path, 'r', encoding='utf-8') as f:
+        dir_symbols = json.load(f)
+    if os.path.exists(shard_dir) or dir_symbols[file_names[0]]["symbols_tree"] != {"新类": {}}:
+        print(f"   ✗ 目录模式保存时应将分片合并进symbols.json")
+        return False
+    if any(name.endswith(".tmp") for name in os.listdir(os.path.dirname(symbols_path))):
+        print(f"   ✗ 不应残留临时文件")
+        return False
+
+    print(f"   ✓ 分片存储的并发保存、读取与合并正确")
+    return True
+
+
+def _run_symbols_cache_cases(
+    test_ibc_root: str,
+    symbols_tree: Dict[str, Any],
+    symbols_metadata: Dict[str, Any]
+) -> bool:
+    """符号表缓存的各测试用例：重复加载不再解析，保存或外部修改后失效"""
+    from unittest import mock
+
+    from data_store import symbol_table_manager
+
+    ibc_data_store = get_ibc_data_store()
+    dependent_relation = {"app/main": ["user/manager"]}
+    symbols_path = ibc_data_store.build_symbols_path(test_ibc_root, "user/manager")
+    ibc_data_store.save_symbols(symbols_path, "manager", symbols_tree, symbols_metadata)
+
+    parse_count = [0]
+    original_json_load = json.load
+
+    def counting_json_load(*args, **kwargs):
+        parse_count[0] += 1
+        return original_json_load(*args, **kwargs)
+
+    with mock.patch.object(symbol_table_manager.json, "load", counting_json_load):
+        for _ in range(3):
+            if not ibc_data_store.is_dependency_symbol_tables_valid(test_ibc_root, dependent_relation, "app/main"):
+                print(f"   ✗ 依赖符号表应有效")
+                return False
+            first = ibc_data_store.load_dependency_symbol_tables(test_ibc_root, dependent_relation, "app/main")
+        second = ibc_data_store.load_dependency_symbol_tables(test_ibc_root, dependent_relation, "app/main")
+        if parse_count[0] != 1:
+            print(f"   ✗ 重复检查和加载应只解析一次，实际解析 {parse_count[0]} 次")
+            return False
+        if first["user/manager"][1] is not second["user/manager"][1]:
+            print(f"   ✗ 依赖符号数据未变化时应返回同一组对象")
+            return False
+        try:
+            second["user/manager"][1]["临时"] = None
+            print(f"   ✗ 共享的依赖符号元数据应为只读")
+            return False
+        except TypeError:
+            pass
+
+        # load_symbols返回新建对象，修改后不影响缓存
+        loaded_tree, loaded_metadata = ibc_data_store.load_symbols(symbols_path, "manager")
+        loaded_tree["UserManager"]["临时"] = {}
+        loaded_metadata.pop("UserManager")
+        shared_tree, shared_metadata = second["user/manager"]
+        if "临时" in shared_tree["UserManager"] or "UserManager" not in shared_metadata:
+            print(f"   ✗ 修改load_symbols的结果不应影响缓存")
+            return False
+
+        # save_symbols后缓存失效
+        ibc_data_store.update_symbols_batch(symbols_path, "manager", {"UserManager": "UserManagerNorm"})
+        updated = ibc_data_store.load_dependency_symbol_tables(test_ibc_root, dependent_relation, "app/main")
+        if updated["user/manager"][1]["UserManager"].normalized_name != "UserManagerNorm":
+            print(f"   ✗ 保存后应读取到更新的符号数据")
+            return False
+        parse_count_after_save = parse_count[0]
+
+        # 外部修改文件（大小变化）后缓存失效
+        with open(symbols_path, 'r', encoding='utf-8') as f:
+            dir_symbols = original_json_load(f)
+        dir_symbols["manager"]["symbols_tree"]["UserManager"]["外部新增"] = {}
+        with open(symbols_path, 'w', encoding='utf-8') as f:
+            json.dump(dir_symbols, f, ensure_ascii=False)
+        external = ibc_data_store.load_dependency_symbol_tables(test_ibc_root, dependent_relation, "app/main")
+        if "外部新增" not in external["user/manager"][0]["UserManager"]:
+            print(f"   ✗ 文件被外部修改后应重新解析")
+            return False
+        if parse_count[0] != parse_count_after_save + 1:
+            print(f"   ✗ 外部修改后应只重新解析一次")
+            return False
+
+        os.remove(symbols_path)
+        if ibc_data_store.is_dependency_symbol_tables_valid(test_ibc_root, dependent_relation, "app/main"):
+            print(f"   ✗ 符号表文件删除后应判定为无效")
+            return False
+
+    print(f"   ✓ 符号表缓存命中与失效正确")
+    return True
+
+def test_ast_binary_format():
+    """测试AST二进制格式的子树读取、JSON导出与旧版JSON兼容"""
+    
+    print("\n" + "=" * 60)
+    print("测试 6: AST二进制格式")
+    print("=" * 60)
+    
+    with tempfile.TemporaryDirectory() as test_ibc_root:
+        return _run_ast_binary_format_cases(test_ibc_root)
+
+
+def _run_ast_binary_format_cases(test_ibc_root: str) -> bool:
+    """AST二进制格式的各测试用例"""
+    ibc_data_store = get_ibc_data_store()
+    
+    ibc_content = """module json: 标准JSON解析库
+
+description: 配置管理器
+class ConfigManager():
+    private
+    var configPath: 配置文件路径
+
+    public
+    func 加载配置(路径: 字符串路径):
+        文件内容 = 读取文件(self.configPath)
+        返回 $json.parse(文件内容)
+
+func 辅助函数():
+    执行辅助操作
+"""
+    ast_dict, _, _ = analyze_ibc_content(ibc_content)
+    ast_path = ibc_data_store.build_ast_path(test_ibc_root, "config/manager")
+    
+    # 测试用例1: 二进制格式完整往返
+    print("\n6.1 测试二进制格式完整往返...")
+    ibc_data_store.save_ast(ast_path, ast_dict)
+    with open(ast_path, 'rb') as f:
+        if not f.read().startswith(b"IBCAST"):
+            print(f"   ✗ AST文件不是二进制格式")
+            return False
+    loaded_ast = ibc_data_store.load_ast(ast_path)
+    if loaded_ast != ast_dict or [type(node) for node in loaded_ast.values()] != [type(node) for node in ast_dict.values()]:
+        print(f"   ✗ 二进制格式往返后AST不一致")
+        return False
+    print(f"   ✓ 二进制格式往返一致，节点数: {len(loaded_ast)}")
+    
+    # 测试用例2: 只读取单个子树
+    print("\n6.2 测试子树读取...")
+    class_uid = next(uid for uid, node in ast_dict.items() if isinstance(node, ClassNode))
+    expected_uids = set()
+    pending = [class_uid]
+    while pending:
+        uid = pending.pop()
+        expected_uids.add(uid)
+        pending.extend(ast_dict[uid].children_uids)
+    subtree = ibc_data_store.load_ast_subtree(ast_path, class_uid)
+    if set(subtree) != expected_uids or any(subtree[uid] != ast_dict[uid] for uid in subtree):
+        print(f"   ✗ 子树内容错误: {sorted(subtree)}")
+        return False
+    private_var = next(node for node in subtree.values() if isinstance(node, VariableNode))
+    if private_var.visibility != VisibilityTypes.PRIVATE:
+        print(f"   ✗ 子树中的可见性未正确还原")
+        return False
+    if ibc_data_store.load_ast_subtree(ast_path, 9999) != {}:
+        print(f"   ✗ 不存在的子树根节点应返回空字典")
+        return False
+    print(f"   ✓ 子树读取正确，节点数: {len(subtree)}")
+    
+    # 测试用例3: JSON导出，导出的文件仍可加载
+    print("\n6.3 测试JSON导出...")
+    json_path = os.path.join(test_ibc_root, "config", "manager_export.json")
+    ibc_data_store.export_ast_json(json_path, ast_dict)
+    if ibc_data_store.load_ast(json_path) != ast_dict:
+        print(f"   ✗ 导出的JSON加载后AST不一致")
+        return False
+    print(f"   ✓ JSON导出成功且可重新加载")
+    
+    # 测试用例4: 只存在旧版JSON文件时仍可加载
+    print("\n6.4 测试旧版JSON兼容...")
+    legacy_path = os.path.join(test_ibc_root, "legacy", "module_ibc_ast.json")
+    ibc_data_store.export_ast_json(legacy_path, ast_dict)
+    binary_path = ibc_data_store.build_ast_path(test_ibc_root, "legacy/module")
+    if ibc_data_store.load_ast(binary_path) != ast_dict or \
+       set(ibc_data_store.load_ast_subtree(binary_path, class_uid)) != expected_uids:
+        print(f"   ✗ 旧版JSON文件加载失败")
+        return False
+    print(f"   ✓ 旧版JSON文件可通过新路径加载")
+    
+    # 测试用例5: 节点记录为JSON，枚举以显式编号保存，旧版本文件头被拒绝
+    print("\n6.5 测试记录编码与格式版本...")
+    data = IbcAstBinaryFormat.encode(ast_dict)
+    magic, version, node_count = struct.unpack_from('<6sHI', data)
+    if version != 2 or node_count != len(ast_dict):
+        print(f"   ✗ 文件头不正确: {version}, {node_count}")
+        return False
+    var_uid = private_var.uid
+    records_start = struct.calcsize('<6sHI') + node_count * struct.calcsize('<qqBII')
+    for uid, _, _, offset, length in struct.iter_unpack('<qqBII', data[struct.calcsize('<6sHI'):records_start]):
+        if uid == var_uid:
+            record = json.loads(data[records_start + offset:records_start + offset + length].decode('utf-8'))
+            if record["node_type"] != 4 or record["visibility"] != 2 or record["identifier"] != "configPath":
+                print(f"   ✗ 节点记录编码不正确: {record}")
+                return False
+    legacy_data = struct.pack('<6sHI', magic, 1, node_count) + data[struct.calcsize('<6sHI'):]
+    try:
+        IbcAstBinaryFormat.decode(legacy_data)
+        print(f"   ✗ 旧版本格式应被拒绝")
+        return False
+    except ValueError:
+        pass
+    print(f"   ✓ 记录编码稳定，旧版本格式被拒绝")
+    
     return True
+
 if __name__ == "__main__":
     print("\n" + "=" * 60)
     print("IBC数据管理器测试套件")
@@ -453,6 +819,7 @@ if __name__ == "__main__":
         result3 = test_ast_with_real_ibc_content()
         result4 = test_verify_data_management()
         result5 = test_symbol_management()
+        result6 = test_ast_binary_format()
         
         # 汇总结果
         print("\n" + "=" * 60)
@@ -463,9 +830,10 @@ if __name__ == "__main__":
         print(f"测试 3 - 真实IBC代码AST: {'✓ 通过' if result3 else '✗ 失败'}")
         print(f"测试 4 - 校验数据管理: {'✓ 通过' if result4 else '✗ 失败'}")
         print(f"测试 5 - 符号表数据管理: {'✓ 通过' if result5 else '✗ 失败'}")
+        print(f"测试 6 - AST二进制格式: {'✓ 通过' if result6 else '✗ 失败'}")
         print("=" * 60)
         
-        if result1 and result2 and result3 and result4 and result5:
+        if result1 and result2 and result3 and result4 and result5 and result6:
             print("✓ 所有测试通过！IbcDataStore功能完整且正确！")
         else:
             print("✗ 有测试失败，请检查输出")
@@ -0,0 +1,212 @@
+"""
+增量IBC分析器测试脚本
+验证增量分析结果与完整分析一致、未变化部分的uid保持稳定、重新解析范围局限于编辑位置附近
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from typedef.ibc_data_types import BehaviorStepNode, ClassNode, FunctionNode
+from utils.ibc_analyzer.ibc_analyzer import analyze_ibc_content
+from utils.ibc_analyzer.ibc_incremental_analyzer import IbcIncrementalAnalyzer
+from utils.issue_recorder import IbcIssueRecorder
+
+
+BASE_CODE = """module json: 标准JSON解析库
+
+description: 配置管理器
+class ConfigManager():
+    var configPath: 配置文件路径
+
+    func 加载配置():
+        文件内容 = 读取文件(self.configPath)
+        返回 $json.parse(文件内容)
+
+@ 计算两个数的和
+func 计算(a: 数字, b: 数字):
+    结果 = a 加 b
+    返回 结果
+
+func 输出(内容: 文本):
+    如果 内容 为空:
+        返回
+    打印 内容"""
+
+
+def normalize_ast(ast_dict):
+    """去除uid信息，按树结构返回节点内容，便于比较两次分析的结果"""
+    if not ast_dict:
+        return None
+
+    def walk(uid):
+        node = ast_dict[uid]
+        data = node.to_dict()
+        for key in ("uid", "parent_uid", "children_uids"):
+            data.pop(key)
+        data["children"] = [walk(child_uid) for child_uid in node.children_uids]
+        return data
+
+    return walk(0)
+
+
+def find_node(ast_dict, node_type, identifier):
+    """按类型与标识符查找节点"""
+    for node in ast_dict.values():
+        if isinstance(node, node_type) and node.identifier == identifier:
+            return node
+    return None
+
+
+def test_edit_inside_function():
+    """测试修改函数内部的一行：结果与完整分析一致，其余顶层节点uid不变"""
+    print("\n测试 edit_inside_function 函数...")
+
+    try:
+        analyzer = IbcIncrementalAnalyzer()
+        old_ast, _, _ = analyzer.analyze(BASE_CODE)
+        old_class_uid = find_node(old_ast, ClassNode, "ConfigManager").uid
+        old_func_uid = find_node(old_ast, FunctionNode, "输出").uid
+
+        new_code = BASE_CODE.replace("    结果 = a 加 b", "    结果 = a 加 b 加 $json.offset")
+        new_ast, new_tree, new_metadata = analyzer.analyze(new_code)
+        full_ast, full_tree, full_metadata = analyze_ibc_content(new_code)
+
+        assert normalize_ast(new_ast) == normalize_ast(full_ast), "增量分析AST与完整分析不一致"
+        assert new_tree == full_tree, "增量分析符号树与完整分析不一致"
+        assert new_metadata.keys() == full_metadata.keys(), "增量分析符号元数据与完整分析不一致"
+
+        assert find_node(new_ast, ClassNode, "ConfigManager").uid == old_class_uid, "编辑前的类节点uid发生变化"
+        assert find_node(new_ast, FunctionNode, "输出").uid == old_func_uid, "编辑后的函数节点uid发生变化"
+
+        start_line, end_line = analyzer.last_reparsed_range
+        assert start_line == 11 and end_line == 15, f"重新解析范围应为11-15行，实际为{start_line}-{end_line}行"
+        print(f"  ✓ 仅重新解析第{start_line}-{end_line}行，其余节点uid保持不变")
+        return True
+    except Exception as e:
+        print(f"  ❌ 测试失败: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_insert_lines_shift():
+    """测试在文件中部插入新函数：后续节点复用并平移行号"""
+    print("\n测试 insert_lines_shift 函数...")
+
+    try:
+        analyzer = IbcIncrementalAnalyzer()
+        old_ast, _, _ = analyzer.analyze(BASE_CODE)
+        old_node = find_node(old_ast, FunctionNode, "输出")
+
+        inserted = "func 新函数():\n    执行 操作\n\n"
+        new_code = BASE_CODE.replace("func 输出", inserted + "func 输出")
+        new_ast, _, _ = analyzer.analyze(new_code)
+        full_ast, _, _ = analyze_ibc_content(new_code)
+
+        assert normalize_ast(new_ast) == normalize_ast(full_ast), "增量分析AST与完整分析不一致"
+        new_node = find_node(new_ast, FunctionNode, "输出")
+        assert new_node.uid == old_node.uid, "插入位置之后的函数节点uid发生变化"
+        assert new_node.line_number == old_node.line_number + 3, "插入位置之后的函数节点行号未正确平移"
+        assert old_node.line_number == 16, "上一次分析返回的节点不应被修改"
+        print("  ✓ 插入位置之后的节点复用并正确平移行号")
+        return True
+    except Exception as e:
+        print(f"  ❌ 测试失败: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_error_then_recover():
+    """测试编辑引入语法错误后再修复：错误被记录，修复后分析结果恢复正常"""
+    print("\n测试 error_then_recover 函数...")
+
+    try:
+        analyzer = IbcIncrementalAnalyzer()
+        analyzer.analyze(BASE_CODE)
+
+        recorder = IbcIssueRecorder()
+        broken_code = BASE_CODE.replace("class ConfigManager():", "class ConfigManager(:")
+        broken_ast, _, _ = analyzer.analyze(broken_code, recorder)
+        assert not broken_ast, "存在语法错误时应返回空AST"
+        assert recorder.has_issues(), "语法错误应被记录到issue recorder"
+
+        fixed_ast, _, _ = analyzer.analyze(BASE_CODE)
+        full_ast, _, _ = analyze_ibc_content(BASE_CODE)
+        assert normalize_ast(fixed_ast) == normalize_ast(full_ast), "修复后的分析结果与完整分析不一致"
+        behaviors = [node for node in fixed_ast.values() if isinstance(node, BehaviorStepNode)]
+        assert len(behaviors) == 7, f"预期7个行为步骤，实际{len(behaviors)}"
+        print("  ✓ 语法错误被正确记录，修复后分析结果恢复正常")
+        return True
+    except Exception as e:
+        print(f"  ❌ 测试失败: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_error_recovery_mode():
+    """测试错误恢复模式：一次记录全部语法错误并返回部分AST，之后仍可正常增量分析"""
+    print("\n测试 error_recovery_mode 函数...")
+
+    try:
+        analyzer = IbcIncrementalAnalyzer()
+        analyzer.analyze(BASE_CODE)
+
+        recorder = IbcIssueRecorder()
+        broken_code = BASE_CODE.replace("class ConfigManager():", "class ConfigManager(:") \
+                               .replace("func 输出(内容: 文本):", "func 输出(内容: 文本)")
+        partial_ast, partial_tree, _ = analyzer.analyze(broken_code, recorder, recover_errors=True)
+        issue_lines = [issue.line_num for issue in recorder.get_issues()]
+        assert issue_lines == [4, 16], f"预期在第4、16行记录错误，实际{issue_lines}"
+        assert find_node(partial_ast, FunctionNode, "计算") is not None, "未出错的函数应保留在部分AST中"
+        assert "计算" in partial_tree, "部分AST应生成对应的符号树"
+
+        fixed_ast, _, _ = analyzer.analyze(BASE_CODE)
+        full_ast, _, _ = analyze_ibc_content(BASE_CODE)
+        assert normalize_ast(fixed_ast) == normalize_ast(full_ast), "修复后的分析结果与完整分析不一致"
+        print("  ✓ 一次记录全部语法错误，修复后分析结果恢复正常")
+        return True
+    except Exception as e:
+        print(f"  ❌ 测试失败: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("增量IBC分析器测试")
+    print("=" * 60)
+
+    test_results = []
+    test_results.append(("函数内部修改", test_edit_inside_function()))
+    test_results.append(("插入行平移", test_insert_lines_shift()))
+    test_results.append(("错误后修复", test_error_then_recover()))
+    test_results.append(("错误恢复模式", test_error_recovery_mode()))
+
+    print("\n" + "=" * 60)
+    print("测试结果汇总")
+    print("=" * 60)
+
+    passed = 0
+    failed = 0
+
+    for test_name, result in test_results:
+        status = "✓ 通过" if result else "❌ 失败"
+        print(f"{test_name:20} {status}")
+        if result:
+            passed += 1
+        else:
+            failed += 1
+
+    print("=" * 60)
+    print(f"总计: {passed} 通过, {failed} 失败")
+
+    if failed == 0:
+        print("所有测试通过！✓")
+    else:
+        print(f"⚠️  有 {failed} 个测试失败")
+    print("=" * 60)
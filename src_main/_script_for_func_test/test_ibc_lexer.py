@@ -601,6 +601,41 @@ class TestClass():
     return True
 
 
+def test_scanner_matches_reference():
+    """测试单遍扫描器与参考实现输出完全一致"""
+    print("测试 scanner_matches_reference 函数...")
+    
+    samples = [
+        "module src.utils: 工具模块",
+        "func 计算(参数1: 整数, 参数2: 字符串):",
+        "    结果 = $a.b(self.c, 1)",
+        "$a $b",
+        "$ (",
+        "$$a",
+        "myself.x = self.y",
+        "(self.x)",
+        "self. foo",
+        "调用 $a.b　和　$c.d 完成",
+        "行续接 \\",
+        "a + b - c * d / e % f < g > h ! i & j | k",
+        "[列表] {字典} = 值",
+        "@ 意图注释 $ref 以及 self.member",
+    ]
+    code = "\n".join(samples)
+    
+    try:
+        scanned = [(t.type, t.value, t.line_num) for t in IbcLexer(code).tokenize()]
+        reference = [(t.type, t.value, t.line_num) for t in IbcLexer(code, reference_mode=True).tokenize()]
+        assert scanned == reference, "单遍扫描器输出与参考实现不一致"
+        print(f"    ✓ 共 {len(scanned)} 个token完全一致")
+    except Exception as e:
+        print(f"    ❌ 测试失败: {e}")
+        return False
+    
+    print("  ✓ 扫描器一致性测试通过")
+    return True
+
+
 if __name__ == "__main__":
     print("\n开始测试 Intent Behavior Code 词法分析器...\n")
     
@@ -643,6 +678,9 @@ if __name__ == "__main__":
         test_results.append(("引用类型", test_reference_types()))
         print()
         
+        test_results.append(("扫描器一致性", test_scanner_matches_reference()))
+        print()
+        
         print("=" * 50)
         print("测试结果汇总")
         print("=" * 50)
@@ -9,7 +9,8 @@ from typedef.ibc_data_types import (AstNodeType, BehaviorStepNode, ClassNode,
                                     FunctionNode, ModuleNode, VariableNode,
                                     VisibilityTypes)
 from utils.ibc_analyzer.ibc_lexer import IbcLexer
-from utils.ibc_analyzer.ibc_parser import IbcParser
+from typedef.exception_types import IbcParserError
+from utils.ibc_analyzer.ibc_parser import IbcParser, IbcStreamParser
 
 
 def print_ast_tree(ast_nodes: dict, uid: int = 0, indent: int = 0) -> None:
@@ -2305,6 +2306,131 @@ class DerivedClass($BaseClass: 继承基类):
         return False
 
 
+def test_stream_parser():
+    """测试流式解析器：结果与列表解析一致，且遇到语法错误后不再继续词法分析"""
+    print("\n测试 stream_parser 函数...")
+    
+    code = """module threading: 线程支持库
+
+description: 线程安全的配置管理器
+class ConfigManager():
+    var configPath: 主配置文件路径
+    
+    func 加载配置(路径: 字符串路径):
+        文件内容 = 读取文件(self.configPath)
+        如果 文件内容 为空:
+            返回 $threading.Lock"""
+    
+    try:
+        list_ast = IbcParser(IbcLexer(code).tokenize()).parse()
+        stream_ast = IbcStreamParser(IbcLexer(code).iter_tokens()).parse()
+        
+        list_dict = {uid: node.to_dict() for uid, node in list_ast.items()}
+        stream_dict = {uid: node.to_dict() for uid, node in stream_ast.items()}
+        assert list_dict == stream_dict, "流式解析结果与列表解析结果不一致"
+        print("  ✓ 流式解析结果与列表解析一致")
+    except Exception as e:
+        print(f"  ❌ 测试失败: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+    
+    # 第2行出现语法错误，其后的大量内容不应再被词法分析
+    error_code = "class A():\n    module x\n" + "\n".join(f"行为{i}" for i in range(1000))
+    lexer = IbcLexer(error_code)
+    try:
+        IbcStreamParser(lexer.iter_tokens()).parse()
+        print("  ❌ 测试失败: 未检测到语法错误")
+        return False
+    except IbcParserError as e:
+        assert e.line_num == 2, f"错误行号应为2，实际为{e.line_num}"
+        assert lexer.line_num <= 3, f"语法错误后词法分析应中止，实际已分析到第{lexer.line_num}行"
+        print(f"  ✓ 语法错误后词法分析在第{lexer.line_num}行中止")
+    
+    return True
+
+
+def test_long_behavior_line():
+    """测试超长行为描述行的内容收集"""
+    print("\n测试 long_behavior_line 函数...")
+    
+    parts = [f"$模块.值{i}" for i in range(2000)]
+    code = "func 汇总():\n    结果 = " + " 加 ".join(parts) + " 加 self.偏移\n"
+    # $前缀不会保留在行为步骤内容中
+    expected = "结果 = " + " 加 ".join(part[1:] for part in parts) + " 加 self.偏移"
+    
+    try:
+        ast_nodes = IbcParser(IbcLexer(code).tokenize()).parse()
+        behaviors = [node for node in ast_nodes.values() if isinstance(node, BehaviorStepNode)]
+        assert len(behaviors) == 1, f"预期1个行为步骤，实际{len(behaviors)}"
+        assert behaviors[0].content == expected, "行为步骤内容与源码不一致"
+        assert len(behaviors[0].symbol_refs) == 2000, f"预期2000个符号引用，实际{len(behaviors[0].symbol_refs)}"
+        print("  ✓ 成功收集超长行为描述行")
+        return True
+    except Exception as e:
+        print(f"  ❌ 测试失败: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_error_recovery():
+    """测试错误恢复模式：一次收集全部语法错误并返回部分AST"""
+    print("\n测试 error_recovery 函数...")
+    
+    code = """module json: 标准JSON解析库
+
+class 配置(:
+    var 路径: 配置文件路径
+    func 读取():
+        执行 读取
+
+func 计算(a: 数字):
+    结果 = a 加 b
+        错误缩进
+    返回 结果
+
+func 输出():
+    打印 内容
+    func 内部(
+    结束
+
+var 尾部: 正常"""
+    
+    try:
+        parser = IbcParser(IbcLexer(code).tokenize(), recover_errors=True)
+        ast_nodes = parser.parse()
+        
+        error_lines = [error.line_num for error in parser.errors]
+        assert error_lines == [3, 10, 16], f"预期错误行号为[3, 10, 16]，实际{error_lines}"
+        
+        # 出错的类声明连同其代码块被跳过，其余内容正常解析
+        assert not any(isinstance(node, ClassNode) for node in ast_nodes.values()), "出错的类声明不应出现在AST中"
+        func_names = [node.identifier for node in ast_nodes.values() if isinstance(node, FunctionNode)]
+        assert func_names == ["计算", "输出"], f"函数节点不符合预期: {func_names}"
+        behaviors = [node.content for node in ast_nodes.values() if isinstance(node, BehaviorStepNode)]
+        assert behaviors == ["结果 = a 加 b", "返回 结果", "打印 内容"], f"行为步骤不符合预期: {behaviors}"
+        
+        # 出错位置之后的顶层变量仍挂在根节点下
+        tail_var = next(node for node in ast_nodes.values() if isinstance(node, VariableNode))
+        assert tail_var.identifier == "尾部" and tail_var.parent_uid == 0, "尾部变量未正确恢复到顶层"
+        
+        # 默认模式仍在第一个错误处抛出异常
+        try:
+            IbcParser(IbcLexer(code).tokenize()).parse()
+            assert False, "默认模式应抛出IbcParserError"
+        except IbcParserError as e:
+            assert e.line_num == 3, f"默认模式应在第3行报错，实际第{e.line_num}行"
+        
+        print(f"  ✓ 一次收集到 {len(parser.errors)} 个语法错误，并返回部分AST")
+        return True
+    except Exception as e:
+        print(f"  ❌ 测试失败: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
 if __name__ == "__main__":
     print("\n" + "=" * 60)
     print("开始测试 Intent Behavior Code 解析器...")
@@ -2366,6 +2492,9 @@ if __name__ == "__main__":
         test_results.append(("混合延续场景", test_mixed_continuation_and_comma()))
         test_results.append(("多层继承链", test_deep_nested_inheritance()))
         test_results.append(("继承可见性交互", test_visibility_inheritance_interaction()))
+        test_results.append(("流式解析", test_stream_parser()))
+        test_results.append(("超长行为描述行", test_long_behavior_line()))
+        test_results.append(("错误恢复模式", test_error_recovery()))
         
         print("\n" + "=" * 60)
         print("测试结果汇总")
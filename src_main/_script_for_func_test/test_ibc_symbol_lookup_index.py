@@ -0,0 +1,133 @@
+"""
+符号查找索引测试脚本
+验证点分路径索引与符号树索引的各类查询结果
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.ibc_analyzer.ibc_symbol_lookup_index import (DottedPathIndex,
+                                                        SymbolTreeIndex)
+
+
+SYMBOLS_TREE = {
+    "src": {
+        "ball": {
+            "ball_entity": {
+                "BallEntity": {"get_position": {}, "move": {}},
+                "create_ball": {}
+            }
+        },
+        "engine": {
+            "physics": {
+                "PhysicsEngine": {"apply_force": {}}
+            }
+        }
+    },
+    "BallEntity": {"reset": {}}
+}
+
+
+def test_dotted_path_index():
+    """测试点分路径索引的前缀、后缀与前缀树查询"""
+    print("\n测试 dotted_path_index 函数...")
+
+    try:
+        index = DottedPathIndex([
+            "src.ball.ball_entity.BallEntity",
+            "src.ball.ball_entity.BallEntity.get_position",
+            "src.engine.physics.PhysicsEngine.apply_force",
+        ])
+
+        assert "src.ball.ball_entity.BallEntity" in index, "完整路径应可直接查到"
+        assert "src.ball.ball_entity" not in index, "前缀路径不是完整路径"
+        assert index.has_prefix("src.ball.ball_entity"), "应识别存在的前缀"
+        assert not index.has_prefix("src.ball.ball"), "前缀必须按段匹配"
+
+        assert index.has_suffix("BallEntity.get_position"), "应识别按段对齐的后缀"
+        assert not index.has_suffix("Entity.get_position"), "后缀必须按段匹配"
+        assert index.first_parts == {"src"} and "apply_force" in index.last_parts
+
+        assert index.has_nested_suffix("src.engine", "apply_force"), "中间隔有多层时应匹配"
+        assert not index.has_nested_suffix("src.engine.physics.PhysicsEngine", "apply_force"), \
+            "前缀与后缀之间至少隔一层"
+
+        libraries = DottedPathIndex(["numpy", "matplotlib.pyplot"])
+        assert libraries.contains_prefix_of("numpy.linalg.norm"), "库名是路径前缀时应命中"
+        assert libraries.contains_prefix_of("matplotlib.pyplot.plot")
+        assert not libraries.contains_prefix_of("matplotlib.cm"), "只有库的上级路径时不应命中"
+        assert not libraries.contains_prefix_of("numpyx"), "前缀必须按段匹配"
+        print("  ✓ 点分路径索引查询正确")
+        return True
+    except Exception as e:
+        print(f"  ❌ 测试失败: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_symbol_tree_index():
+    """测试符号树索引的精确、跳层与通配层级查询"""
+    print("\n测试 symbol_tree_index 函数...")
+
+    try:
+        index = SymbolTreeIndex(SYMBOLS_TREE)
+
+        assert index.has_path(["src", "ball", "ball_entity", "BallEntity", "move"]), "精确路径应存在"
+        assert not index.has_path(["src", "ball", "BallEntity"]), "精确查询不跳过层级"
+
+        # physics 不在 src 下，但在 src 的子节点 engine 中
+        assert index.has_path_with_skips(["src", "physics", "PhysicsEngine", "apply_force"]), "应允许跳过一层"
+        assert not index.has_path_with_skips(["src", "PhysicsEngine"]), "每次最多跳过一层"
+
+        assert index.search(["PhysicsEngine", "apply_force"]), "应在任意深度找到路径起点"
+        assert index.search(["src", "apply_force"]), "后续各段可以位于任意深度"
+        assert not index.search(["engine", "get_position"]), "后续各段必须位于上一段之下"
+
+        # 根节点直接包含BallEntity时只沿该键查找，与递归搜索的结果一致
+        assert index.search(["BallEntity", "reset"])
+        assert not index.search(["BallEntity", "get_position"]), "同名键直接存在时不再深入其他子树"
+        assert index.search([]), "空路径视为存在"
+        print("  ✓ 符号树索引查询正确")
+        return True
+    except Exception as e:
+        print(f"  ❌ 测试失败: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("符号查找索引测试")
+    print("=" * 60)
+
+    test_results = []
+    test_results.append(("点分路径索引", test_dotted_path_index()))
+    test_results.append(("符号树索引", test_symbol_tree_index()))
+
+    print("\n" + "=" * 60)
+    print("测试结果汇总")
+    print("=" * 60)
+
+    passed = 0
+    failed = 0
+
+    for test_name, result in test_results:
+        status = "✓ 通过" if result else "❌ 失败"
+        print(f"{test_name:20} {status}")
+        if result:
+            passed += 1
+        else:
+            failed += 1
+
+    print("=" * 60)
+    print(f"总计: {passed} 通过, {failed} 失败")
+
+    if failed == 0:
+        print("所有测试通过！✓")
+    else:
+        print(f"⚠️  有 {failed} 个测试失败")
+    print("=" * 60)
@@ -12,6 +12,7 @@
 """
 import os
 import sys
+from types import MappingProxyType
 
 # 添加项目根目录到系统路径
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -21,7 +22,8 @@ from typedef.cmd_data_types import Colors
 from typedef.ibc_data_types import (ClassMetadata, FunctionMetadata,
                                     VariableMetadata)
 from utils.ibc_analyzer.ibc_analyzer import analyze_ibc_content
-from utils.ibc_analyzer.ibc_symbol_ref_resolver import SymbolRefResolver
+from utils.ibc_analyzer.ibc_symbol_ref_resolver import (ScopeType,
+                                                        SymbolRefResolver)
 from utils.ibc_analyzer.ibc_visible_symbol_builder import VisibleSymbolBuilder
 from utils.issue_recorder import IbcIssueRecorder
 
@@ -255,6 +257,88 @@ def test_local_symbol_merge_and_empty():
     return True
 
 
+def test_visible_symbol_structural_sharing():
+    """测试1.3: 可见符号表与依赖符号表共享数据"""
+    print(f"\n{Colors.OKBLUE}{'='*60}{Colors.ENDC}")
+    print(f"{Colors.OKBLUE}测试1.3: 可见符号表结构共享{Colors.ENDC}")
+    print(f"{Colors.OKBLUE}{'='*60}{Colors.ENDC}\n")
+
+    try:
+        builder = VisibleSymbolBuilder({"src": {"ball": {"ball_entity": "球体", "ball_util": "工具"}}})
+        entity_tree = {"BallEntity": {"move": {}, "_reset": {}}}
+        entity_metadata = {
+            "BallEntity": create_test_metadata("class"),
+            "BallEntity.move": create_test_metadata("function"),
+            "BallEntity._reset": create_test_metadata("function", visibility="private"),
+        }
+        util_tree = {"clamp": {}}
+        util_metadata = {"clamp": create_test_metadata("function")}
+        dependency_symbol_tables = {
+            "src/ball/ball_entity": (entity_tree, entity_metadata),
+            "src/ball/ball_util": (util_tree, util_metadata),
+        }
+
+        symbols_tree, symbols_metadata = builder.build_visible_symbol_tree(
+            current_file_path="src/main",
+            dependency_symbol_tables=dependency_symbol_tables,
+            include_local_symbols=True,
+            local_symbols_tree={"clamp": {}},
+            local_symbols_metadata={"clamp": create_test_metadata("function", description="本地实现")}
+        )
+
+        # 依赖文件的符号子树直接共享，不复制
+        assert symbols_tree["src"]["ball"]["ball_entity"]["BallEntity"] is entity_tree["BallEntity"], "依赖符号子树应直接共享"
+        assert entity_tree == {"BallEntity": {"move": {}, "_reset": {}}}, "构建过程不应修改依赖符号树"
+
+        # 按键查找逐层进行，不触发各层合并
+        assert "src.ball.ball_util.clamp" in symbols_metadata
+        assert symbols_metadata.get("clamp").__is_local__, "本地符号层优先"
+        assert symbols_metadata.get("src.ball.missing") is None
+        assert symbols_metadata._merged is None, "按键查找不应合并各层"
+        assert list(symbols_metadata.local_layer) == ["clamp"], "本地符号层只应包含当前文件的符号"
+
+        assert list(symbols_metadata) == [
+            "src", "src.ball", "src.ball.ball_entity", "src.ball.ball_entity.BallEntity",
+            "src.ball.ball_entity.BallEntity.move", "src.ball.ball_util", "src.ball.ball_util.clamp", "clamp"
+        ], f"元数据键顺序错误: {list(symbols_metadata)}"
+        assert "src.ball.ball_entity.BallEntity._reset" not in symbols_metadata, "private符号不应可见"
+        assert symbols_metadata["src.ball.ball_entity"].description == "球体"
+        assert symbols_metadata["clamp"].__is_local__, "本地符号层优先"
+        assert symbols_metadata["src.ball.ball_util.clamp"] is util_metadata["clamp"], "依赖符号元数据不应复制"
+
+        # 只读的依赖符号元数据对象不变时，再次构建复用冻结的元数据层
+        shared_symbol_tables = {
+            dep_path: (dep_tree, MappingProxyType(dep_metadata))
+            for dep_path, (dep_tree, dep_metadata) in dependency_symbol_tables.items()
+        }
+        builder.build_visible_symbol_tree(current_file_path="src/main", dependency_symbol_tables=shared_symbol_tables)
+        layer = builder._file_metadata_layers["src.ball.ball_entity"][1]
+        _, symbols_metadata2 = builder.build_visible_symbol_tree(
+            current_file_path="src/main",
+            dependency_symbol_tables=shared_symbol_tables
+        )
+        assert builder._file_metadata_layers["src.ball.ball_entity"][1] is layer, "未变化的依赖应复用元数据层"
+        assert "clamp" not in symbols_metadata2, "本地符号不应残留到其他构建结果中"
+
+        # 普通字典被原地修改（符号数量不变）后，不应返回过期的元数据层
+        entity_metadata["BallEntity.move"] = create_test_metadata("function", visibility="private")
+        entity_metadata["BallEntity._reset"] = create_test_metadata("function")
+        _, symbols_metadata3 = builder.build_visible_symbol_tree(
+            current_file_path="src/main",
+            dependency_symbol_tables=dependency_symbol_tables
+        )
+        assert "src.ball.ball_entity.BallEntity.move" not in symbols_metadata3, "原地修改后的可见性应生效"
+        assert "src.ball.ball_entity.BallEntity._reset" in symbols_metadata3, "原地修改后的可见性应生效"
+
+        print(f"{Colors.OKGREEN}✓ 测试通过{Colors.ENDC}")
+        return True
+    except Exception as e:
+        print(f"{Colors.FAIL}✗ 测试失败: {e}{Colors.ENDC}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
 def test_local_symbol_priority():
     """测试1.2: 本地符号优先级（重名处理）"""
     print(f"\n{Colors.OKBLUE}{'='*60}{Colors.ENDC}")
@@ -742,6 +826,126 @@ class DataProcessor():
     )
 
 
+def test_scope_tables():
+    """测试6.2: 作用域符号表的预计算与链接"""
+    print(f"\n{Colors.OKBLUE}{'='*60}{Colors.ENDC}")
+    print(f"{Colors.OKBLUE}测试: 6.2 作用域符号表{Colors.ENDC}")
+    print(f"{Colors.OKBLUE}{'='*60}{Colors.ENDC}\n")
+
+    ibc_content = """
+description: 作用域符号表测试
+
+class Counter():
+    var count: 计数
+    var step: 步长
+
+    func add(step: 单次增量):
+        var total: 合计
+        如果 step 大于 0:
+            count 增加 step
+        返回 total
+"""
+    try:
+        issue_recorder = IbcIssueRecorder()
+        ast_dict, symbols_tree, symbols_metadata = analyze_ibc_content(ibc_content, issue_recorder)
+        resolver = SymbolRefResolver(
+            ast_dict=ast_dict,
+            symbols_tree=symbols_tree,
+            symbols_metadata=symbols_metadata,
+            ibc_issue_recorder=issue_recorder,
+            proj_root_dict={"src": {"test": "测试模块"}},
+            dependent_relation={"src/test": []},
+            current_file_path="src/test"
+        )
+
+        class_uid = next(uid for uid, node in ast_dict.items() if getattr(node, 'identifier', '') == "Counter")
+        func_uid = next(uid for uid, node in ast_dict.items() if getattr(node, 'identifier', '') == "add")
+        behavior_uids = [uid for uid, node in ast_dict.items() if node.parent_uid == func_uid and not hasattr(node, 'identifier')]
+        nested_uid = ast_dict[behavior_uids[0]].children_uids[0]
+
+        func_scope = resolver.scope_tables[func_uid]
+        assert func_scope.parent is resolver.scope_tables[class_uid], "函数作用域应链接到类作用域"
+        assert set(func_scope.symbols) == {"step", "total"}, f"函数作用域符号错误: {list(func_scope.symbols)}"
+
+        # 内层的参数遮蔽同名的类成员
+        context = resolver._build_reference_context(nested_uid, ast_dict[nested_uid].line_number)
+        assert context.local_symbols["step"].scope == 'function', "参数应遮蔽同名类成员"
+        assert "count" in context.local_symbols and "add" in context.local_symbols, "应能看到外层类成员"
+        assert [scope_type for scope_type, _ in context.scope_chain] == [
+            ScopeType.BEHAVIOR, ScopeType.BEHAVIOR, ScopeType.FUNCTION, ScopeType.CLASS, ScopeType.TOP_LEVEL
+        ], f"作用域链错误: {context.scope_chain}"
+
+        # 同一函数内的局部变量节点直接复用函数作用域的符号表
+        total_uid = next(uid for uid, node in ast_dict.items() if getattr(node, 'identifier', '') == "total")
+        assert resolver.scope_tables[total_uid] is func_scope, "非作用域节点应归属所在作用域"
+
+        print(f"{Colors.OKGREEN}✓ 测试通过{Colors.ENDC}")
+        return True
+    except Exception as e:
+        print(f"{Colors.FAIL}✗ 测试失败: {e}{Colors.ENDC}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_resolution_cache():
+    """测试6.3: 同一作用域内重复引用的解析缓存"""
+    print(f"\n{Colors.OKBLUE}{'='*60}{Colors.ENDC}")
+    print(f"{Colors.OKBLUE}测试: 6.3 引用解析缓存{Colors.ENDC}")
+    print(f"{Colors.OKBLUE}{'='*60}{Colors.ENDC}\n")
+
+    ibc_content = """
+description: 解析缓存测试
+
+func update(delta: 时间增量):
+    调用 $missing_helper 处理 $delta
+    调用 $missing_helper 处理 $delta
+    调用 $missing_helper 处理 $delta
+
+func reset():
+    调用 $delta 归零
+"""
+    try:
+        issue_recorder = IbcIssueRecorder()
+        ast_dict, symbols_tree, symbols_metadata = analyze_ibc_content(ibc_content, issue_recorder)
+        resolver = SymbolRefResolver(
+            ast_dict=ast_dict,
+            symbols_tree=symbols_tree,
+            symbols_metadata=symbols_metadata,
+            ibc_issue_recorder=issue_recorder,
+            proj_root_dict={"src": {"test": "测试模块"}},
+            dependent_relation={"src/test": []},
+            current_file_path="src/test"
+        )
+        resolver.resolve_all_references()
+        issues = issue_recorder.get_issues()
+
+        # 每次出现都按各自的行号报告
+        missing_issues = [issue for issue in issues if "missing_helper" in issue.message]
+        assert [issue.line_num for issue in missing_issues] == [5, 6, 7], \
+            f"重复引用应按各自行号报告: {[issue.line_num for issue in missing_issues]}"
+        assert len({issue.message for issue in missing_issues}) == 1, "缓存重放的错误信息应与首次一致"
+
+        # 各行为步骤共用函数作用域的局部符号，只有首次引用需要完整验证
+        stats = resolver.get_resolution_cache_stats()
+        assert stats['hits'] == 4 and stats['misses'] == 3, f"缓存命中统计错误: {stats}"
+        assert resolver.resolution_cache[("missing_helper", next(
+            uid for uid, node in ast_dict.items() if getattr(node, 'identifier', '') == "update"
+        ))].is_valid is False
+
+        # 其他函数中的同名引用不共用缓存：reset中没有delta参数
+        assert any(issue.line_num == 10 and "delta" in issue.message for issue in issues), \
+            "不同作用域的同名引用应分别解析"
+
+        print(f"{Colors.OKGREEN}✓ 测试通过{Colors.ENDC}")
+        return True
+    except Exception as e:
+        print(f"{Colors.FAIL}✗ 测试失败: {e}{Colors.ENDC}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
 # ===========================
 # 7. Module层次引用测试
 # ===========================
@@ -1183,6 +1387,7 @@ def run_all_tests():
         print(f"{Colors.OKBLUE}{'#'*70}{Colors.ENDC}")
         test_results.append(("1.1 本地符号合并（含空表）", test_local_symbol_merge_and_empty()))
         test_results.append(("1.2 本地符号优先级", test_local_symbol_priority()))
+        test_results.append(("1.3 可见符号表结构共享", test_visible_symbol_structural_sharing()))
         
         # 2. 外部符号引用测试
         print(f"\n{Colors.OKBLUE}{'#'*70}{Colors.ENDC}")
@@ -1223,6 +1428,8 @@ def run_all_tests():
         print(f"{Colors.OKBLUE}# 6. 作用域隔离测试{Colors.ENDC}")
         print(f"{Colors.OKBLUE}{'#'*70}{Colors.ENDC}")
         test_results.append(("6.1 同类内访问private成员", test_private_member_access_same_class()))
+        test_results.append(("6.2 作用域符号表", test_scope_tables()))
+        test_results.append(("6.3 引用解析缓存", test_resolution_cache()))
         
         # 7. Module层次引用测试
         print(f"\n{Colors.OKBLUE}{'#'*70}{Colors.ENDC}")
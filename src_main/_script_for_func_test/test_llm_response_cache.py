@@ -0,0 +1,152 @@
+"""
+模型响应缓存测试脚本
+验证缓存键区分模型与提示词、有效期与损坏条目的处理、超出大小上限时按LRU淘汰
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from libs.llm_response_cache import LlmResponseCache
+
+
+def test_cache_hit():
+    """测试相同请求命中缓存，不同模型或提示词不会命中"""
+    print("\n测试 cache_hit 函数...")
+
+    try:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            response_cache = LlmResponseCache()
+            key = response_cache.build_key("model-a", "系统提示词", "用户提示词")
+            assert response_cache.get(key) is None and response_cache.miss_count == 0, "未设置目录时缓存应关闭"
+            response_cache.put(key, "响应内容")
+            assert not os.listdir(cache_dir)
+
+            response_cache.set_cache_dir(cache_dir)
+            assert response_cache.get(key) is None
+            response_cache.put(key, "响应内容", "model-a")
+            assert response_cache.get(key) == "响应内容"
+            assert (response_cache.hit_count, response_cache.miss_count) == (1, 1)
+
+            assert key == LlmResponseCache.build_key("model-a", "系统提示词", "用户提示词")
+            other_keys = {
+                LlmResponseCache.build_key("model-b", "系统提示词", "用户提示词"),
+                LlmResponseCache.build_key("model-a", "系统提示词2", "用户提示词"),
+                LlmResponseCache.build_key("model-a", "系统提示词", "用户提示词2"),
+                LlmResponseCache.build_key("model-a", "用户提示词", "系统提示词"),
+            }
+            assert key not in other_keys and len(other_keys) == 4, "模型或提示词不同时缓存键应不同"
+
+            # 重新设置目录后从磁盘恢复索引，相同键的写入覆盖旧响应
+            reopened_cache = LlmResponseCache()
+            reopened_cache.set_cache_dir(cache_dir)
+            assert reopened_cache.get(key) == "响应内容"
+            reopened_cache.put(key, "新的响应")
+            assert reopened_cache.get(key) == "新的响应"
+            assert len(os.listdir(cache_dir)) == 1
+        print("  ✓ 相同请求命中缓存，不同模型或提示词互不影响")
+        return True
+    except Exception as e:
+        print(f"  ❌ 测试失败: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_ttl_and_corrupted_entry():
+    """测试过期条目与损坏条目的处理"""
+    print("\n测试 ttl_and_corrupted_entry 函数...")
+
+    try:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            response_cache = LlmResponseCache()
+            response_cache.set_cache_dir(cache_dir)
+            key = response_cache.build_key("model", "sys", "user")
+            response_cache.put(key, "响应")
+            assert response_cache.get(key, ttl_seconds=3600) == "响应"
+
+            time.sleep(0.05)
+            assert response_cache.get(key, ttl_seconds=0.01) is None, "超过有效期的条目应视为未命中"
+            assert not os.listdir(cache_dir), "过期条目应被删除"
+
+            response_cache.put(key, "响应")
+            with open(os.path.join(cache_dir, key + '.json'), 'w', encoding='utf-8') as f:
+                f.write('{"response": "半截')
+            assert response_cache.get(key) is None, "损坏的条目应视为未命中"
+            assert not os.listdir(cache_dir), "损坏的条目应被删除"
+        print("  ✓ 过期与损坏的条目被丢弃")
+        return True
+    except Exception as e:
+        print(f"  ❌ 测试失败: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_lru_eviction():
+    """测试超出大小上限时按最近使用顺序淘汰"""
+    print("\n测试 lru_eviction 函数...")
+
+    try:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            response_cache = LlmResponseCache()
+            keys = [response_cache.build_key("model", "sys", f"user-{i}") for i in range(3)]
+            response_cache.set_cache_dir(cache_dir)
+            response_cache.put(keys[0], "x" * 100)
+            entry_size = os.path.getsize(os.path.join(cache_dir, keys[0] + '.json'))
+            response_cache.set_cache_dir(cache_dir, max_bytes=entry_size * 2 + 16)
+
+            response_cache.put(keys[1], "x" * 100)
+            assert response_cache.get(keys[0]) is not None
+            response_cache.put(keys[2], "x" * 100)
+            assert response_cache.get(keys[1]) is None, "最久未使用的条目应被淘汰"
+            assert response_cache.get(keys[0]) is not None
+            assert response_cache.get(keys[2]) is not None
+
+            response_cache.clear()
+            assert not os.listdir(cache_dir)
+        print("  ✓ 超出大小上限时淘汰最久未使用的条目")
+        return True
+    except Exception as e:
+        print(f"  ❌ 测试失败: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("模型响应缓存测试")
+    print("=" * 60)
+
+    test_results = []
+    test_results.append(("缓存命中", test_cache_hit()))
+    test_results.append(("过期与损坏条目", test_ttl_and_corrupted_entry()))
+    test_results.append(("LRU淘汰", test_lru_eviction()))
+
+    print("\n" + "=" * 60)
+    print("测试结果汇总")
+    print("=" * 60)
+
+    passed = 0
+    failed = 0
+
+    for test_name, result in test_results:
+        status = "✓ 通过" if result else "❌ 失败"
+        print(f"{test_name:20} {status}")
+        if result:
+            passed += 1
+        else:
+            failed += 1
+
+    print("=" * 60)
+    print(f"总计: {passed} 通过, {failed} 失败")
+
+    if failed == 0:
+        print("所有测试通过！✓")
+    else:
+        print(f"⚠️  有 {failed} 个测试失败")
+    print("=" * 60)
@@ -0,0 +1,178 @@
+"""
+重试策略与限速器测试脚本
+验证指数退避与抖动的范围、Retry-After的解析与遵循、可重试错误的判断，以及令牌桶限速的等待时间
+"""
+
+import asyncio
+import os
+import random
+import sys
+import time
+from email.utils import formatdate
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from libs.rate_limiter import RateLimiter, TokenBucket, estimate_tokens
+from libs.retry_policy import RetryPolicy, is_retryable_error, parse_retry_after
+
+
+class _FakeResponse:
+    def __init__(self, headers):
+        self.headers = headers
+
+
+class _FakeApiError(Exception):
+    def __init__(self, status_code=None, headers=None):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+        self.response = _FakeResponse(headers or {})
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_retry_policy():
+    """测试退避时间、Retry-After与可重试错误判断"""
+    print("\n测试 retry_policy 函数...")
+
+    try:
+        policy = RetryPolicy(max_retry=6, base_delay=1.0, max_delay=10.0, rng=random.Random(1))
+        for attempt in range(6):
+            backoff = min(10.0, 2 ** attempt)
+            for _ in range(20):
+                delay = policy.get_delay(attempt)
+                assert backoff / 2 <= delay <= backoff, f"第{attempt}次重试的等待时间超出范围: {delay}"
+        assert policy.get_delay(0, retry_after=5.0) >= 5.0, "等待时间应不少于Retry-After"
+        assert policy.get_delay(0, retry_after=3600.0) == 10.0, "Retry-After同样受等待时间上限约束"
+
+        assert policy.should_retry(0) and policy.should_retry(4, _FakeApiError(429))
+        assert not policy.should_retry(5), "达到最大尝试次数后不应再重试"
+        for status_code in (None, 408, 409, 429, 500, 503):
+            assert is_retryable_error(_FakeApiError(status_code)), f"{status_code} 应可重试"
+        for status_code in (400, 401, 403, 404, 422):
+            assert not is_retryable_error(_FakeApiError(status_code)), f"{status_code} 不应重试"
+        assert is_retryable_error(ConnectionError("连接中断"))
+
+        assert parse_retry_after(_FakeApiError(429, {'retry-after': '7'})) == 7.0
+        assert parse_retry_after(_FakeApiError(429, {'retry-after-ms': '1500', 'retry-after': '7'})) == 1.5
+        http_date = formatdate(time.time() + 30, usegmt=True)
+        assert 25 <= parse_retry_after(_FakeApiError(429, {'retry-after': http_date})) <= 30
+        assert parse_retry_after(_FakeApiError(429, {'retry-after': 'invalid'})) is None
+        assert parse_retry_after(_FakeApiError(500)) is None
+        assert parse_retry_after(None) is None
+        print("  ✓ 退避时间、Retry-After与可重试错误判断正确")
+        return True
+    except Exception as e:
+        print(f"  ❌ 测试失败: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_token_bucket():
+    """测试令牌桶的突发容量、补充速率与欠账等待"""
+    print("\n测试 token_bucket 函数...")
+
+    try:
+        clock = _FakeClock()
+        bucket = TokenBucket(60, clock)
+        for _ in range(60):
+            assert bucket.reserve(1) == 0.0, "一分钟的配额内不应等待"
+        assert bucket.reserve(1) == 1.0, "配额用完后应按补充速率等待"
+        assert bucket.reserve(1) == 2.0, "排队的请求按到达顺序依次等待"
+        clock.now += 10
+        assert bucket.reserve(1) == 0.0, "经过一段时间后应补充令牌"
+        assert bucket.reserve(1000) == 53.0, "单次扣除量不应超过桶容量"
+
+        limiter = RateLimiter(requests_per_minute=120, tokens_per_minute=600, clock=_FakeClock())
+        assert limiter.reserve(600) == 0.0
+        assert limiter.reserve(300) == 30.0, "token配额不足时应等待"
+        limiter.record_tokens(300)
+        assert limiter.reserve(0) == 0.0, "不消耗token的请求只受请求数限制"
+        assert abs(limiter.reserve(1) - 60.1) < 1e-9, "补记的输出token应计入后续等待"
+        assert not RateLimiter().is_enabled()
+        print("  ✓ 令牌桶按容量突发、按速率补充")
+        return True
+    except Exception as e:
+        print(f"  ❌ 测试失败: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_concurrent_acquire():
+    """测试并发请求共享限速器时按速率放行且不阻塞事件循环"""
+    print("\n测试 concurrent_acquire 函数...")
+
+    try:
+        # 每秒20个请求，突发容量耗尽后再发起5个请求约需0.25秒
+        limiter = RateLimiter(requests_per_minute=1200)
+        for _ in range(1200):
+            limiter.reserve(0)
+
+        ticks = []
+
+        async def heartbeat():
+            for _ in range(5):
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.02)
+
+        async def main():
+            start = time.monotonic()
+            waits = await asyncio.gather(*(limiter.acquire() for _ in range(5)), heartbeat())
+            return time.monotonic() - start, waits[:5]
+
+        elapsed, waits = asyncio.run(main())
+        assert 0.2 <= elapsed < 0.6, f"放行时间不符合速率: {elapsed:.2f}秒"
+        assert sorted(waits) == waits and waits[0] > 0, "等待时间应依次增加"
+        assert len(ticks) == 5 and ticks[-1] - ticks[0] < 0.2, "等待配额时不应阻塞事件循环"
+
+        assert estimate_tokens("") == 0
+        assert estimate_tokens("你好") == 2 and estimate_tokens("abcdefgh") == 2
+        print("  ✓ 并发请求按速率依次放行，事件循环不被阻塞")
+        return True
+    except Exception as e:
+        print(f"  ❌ 测试失败: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("重试策略与限速器测试")
+    print("=" * 60)
+
+    test_results = []
+    test_results.append(("重试策略", test_retry_policy()))
+    test_results.append(("令牌桶", test_token_bucket()))
+    test_results.append(("并发限速", test_concurrent_acquire()))
+
+    print("\n" + "=" * 60)
+    print("测试结果汇总")
+    print("=" * 60)
+
+    passed = 0
+    failed = 0
+
+    for test_name, result in test_results:
+        status = "✓ 通过" if result else "❌ 失败"
+        print(f"{test_name:20} {status}")
+        if result:
+            passed += 1
+        else:
+            failed += 1
+
+    print("=" * 60)
+    print(f"总计: {passed} 通过, {failed} 失败")
+
+    if failed == 0:
+        print("所有测试通过！✓")
+    else:
+        print(f"⚠️  有 {failed} 个测试失败")
+    print("=" * 60)
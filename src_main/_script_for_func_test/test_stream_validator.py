@@ -0,0 +1,290 @@
+"""
+流式输出校验器测试脚本
+验证合法输出在任意分块下都不会被误判，JSON前缀错误在出现处即被发现，
+IBC流式校验报告的错误与完整分析（错误恢复模式）报告的错误一致，且错误数达到上限才终止
+"""
+
+import json
+import os
+import random
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from libs.stream_validator import JsonPrefixValidator
+from libs.text_funcs import ChatResponseCleaner
+from utils.ibc_analyzer.ibc_analyzer import analyze_ibc_content
+from utils.ibc_analyzer.ibc_lexer import IbcLexer
+from utils.ibc_analyzer.ibc_parser import IbcParser
+from utils.ibc_analyzer.ibc_stream_validator import IbcStreamValidator
+from utils.issue_recorder import IbcIssueRecorder
+
+
+SAMPLE_JSON = {
+    "main_goal": "实现一个\"配置\"管理工具\n支持热加载",
+    "core_functions": ["加载", "保存", "校验"],
+    "module_breakdown": {"config": {"deps": [], "weight": -1.5e3, "enabled": True, "owner": None}},
+    "ExternalLibraryDependencies": {"json": "标准库", "emoji": "☺"},
+}
+
+SAMPLE_IBC = """module json: 标准JSON解析库
+
+description: 配置管理器
+class ConfigManager():
+    var configPath: 配置文件路径
+
+    func 加载配置():
+        文件内容 = 读取文件(self.configPath)
+        返回 $json.parse(文件内容)
+
+@ 计算两个数的和
+func 计算(a: 数字, b: 数字):
+    结果 = a 加 b
+    返回 结果
+
+func 输出(内容: 文本):
+    如果 内容 为空:
+        返回
+    打印 内容"""
+
+
+def _feed_in_chunks(validator, text, rng):
+    """随机切分文本后逐段输入校验器，返回首次报错时已输入的长度与错误信息"""
+    pos = 0
+    while pos < len(text):
+        size = rng.randint(1, 12)
+        error = validator.feed(text[pos:pos + size])
+        pos += size
+        if error is not None:
+            return min(pos, len(text)), error
+    return None, None
+
+
+def test_valid_output_accepted():
+    """测试合法输出在任意分块与代码块标记下都不会被误判"""
+    print("\n测试 valid_output_accepted 函数...")
+
+    try:
+        rng = random.Random(20240720)
+        json_texts = [
+            json.dumps(SAMPLE_JSON, ensure_ascii=False, indent=2),
+            json.dumps(SAMPLE_JSON),
+            "```json\n" + json.dumps(SAMPLE_JSON, ensure_ascii=False, indent=4) + "\n```\n说明文字",
+            "\n  [1, 2.5, -0.1, \"a\\u00e9\", [], {}]",
+        ]
+        for text in json_texts:
+            for _ in range(20):
+                assert _feed_in_chunks(JsonPrefixValidator(), text, rng) == (None, None), f"合法JSON被误判: {text[:30]}"
+
+        validator = JsonPrefixValidator()
+        validator.feed("```json\n{\"a\": 1}\n```")
+        assert validator.finished and validator.feed("任意内容") is None, "根节点闭合后不应再校验"
+
+        ibc_texts = [SAMPLE_IBC, "```intent_behavior_code\n" + SAMPLE_IBC + "\n```\n", "\n" + SAMPLE_IBC + "\n"]
+        for text in ibc_texts:
+            for _ in range(20):
+                assert _feed_in_chunks(IbcStreamValidator(), text, rng) == (None, None), "合法IBC被误判"
+        print("  ✓ 合法输出未被误判")
+        return True
+    except Exception as e:
+        print(f"  ❌ 测试失败: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_json_prefix_errors():
+    """测试JSON前缀错误在出现位置即被发现"""
+    print("\n测试 json_prefix_errors 函数...")
+
+    try:
+        cases = [
+            ('以下是结果：{"a": 1}', '以'),
+            ('{"a": 1 "b": 2}', '"b"'),
+            ('{a: 1}', 'a:'),
+            ('{"a" 1}', '1}'),
+            ('{"a": [1, 2,, 3]}', ', 3'),
+            ('{"a": tru e}', ' e}'),
+            ('{"a": "第一行\n第二行"}', '\n'),
+            ('{"a": "\\x"}', 'x"'),
+            ('{"a": 01}', '}'),
+            ('{"a": [1, 2}', '}'),
+        ]
+        for text, marker in cases:
+            error_pos = text.index(marker) + 1
+            validator = JsonPrefixValidator()
+            for i, ch in enumerate(text):
+                error = validator.feed(ch)
+                if error is not None:
+                    break
+            assert error is not None, f"未发现JSON错误: {text!r}"
+            assert i + 1 == error_pos, f"JSON错误发现位置不正确: {text!r} 在第{i + 1}个字符报错 ({error})"
+            try:
+                json.loads(text[:i + 1])
+                assert False, "报错的前缀不应能被解析"
+            except json.JSONDecodeError:
+                pass
+
+        assert JsonPrefixValidator(root_types='{').feed('[1]') is not None, "根节点类型不符时应报错"
+        print("  ✓ JSON前缀错误在出现位置即被发现")
+        return True
+    except Exception as e:
+        print(f"  ❌ 测试失败: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_ibc_errors_match_full_analysis():
+    """测试IBC流式校验报告的错误与完整分析一致"""
+    print("\n测试 ibc_errors_match_full_analysis 函数...")
+
+    try:
+        rng = random.Random(20240721)
+        lines = SAMPLE_IBC.split('\n')
+        fragments = ["func", "class 类():", "var", ":", "(", ")", "    ", "\t", "@ 注释", "description: 描述", "module x"]
+        aborted = 0
+        for max_errors in (1, 2, 3):
+            for _ in range(200):
+                mutated = list(lines)
+                for _ in range(rng.randint(1, 4)):
+                    index = rng.randrange(len(mutated))
+                    fragment = rng.choice(fragments)
+                    mode = rng.randint(0, 2)
+                    if mode == 0:
+                        mutated[index] = fragment + mutated[index]
+                    elif mode == 1:
+                        mutated[index] = mutated[index] + fragment
+                    else:
+                        mutated.insert(index, fragment)
+                text = '\n'.join(mutated)
+
+                validator = IbcStreamValidator(max_errors)
+                _, error = _feed_in_chunks(validator, text, rng)
+                if error is None:
+                    continue
+                aborted += 1
+
+                # 提前终止时报告的错误必须恰好是完整分析（错误恢复模式）报告的前若干个错误
+                # 与调用方一致，完整分析前先清理首尾空白与代码块标记
+                recorder = IbcIssueRecorder()
+                analyze_ibc_content(ChatResponseCleaner.clean_code_block_markers(text), recorder,
+                                    streaming=True, recover_errors=True)
+                expected = [(issue.line_num, issue.message) for issue in recorder.get_issues()]
+                reported = [(e.line_num, e.message) for e in validator.get_errors()]
+                assert len(reported) >= max_errors, f"错误数未达到上限即终止: {error}"
+                assert reported == expected[:len(reported)], \
+                    f"流式校验错误与完整分析不一致: {reported} / {expected}\n{text}"
+        assert aborted > 0, "随机变异中应至少有部分被提前发现"
+        print(f"  ✓ {aborted} 个提前终止的错误均与完整分析一致")
+        return True
+    except Exception as e:
+        print(f"  ❌ 测试失败: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_ibc_collects_multiple_errors():
+    """测试IBC流式校验在第一处错误后继续校验，错误数达到上限才终止"""
+    print("\n测试 ibc_collects_multiple_errors 函数...")
+
+    try:
+        lines = SAMPLE_IBC.split('\n')
+        lines[3] = lines[3] + ":"
+        lines[15] = lines[15] + ":"
+        text = '\n'.join(lines)
+
+        recorder = IbcIssueRecorder()
+        analyze_ibc_content(text, recorder, recover_errors=True)
+        error_lines = [issue.line_num for issue in recorder.get_issues()]
+        assert 4 in error_lines and 16 in error_lines, f"样例应在第4行与第16行出错: {error_lines}"
+
+        # 错误数未达到上限时不终止，完整输出交由完整分析一次报告全部错误
+        validator = IbcStreamValidator(max_errors=len(error_lines) + 1)
+        assert validator.feed(text + "\n") is None, "错误数未达到上限时不应终止"
+        assert [e.line_num for e in validator.get_errors()] == error_lines
+
+        # 达到上限时终止，错误信息包含已发现的全部错误
+        validator = IbcStreamValidator(max_errors=2)
+        error = None
+        for line in text.split('\n'):
+            error = validator.feed(line + "\n")
+            if error is not None:
+                break
+        assert error is not None and "IBC第4行" in error and "IBC第16行" in error, f"错误信息不完整: {error}"
+
+        # 上限为1时在第一处错误即终止
+        assert IbcStreamValidator(max_errors=1).feed(text + "\n").startswith("IBC第4行")
+        print("  ✓ 多处错误均被收集")
+        return True
+    except Exception as e:
+        print(f"  ❌ 测试失败: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_incremental_entry_points():
+    """测试词法/语法分析器的增量接口与完整分析结果一致"""
+    print("\n测试 incremental_entry_points 函数...")
+
+    try:
+        lines = SAMPLE_IBC.split('\n')
+        expected_tokens = [(t.type, t.value, t.line_num) for t in IbcLexer(SAMPLE_IBC).iter_tokens()]
+
+        lexer = IbcLexer("")
+        parser = IbcParser([])
+        fed_tokens = []
+        for line in lines:
+            for token in lexer.feed_line(line):
+                fed_tokens.append((token.type, token.value, token.line_num))
+                parser.feed_token(token)
+        assert fed_tokens == expected_tokens[:len(fed_tokens)], "增量词法分析的token应与iter_tokens一致"
+        for token in IbcLexer(SAMPLE_IBC).tokenize()[len(fed_tokens):]:
+            parser.feed_token(token)
+        assert parser.ast_nodes == IbcParser(IbcLexer(SAMPLE_IBC).tokenize()).parse(), "增量语法分析的AST应与parse一致"
+        print("  ✓ 增量接口与完整分析一致")
+        return True
+    except Exception as e:
+        print(f"  ❌ 测试失败: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("流式输出校验器测试")
+    print("=" * 60)
+
+    test_results = []
+    test_results.append(("合法输出不误判", test_valid_output_accepted()))
+    test_results.append(("JSON前缀错误", test_json_prefix_errors()))
+    test_results.append(("IBC错误一致性", test_ibc_errors_match_full_analysis()))
+    test_results.append(("IBC多处错误", test_ibc_collects_multiple_errors()))
+    test_results.append(("增量分析接口", test_incremental_entry_points()))
+
+    print("\n" + "=" * 60)
+    print("测试结果汇总")
+    print("=" * 60)
+
+    passed = 0
+    failed = 0
+
+    for test_name, result in test_results:
+        status = "✓ 通过" if result else "❌ 失败"
+        print(f"{test_name:20} {status}")
+        if result:
+            passed += 1
+        else:
+            failed += 1
+
+    print("=" * 60)
+    print(f"总计: {passed} 通过, {failed} 失败")
+
+    if failed == 0:
+        print("所有测试通过！✓")
+    else:
+        print(f"⚠️  有 {failed} 个测试失败")
+    print("=" * 60)
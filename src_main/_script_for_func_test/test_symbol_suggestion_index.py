@@ -0,0 +1,125 @@
+"""
+符号模糊建议索引测试脚本
+验证建议结果与difflib.get_close_matches一致，以及错误报告器使用索引后的建议信息
+"""
+
+import difflib
+import os
+import random
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from libs.symbol_error_reporter import SymbolErrorReporter
+from libs.symbol_suggestion_index import SymbolSuggestionIndex
+from typedef.ibc_data_types import (ClassMetadata, FunctionMetadata,
+                                    VariableMetadata)
+from utils.issue_recorder import IbcIssueRecorder
+
+
+def _random_names(rng: random.Random, count: int):
+    """生成带公共前缀、后缀的随机符号名，使相似度分布接近真实符号表"""
+    parts = ["get", "set", "ball", "player", "update", "render", "score", "pos", "x", "位置", "更新"]
+    names = []
+    for _ in range(count):
+        name = "_".join(rng.choice(parts) for _ in range(rng.randint(1, 3)))
+        if rng.random() < 0.3:
+            name += str(rng.randint(0, 9))
+        names.append(name)
+    return names
+
+
+def test_matches_difflib():
+    """测试建议结果与difflib完全一致"""
+    print("\n测试 matches_difflib 函数...")
+
+    try:
+        rng = random.Random(20240601)
+        for _ in range(200):
+            names = _random_names(rng, rng.randint(0, 80))
+            extras = _random_names(rng, rng.randint(0, 5))
+            index = SymbolSuggestionIndex(names)
+            candidates = list(dict.fromkeys(names + extras))
+
+            for _ in range(5):
+                word = rng.choice(_random_names(rng, 1) + candidates[:1] + ["", "xyz"])
+                n = rng.randint(1, 5)
+                cutoff = rng.choice([0.0, 0.3, 0.6, 0.85, 1.0])
+                expected = difflib.get_close_matches(word, candidates, n=n, cutoff=cutoff)
+                actual = index.get_close_matches(word, n=n, cutoff=cutoff, extra_candidates=extras)
+                assert actual == expected, f"{word!r}: {actual} != {expected}"
+
+        index = SymbolSuggestionIndex(["get_position", "get_position", "set_position"])
+        assert len(index) == 2 and "get_position" in index, "重复的名称只应收录一次"
+        print("  ✓ 建议结果与difflib一致")
+        return True
+    except Exception as e:
+        print(f"  ❌ 测试失败: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_reporter_suggestions():
+    """测试错误报告器的候选收集与建议信息"""
+    print("\n测试 reporter_suggestions 函数...")
+
+    try:
+        local_symbols = {
+            "BallEntity": ClassMetadata(),
+            "BallEntity.get_position": FunctionMetadata(type="func"),
+            "BallEntity.update": FunctionMetadata(type="func"),
+        }
+        recorder = IbcIssueRecorder()
+        reporter = SymbolErrorReporter(recorder, local_symbols)
+
+        context_symbols = {"position": VariableMetadata(type="var"), "update": VariableMetadata(type="var")}
+        candidates = reporter.collect_candidates(context_symbols, ["ball_entity", "update"])
+        assert candidates == ["position", "update", "BallEntity", "get_position", "ball_entity"], \
+            f"候选应去重并保持首次出现的顺序: {candidates}"
+
+        reporter.record_not_found_error("get_positon", context_symbols, ["ball_entity"], 3)
+        issues = recorder.get_issues()
+        assert len(issues) == 1 and "get_position" in issues[0].message, "应建议最相似的本地符号"
+        assert issues[0].line_num == 3
+        print("  ✓ 错误报告器建议信息正确")
+        return True
+    except Exception as e:
+        print(f"  ❌ 测试失败: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("符号模糊建议索引测试")
+    print("=" * 60)
+
+    test_results = []
+    test_results.append(("与difflib一致", test_matches_difflib()))
+    test_results.append(("错误报告器建议", test_reporter_suggestions()))
+
+    print("\n" + "=" * 60)
+    print("测试结果汇总")
+    print("=" * 60)
+
+    passed = 0
+    failed = 0
+
+    for test_name, result in test_results:
+        status = "✓ 通过" if result else "❌ 失败"
+        print(f"{test_name:20} {status}")
+        if result:
+            passed += 1
+        else:
+            failed += 1
+
+    print("=" * 60)
+    print(f"总计: {passed} 通过, {failed} 失败")
+
+    if failed == 0:
+        print("所有测试通过！✓")
+    else:
+        print(f"⚠️  有 {failed} 个测试失败")
+    print("=" * 60)
@@ -0,0 +1,177 @@
+"""
+更新状态失效引擎测试脚本
+验证两阶段检查与广度优先传播的结果与逐文件递归传播一致，以及原因记录和校验数据一次性加载
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from data_store.verify_data_manager import VerifyDataManager
+from libs.dependency_graph import DependencyGraph
+from libs.update_invalidation import UpdateInvalidationEngine
+
+
+def _reference_update_status(file_list, dependent_relation, dirty_files, modified_files):
+    """逐文件递归传播的参考实现"""
+    need_update_flag_dict = {file_path: file_path in dirty_files for file_path in file_list}
+
+    def propagate(file_path):
+        for potential_dependent, deps in dependent_relation.items():
+            if file_path in deps and not need_update_flag_dict.get(potential_dependent, False):
+                need_update_flag_dict[potential_dependent] = True
+                propagate(potential_dependent)
+
+    for file_path in file_list:
+        if need_update_flag_dict.get(file_path, False):
+            propagate(file_path)
+        elif file_path in modified_files:
+            propagate(file_path)
+    return need_update_flag_dict
+
+
+def test_evaluate_matches_reference():
+    """测试随机依赖表上的标记结果与参考实现一致"""
+    print("\n测试 evaluate_matches_reference 函数...")
+
+    try:
+        rng = random.Random(20240705)
+        for _ in range(100):
+            file_list = [f"src/mod_{i}" for i in range(rng.randint(1, 25))]
+            dependent_relation = {
+                file_path: rng.sample(file_list[:i], rng.randint(0, min(i, 3)))
+                for i, file_path in enumerate(file_list)
+            }
+            dirty_files = set(rng.sample(file_list, rng.randint(0, min(3, len(file_list)))))
+            modified_files = set(rng.sample(file_list, rng.randint(0, min(3, len(file_list)))))
+
+            checked_manual = []
+
+            def check_manual_change(file_path):
+                checked_manual.append(file_path)
+                return "手动修改" if file_path in modified_files else None
+
+            engine = UpdateInvalidationEngine(DependencyGraph(dependent_relation), file_list)
+            result = engine.evaluate(
+                check_file=lambda file_path: "直接变化" if file_path in dirty_files else None,
+                check_manual_change=check_manual_change,
+            )
+            expected = _reference_update_status(file_list, dependent_relation, dirty_files, modified_files)
+            assert result == expected, "标记结果与参考实现不一致"
+
+            # 手动修改检查只针对检查时尚未被标记的文件
+            for file_path in checked_manual:
+                assert file_path not in dirty_files
+
+            for file_path, reason in engine.update_reasons.items():
+                if reason.caused_by:
+                    assert file_path not in dirty_files
+                    assert reason.caused_by in dependent_relation[file_path], "传播原因应为直接依赖"
+                    assert result[reason.caused_by] or reason.caused_by in engine.manual_change_reasons
+                else:
+                    assert file_path in dirty_files and reason.reason == "直接变化"
+            assert set(engine.update_reasons) == {f for f, flag in result.items() if flag}
+        print("  ✓ 标记结果与参考实现一致，传播原因指向直接依赖")
+        return True
+    except Exception as e:
+        print(f"  ❌ 测试失败: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_propagation_order():
+    """测试传播顺序与手动修改的处理"""
+    print("\n测试 propagation_order 函数...")
+
+    try:
+        dependent_relation = {
+            "a": [],
+            "b": ["a"],
+            "c": ["a"],
+            "d": ["b", "c"],
+            "e": [],
+            "f": ["e"],
+        }
+        file_list = ["a", "e", "b", "c", "f", "d"]
+        engine = UpdateInvalidationEngine(DependencyGraph(dependent_relation), file_list)
+        engine.evaluate(
+            check_file=lambda file_path: "首次生成" if file_path == "a" else None,
+            check_manual_change=lambda file_path: "手动修改" if file_path == "e" else None,
+        )
+        propagated = [(reason.file_path, reason.caused_by) for reason in engine.get_propagated_updates()]
+        assert propagated == [("b", "a"), ("c", "a"), ("d", "b"), ("f", "e")], f"传播顺序不符合预期: {propagated}"
+        assert not engine.need_update_flag_dict["e"], "被手动修改的文件自身无需更新"
+        assert engine.manual_change_reasons["e"].reason == "手动修改"
+        print("  ✓ 传播按广度优先顺序进行，被手动修改的文件只影响依赖方")
+        return True
+    except Exception as e:
+        print(f"  ❌ 测试失败: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_load_all_verify_data():
+    """测试一次性加载全部校验数据"""
+    print("\n测试 load_all_verify_data 函数...")
+
+    try:
+        with tempfile.TemporaryDirectory() as data_dir:
+            assert VerifyDataManager.load_all_verify_data(data_dir) == {}, "verify文件不存在时应返回空字典"
+
+            VerifyDataManager.save_file_verify_data(data_dir, "src/a", {"ibc_verify_code": "1"})
+            VerifyDataManager.save_file_verify_data(data_dir, "src/b", {"ibc_verify_code": "2"})
+            all_verify_data = VerifyDataManager.load_all_verify_data(data_dir)
+            assert all_verify_data == {"src/a": {"ibc_verify_code": "1"}, "src/b": {"ibc_verify_code": "2"}}
+            assert all_verify_data["src/b"] == VerifyDataManager.load_file_verify_data(data_dir, "src/b")
+
+            with open(os.path.join(data_dir, 'icp_verify_data.json'), 'w', encoding='utf-8') as f:
+                json.dump(["invalid"], f)
+            assert VerifyDataManager.load_all_verify_data(data_dir) == {}, "格式错误时应返回空字典"
+        print("  ✓ 全部校验数据加载正确")
+        return True
+    except Exception as e:
+        print(f"  ❌ 测试失败: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("更新状态失效引擎测试")
+    print("=" * 60)
+
+    test_results = []
+    test_results.append(("标记结果一致性", test_evaluate_matches_reference()))
+    test_results.append(("传播顺序", test_propagation_order()))
+    test_results.append(("加载全部校验数据", test_load_all_verify_data()))
+
+    print("\n" + "=" * 60)
+    print("测试结果汇总")
+    print("=" * 60)
+
+    passed = 0
+    failed = 0
+
+    for test_name, result in test_results:
+        status = "✓ 通过" if result else "❌ 失败"
+        print(f"{test_name:20} {status}")
+        if result:
+            passed += 1
+        else:
+            failed += 1
+
+    print("=" * 60)
+    print(f"总计: {passed} 通过, {failed} 失败")
+
+    if failed == 0:
+        print("所有测试通过！✓")
+    else:
+        print(f"⚠️  有 {failed} 个测试失败")
+    print("=" * 60)
@@ -1,7 +1,7 @@
-import asyncio
+import copy
 import json
 import os
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from data_store.app_data_store import get_instance as get_app_data_store
 from data_store.ibc_data_store import get_instance as get_ibc_data_store
@@ -9,10 +9,13 @@ from data_store.sys_prompt_manager import \
     get_instance as get_sys_prompt_manager
 from data_store.user_prompt_manager import \
     get_instance as get_user_prompt_manager
+from libs.dependency_graph import DependencyGraph
 from libs.dir_json_funcs import DirJsonFuncs
+from libs.file_task_scheduler import FileTaskScheduler
 from libs.ibc_funcs import IbcFuncs
 from libs.symbol_metadata_helper import SymbolMetadataHelper
 from libs.text_funcs import ChatResponseCleaner
+from libs.update_invalidation import UpdateInvalidationEngine
 from run_time_cfg.proj_run_time_cfg import \
     get_instance as get_proj_run_time_cfg
 from typedef.cmd_data_types import CmdProcStatus, Colors, CommandInfo
@@ -69,29 +72,42 @@ class CmdHandlerCodeGen(BaseCmdHandler):
         # 准备执行前所需的变量
         self._build_pre_execution_variables()
         
-        # 按依赖顺序遍历并处理每个文件
-        for file_path in self.file_creation_order_list:
-            success = self._generate_single_target_code(file_path)
-            if not success:
+        # 按依赖关系调度处理每个文件，相互独立的文件并行生成
+        scheduler = FileTaskScheduler(
+            self.dependency_graph,
+            self.file_creation_order_list,
+            max_workers=get_proj_run_time_cfg().get_max_concurrent_requests('coder_handler')
+        )
+        if scheduler.max_workers > 1:
+            print(f"  {Colors.OKBLUE}并行生成，最多同时处理 {scheduler.max_workers} 个文件{Colors.ENDC}")
+        if not scheduler.run(lambda file_path: self._new_file_worker()._generate_single_target_code(file_path)):
+            for file_path in scheduler.failed_files:
+                if file_path in scheduler.errors:
+                    print(f"{Colors.FAIL}文件 {file_path} 处理异常: {scheduler.errors[file_path]}{Colors.ENDC}")
                 print(f"{Colors.FAIL}文件 {file_path} 目标代码生成失败，退出运行{Colors.ENDC}")
-                return
+            return
         
         # 所有文件处理完毕，统一更新目标代码文件的MD5值到统一的verify文件
         print(f"  {Colors.OKBLUE}开始更新目标代码文件校验码...{Colors.ENDC}")
         ibc_data_store = get_ibc_data_store()
-        for file_path in self.file_creation_order_list:
-            target_code_path = self._build_target_code_path(file_path)
-            if os.path.exists(target_code_path):
-                try:
-                    with open(target_code_path, 'r', encoding='utf-8') as f:
-                        target_code_content = f.read()
-                    current_target_md5 = IbcFuncs.calculate_text_md5(target_code_content)
-                    ibc_data_store.update_file_verify_data(self.work_data_dir_path, file_path, {
-                        'target_code_verify_code': current_target_md5
-                    })
-                except Exception as e:
-                    print(f"    {Colors.WARNING}警告: 更新目标代码校验码失败: {file_path}, {e}{Colors.ENDC}")
-        print(f"  {Colors.OKGREEN}目标代码文件校验码更新完毕{Colors.ENDC}")
+        # 在同一个会话中修改所有文件的校验码，最后只写入一次verify文件；写入失败只给出警告，不影响已生成的目标代码
+        try:
+            with ibc_data_store.open_verify_data_session(self.work_data_dir_path) as verify_session:
+                for file_path in self.file_creation_order_list:
+                    target_code_path = self._build_target_code_path(file_path)
+                    if os.path.exists(target_code_path):
+                        try:
+                            with open(target_code_path, 'r', encoding='utf-8') as f:
+                                target_code_content = f.read()
+                            current_target_md5 = IbcFuncs.calculate_text_md5(target_code_content)
+                            verify_session.update(file_path, {
+                                'target_code_verify_code': current_target_md5
+                            })
+                        except Exception as e:
+                            print(f"    {Colors.WARNING}警告: 更新目标代码校验码失败: {file_path}, {e}{Colors.ENDC}")
+            print(f"  {Colors.OKGREEN}目标代码文件校验码更新完毕{Colors.ENDC}")
+        except IOError as e:
+            print(f"    {Colors.WARNING}警告: 更新目标代码校验码失败: {e}{Colors.ENDC}")
         
         print(f"{Colors.OKGREEN}目标代码生成完毕!{Colors.ENDC}")
     
@@ -183,6 +199,7 @@ class CmdHandlerCodeGen(BaseCmdHandler):
         self.proj_root_dict = final_dir_json_dict['proj_root_dict']
         self.proj_root_dict_json_str = json.dumps(self.proj_root_dict, indent=2, ensure_ascii=False)
         self.dependent_relation = dependent_relation
+        self.dependency_graph = DependencyGraph(dependent_relation)
         self.file_creation_order_list = file_creation_order_list
         self.work_ibc_dir_path = work_ibc_dir_path
         self.work_target_dir_path = work_target_dir_path
@@ -199,75 +216,27 @@ class CmdHandlerCodeGen(BaseCmdHandler):
         根据以下逻辑标记文件是否需要更新：
         1. 检查规范化符号元数据的MD5值变化
         2. 检查目标代码文件是否存在
-        3. 检查依赖链中的变化（依赖传播）
+        3. 检查依赖链中的变化（依赖传播，目标代码被手动修改时同样传播给依赖它的文件）
         
         Returns:
             Dict[str, bool]: 文件路径到是否需要更新的映射
         """
         print(f"  {Colors.OKBLUE}开始检查文件更新状态...{Colors.ENDC}")
-        need_update_flag_dict = {}
-
         file_list = self.file_creation_order_list
-        ibc_data_store = get_ibc_data_store()
         
-        # 第一阶段：检查规范化符号元数据的MD5和目标代码文件存在性
-        for file_path in file_list:
-            need_update = False
-            
-            # 从 verify_data 加载校验数据
-            verify_data = ibc_data_store.load_file_verify_data(self.work_data_dir_path, file_path)
-            
-            # 检查规范化后的符号元数据是否变化
-            symbols_path = ibc_data_store.build_symbols_path(self.work_ibc_dir_path, file_path)
-            if os.path.exists(symbols_path):
-                file_name = os.path.basename(file_path)
-                symbols_tree, symbols_metadata = ibc_data_store.load_symbols(symbols_path, file_name)
-                
-                if symbols_metadata:
-                    current_normalized_md5 = IbcFuncs.calculate_symbols_metadata_md5(symbols_metadata)
-                    saved_normalized_md5 = verify_data.get('symbol_normalize_verify_code', None)
-                    
-                    if saved_normalized_md5 is None:
-                        print(f"    {Colors.OKBLUE}首次生成: {file_path}{Colors.ENDC}")
-                        need_update = True
-                    elif saved_normalized_md5 != current_normalized_md5:
-                        print(f"    {Colors.OKBLUE}规范化符号已变化: {file_path}{Colors.ENDC}")
-                        need_update = True
-            else:
-                print(f"    {Colors.WARNING}警告: 符号表文件不存在: {file_path}{Colors.ENDC}")
-                need_update = True
-            
-            # 检查目标代码文件是否存在
-            if not need_update:
-                target_code_path = self._build_target_code_path(file_path)
-                if not os.path.exists(target_code_path):
-                    print(f"    {Colors.OKBLUE}目标代码文件不存在，需要生成: {file_path}{Colors.ENDC}")
-                    need_update = True
-            
-            need_update_flag_dict[file_path] = need_update
-        
-        # 第二阶段：依赖链传播更新
-        # 按依赖顺序遍历（file_list已经是拓扑排序后的顺序）
-        for file_path in file_list:
-            if need_update_flag_dict.get(file_path, False):
-                # 如果当前文件已标记需要更新，则所有依赖它的文件也需要更新
-                self._propagate_update_to_dependents(file_path, need_update_flag_dict)
-            else:
-                # 检查目标代码文件的MD5是否变化（用户可能手动修改了）
-                target_code_path = self._build_target_code_path(file_path)
-                if os.path.exists(target_code_path):
-                    try:
-                        with open(target_code_path, 'r', encoding='utf-8') as f:
-                            target_code_content = f.read()
-                        current_target_md5 = IbcFuncs.calculate_text_md5(target_code_content)
-                        verify_data = ibc_data_store.load_file_verify_data(self.work_data_dir_path, file_path)
-                        saved_target_md5 = verify_data.get('target_code_verify_code', None)
-                        
-                        if saved_target_md5 is not None and saved_target_md5 != current_target_md5:
-                            print(f"    {Colors.OKBLUE}目标代码被手动修改: {file_path}，依赖它的文件需要更新{Colors.ENDC}")
-                            self._propagate_update_to_dependents(file_path, need_update_flag_dict)
-                    except Exception as e:
-                        print(f"    {Colors.WARNING}警告: 检查目标代码MD5失败: {file_path}, {e}{Colors.ENDC}")
+        # 统一的verify文件只加载一次，供所有文件的检查使用
+        ibc_data_store = get_ibc_data_store()
+        all_verify_data = ibc_data_store.load_all_verify_data(self.work_data_dir_path)
+        
+        engine = UpdateInvalidationEngine(self.dependency_graph, file_list)
+        need_update_flag_dict = engine.evaluate(
+            check_file=lambda file_path: self._check_file_update_reason(
+                file_path, all_verify_data.get(file_path, {})),
+            check_manual_change=lambda file_path: self._check_target_code_manual_change(
+                file_path, all_verify_data.get(file_path, {})),
+        )
+        for update_reason in engine.get_propagated_updates():
+            print(f"    {Colors.OKBLUE}依赖传播: {update_reason.file_path} 需要更新（因为依赖 {update_reason.caused_by}）{Colors.ENDC}")
         
         # 打印更新状态摘要
         update_count = sum(1 for v in need_update_flag_dict.values() if v)
@@ -275,21 +244,62 @@ class CmdHandlerCodeGen(BaseCmdHandler):
         
         return need_update_flag_dict
     
-    def _propagate_update_to_dependents(self, file_path: str, need_update_flag_dict: Dict[str, bool]):
-        """将更新标记传播到所有依赖当前文件的文件
+    def _check_file_update_reason(self, file_path: str, verify_data: Dict[str, str]) -> Optional[str]:
+        """检查规范化符号元数据的MD5和目标代码文件存在性，返回需要更新的原因，无需更新时返回None"""
+        ibc_data_store = get_ibc_data_store()
         
-        Args:
-            file_path: 被依赖的文件路径
-            need_update_flag_dict: 更新标记字典
-        """
-        # 遍历所有文件，找出依赖当前文件的文件
-        for potential_dependent, dependencies in self.dependent_relation.items():
-            if file_path in dependencies:
-                if not need_update_flag_dict.get(potential_dependent, False):
-                    print(f"    {Colors.OKBLUE}依赖传播: {potential_dependent} 需要更新（因为依赖 {file_path}）{Colors.ENDC}")
-                    need_update_flag_dict[potential_dependent] = True
-                    # 递归传播
-                    self._propagate_update_to_dependents(potential_dependent, need_update_flag_dict)
+        # 检查规范化后的符号元数据是否变化
+        symbols_path = ibc_data_store.build_symbols_path(self.work_ibc_dir_path, file_path)
+        if not os.path.exists(symbols_path):
+            print(f"    {Colors.WARNING}警告: 符号表文件不存在: {file_path}{Colors.ENDC}")
+            return "符号表文件不存在"
+        
+        file_name = os.path.basename(file_path)
+        symbols_tree, symbols_metadata = ibc_data_store.load_symbols(symbols_path, file_name)
+        if symbols_metadata:
+            current_normalized_md5 = IbcFuncs.calculate_symbols_metadata_md5(symbols_metadata)
+            saved_normalized_md5 = verify_data.get('symbol_normalize_verify_code', None)
+            
+            if saved_normalized_md5 is None:
+                print(f"    {Colors.OKBLUE}首次生成: {file_path}{Colors.ENDC}")
+                return "首次生成"
+            if saved_normalized_md5 != current_normalized_md5:
+                print(f"    {Colors.OKBLUE}规范化符号已变化: {file_path}{Colors.ENDC}")
+                return "规范化符号已变化"
+        
+        # 检查目标代码文件是否存在
+        target_code_path = self._build_target_code_path(file_path)
+        if not os.path.exists(target_code_path):
+            print(f"    {Colors.OKBLUE}目标代码文件不存在，需要生成: {file_path}{Colors.ENDC}")
+            return "目标代码文件不存在"
+        
+        return None
+    
+    def _check_target_code_manual_change(self, file_path: str, verify_data: Dict[str, str]) -> Optional[str]:
+        """检查目标代码文件的MD5是否变化（用户可能手动修改了），被修改时返回原因，否则返回None"""
+        target_code_path = self._build_target_code_path(file_path)
+        if not os.path.exists(target_code_path):
+            return None
+        
+        try:
+            with open(target_code_path, 'r', encoding='utf-8') as f:
+                target_code_content = f.read()
+            current_target_md5 = IbcFuncs.calculate_text_md5(target_code_content)
+        except Exception as e:
+            print(f"    {Colors.WARNING}警告: 检查目标代码MD5失败: {file_path}, {e}{Colors.ENDC}")
+            return None
+        
+        saved_target_md5 = verify_data.get('target_code_verify_code', None)
+        if saved_target_md5 is not None and saved_target_md5 != current_target_md5:
+            print(f"    {Colors.OKBLUE}目标代码被手动修改: {file_path}，依赖它的文件需要更新{Colors.ENDC}")
+            return "目标代码被手动修改"
+        return None
+    
+    def _new_file_worker(self) -> 'CmdHandlerCodeGen':
+        """创建处理单个文件的处理器副本，共享执行前准备的变量，单文件的生成状态相互独立"""
+        worker = copy.copy(self)
+        worker.issue_recorder = TextIssueRecorder()
+        return worker
     
     def _generate_single_target_code(self, icp_json_file_path: str) -> bool:
         """为单个文件生成目标代码（包含重试机制）
@@ -344,11 +354,11 @@ class CmdHandlerCodeGen(BaseCmdHandler):
                 current_user_prompt = self.user_prompt_base + "\n\n" + self.user_prompt_retry_part
             
             # 调用AI进行代码生成
-            response_content, success = asyncio.run(self.chat_handler.get_role_response(
+            response_content, success = self.chat_handler.get_role_response_sync(
                 role_name=self.role_code_gen,
                 sys_prompt=current_sys_prompt,
                 user_prompt=current_user_prompt
-            ))
+            )
             
             if not success or not response_content:
                 print(f"    {Colors.WARNING}警告: AI响应失败或为空{Colors.ENDC}")
@@ -361,6 +371,7 @@ class CmdHandlerCodeGen(BaseCmdHandler):
             is_valid = self._validate_generated_code(cleaned_code, icp_json_file_path)
             
             if is_valid:
+                self.chat_handler.accept_response(current_sys_prompt, current_user_prompt, response_content)
                 generated_code = cleaned_code
                 break
             
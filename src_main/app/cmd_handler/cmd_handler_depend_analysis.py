@@ -1,4 +1,3 @@
-import asyncio
 import json
 import os
 import sys
@@ -10,6 +9,7 @@ from data_store.user_data_store import get_instance as get_user_data_store
 from data_store.user_prompt_manager import \
     get_instance as get_user_prompt_manager
 from libs.dir_json_funcs import DirJsonFuncs
+from libs.stream_validator import JsonPrefixValidator
 from libs.text_funcs import ChatResponseCleaner
 from run_time_cfg.proj_run_time_cfg import \
     get_instance as get_proj_run_time_cfg
@@ -95,11 +95,12 @@ class CmdHandlerDependAnalysis(BaseCmdHandler):
                 current_sys_prompt = base_sys_prompt
                 current_user_prompt = self.user_prompt_base
         
-                response_content, success = asyncio.run(self.chat_handler.get_role_response(
+                response_content, success = self.chat_handler.get_role_response_sync(
                     role_name=self.role_name,
                     sys_prompt=current_sys_prompt,
-                    user_prompt=current_user_prompt
-                ))
+                    user_prompt=current_user_prompt,
+                    validator_factory=JsonPrefixValidator
+                )
         
                 # 如果响应失败，继续下一次尝试
                 if not success:
@@ -116,6 +117,7 @@ class CmdHandlerDependAnalysis(BaseCmdHandler):
                 # 验证响应内容
                 is_valid = self._validate_response(cleaned_json_str)
                 if is_valid:
+                    self.chat_handler.accept_response(current_sys_prompt, current_user_prompt, response_content)
                     break
         
                 # 如果验证失败，保存当前生成的内容，供后续诊断和修复使用
@@ -145,15 +147,16 @@ class CmdHandlerDependAnalysis(BaseCmdHandler):
                     analysis_mapping
                 )
 
-                fix_suggestion_raw, success = asyncio.run(self.chat_handler.get_role_response(
+                fix_suggestion_raw, success = self.chat_handler.get_role_response_sync(
                     role_name=self.role_name,
                     sys_prompt=analysis_sys_prompt,
                     user_prompt=analysis_user_prompt,
-                ))
+                )
         
                 if not success or not fix_suggestion_raw:
                     print(f"{Colors.WARNING}警告: 生成修复建议失败，将进行下一次尝试{Colors.ENDC}")
                     continue
+                self.chat_handler.accept_response(analysis_sys_prompt, analysis_user_prompt, fix_suggestion_raw)
         
                 fix_suggestion = ChatResponseCleaner.clean_code_block_markers(fix_suggestion_raw)
         
@@ -166,11 +169,12 @@ class CmdHandlerDependAnalysis(BaseCmdHandler):
                     current_sys_prompt = base_sys_prompt
                 current_user_prompt = self.user_prompt_base + "\n\n" + self.user_prompt_retry_part
         
-                response_content, success = asyncio.run(self.chat_handler.get_role_response(
+                response_content, success = self.chat_handler.get_role_response_sync(
                     role_name=self.role_name,
                     sys_prompt=current_sys_prompt,
-                    user_prompt=current_user_prompt
-                ))
+                    user_prompt=current_user_prompt,
+                    validator_factory=JsonPrefixValidator
+                )
         
                 if not success:
                     print(f"{Colors.WARNING}警告: 修复阶段AI响应失败，将进行下一次尝试{Colors.ENDC}")
@@ -186,6 +190,7 @@ class CmdHandlerDependAnalysis(BaseCmdHandler):
                 # 再次验证修复后的响应内容
                 is_valid = self._validate_response(cleaned_json_str)
                 if is_valid:
+                    self.chat_handler.accept_response(current_sys_prompt, current_user_prompt, response_content)
                     break
         
                 # 如果依然验证失败，保存当前生成的内容，供下一轮重试使用
@@ -1,4 +1,3 @@
-import asyncio
 import json
 import os
 import re
@@ -95,11 +94,11 @@ class CmdHandlerDirFileFill(BaseCmdHandler):
                     current_sys_prompt = base_sys_prompt
                 current_user_prompt = self.user_prompt_base + "\n\n" + self.user_prompt_retry_part
             
-            response_content, success = asyncio.run(self.chat_handler.get_role_response(
+            response_content, success = self.chat_handler.get_role_response_sync(
                 role_name=self.role_dir_file_fill,
                 sys_prompt=current_sys_prompt,
                 user_prompt=current_user_prompt
-            ))
+            )
             
             # 如果响应失败，继续下一次尝试
             if not success:
@@ -112,6 +111,7 @@ class CmdHandlerDirFileFill(BaseCmdHandler):
             # 验证响应内容
             is_valid = self._validate_response(cleaned_content, self.old_json_dict)
             if is_valid:
+                self.chat_handler.accept_response(current_sys_prompt, current_user_prompt, response_content)
                 break
             
             # 如果验证失败，保存当前生成的内容并构建重试提示词
@@ -153,11 +153,11 @@ class CmdHandlerDirFileFill(BaseCmdHandler):
 
             sys_prompt_plan_gen = self.sys_prompt_manager.get_prompt(self.role_plan_gen)
 
-            response_content, success = asyncio.run(self.chat_handler.get_role_response(
+            response_content, success = self.chat_handler.get_role_response_sync(
                 role_name=self.role_plan_gen,
                 sys_prompt=sys_prompt_plan_gen,
                 user_prompt=user_prompt
-            ))
+            )
             
             # 如果响应失败，继续下一次尝试
             if not success:
@@ -166,6 +166,7 @@ class CmdHandlerDirFileFill(BaseCmdHandler):
             
             # 清理代码块标记并退出运行
             cleaned_content = ChatResponseCleaner.clean_code_block_markers(response_content)
+            self.chat_handler.accept_response(sys_prompt_plan_gen, user_prompt, response_content)
             break
         
         # 保存实现规划
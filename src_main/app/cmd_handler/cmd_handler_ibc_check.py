@@ -0,0 +1,168 @@
+import json
+import os
+from typing import Dict
+
+from data_store.ibc_data_store import get_instance as get_ibc_data_store
+from libs.dir_json_funcs import DirJsonFuncs
+from run_time_cfg.proj_run_time_cfg import \
+    get_instance as get_proj_run_time_cfg
+from typedef.cmd_data_types import Colors, CommandInfo
+from typedef.issue_recorder_types import IbcBatchCheckReport
+from utils.ibc_analyzer.ibc_batch_analyzer import IbcBatchAnalyzer
+
+from .base_cmd_handler import BaseCmdHandler
+
+
+class CmdHandlerIbcCheck(BaseCmdHandler):
+    """IBC代码批量校验命令处理器"""
+
+    def __init__(self):
+        super().__init__()
+        self.command_info = CommandInfo(
+            name="ibc_batch_check",
+            aliases=["IBC_CHECK"],
+            description="并行分析并校验项目中全部IBC代码",
+            help_text="对src_ibc中的所有IBC文件执行语法分析与符号引用验证，输出汇总报告",
+        )
+
+        # 路径配置
+        proj_run_time_cfg = get_proj_run_time_cfg()
+        self.work_dir_path = proj_run_time_cfg.get_work_dir_path()
+        self.work_data_dir_path = os.path.join(self.work_dir_path, 'icp_proj_data')
+        self.work_icp_config_file_path = os.path.join(self.work_dir_path, '.icp_proj_config', 'icp_config.json')
+        self.report_file_path = os.path.join(self.work_data_dir_path, 'ibc_check_report.json')
+
+    def execute(self):
+        """执行IBC代码批量校验"""
+        if not self.is_cmd_valid():
+            return
+
+        print(f"{Colors.OKBLUE}开始批量校验IBC代码...{Colors.ENDC}")
+
+        if not self._build_pre_execution_variables():
+            return
+
+        # 读取所有已生成的IBC代码
+        ibc_contents = self._load_ibc_contents()
+        if not ibc_contents:
+            print(f"  {Colors.WARNING}警告: 未找到任何IBC文件，请先执行IBC生成命令{Colors.ENDC}")
+            return
+
+        batch_analyzer = IbcBatchAnalyzer(
+            proj_root_dict=self.proj_root_dict,
+            dependent_relation=self.dependent_relation,
+            external_library_dependencies=self.external_library_dependencies
+        )
+        print(f"  {Colors.OKBLUE}正在使用 {batch_analyzer.max_workers} 个进程分析 {len(ibc_contents)} 个文件...{Colors.ENDC}")
+        report = batch_analyzer.analyze_files(ibc_contents, self.file_creation_order_list)
+
+        self._print_report(report)
+        self._save_report(report)
+
+    def _build_pre_execution_variables(self) -> bool:
+        """准备命令正式开始执行之前所需的变量内容"""
+        # 读取依赖分析结果
+        final_dir_content_file = os.path.join(self.work_data_dir_path, 'icp_dir_content_with_depend.json')
+        try:
+            with open(final_dir_content_file, 'r', encoding='utf-8') as f:
+                final_dir_json_dict = json.load(f)
+        except Exception as e:
+            print(f"  {Colors.FAIL}错误: 读取依赖分析结果失败: {e}{Colors.ENDC}")
+            return False
+
+        if "proj_root_dict" not in final_dir_json_dict or "dependent_relation" not in final_dir_json_dict:
+            print(f"  {Colors.FAIL}错误: 依赖分析结果缺少必要的节点(proj_root_dict或dependent_relation){Colors.ENDC}")
+            return False
+
+        # 读取外部库依赖信息（来自 refined_requirements.json）
+        external_library_dependencies = {}
+        refined_requirements_file = os.path.join(self.work_data_dir_path, 'refined_requirements.json')
+        try:
+            with open(refined_requirements_file, 'r', encoding='utf-8') as rf:
+                refined = json.load(rf)
+                external_library_dependencies = refined.get('ExternalLibraryDependencies', {}) if isinstance(refined, dict) else {}
+        except Exception as e:
+            print(f"  {Colors.WARNING}警告: 读取外部库依赖信息失败: {e}，将使用空依赖{Colors.ENDC}")
+
+        # 获取IBC文件夹路径
+        try:
+            with open(self.work_icp_config_file_path, 'r', encoding='utf-8') as f:
+                icp_config_json_dict = json.load(f)
+        except Exception as e:
+            print(f"  {Colors.FAIL}错误: 读取ICP配置文件失败: {e}{Colors.ENDC}")
+            return False
+
+        if "path_mapping" in icp_config_json_dict:
+            ibc_dir_name = icp_config_json_dict["path_mapping"].get("ibc_dir_name", "src_ibc")
+        else:
+            ibc_dir_name = "src_ibc"
+
+        # 存储实例变量供后续使用
+        self.proj_root_dict = final_dir_json_dict['proj_root_dict']
+        self.dependent_relation = final_dir_json_dict['dependent_relation']
+        self.file_creation_order_list = DirJsonFuncs.build_file_creation_order(self.dependent_relation)
+        self.external_library_dependencies = external_library_dependencies
+        self.work_ibc_dir_path = os.path.join(self.work_dir_path, ibc_dir_name)
+        return True
+
+    def _load_ibc_contents(self) -> Dict[str, str]:
+        """按依赖顺序读取所有已存在的IBC代码"""
+        ibc_data_store = get_ibc_data_store()
+        ibc_contents = {}
+        missing_files = []
+        for file_path in self.file_creation_order_list:
+            ibc_path = ibc_data_store.build_ibc_path(self.work_ibc_dir_path, file_path)
+            if not os.path.exists(ibc_path):
+                missing_files.append(file_path)
+                continue
+            ibc_contents[file_path] = ibc_data_store.load_ibc_content(ibc_path)
+
+        if missing_files:
+            print(f"  {Colors.WARNING}警告: 以下文件尚未生成IBC代码，依赖它们的文件将跳过符号引用验证:{Colors.ENDC}")
+            for missing_file in missing_files[:5]:  # 只显示前5个
+                print(f"    - {missing_file}")
+            if len(missing_files) > 5:
+                print(f"    ... 还有 {len(missing_files) - 5} 个文件")
+        return ibc_contents
+
+    def _print_report(self, report: IbcBatchCheckReport) -> None:
+        """打印汇总报告"""
+        for result in report.get_invalid_results():
+            print(f"  {Colors.FAIL}{result.file_path}{Colors.ENDC}")
+            if result.error:
+                print(f"    {Colors.FAIL}分析异常: {result.error}{Colors.ENDC}")
+            for issue in result.syntax_issues + result.reference_issues:
+                print(f"    第{issue.line_num}行: {issue.message}")
+                if issue.line_content:
+                    print(f"      {issue.line_content}")
+
+        unchecked_files = [result.file_path for result in report.file_results if not result.reference_checked]
+        if unchecked_files:
+            print(f"  {Colors.WARNING}警告: {len(unchecked_files)} 个文件因依赖符号不可用未进行符号引用验证{Colors.ENDC}")
+
+        invalid_count = len(report.get_invalid_results())
+        summary = (f"校验完成: {len(report.file_results)} 个文件, {invalid_count} 个存在问题, "
+                   f"共 {report.get_issue_count()} 个问题, 耗时 {report.elapsed_seconds:.2f} 秒")
+        color = Colors.OKGREEN if report.is_all_valid() else Colors.WARNING
+        print(f"{color}{summary}{Colors.ENDC}")
+
+    def _save_report(self, report: IbcBatchCheckReport) -> None:
+        """保存汇总报告到项目数据目录"""
+        try:
+            with open(self.report_file_path, 'w', encoding='utf-8') as f:
+                json.dump(report.to_dict(), f, indent=2, ensure_ascii=False)
+            print(f"  {Colors.OKGREEN}校验报告已保存: {self.report_file_path}{Colors.ENDC}")
+        except Exception as e:
+            print(f"  {Colors.WARNING}警告: 保存校验报告失败: {e}{Colors.ENDC}")
+
+    def is_cmd_valid(self):
+        """检查命令的必要条件是否满足"""
+        return self._check_cmd_requirement()
+
+    def _check_cmd_requirement(self) -> bool:
+        """验证命令的前置条件"""
+        ibc_dir_file = os.path.join(self.work_data_dir_path, 'icp_dir_content_with_depend.json')
+        if not os.path.exists(ibc_dir_file):
+            print(f"  {Colors.WARNING}警告: 依赖分析结果文件不存在，请先执行依赖分析命令{Colors.ENDC}")
+            return False
+        return True
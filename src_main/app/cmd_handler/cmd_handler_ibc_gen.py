@@ -1,24 +1,30 @@
-import asyncio
+import copy
 import json
 import os
 from typing import Any, Dict, List, Optional
 
 from data_store.ibc_data_store import get_instance as get_ibc_data_store
+from data_store.symbol_table_manager import (STORAGE_MODE_DIRECTORY,
+                                             STORAGE_MODE_SHARDED)
 from data_store.sys_prompt_manager import \
     get_instance as get_sys_prompt_manager
 from data_store.user_data_store import get_instance as get_user_data_store
 from data_store.user_prompt_manager import \
     get_instance as get_user_prompt_manager
+from libs.dependency_graph import DependencyGraph
 from libs.dir_json_funcs import DirJsonFuncs
+from libs.file_task_scheduler import FileTaskScheduler
 from libs.ibc_funcs import IbcFuncs
 from libs.text_funcs import ChatResponseCleaner
+from libs.update_invalidation import UpdateInvalidationEngine
 from run_time_cfg.proj_run_time_cfg import \
     get_instance as get_proj_run_time_cfg
 from typedef.cmd_data_types import CmdProcStatus, Colors, CommandInfo
 from typedef.ibc_data_types import (AstNodeType, ClassNode, FunctionNode,
                                     IbcBaseAstNode, VariableNode,
                                     VisibilityTypes)
-from utils.ibc_analyzer.ibc_analyzer import analyze_ibc_content
+from utils.ibc_analyzer.ibc_incremental_analyzer import IbcIncrementalAnalyzer
+from utils.ibc_analyzer.ibc_stream_validator import IbcStreamValidator
 from utils.ibc_analyzer.ibc_symbol_ref_resolver import SymbolRefResolver
 from utils.ibc_analyzer.ibc_visible_symbol_builder import VisibleSymbolBuilder
 from utils.icp_ai_utils.icp_chat_inst import ICPChatInsts
@@ -64,6 +70,7 @@ class CmdHandlerIbcGen(BaseCmdHandler):
         self.last_generated_ibc_content = None  # 上一次生成的IBC内容
         self.last_sys_prompt_used = ""  # 上一次调用时使用的系统提示词
         self.last_user_prompt_used = ""  # 上一次调用时使用的用户提示词
+        self.ibc_stream_max_errors = 3  # 流式校验累计发现多少处错误后提前终止生成
 
     
     def execute(self):
@@ -76,16 +83,40 @@ class CmdHandlerIbcGen(BaseCmdHandler):
         # 准备执行前所需的变量
         self._build_pre_execution_variables()
         
-        # 按依赖顺序遍历并处理每个文件
-        for file_path in self.file_creation_order_list:
-            success = self._create_single_ibc_file(file_path)
-            if not success:
+        self.ibc_stream_max_errors = get_proj_run_time_cfg().get_ibc_stream_max_errors('coder_handler')
+        
+        # 按依赖关系调度处理每个文件，相互独立的文件并行生成
+        scheduler = FileTaskScheduler(
+            self.dependency_graph,
+            self.file_creation_order_list,
+            max_workers=get_proj_run_time_cfg().get_max_concurrent_requests('coder_handler')
+        )
+        ibc_data_store = get_ibc_data_store()
+        is_parallel = scheduler.max_workers > 1
+        if is_parallel:
+            # 并行时同一目录下的文件可能同时保存符号表，改为分片写入，结束后再合并回symbols.json
+            print(f"  {Colors.OKBLUE}并行生成，最多同时处理 {scheduler.max_workers} 个文件{Colors.ENDC}")
+            ibc_data_store.set_symbols_storage_mode(STORAGE_MODE_SHARDED)
+        try:
+            success = scheduler.run(lambda file_path: self._new_file_worker()._create_single_ibc_file(file_path))
+        finally:
+            if is_parallel:
+                ibc_data_store.set_symbols_storage_mode(STORAGE_MODE_DIRECTORY)
+                symbols_paths = {
+                    ibc_data_store.build_symbols_path(self.work_ibc_dir_path, file_path)
+                    for file_path in self.file_creation_order_list
+                }
+                for symbols_path in symbols_paths:
+                    ibc_data_store.compact_symbols(symbols_path)
+        if not success:
+            for file_path in scheduler.failed_files:
+                if file_path in scheduler.errors:
+                    print(f"{Colors.FAIL}文件 {file_path} 处理异常: {scheduler.errors[file_path]}{Colors.ENDC}")
                 print(f"{Colors.FAIL}文件 {file_path} 处理失败，退出运行{Colors.ENDC}")
-                return
+            return
         
         # 所有文件处理完毕，统一更新ibc文件的MD5值到统一的verify文件
         print(f"  {Colors.OKBLUE}开始更新ibc文件校验码...{Colors.ENDC}")
-        ibc_data_store = get_ibc_data_store()
         ibc_data_store.batch_update_ibc_verify_codes(
             self.work_data_dir_path,
             self.work_ibc_dir_path,
@@ -164,6 +195,7 @@ class CmdHandlerIbcGen(BaseCmdHandler):
         self.proj_root_dict = final_dir_json_dict['proj_root_dict']
         self.proj_root_dict_json_str = json.dumps(self.proj_root_dict, indent=2, ensure_ascii=False)
         self.dependent_relation = dependent_relation
+        self.dependency_graph = DependencyGraph(dependent_relation)
         self.file_creation_order_list = file_creation_order_list
         self.user_requirements_str = user_requirements_str
         self.work_staging_dir_path = work_staging_dir_path
@@ -184,82 +216,27 @@ class CmdHandlerIbcGen(BaseCmdHandler):
         根据以下逻辑标记文件是否需要更新：
         1. 检查one_file_req的MD5值变化
         2. 检查ibc文件是否存在
-        3. 检查依赖链中的变化（依赖传播）
+        3. 检查依赖链中的变化（依赖传播，ibc文件被手动修改时同样传播给依赖它的文件）
         
         Returns:
             Dict[str, bool]: 文件路径到是否需要更新的映射
         """
         print(f"  {Colors.OKBLUE}开始检查文件更新状态...{Colors.ENDC}")
-        need_update_flag_dict = {}
-
         file_list = self.file_creation_order_list
         
-        # 第一阶段：检查one_file_req的MD5和ibc文件存在性
-        for file_path in file_list:
-            need_update = False
-            
-            req_file = os.path.join(self.work_staging_dir_path, f"{file_path}_one_file_req.txt")
-            ibc_data_store = get_ibc_data_store()
-            ibc_path = ibc_data_store.build_ibc_path(self.work_ibc_dir_path, file_path)
-            
-            # 读取one_file_req的当前MD5
-            try:
-                with open(req_file, 'r', encoding='utf-8') as f:
-                    req_content = f.read()
-                current_req_md5 = IbcFuncs.calculate_text_md5(req_content)
-            except Exception as e:
-                print(f"    {Colors.WARNING}警告: 读取one_file_req文件失败: {file_path}, {e}{Colors.ENDC}")
-                need_update = True
-                need_update_flag_dict[file_path] = need_update
-                continue
-            
-            # 从统一的verify文件中加载该文件的校验数据
-            ibc_data_store = get_ibc_data_store()
-            verify_data = ibc_data_store.load_file_verify_data(self.work_data_dir_path, file_path)
-            
-            # 检查one_file_req的MD5是否变化
-            saved_req_md5 = verify_data.get('one_file_req_verify_code', None)
-            if saved_req_md5 is None:
-                print(f"    {Colors.OKBLUE}首次生成: {file_path}{Colors.ENDC}")
-                need_update = True
-            elif saved_req_md5 != current_req_md5:
-                print(f"    {Colors.OKBLUE}one_file_req已变化: {file_path}{Colors.ENDC}")
-                need_update = True
-            
-            # 检查ibc文件是否存在
-            if not need_update and not os.path.exists(ibc_path):
-                print(f"    {Colors.OKBLUE}ibc文件不存在，需要生成: {file_path}{Colors.ENDC}")
-                need_update = True
-            
-            need_update_flag_dict[file_path] = need_update
-            
-            # 注意: one_file_req的MD5更新移到了文件生成成功后(_create_single_ibc_file)
-            # 只有生成成功并验证通过后才更新,避免失败文件被跳过的问题
-        
-        # 第二阶段：依赖链传播更新
-        # 按依赖顺序遍历（file_list已经是拓扑排序后的顺序）
-        for file_path in file_list:
-            if need_update_flag_dict.get(file_path, False):
-                # 如果当前文件已标记需要更新，则所有依赖它的文件也需要更新
-                self._propagate_update_to_dependents(file_path, need_update_flag_dict)
-            else:
-                # 检查ibc文件的MD5是否变化（用户可能手动修改了）
-                ibc_data_store = get_ibc_data_store()
-                ibc_path = ibc_data_store.build_ibc_path(self.work_ibc_dir_path, file_path)
-                
-                if os.path.exists(ibc_path):
-                    try:
-                        ibc_content = ibc_data_store.load_ibc_content(ibc_path)
-                        if ibc_content:
-                            current_ibc_md5 = IbcFuncs.calculate_text_md5(ibc_content)
-                            
-                            verify_data = ibc_data_store.load_file_verify_data(self.work_data_dir_path, file_path)
-                            saved_ibc_md5 = verify_data.get('ibc_verify_code', None)
-                        if saved_ibc_md5 is not None and saved_ibc_md5 != current_ibc_md5:
-                            print(f"    {Colors.OKBLUE}ibc文件被手动修改: {file_path}，依赖它的文件需要更新{Colors.ENDC}")
-                            self._propagate_update_to_dependents(file_path, need_update_flag_dict)
-                    except Exception as e:
-                        print(f"    {Colors.WARNING}警告: 检查ibc文件MD5失败: {file_path}, {e}{Colors.ENDC}")
+        # 统一的verify文件只加载一次，供所有文件的检查使用
+        ibc_data_store = get_ibc_data_store()
+        all_verify_data = ibc_data_store.load_all_verify_data(self.work_data_dir_path)
+        
+        engine = UpdateInvalidationEngine(self.dependency_graph, file_list)
+        need_update_flag_dict = engine.evaluate(
+            check_file=lambda file_path: self._check_file_update_reason(
+                file_path, all_verify_data.get(file_path, {})),
+            check_manual_change=lambda file_path: self._check_ibc_manual_change(
+                file_path, all_verify_data.get(file_path, {})),
+        )
+        for update_reason in engine.get_propagated_updates():
+            print(f"    {Colors.OKBLUE}依赖传播: {update_reason.file_path} 需要更新（因为依赖 {update_reason.caused_by}）{Colors.ENDC}")
         
         # 打印更新状态摘要
         update_count = sum(1 for v in need_update_flag_dict.values() if v)
@@ -267,21 +244,68 @@ class CmdHandlerIbcGen(BaseCmdHandler):
         
         return need_update_flag_dict
     
-    def _propagate_update_to_dependents(self, file_path: str, need_update_flag_dict: Dict[str, bool]):
-        """将更新标记传播到所有依赖当前文件的文件
+    def _check_file_update_reason(self, file_path: str, verify_data: Dict[str, str]) -> Optional[str]:
+        """检查one_file_req的MD5和ibc文件存在性，返回需要更新的原因，无需更新时返回None
         
-        Args:
-            file_path: 被依赖的文件路径
-            need_update_flag_dict: 更新标记字典
+        注意: one_file_req的MD5更新在文件生成成功后进行(_create_single_ibc_file)，
+        只有生成成功并验证通过后才更新，避免失败文件被跳过的问题
         """
-        # 遍历所有文件，找出依赖当前文件的文件
-        for potential_dependent, dependencies in self.dependent_relation.items():
-            if file_path in dependencies:
-                if not need_update_flag_dict.get(potential_dependent, False):
-                    print(f"    {Colors.OKBLUE}依赖传播: {potential_dependent} 需要更新（因为依赖 {file_path}）{Colors.ENDC}")
-                    need_update_flag_dict[potential_dependent] = True
-                    # 递归传播
-                    self._propagate_update_to_dependents(potential_dependent, need_update_flag_dict)
+        req_file = os.path.join(self.work_staging_dir_path, f"{file_path}_one_file_req.txt")
+        
+        # 读取one_file_req的当前MD5
+        try:
+            with open(req_file, 'r', encoding='utf-8') as f:
+                req_content = f.read()
+            current_req_md5 = IbcFuncs.calculate_text_md5(req_content)
+        except Exception as e:
+            print(f"    {Colors.WARNING}警告: 读取one_file_req文件失败: {file_path}, {e}{Colors.ENDC}")
+            return "读取one_file_req文件失败"
+        
+        # 检查one_file_req的MD5是否变化
+        saved_req_md5 = verify_data.get('one_file_req_verify_code', None)
+        if saved_req_md5 is None:
+            print(f"    {Colors.OKBLUE}首次生成: {file_path}{Colors.ENDC}")
+            return "首次生成"
+        if saved_req_md5 != current_req_md5:
+            print(f"    {Colors.OKBLUE}one_file_req已变化: {file_path}{Colors.ENDC}")
+            return "one_file_req已变化"
+        
+        # 检查ibc文件是否存在
+        ibc_data_store = get_ibc_data_store()
+        ibc_path = ibc_data_store.build_ibc_path(self.work_ibc_dir_path, file_path)
+        if not os.path.exists(ibc_path):
+            print(f"    {Colors.OKBLUE}ibc文件不存在，需要生成: {file_path}{Colors.ENDC}")
+            return "ibc文件不存在"
+        
+        return None
+    
+    def _check_ibc_manual_change(self, file_path: str, verify_data: Dict[str, str]) -> Optional[str]:
+        """检查ibc文件的MD5是否变化（用户可能手动修改了），被修改时返回原因，否则返回None"""
+        ibc_data_store = get_ibc_data_store()
+        ibc_path = ibc_data_store.build_ibc_path(self.work_ibc_dir_path, file_path)
+        if not os.path.exists(ibc_path):
+            return None
+        
+        try:
+            ibc_content = ibc_data_store.load_ibc_content(ibc_path)
+            if not ibc_content:
+                return None
+            current_ibc_md5 = IbcFuncs.calculate_text_md5(ibc_content)
+        except Exception as e:
+            print(f"    {Colors.WARNING}警告: 检查ibc文件MD5失败: {file_path}, {e}{Colors.ENDC}")
+            return None
+        
+        saved_ibc_md5 = verify_data.get('ibc_verify_code', None)
+        if saved_ibc_md5 is not None and saved_ibc_md5 != current_ibc_md5:
+            print(f"    {Colors.OKBLUE}ibc文件被手动修改: {file_path}，依赖它的文件需要更新{Colors.ENDC}")
+            return "ibc文件被手动修改"
+        return None
+    
+    def _new_file_worker(self) -> 'CmdHandlerIbcGen':
+        """创建处理单个文件的处理器副本，共享执行前准备的变量，单文件的生成状态相互独立"""
+        worker = copy.copy(self)
+        worker.ibc_issue_recorder = IbcIssueRecorder()
+        return worker
     
     def _create_single_ibc_file(self, icp_json_file_path: str) -> bool:
         """为单个文件生成IBC代码（包含重试机制）
@@ -317,6 +341,9 @@ class CmdHandlerIbcGen(BaseCmdHandler):
         symbols_tree = {}
         symbols_metadata = {}
 
+        # 修复重试通常只改动少量行，使用增量分析器避免每次完整重新分析
+        ibc_analyzer = IbcIncrementalAnalyzer()
+
         for attempt in range(max_attempts):
             print(f"    {Colors.OKBLUE}正在进行第 {attempt + 1}/{max_attempts} 次尝试...{Colors.ENDC}")
 
@@ -336,11 +363,12 @@ class CmdHandlerIbcGen(BaseCmdHandler):
                 self._save_user_prompt_to_stage(icp_json_file_path, current_user_prompt, attempt + 1)
 
                 # 调用AI生成IBC代码
-                response_content, success = asyncio.run(self.chat_handler.get_role_response(
+                response_content, success = self.chat_handler.get_role_response_sync(
                     role_name=self.role_name,
                     sys_prompt=current_sys_prompt,
-                    user_prompt=current_user_prompt
-                ))
+                    user_prompt=current_user_prompt,
+                    validator_factory=lambda: IbcStreamValidator(self.ibc_stream_max_errors)
+                )
 
                 if not success or not response_content:
                     print(f"    {Colors.WARNING}警告: AI响应失败或为空{Colors.ENDC}")
@@ -350,8 +378,12 @@ class CmdHandlerIbcGen(BaseCmdHandler):
                 ibc_content = ChatResponseCleaner.clean_code_block_markers(response_content)
 
                 # 解析IBC代码生成AST
+                # 每次分析前清空issue recorder；启用错误恢复，一次收集全部语法错误供后续修复
                 print(f"    {Colors.OKBLUE}正在分析IBC代码生成AST...{Colors.ENDC}")
-                ast_dict, symbols_tree, symbols_metadata = analyze_ibc_content(ibc_content, self.ibc_issue_recorder)
+                self.ibc_issue_recorder.clear()
+                ast_dict, symbols_tree, symbols_metadata = ibc_analyzer.analyze(
+                    ibc_content, self.ibc_issue_recorder, recover_errors=True
+                )
 
                 # 验证是否得到有效的AST和符号数据（包括符号引用验证）
                 is_valid = self._validate_ibc_response(
@@ -361,6 +393,7 @@ class CmdHandlerIbcGen(BaseCmdHandler):
                     symbols_metadata=symbols_metadata
                 )
                 if is_valid:
+                    self.chat_handler.accept_response(current_sys_prompt, current_user_prompt, response_content)
                     break
 
                 # 如果验证失败，保存当前生成的内容，供后续诊断和修复使用
@@ -392,15 +425,16 @@ class CmdHandlerIbcGen(BaseCmdHandler):
                     analysis_mapping
                 )
 
-                fix_suggestion_raw, success = asyncio.run(self.chat_handler.get_role_response(
+                fix_suggestion_raw, success = self.chat_handler.get_role_response_sync(
                     role_name=self.role_name,
                     sys_prompt=analysis_sys_prompt,
                     user_prompt=analysis_user_prompt,
-                ))
+                )
 
                 if not success or not fix_suggestion_raw:
                     print(f"    {Colors.WARNING}警告: 生成修复建议失败，将进行下一次尝试{Colors.ENDC}")
                     continue
+                self.chat_handler.accept_response(analysis_sys_prompt, analysis_user_prompt, fix_suggestion_raw)
 
                 fix_suggestion = ChatResponseCleaner.clean_code_block_markers(fix_suggestion_raw)
 
@@ -417,11 +451,12 @@ class CmdHandlerIbcGen(BaseCmdHandler):
                 self._save_user_prompt_to_stage(icp_json_file_path, current_user_prompt, attempt + 1)
 
                 # 调用AI生成修复后的IBC代码
-                response_content, success = asyncio.run(self.chat_handler.get_role_response(
+                response_content, success = self.chat_handler.get_role_response_sync(
                     role_name=self.role_name,
                     sys_prompt=current_sys_prompt,
-                    user_prompt=current_user_prompt
-                ))
+                    user_prompt=current_user_prompt,
+                    validator_factory=lambda: IbcStreamValidator(self.ibc_stream_max_errors)
+                )
 
                 if not success or not response_content:
                     print(f"    {Colors.WARNING}警告: 修复阶段AI响应失败或为空{Colors.ENDC}")
@@ -435,8 +470,12 @@ class CmdHandlerIbcGen(BaseCmdHandler):
                 ibc_content = ChatResponseCleaner.clean_code_block_markers(response_content)
 
                 # 解析IBC代码生成AST
+                # 每次分析前清空issue recorder；启用错误恢复，一次收集全部语法错误供后续修复
                 print(f"    {Colors.OKBLUE}正在分析修复后的IBC代码生成AST...{Colors.ENDC}")
-                ast_dict, symbols_tree, symbols_metadata = analyze_ibc_content(ibc_content, self.ibc_issue_recorder)
+                self.ibc_issue_recorder.clear()
+                ast_dict, symbols_tree, symbols_metadata = ibc_analyzer.analyze(
+                    ibc_content, self.ibc_issue_recorder, recover_errors=True
+                )
 
                 # 再次验证修复后的响应内容
                 is_valid = self._validate_ibc_response(
@@ -446,6 +485,7 @@ class CmdHandlerIbcGen(BaseCmdHandler):
                     symbols_metadata=symbols_metadata
                 )
                 if is_valid:
+                    self.chat_handler.accept_response(current_sys_prompt, current_user_prompt, response_content)
                     break
 
                 # 如果依然验证失败，保存当前生成的内容，供下一轮重试使用
@@ -767,8 +807,8 @@ class CmdHandlerIbcGen(BaseCmdHandler):
         Returns:
             bool: 是否有效
         """
-        # 每次分析前清空issue recorder
-        self.ibc_issue_recorder.clear()
+        # issue recorder 在分析前已清空，其中可能已有错误恢复模式记录的语法错误，这里不再清空，
+        # 在部分AST上继续做符号引用验证，使所有问题能在同一轮修复中一并给出
 
         # 检查AST是否有效
         if not ast_dict:
@@ -852,7 +892,8 @@ class CmdHandlerIbcGen(BaseCmdHandler):
             proj_root_dict=self.proj_root_dict,
             dependent_relation=self.dependent_relation,
             current_file_path=current_file_path,
-            external_library_dependencies=self.external_library_dependencies
+            external_library_dependencies=self.external_library_dependencies,
+            dependency_graph=self.dependency_graph
         )
         ref_resolver.resolve_all_references()
     
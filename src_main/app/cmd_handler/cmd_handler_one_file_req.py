@@ -1,4 +1,4 @@
-import asyncio
+import copy
 import json
 import os
 import sys
@@ -9,7 +9,9 @@ from data_store.sys_prompt_manager import \
 from data_store.user_data_store import get_instance as get_user_data_store
 from data_store.user_prompt_manager import \
     get_instance as get_user_prompt_manager
+from libs.dependency_graph import DependencyGraph
 from libs.dir_json_funcs import DirJsonFuncs
+from libs.file_task_scheduler import FileTaskScheduler
 from libs.text_funcs import ChatResponseCleaner
 from run_time_cfg.proj_run_time_cfg import \
     get_instance as get_proj_run_time_cfg
@@ -76,12 +78,20 @@ class CmdHandlerOneFileReq(BaseCmdHandler):
             print(f"  {Colors.FAIL}错误: 创建src_staging目录失败: {e}{Colors.ENDC}")
             return
 
-        # 按文件生成顺序遍历并生成后续文件
-        for icp_json_file_path in self.file_creation_order_list:
-            success = self._create_single_one_file_req(icp_json_file_path)
-            if not success:
-                print(f"{Colors.FAIL}单文件需求描述生成失败，终止执行{Colors.ENDC}")
-                return
+        # 按依赖关系调度生成各文件，依赖的文件生成完毕后即可开始，相互独立的文件并行生成
+        scheduler = FileTaskScheduler(
+            DependencyGraph(self.dependent_relation_dict),
+            self.file_creation_order_list,
+            max_workers=get_proj_run_time_cfg().get_max_concurrent_requests('coder_handler')
+        )
+        if scheduler.max_workers > 1:
+            print(f"  {Colors.OKBLUE}并行生成，最多同时处理 {scheduler.max_workers} 个文件{Colors.ENDC}")
+        if not scheduler.run(lambda file_path: self._new_file_worker()._create_single_one_file_req(file_path)):
+            for file_path in scheduler.failed_files:
+                if file_path in scheduler.errors:
+                    print(f"{Colors.FAIL}文件 {file_path} 处理异常: {scheduler.errors[file_path]}{Colors.ENDC}")
+            print(f"{Colors.FAIL}单文件需求描述生成失败，终止执行{Colors.ENDC}")
+            return
 
         print(f"{Colors.OKGREEN}IBC目录结构创建命令执行完毕!{Colors.ENDC}")
 
@@ -168,6 +178,12 @@ class CmdHandlerOneFileReq(BaseCmdHandler):
 
         return
 
+    def _new_file_worker(self) -> 'CmdHandlerOneFileReq':
+        """创建处理单个文件的处理器副本，共享执行前准备的变量及已生成的需求描述，单文件的生成状态相互独立"""
+        worker = copy.copy(self)
+        worker.issue_recorder = TextIssueRecorder()
+        return worker
+
     def _create_single_one_file_req(self, icp_json_file_path: str) -> bool:
         """为当前选中路径生成单文件需求描述并保存"""
         # 重置单个文件的生成状态
@@ -202,11 +218,11 @@ class CmdHandlerOneFileReq(BaseCmdHandler):
                 current_user_prompt = self.user_prompt_base + "\n\n" + self.user_prompt_retry_part
             
             # 调用AI生成单文件需求描述
-            response_content, success = asyncio.run(self.chat_handler.get_role_response(
+            response_content, success = self.chat_handler.get_role_response_sync(
                 role_name=self.role_name,
                 sys_prompt=current_sys_prompt,
                 user_prompt=current_user_prompt
-            ))
+            )
             
             # 如果响应失败，继续下一次尝试
             if not success:
@@ -214,15 +230,17 @@ class CmdHandlerOneFileReq(BaseCmdHandler):
                 continue
             
             # 移除可能的代码块标记
-            response_content = ChatResponseCleaner.clean_code_block_markers(response_content)
+            cleaned_content = ChatResponseCleaner.clean_code_block_markers(response_content)
             
             # 验证响应内容
-            is_valid = self._validate_response(response_content)
+            is_valid = self._validate_response(cleaned_content)
             if is_valid:
+                self.chat_handler.accept_response(current_sys_prompt, current_user_prompt, response_content)
+                response_content = cleaned_content
                 break
             
             # 如果验证失败，保存当前生成的内容并构建重试提示词
-            self.last_generated_content = response_content
+            self.last_generated_content = cleaned_content
             self.user_prompt_retry_part = self._build_user_prompt_retry_part()
         
         # 循环已跳出，检查运行结果并进行相应操作
@@ -274,10 +292,14 @@ class CmdHandlerOneFileReq(BaseCmdHandler):
             return ""
         accumulated_related_desc = []
         
-        for _file_path, file_str in self.accumulated_file_str_list:
+        # 按文件创建顺序而非生成完成顺序排列：并行生成时完成顺序每次运行都可能不同，
+        # 按完成顺序排列会使相同输入得到不同的提示词
+        accumulated_file_str_dict = dict(self.accumulated_file_str_list)
+        for _file_path in self.file_creation_order_list:
             # 只包含当前文件依赖的文件
-            if _file_path not in current_file_dependencies:
+            if _file_path not in current_file_dependencies or _file_path not in accumulated_file_str_dict:
                 continue
+            file_str = accumulated_file_str_dict[_file_path]
                 
             extracted_desc = self._extract_section_content(file_str, 'description')
             extracted_func = self._extract_section_content(file_str, 'function')
@@ -1,4 +1,3 @@
-import asyncio
 import json
 import os
 import sys
@@ -78,11 +77,11 @@ class CmdHandlerParaExtract(BaseCmdHandler):
                 )
                 current_user_prompt = requirement_content + "\n\n" + retry_hint
 
-            response_content, success = asyncio.run(self.chat_handler.get_role_response(
+            response_content, success = self.chat_handler.get_role_response_sync(
                 role_name=self.role_name,
                 sys_prompt=base_sys_prompt,
                 user_prompt=current_user_prompt
-            ))
+            )
 
             if not success:
                 print(f"{Colors.WARNING}警告: AI响应失败，将进行下一次尝试{Colors.ENDC}")
@@ -98,6 +97,7 @@ class CmdHandlerParaExtract(BaseCmdHandler):
             # 验证响应内容
             is_valid, error_msg = self._validate_response(cleaned)
             if is_valid:
+                self.chat_handler.accept_response(base_sys_prompt, current_user_prompt, response_content)
                 cleaned_content = cleaned
                 break
 
@@ -1,4 +1,3 @@
-import asyncio
 import json
 import os
 import sys
@@ -9,6 +8,7 @@ from data_store.sys_prompt_manager import \
 from data_store.user_data_store import get_instance as get_user_data_store
 from data_store.user_prompt_manager import \
     get_instance as get_user_prompt_manager
+from libs.stream_validator import JsonPrefixValidator
 from libs.text_funcs import ChatResponseCleaner
 from run_time_cfg.proj_run_time_cfg import \
     get_instance as get_proj_run_time_cfg
@@ -91,11 +91,12 @@ class CmdHandlerReqAnalysis(BaseCmdHandler):
                     current_sys_prompt = base_sys_prompt
                 current_user_prompt = self.user_prompt_base + "\n\n" + self.user_prompt_retry_part
             
-            response_content, success = asyncio.run(self.chat_handler.get_role_response(
+            response_content, success = self.chat_handler.get_role_response_sync(
                 role_name=self.role_name,
                 sys_prompt=current_sys_prompt,
-                user_prompt=current_user_prompt
-            ))
+                user_prompt=current_user_prompt,
+                validator_factory=JsonPrefixValidator
+            )
             
             # 如果响应失败，继续下一次尝试
             if not success:
@@ -108,6 +109,7 @@ class CmdHandlerReqAnalysis(BaseCmdHandler):
             # 验证响应内容
             is_valid = self._validate_response(cleaned_content)
             if is_valid:
+                self.chat_handler.accept_response(current_sys_prompt, current_user_prompt, response_content)
                 break
             
             # 如果验证失败，保存当前生成的内容并构建重试提示词
@@ -1,16 +1,21 @@
-import asyncio
+import copy
 import json
 import os
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from data_store.ibc_data_store import get_instance as get_ibc_data_store
+from data_store.symbol_table_manager import (STORAGE_MODE_DIRECTORY,
+                                             STORAGE_MODE_SHARDED)
 from data_store.sys_prompt_manager import \
     get_instance as get_sys_prompt_manager
 from data_store.user_prompt_manager import \
     get_instance as get_user_prompt_manager
+from libs.dependency_graph import DependencyGraph
 from libs.dir_json_funcs import DirJsonFuncs
+from libs.file_task_scheduler import FileTaskScheduler
 from libs.ibc_funcs import IbcFuncs
 from libs.text_funcs import ChatResponseCleaner
+from libs.update_invalidation import UpdateInvalidationEngine
 from run_time_cfg.proj_run_time_cfg import \
     get_instance as get_proj_run_time_cfg
 from typedef.cmd_data_types import CmdProcStatus, Colors, CommandInfo
@@ -68,11 +73,36 @@ class CmdHandlerSymbolNormalize(BaseCmdHandler):
         
         print(f"{Colors.OKBLUE}开始符号规范化...{Colors.ENDC}")
         self._build_pre_execution_variables()
-        for file_path in self.file_creation_order_list:
-            success = self._normalize_single_file_symbols(file_path)
-            if not success:
+        
+        # 按依赖关系调度处理每个文件，相互独立的文件并行规范化
+        scheduler = FileTaskScheduler(
+            self.dependency_graph,
+            self.file_creation_order_list,
+            max_workers=get_proj_run_time_cfg().get_max_concurrent_requests('coder_handler')
+        )
+        ibc_data_store = get_ibc_data_store()
+        is_parallel = scheduler.max_workers > 1
+        if is_parallel:
+            # 并行时同一目录下的文件可能同时保存符号表，改为分片写入，结束后再合并回symbols.json
+            print(f"  {Colors.OKBLUE}并行规范化，最多同时处理 {scheduler.max_workers} 个文件{Colors.ENDC}")
+            ibc_data_store.set_symbols_storage_mode(STORAGE_MODE_SHARDED)
+        try:
+            success = scheduler.run(lambda file_path: self._new_file_worker()._normalize_single_file_symbols(file_path))
+        finally:
+            if is_parallel:
+                ibc_data_store.set_symbols_storage_mode(STORAGE_MODE_DIRECTORY)
+                symbols_paths = {
+                    ibc_data_store.build_symbols_path(self.work_ibc_dir_path, file_path)
+                    for file_path in self.file_creation_order_list
+                }
+                for symbols_path in symbols_paths:
+                    ibc_data_store.compact_symbols(symbols_path)
+        if not success:
+            for file_path in scheduler.failed_files:
+                if file_path in scheduler.errors:
+                    print(f"{Colors.FAIL}文件 {file_path} 处理异常: {scheduler.errors[file_path]}{Colors.ENDC}")
                 print(f"{Colors.FAIL}文件 {file_path} 符号规范化失败，退出运行{Colors.ENDC}")
-                return
+            return
         
         print(f"{Colors.OKGREEN}符号规范化命令执行完毕!{Colors.ENDC}")
     
@@ -124,11 +154,12 @@ class CmdHandlerSymbolNormalize(BaseCmdHandler):
         print(f"  {Colors.OKBLUE}正在加载待规范化符号...{Colors.ENDC}")
         self.symbols_to_normalize_dict = {}
         ibc_data_store = get_ibc_data_store()
+        all_verify_data = ibc_data_store.load_all_verify_data(self.work_data_dir_path)
         
         for file_path in file_creation_order_list:
             # 先从 verify_data 快速检查符号数量
             # 利用 IBC 生成阶段保存的 symbols_count 信息进行快速过滤
-            verify_data = ibc_data_store.load_file_verify_data(self.work_data_dir_path, file_path)
+            verify_data = all_verify_data.get(file_path, {})
             symbols_count_str = verify_data.get('symbols_count', None)
             
             # 如果符号数量为 0，直接跳过（无需规范化）
@@ -161,6 +192,7 @@ class CmdHandlerSymbolNormalize(BaseCmdHandler):
 
         # 存储实例变量供后续使用
         self.dependent_relation = dependent_relation
+        self.dependency_graph = DependencyGraph(dependent_relation)
         self.file_creation_order_list = file_creation_order_list
         self.work_ibc_dir_path = work_ibc_dir_path
         
@@ -176,92 +208,27 @@ class CmdHandlerSymbolNormalize(BaseCmdHandler):
         1. 检查是否有待规范化的符号（最高优先级）
         2. 检查IBC文件的MD5值变化
         3. 检查符号元数据的MD5值变化
-        4. 检查依赖链中的变化（依赖传播）
+        4. 检查依赖链中的变化（依赖传播，规范化结果被手动修改时同样传播给依赖它的文件）
         
         Returns:
             Dict[str, bool]: 文件路径到是否需要更新的映射
         """
         print(f"  {Colors.OKBLUE}开始检查文件更新状态...{Colors.ENDC}")
-        need_update_flag_dict = {}
-
         file_list = self.file_creation_order_list
-        ibc_data_store = get_ibc_data_store()
         
-        # 第一阶段：检查待规范化符号、IBC文件和符号元数据的MD5
-        for file_path in file_list:
-            need_update = False
-            
-            # 优先检查：是否有待规范化的符号
-            if file_path in self.symbols_to_normalize_dict:
-                print(f"    {Colors.OKBLUE}有待规范化符号: {file_path} (共 {len(self.symbols_to_normalize_dict[file_path])} 个){Colors.ENDC}")
-                need_update = True
-                need_update_flag_dict[file_path] = need_update
-                continue
-            
-            # 从 verify_data 加载校验数据
-            verify_data = ibc_data_store.load_file_verify_data(self.work_data_dir_path, file_path)
-            
-            # 检查符号数量，如果为 0 则无需规范化
-            symbols_count_str = verify_data.get('symbols_count', None)
-            if symbols_count_str is not None:
-                try:
-                    symbols_count = int(symbols_count_str)
-                    if symbols_count == 0:
-                        need_update_flag_dict[file_path] = False
-                        continue
-                except ValueError:
-                    pass  # 继续正常检查
-            
-            # 检查IBC文件的MD5是否变化
-            ibc_path = ibc_data_store.build_ibc_path(self.work_ibc_dir_path, file_path)
-            if os.path.exists(ibc_path):
-                try:
-                    current_ibc_md5 = IbcFuncs.calculate_text_md5(ibc_data_store.load_ibc_content(ibc_path) or "")
-                    saved_ibc_md5 = verify_data.get('ibc_verify_code', None)
-                    
-                    if saved_ibc_md5 is not None and saved_ibc_md5 != current_ibc_md5:
-                        print(f"    {Colors.OKBLUE}IBC文件已变化: {file_path}{Colors.ENDC}")
-                        need_update = True
-                except Exception as e:
-                    print(f"    {Colors.WARNING}警告: 检查IBC文件MD5失败: {file_path}, {e}{Colors.ENDC}")
-            
-            # 检查符号元数据的MD5是否变化（如果IBC未变化）
-            if not need_update:
-                symbols_path = ibc_data_store.build_symbols_path(self.work_ibc_dir_path, file_path)
-                if os.path.exists(symbols_path):
-                    file_name = os.path.basename(file_path)
-                    symbols_tree, symbols_metadata = ibc_data_store.load_symbols(symbols_path, file_name)
-                    
-                    if symbols_metadata:
-                        current_symbols_md5 = IbcFuncs.calculate_symbols_metadata_md5(symbols_metadata)
-                        saved_symbols_md5 = verify_data.get('symbols_metadata_md5', None)
-                        
-                        if saved_symbols_md5 is not None and saved_symbols_md5 != current_symbols_md5:
-                            print(f"    {Colors.OKBLUE}符号元数据已变化: {file_path}{Colors.ENDC}")
-                            need_update = True
-            
-            need_update_flag_dict[file_path] = need_update
-        
-        # 第二阶段：依赖链传播更新
-        # 按依赖顺序遍历（file_list已经是拓扑排序后的顺序）
-        for file_path in file_list:
-            if need_update_flag_dict.get(file_path, False):
-                # 如果当前文件已标记需要更新，则所有依赖它的文件也需要更新
-                self._propagate_update_to_dependents(file_path, need_update_flag_dict)
-            else:
-                # 检查规范化后符号元数据的MD5是否变化（用户可能手动修改了符号表）
-                symbols_path = ibc_data_store.build_symbols_path(self.work_ibc_dir_path, file_path)
-                file_name = os.path.basename(file_path)
-                symbols_tree, symbols_metadata = ibc_data_store.load_symbols(symbols_path, file_name)
-                
-                if symbols_metadata:
-                    current_normalized_md5 = IbcFuncs.calculate_symbols_metadata_md5(symbols_metadata)
-                    verify_data = ibc_data_store.load_file_verify_data(self.work_data_dir_path, file_path)
-                    saved_normalized_md5 = verify_data.get('symbol_normalize_verify_code', None)
-                    
-                    if saved_normalized_md5 is not None and saved_normalized_md5 != current_normalized_md5:
-                        print(f"    {Colors.OKBLUE}规范化结果被手动修改: {file_path}，依赖它的文件需要更新{Colors.ENDC}")
-                        self._propagate_update_to_dependents(file_path, need_update_flag_dict)
+        # 统一的verify文件只加载一次，供所有文件的检查使用
+        ibc_data_store = get_ibc_data_store()
+        all_verify_data = ibc_data_store.load_all_verify_data(self.work_data_dir_path)
+        
+        engine = UpdateInvalidationEngine(self.dependency_graph, file_list)
+        need_update_flag_dict = engine.evaluate(
+            check_file=lambda file_path: self._check_file_update_reason(
+                file_path, all_verify_data.get(file_path, {})),
+            check_manual_change=lambda file_path: self._check_normalize_manual_change(
+                file_path, all_verify_data.get(file_path, {})),
+        )
+        for update_reason in engine.get_propagated_updates():
+            print(f"    {Colors.OKBLUE}依赖传播: {update_reason.file_path} 需要更新（因为依赖 {update_reason.caused_by}）{Colors.ENDC}")
         
         # 打印更新状态摘要
         update_count = sum(1 for v in need_update_flag_dict.values() if v)
@@ -269,21 +236,74 @@ class CmdHandlerSymbolNormalize(BaseCmdHandler):
         
         return need_update_flag_dict
     
-    def _propagate_update_to_dependents(self, file_path: str, need_update_flag_dict: Dict[str, bool]):
-        """将更新标记传播到所有依赖当前文件的文件
+    def _check_file_update_reason(self, file_path: str, verify_data: Dict[str, str]) -> Optional[str]:
+        """检查待规范化符号、IBC文件和符号元数据的MD5，返回需要更新的原因，无需更新时返回None"""
+        # 优先检查：是否有待规范化的符号
+        if file_path in self.symbols_to_normalize_dict:
+            print(f"    {Colors.OKBLUE}有待规范化符号: {file_path} (共 {len(self.symbols_to_normalize_dict[file_path])} 个){Colors.ENDC}")
+            return "有待规范化符号"
+        
+        # 检查符号数量，如果为 0 则无需规范化
+        symbols_count_str = verify_data.get('symbols_count', None)
+        if symbols_count_str is not None:
+            try:
+                if int(symbols_count_str) == 0:
+                    return None
+            except ValueError:
+                pass  # 继续正常检查
         
-        Args:
-            file_path: 被依赖的文件路径
-            need_update_flag_dict: 更新标记字典
-        """
-        # 遍历所有文件，找出依赖当前文件的文件
-        for potential_dependent, dependencies in self.dependent_relation.items():
-            if file_path in dependencies:
-                if not need_update_flag_dict.get(potential_dependent, False):
-                    print(f"    {Colors.OKBLUE}依赖传播: {potential_dependent} 需要更新（因为依赖 {file_path}）{Colors.ENDC}")
-                    need_update_flag_dict[potential_dependent] = True
-                    # 递归传播
-                    self._propagate_update_to_dependents(potential_dependent, need_update_flag_dict)
+        ibc_data_store = get_ibc_data_store()
+        
+        # 检查IBC文件的MD5是否变化
+        ibc_path = ibc_data_store.build_ibc_path(self.work_ibc_dir_path, file_path)
+        if os.path.exists(ibc_path):
+            try:
+                current_ibc_md5 = IbcFuncs.calculate_text_md5(ibc_data_store.load_ibc_content(ibc_path) or "")
+                saved_ibc_md5 = verify_data.get('ibc_verify_code', None)
+                
+                if saved_ibc_md5 is not None and saved_ibc_md5 != current_ibc_md5:
+                    print(f"    {Colors.OKBLUE}IBC文件已变化: {file_path}{Colors.ENDC}")
+                    return "IBC文件已变化"
+            except Exception as e:
+                print(f"    {Colors.WARNING}警告: 检查IBC文件MD5失败: {file_path}, {e}{Colors.ENDC}")
+        
+        # 检查符号元数据的MD5是否变化（如果IBC未变化）
+        symbols_path = ibc_data_store.build_symbols_path(self.work_ibc_dir_path, file_path)
+        if os.path.exists(symbols_path):
+            file_name = os.path.basename(file_path)
+            symbols_tree, symbols_metadata = ibc_data_store.load_symbols(symbols_path, file_name)
+            
+            if symbols_metadata:
+                current_symbols_md5 = IbcFuncs.calculate_symbols_metadata_md5(symbols_metadata)
+                saved_symbols_md5 = verify_data.get('symbols_metadata_md5', None)
+                
+                if saved_symbols_md5 is not None and saved_symbols_md5 != current_symbols_md5:
+                    print(f"    {Colors.OKBLUE}符号元数据已变化: {file_path}{Colors.ENDC}")
+                    return "符号元数据已变化"
+        
+        return None
+    
+    def _check_normalize_manual_change(self, file_path: str, verify_data: Dict[str, str]) -> Optional[str]:
+        """检查规范化后符号元数据的MD5是否变化（用户可能手动修改了符号表），被修改时返回原因，否则返回None"""
+        ibc_data_store = get_ibc_data_store()
+        symbols_path = ibc_data_store.build_symbols_path(self.work_ibc_dir_path, file_path)
+        file_name = os.path.basename(file_path)
+        symbols_tree, symbols_metadata = ibc_data_store.load_symbols(symbols_path, file_name)
+        if not symbols_metadata:
+            return None
+        
+        current_normalized_md5 = IbcFuncs.calculate_symbols_metadata_md5(symbols_metadata)
+        saved_normalized_md5 = verify_data.get('symbol_normalize_verify_code', None)
+        if saved_normalized_md5 is not None and saved_normalized_md5 != current_normalized_md5:
+            print(f"    {Colors.OKBLUE}规范化结果被手动修改: {file_path}，依赖它的文件需要更新{Colors.ENDC}")
+            return "规范化结果被手动修改"
+        return None
+    
+    def _new_file_worker(self) -> 'CmdHandlerSymbolNormalize':
+        """创建处理单个文件的处理器副本，共享执行前准备的变量，单文件的生成状态相互独立"""
+        worker = copy.copy(self)
+        worker.issue_recorder = TextIssueRecorder()
+        return worker
     
     def _extract_symbols_from_metadata(self, symbols_metadata: Dict[str, SymbolMetadata]) -> Dict[str, SymbolMetadata]:
         """从符号元数据中提取待规范化的符号
@@ -375,11 +395,11 @@ class CmdHandlerSymbolNormalize(BaseCmdHandler):
                 current_user_prompt = self.user_prompt_base + "\n\n" + self.user_prompt_retry_part
             
             # 调用AI进行符号规范化
-            response_content, success = asyncio.run(self.chat_handler.get_role_response(
+            response_content, success = self.chat_handler.get_role_response_sync(
                 role_name=self.role_name,
                 sys_prompt=current_sys_prompt,
                 user_prompt=current_user_prompt
-            ))
+            )
             
             if not success or not response_content:
                 print(f"    {Colors.WARNING}警告: AI响应失败或为空{Colors.ENDC}")
@@ -392,6 +412,7 @@ class CmdHandlerSymbolNormalize(BaseCmdHandler):
             
             if is_valid:
                 # 验证通过，保存规范化结果
+                self.chat_handler.accept_response(current_sys_prompt, current_user_prompt, response_content)
                 self._save_normalized_symbols(icp_json_file_path, cleaned_response, symbols_to_normalize)
                 break
             
@@ -5,6 +5,7 @@ from .cmd_handler_code_gen import CmdHandlerCodeGen
 from .cmd_handler_depend_analysis import CmdHandlerDependAnalysis
 from .cmd_handler_dir_file_fill import CmdHandlerDirFileFill
 from .cmd_handler_help import CmdHandlerHelp
+from .cmd_handler_ibc_check import CmdHandlerIbcCheck
 from .cmd_handler_ibc_gen import CmdHandlerIbcGen
 from .cmd_handler_module_to_dir import CmdHandlerModuleToDir
 from .cmd_handler_one_file_req import CmdHandlerOneFileReq
@@ -94,6 +95,10 @@ class CommandManager:
         intent_behavior_code_gen_cmd = CmdHandlerIbcGen()
         commands.append(intent_behavior_code_gen_cmd)
 
+        # IBC代码批量校验命令
+        ibc_check_cmd = CmdHandlerIbcCheck()
+        commands.append(ibc_check_cmd)
+
         # 符号规范化命令
         symbol_normalize_cmd = CmdHandlerSymbolNormalize()
         commands.append(symbol_normalize_cmd)
@@ -1,7 +1,6 @@
 # 未来新cmd_handler可能会考虑采用的结构，目前完全由ai自动生成，我需要进一步进行深入的review来考虑如何将旧cmd_handler进行迁移。
 # 目前来说旧版本的cmd_handler为了保持基本的可用性仍然不会进行改动
 
-import asyncio
 from typing import List
 
 from app.cmd_handler.base_cmd_handler import BaseCmdHandler
@@ -15,6 +14,7 @@ from flow.flow_context import FlowContext
 from flow.flow_engine import FlowEngine
 from flow.ibc_flow import IBCGenState, IBCSaveState, IBCValidateState
 from typedef.cmd_data_types import Colors
+from utils.icp_ai_utils.async_runtime import get_async_runtime
 
 
 class DemoFlowHandler(BaseCmdHandler):
@@ -29,7 +29,8 @@ class DemoFlowHandler(BaseCmdHandler):
     def execute(self):
         """Entry point for the command."""
         print(f"{Colors.HEADER}Starting Experimental Flow Engine (Refactored)...{Colors.ENDC}")
-        asyncio.run(self._run_async())
+        # 在应用级异步运行时中执行，与其他命令共享模型服务客户端
+        get_async_runtime().run(self._run_async())
 
     async def _run_async(self):
         # 1. Initialize Stores
@@ -13,10 +13,14 @@ from data_store.sys_prompt_manager import \
     get_instance as get_sys_prompt_manager
 from data_store.user_prompt_manager import \
     get_instance as get_user_prompt_manager
+from libs.llm_response_cache import \
+    get_instance as get_llm_response_cache
 from run_time_cfg.proj_run_time_cfg import \
     get_instance as get_proj_run_time_cfg
 from typedef.ai_data_types import ChatApiConfig
 from typedef.cmd_data_types import Colors
+from utils.ibc_analyzer.ibc_analysis_cache import \
+    get_instance as get_ibc_analysis_cache
 from utils.icp_ai_utils.icp_chat_inst import ICPChatInsts
 
 from .cmd_handler.base_cmd_handler import BaseCmdHandler
@@ -91,6 +95,12 @@ class IcpCmdCli:
         # 注册信号处理器
         signal.signal(signal.SIGINT, signal_handler)
         
+        # 开启IBC分析缓存，重复执行命令时未变化的IBC代码无需重新解析
+        work_data_dir_path = os.path.join(self.proj_run_time_cfg.get_work_dir_path(), 'icp_proj_data')
+        get_ibc_analysis_cache().set_cache_dir(os.path.join(work_data_dir_path, 'ibc_analysis_cache'))
+        # 模型响应缓存目录，是否读写缓存由各处理器的 response-cache 配置决定
+        get_llm_response_cache().set_cache_dir(os.path.join(work_data_dir_path, 'llm_response_cache'))
+
         print("欢迎使用 ICP - Intent Code Protocol 命令行工具")
         print("当前工作目录:", self.proj_run_time_cfg.get_work_dir_path())
 
@@ -0,0 +1,406 @@
+"""全局符号索引 - 汇总整个项目的符号元数据，支持按路径、名称、类型、可见性与文件查找"""
+import json
+import os
+import struct
+import threading
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from data_store.symbol_table_manager import (SHARD_DIR_NAME,
+                                             SymbolTableManager)
+from typedef.ibc_data_types import SymbolMetadata, create_symbol_metadata
+
+# 快照文件头：魔数、格式版本
+# 版本2：快照内容由marshal改为UTF-8 JSON
+_MAGIC = b'IBCSYM'
+_FORMAT_VERSION = 2
+_HEADER = struct.Struct('<6sH')
+
+_SNAPSHOT_FILE_NAME = 'symbols_index.bin'
+_SYMBOLS_FILE_NAME = 'symbols.json'
+
+
+@dataclass
+class GlobalSymbolEntry:
+    """全局符号索引中的一条符号记录"""
+    full_path: str  # 项目内的点分完整路径，如 "src.ball.ball_entity.BallEntity.move"
+    file_path: str  # 定义所在文件，如 "src/ball/ball_entity"
+    symbol_path: str  # 文件内部的点分路径，如 "BallEntity.move"
+    name: str  # 符号名（路径末段）
+    symbol_type: str  # 符号类型: class/func/var 等
+    visibility: str  # 可见性，无可见性的符号类型为空字符串
+    metadata_dict: Mapping[str, Any]  # 与symbols.json中一致的元数据（只读副本）
+
+    def to_metadata(self) -> SymbolMetadata:
+        """转换为符号元数据对象，每次调用都新建对象"""
+        return create_symbol_metadata(_thaw_metadata(self.metadata_dict))
+
+
+def _freeze_metadata(meta_dict: Mapping[str, Any]) -> Mapping[str, Any]:
+    """复制元数据字典并包装为只读映射
+
+    refresh索引的是SymbolTableManager进程内缓存中的原始数据，直接引用时修改条目会改变之后加载的符号表；
+    嵌套的字典（参数列表等）同样复制后只读。
+    """
+    return MappingProxyType({
+        key: MappingProxyType(dict(value)) if isinstance(value, Mapping) else value
+        for key, value in meta_dict.items()
+    })
+
+
+def _thaw_metadata(meta_dict: Mapping[str, Any]) -> Dict[str, Any]:
+    """将只读元数据还原为普通字典（含嵌套字典），用于构建元数据对象与写出快照"""
+    return {key: dict(value) if isinstance(value, Mapping) else value for key, value in meta_dict.items()}
+
+
+class GlobalSymbolIndex:
+    """全局符号索引
+
+    汇总ibc_root下所有目录级symbols.json中的符号元数据，提供常数时间的查找：
+    - 按完整路径查找单个符号
+    - 按符号名、符号类型、可见性、定义文件列出符号
+
+    索引数据来源：
+    - attach后，SymbolTableManager.save_symbols每次写入都会增量更新对应目录的索引
+    - refresh按symbols.json及其分片的修改时间和大小检查外部变化，只重新读取变化的目录
+    - 快照以单个JSON文档保存在 ibc_root/symbols_index.bin，加载时无需逐个读取各目录的symbols.json；
+      快照包含整个项目的索引，增量更新后只标记为待写出，由 flush_snapshot 或 detach 统一写出
+
+    索引可被多个线程同时更新与查询，所有读写均在同一把锁内进行。
+
+    通常通过 get_global_symbol_index 获取按ibc_root复用的实例。
+    """
+
+    def __init__(self, ibc_root: str, snapshot_path: Optional[str] = None):
+        self.ibc_root = os.path.abspath(ibc_root)
+        self.snapshot_path = snapshot_path or os.path.join(self.ibc_root, _SNAPSHOT_FILE_NAME)
+
+        # 目录相对路径（根目录为空字符串）-> 符号表的修改标记（SymbolTableManager.get_symbols_stamp）
+        self._dir_stamps: Dict[str, Tuple[Any, ...]] = {}
+        # 目录相对路径 -> 该目录下已索引的文件路径列表
+        self._dir_files: Dict[str, List[str]] = {}
+
+        # 主索引与各二级索引，二级索引的值以完整路径为键，便于按文件整体替换
+        self._by_full_path: Dict[str, GlobalSymbolEntry] = {}
+        self._by_file: Dict[str, Dict[str, GlobalSymbolEntry]] = {}
+        self._by_name: Dict[str, Dict[str, GlobalSymbolEntry]] = {}
+        self._by_type: Dict[str, Dict[str, GlobalSymbolEntry]] = {}
+        self._by_visibility: Dict[str, Dict[str, GlobalSymbolEntry]] = {}
+
+        self._attached = False
+        # 索引已更新但快照尚未写出
+        self._snapshot_dirty = False
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._by_full_path)
+
+    def __contains__(self, full_path: str) -> bool:
+        with self._lock:
+            return full_path in self._by_full_path
+
+    # ==================== 查询 ====================
+
+    def get_symbol(self, full_path: str) -> Optional[GlobalSymbolEntry]:
+        """按完整路径查找符号，不存在时返回None"""
+        with self._lock:
+            return self._by_full_path.get(full_path)
+
+    def find_by_name(self, name: str) -> List[GlobalSymbolEntry]:
+        """列出所有名称为name的符号，可用于回答“符号X定义在哪里”"""
+        with self._lock:
+            return list(self._by_name.get(name, {}).values())
+
+    def find_by_type(self, symbol_type: str, visibility: Optional[str] = None) -> List[GlobalSymbolEntry]:
+        """列出指定类型的符号，可同时按可见性过滤（例如所有public类）"""
+        with self._lock:
+            entries = self._by_type.get(symbol_type, {})
+            if visibility is None:
+                return list(entries.values())
+            visible_entries = self._by_visibility.get(visibility, {})
+            if len(visible_entries) < len(entries):
+                return [entry for entry in visible_entries.values() if entry.symbol_type == symbol_type]
+            return [entry for entry in entries.values() if entry.visibility == visibility]
+
+    def find_by_visibility(self, visibility: str) -> List[GlobalSymbolEntry]:
+        """列出指定可见性的符号"""
+        with self._lock:
+            return list(self._by_visibility.get(visibility, {}).values())
+
+    def get_file_symbols(self, file_path: str) -> List[GlobalSymbolEntry]:
+        """列出定义在指定文件中的符号，file_path形如 "src/ball/ball_entity" """
+        with self._lock:
+            return list(self._by_file.get(file_path, {}).values())
+
+    def get_file_paths(self) -> List[str]:
+        """列出已索引的所有文件路径"""
+        with self._lock:
+            return list(self._by_file)
+
+    # ==================== 索引维护 ====================
+
+    def attach(self) -> None:
+        """注册到SymbolTableManager，此后每次保存符号表都会增量更新索引"""
+        if not self._attached:
+            SymbolTableManager.add_save_listener(self._on_symbols_saved)
+            self._attached = True
+
+    def detach(self) -> None:
+        """取消注册，不再跟随符号表的保存更新，并写出尚未写出的快照"""
+        if self._attached:
+            SymbolTableManager.remove_save_listener(self._on_symbols_saved)
+            self._attached = False
+        try:
+            self.flush_snapshot()
+        except IOError as e:
+            print(f"警告: {e}")
+
+    def refresh(self) -> bool:
+        """检查ibc_root下所有symbols.json，重新索引新增或变化的目录，移除已删除的目录
+
+        Returns:
+            bool: 索引内容是否发生变化
+        """
+        with self._lock:
+            return self._refresh()
+
+    def _refresh(self) -> bool:
+        found_dirs = set()
+        changed = False
+        for dir_path, dir_names, file_names in os.walk(self.ibc_root):
+            has_shards = SHARD_DIR_NAME in dir_names
+            if has_shards:
+                dir_names.remove(SHARD_DIR_NAME)
+            if _SYMBOLS_FILE_NAME not in file_names and not has_shards:
+                continue
+            symbols_path = os.path.join(dir_path, _SYMBOLS_FILE_NAME)
+            stamp = SymbolTableManager.get_symbols_stamp(symbols_path)
+            if stamp is None:
+                continue
+            rel_dir = self._to_rel_dir(dir_path)
+            found_dirs.add(rel_dir)
+
+            if self._dir_stamps.get(rel_dir) == stamp:
+                continue
+            try:
+                dir_symbols = SymbolTableManager.load_dir_symbols(symbols_path)
+            except IOError as e:
+                print(f"警告: 全局符号索引跳过无法读取的符号表: {e}")
+                continue
+            self._index_dir(rel_dir, dir_symbols, stamp)
+            changed = True
+
+        for rel_dir in [rel_dir for rel_dir in self._dir_stamps if rel_dir not in found_dirs]:
+            self._remove_dir(rel_dir)
+            changed = True
+        if changed:
+            self._snapshot_dirty = True
+        return changed
+
+    def clear(self) -> None:
+        """清空索引内容"""
+        with self._lock:
+            for rel_dir in list(self._dir_stamps):
+                self._remove_dir(rel_dir)
+
+    def _on_symbols_saved(self, symbols_path: str, dir_symbols: Dict[str, Any]) -> None:
+        """SymbolTableManager保存监听器：以写入的完整目录数据替换该目录的索引，快照留待统一写出"""
+        dir_path = os.path.dirname(os.path.abspath(symbols_path))
+        if os.path.relpath(dir_path, self.ibc_root).startswith('..'):
+            return
+        stamp = SymbolTableManager.get_symbols_stamp(symbols_path)
+        if stamp is None:
+            return
+        with self._lock:
+            self._index_dir(self._to_rel_dir(dir_path), dir_symbols, stamp)
+            self._snapshot_dirty = True
+
+    def _index_dir(self, rel_dir: str, dir_symbols: Dict[str, Any], stamp: Tuple[Any, ...]) -> None:
+        """以目录级符号数据替换该目录下所有文件的索引"""
+        self._remove_dir(rel_dir)
+        file_paths = []
+        for file_name, file_symbol_data in dir_symbols.items():
+            file_path = f"{rel_dir}/{file_name}" if rel_dir else file_name
+            symbols_metadata = file_symbol_data.get("symbols_metadata", {}) if file_symbol_data else {}
+            self._add_file(file_path, symbols_metadata.items())
+            file_paths.append(file_path)
+        self._dir_files[rel_dir] = file_paths
+        self._dir_stamps[rel_dir] = stamp
+
+    def _remove_dir(self, rel_dir: str) -> None:
+        for file_path in self._dir_files.pop(rel_dir, ()):
+            self._remove_file(file_path)
+        self._dir_stamps.pop(rel_dir, None)
+
+    def _add_file(self, file_path: str, symbols_metadata: Iterable[Tuple[str, Dict[str, Any]]]) -> None:
+        file_path_key = file_path.replace('/', '.')
+        file_entries = self._by_file.setdefault(file_path, {})
+        for symbol_path, meta_dict in symbols_metadata:
+            full_path = f"{file_path_key}.{symbol_path}" if symbol_path else file_path_key
+            entry = GlobalSymbolEntry(
+                full_path=full_path,
+                file_path=file_path,
+                symbol_path=symbol_path,
+                name=symbol_path.rsplit('.', 1)[-1] if symbol_path else os.path.basename(file_path),
+                symbol_type=meta_dict.get("type", ""),
+                visibility=meta_dict.get("visibility", ""),
+                metadata_dict=_freeze_metadata(meta_dict),
+            )
+            self._by_full_path[full_path] = entry
+            file_entries[full_path] = entry
+            self._by_name.setdefault(entry.name, {})[full_path] = entry
+            self._by_type.setdefault(entry.symbol_type, {})[full_path] = entry
+            if entry.visibility:
+                self._by_visibility.setdefault(entry.visibility, {})[full_path] = entry
+
+    def _remove_file(self, file_path: str) -> None:
+        for full_path, entry in self._by_file.pop(file_path, {}).items():
+            if self._by_full_path.get(full_path) is entry:
+                del self._by_full_path[full_path]
+            self._discard(self._by_name, entry.name, full_path, entry)
+            self._discard(self._by_type, entry.symbol_type, full_path, entry)
+            self._discard(self._by_visibility, entry.visibility, full_path, entry)
+
+    @staticmethod
+    def _discard(
+        index: Dict[str, Dict[str, GlobalSymbolEntry]],
+        key: str,
+        full_path: str,
+        entry: GlobalSymbolEntry
+    ) -> None:
+        entries = index.get(key)
+        if entries is None or entries.get(full_path) is not entry:
+            return
+        del entries[full_path]
+        if not entries:
+            del index[key]
+
+    def _to_rel_dir(self, dir_path: str) -> str:
+        rel_dir = os.path.relpath(os.path.abspath(dir_path), self.ibc_root)
+        return '' if rel_dir == '.' else rel_dir.replace(os.sep, '/')
+
+    # ==================== 快照 ====================
+
+    def flush_snapshot(self) -> bool:
+        """索引自上次写出后有变化时写出快照
+
+        Returns:
+            bool: 是否写出了快照
+
+        Raises:
+            IOError: 写入失败时抛出
+        """
+        with self._lock:
+            if not self._snapshot_dirty:
+                return False
+            self.save_snapshot()
+            return True
+
+    def save_snapshot(self) -> None:
+        """将索引写出为快照文件（先写临时文件再替换，避免读到不完整的快照）
+
+        Raises:
+            IOError: 写入失败时抛出
+        """
+        with self._lock:
+            payload = {
+                "dir_stamps": dict(self._dir_stamps),
+                "dir_files": {
+                    rel_dir: [
+                        (file_path, [(entry.symbol_path, _thaw_metadata(entry.metadata_dict)) for entry in self._by_file.get(file_path, {}).values()])
+                        for file_path in file_paths
+                    ]
+                    for rel_dir, file_paths in self._dir_files.items()
+                },
+            }
+            # 临时文件名包含进程与线程标识，多个写入方不会互相覆盖或删除对方的临时文件
+            temp_path = f"{self.snapshot_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                os.makedirs(os.path.dirname(self.snapshot_path), exist_ok=True)
+                with open(temp_path, 'wb') as f:
+                    f.write(_HEADER.pack(_MAGIC, _FORMAT_VERSION))
+                    f.write(json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+                os.replace(temp_path, self.snapshot_path)
+            except Exception as e:
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+                raise IOError(f"保存全局符号索引失败 [{self.snapshot_path}]: {e}") from e
+            self._snapshot_dirty = False
+
+    def load_snapshot(self) -> bool:
+        """从快照文件恢复索引，替换当前内容
+
+        快照不存在、格式版本不符或已损坏时保持索引为空并返回False，调用方可随后refresh重建。
+
+        Returns:
+            bool: 是否成功加载
+        """
+        try:
+            with open(self.snapshot_path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return False
+
+        if len(data) < _HEADER.size:
+            return False
+        magic, version = _HEADER.unpack_from(data)
+        if magic != _MAGIC or version != _FORMAT_VERSION:
+            return False
+        try:
+            payload = json.loads(data[_HEADER.size:].decode('utf-8'))
+            # JSON中的修改标记为嵌套列表，恢复为元组后才能与get_symbols_stamp的结果比较
+            dir_stamps = {rel_dir: _to_tuple(stamp) for rel_dir, stamp in payload["dir_stamps"].items()}
+            dir_files = payload["dir_files"]
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return False
+
+        with self._lock:
+            self.clear()
+            for rel_dir, files in dir_files.items():
+                file_paths = []
+                for file_path, symbols_metadata in files:
+                    self._add_file(file_path, symbols_metadata)
+                    file_paths.append(file_path)
+                self._dir_files[rel_dir] = file_paths
+                self._dir_stamps[rel_dir] = dir_stamps[rel_dir]
+            self._snapshot_dirty = False
+        return True
+
+
+def _to_tuple(value: Any) -> Any:
+    """将JSON解析得到的嵌套列表递归转换为元组"""
+    if isinstance(value, list):
+        return tuple(_to_tuple(item) for item in value)
+    return value
+
+
+# ibc_root的绝对路径 -> 索引实例
+_indexes: Dict[str, GlobalSymbolIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_global_symbol_index(ibc_root: str) -> GlobalSymbolIndex:
+    """获取ibc_root对应的全局符号索引（同一ibc_root复用同一实例）
+
+    首次获取时加载快照，按symbols.json的修改时间和大小同步外部变化，有变化时写回快照，
+    并注册到SymbolTableManager以跟随后续保存增量更新。后续更新的快照需由调用方在一批保存
+    结束后通过 flush_snapshot 写出。
+    """
+    key = os.path.abspath(ibc_root)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = GlobalSymbolIndex(key)
+            index.load_snapshot()
+            index.refresh()
+            try:
+                index.flush_snapshot()
+            except IOError as e:
+                print(f"警告: {e}")
+            index.attach()
+            _indexes[key] = index
+    return index
@@ -0,0 +1,225 @@
+import json
+import struct
+from collections import deque
+from dataclasses import fields
+from enum import Enum
+from typing import Any, BinaryIO, Dict, Tuple
+
+from typedef.ibc_data_types import (AstNodeType, BehaviorStepNode, ClassNode,
+                                    FunctionNode, IbcBaseAstNode, ModuleNode,
+                                    VariableNode, VisibilityTypes)
+
+# 文件头：魔数、格式版本、节点数量
+# 版本2：节点记录由marshal改为UTF-8紧凑JSON，节点类与枚举改用显式编号表
+_MAGIC = b'IBCAST'
+_FORMAT_VERSION = 2
+_HEADER = struct.Struct('<6sHI')
+
+# 索引项：节点uid、父节点uid、节点类编号、记录偏移（相对记录区起点）、记录长度
+_INDEX_ENTRY = struct.Struct('<qqBII')
+
+# 节点类编号表，已分配的编号不可修改或复用，新增节点类只能分配新编号
+_NODE_CLASS_CODES: Dict[type, int] = {
+    IbcBaseAstNode: 0,
+    ModuleNode: 1,
+    ClassNode: 2,
+    FunctionNode: 3,
+    VariableNode: 4,
+    BehaviorStepNode: 5,
+}
+_NODE_CLASSES_BY_CODE: Dict[int, type] = {code: node_class for node_class, code in _NODE_CLASS_CODES.items()}
+
+# 枚举编号表（成员名 -> 编号），节点记录中以编号保存枚举值，规则同节点类编号表
+_ENUM_NAME_CODES: Dict[type, Dict[str, int]] = {
+    AstNodeType: {
+        "DEFAULT": 0,
+        "MODULE": 1,
+        "CLASS": 2,
+        "FUNCTION": 3,
+        "VARIABLE": 4,
+        "BEHAVIOR_STEP": 5,
+    },
+    VisibilityTypes: {
+        "PUBLIC": 0,
+        "PROTECTED": 1,
+        "PRIVATE": 2,
+    },
+}
+_ENUM_CODES: Dict[Enum, int] = {
+    enum_type[name]: code
+    for enum_type, name_codes in _ENUM_NAME_CODES.items()
+    for name, code in name_codes.items()
+}
+_ENUM_MEMBERS: Dict[type, Dict[int, Enum]] = {
+    enum_type: {code: enum_type[name] for name, code in name_codes.items()}
+    for enum_type, name_codes in _ENUM_NAME_CODES.items()
+}
+
+
+def _build_class_layout(node_class: type) -> Tuple[Tuple[str, ...], Tuple[Tuple[str, Dict[int, Enum]], ...]]:
+    """预先计算节点类的字段名及枚举字段，避免逐节点反射dataclass字段"""
+    field_names = []
+    enum_fields = []
+    for f in fields(node_class):
+        field_names.append(f.name)
+        if f.type in _ENUM_MEMBERS:
+            enum_fields.append((f.name, _ENUM_MEMBERS[f.type]))
+    return tuple(field_names), tuple(enum_fields)
+
+
+_CLASS_LAYOUTS = {code: _build_class_layout(node_class) for code, node_class in _NODE_CLASSES_BY_CODE.items()}
+
+
+class IbcAstBinaryFormat:
+    """AST二进制存储格式
+
+    文件结构：文件头 | 索引区 | 记录区
+    - 索引区为定长索引项，记录每个节点的uid、父节点uid、节点类型及记录在记录区中的位置
+    - 记录区中每个节点单独编码为UTF-8紧凑JSON对象（字段名 -> 字段值），枚举按显式编号表保存
+
+    读取单个子树时只需读取文件头与索引区，再按需定位子树中的节点记录。
+
+    所有方法均为静态方法，可独立使用。
+    """
+
+    @staticmethod
+    def encode(ast_dict: Dict[int, IbcBaseAstNode]) -> bytes:
+        """将AST字典编码为二进制数据
+
+        Raises:
+            ValueError: 存在无法编码的节点类型时抛出
+        """
+        index_parts = []
+        record_parts = []
+        offset = 0
+        for uid, node in ast_dict.items():
+            class_code = _NODE_CLASS_CODES.get(type(node))
+            if class_code is None:
+                raise ValueError(f"不支持的AST节点类型: {type(node).__name__}")
+            field_names, enum_fields = _CLASS_LAYOUTS[class_code]
+            values = {name: getattr(node, name) for name in field_names}
+            for name, _ in enum_fields:
+                values[name] = _ENUM_CODES[values[name]]
+            record = json.dumps(values, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+            index_parts.append(_INDEX_ENTRY.pack(uid, node.parent_uid, class_code, offset, len(record)))
+            record_parts.append(record)
+            offset += len(record)
+
+        header = _HEADER.pack(_MAGIC, _FORMAT_VERSION, len(index_parts))
+        return b''.join([header, *index_parts, *record_parts])
+
+    @staticmethod
+    def decode(data: bytes) -> Dict[int, IbcBaseAstNode]:
+        """将二进制数据解码为AST字典
+
+        Raises:
+            ValueError: 数据格式不正确时抛出
+        """
+        view = memoryview(data)
+        node_count = IbcAstBinaryFormat._unpack_header(view[:_HEADER.size])
+        index_end = _HEADER.size + node_count * _INDEX_ENTRY.size
+        if len(view) < index_end:
+            raise ValueError("AST二进制数据索引区不完整")
+
+        ast_dict: Dict[int, IbcBaseAstNode] = {}
+        for uid, _, class_code, offset, length in _INDEX_ENTRY.iter_unpack(view[_HEADER.size:index_end]):
+            start = index_end + offset
+            ast_dict[uid] = IbcAstBinaryFormat._decode_record(class_code, view[start:start + length])
+        return ast_dict
+
+    @staticmethod
+    def is_binary_data(data: bytes) -> bool:
+        """判断数据是否为AST二进制格式"""
+        return data[:len(_MAGIC)] == _MAGIC
+
+    @staticmethod
+    def is_binary_file(file_obj: BinaryIO) -> bool:
+        """判断文件是否为AST二进制格式，不改变文件读取位置"""
+        position = file_obj.tell()
+        magic = file_obj.read(len(_MAGIC))
+        file_obj.seek(position)
+        return IbcAstBinaryFormat.is_binary_data(magic)
+
+    @staticmethod
+    def read_subtree(file_obj: BinaryIO, root_uid: int) -> Dict[int, IbcBaseAstNode]:
+        """从文件中只读取以root_uid为根的子树，根节点不存在时返回空字典
+
+        Raises:
+            ValueError: 数据格式不正确时抛出
+        """
+        file_obj.seek(0)
+        node_count = IbcAstBinaryFormat._unpack_header(file_obj.read(_HEADER.size))
+        index_data = file_obj.read(node_count * _INDEX_ENTRY.size)
+        if len(index_data) < node_count * _INDEX_ENTRY.size:
+            raise ValueError("AST二进制数据索引区不完整")
+        records_start = _HEADER.size + len(index_data)
+
+        index = {
+            uid: (class_code, offset, length)
+            for uid, _, class_code, offset, length in _INDEX_ENTRY.iter_unpack(index_data)
+        }
+
+        subtree: Dict[int, IbcBaseAstNode] = {}
+        pending: deque = deque([root_uid])
+        while pending:
+            uid = pending.popleft()
+            entry = index.get(uid)
+            if entry is None or uid in subtree:
+                continue
+            class_code, offset, length = entry
+            file_obj.seek(records_start + offset)
+            node = IbcAstBinaryFormat._decode_record(class_code, file_obj.read(length))
+            subtree[uid] = node
+            pending.extend(node.children_uids)
+        return subtree
+
+    @staticmethod
+    def read_index(file_obj: BinaryIO) -> Dict[int, Tuple[int, str]]:
+        """只读取索引区，返回 {节点uid: (父节点uid, 节点类名)}
+
+        Raises:
+            ValueError: 数据格式不正确时抛出
+        """
+        file_obj.seek(0)
+        node_count = IbcAstBinaryFormat._unpack_header(file_obj.read(_HEADER.size))
+        index_data = file_obj.read(node_count * _INDEX_ENTRY.size)
+        if len(index_data) < node_count * _INDEX_ENTRY.size:
+            raise ValueError("AST二进制数据索引区不完整")
+        return {
+            uid: (parent_uid, IbcAstBinaryFormat._get_node_class(class_code).__name__)
+            for uid, parent_uid, class_code, _, _ in _INDEX_ENTRY.iter_unpack(index_data)
+        }
+
+    @staticmethod
+    def _unpack_header(header_data: bytes) -> int:
+        """校验文件头并返回节点数量"""
+        if len(header_data) < _HEADER.size:
+            raise ValueError("AST二进制数据文件头不完整")
+        magic, version, node_count = _HEADER.unpack(header_data)
+        if magic != _MAGIC:
+            raise ValueError("不是AST二进制数据")
+        if version != _FORMAT_VERSION:
+            raise ValueError(f"不支持的AST二进制格式版本: {version}")
+        return node_count
+
+    @staticmethod
+    def _get_node_class(class_code: int) -> type:
+        node_class = _NODE_CLASSES_BY_CODE.get(class_code)
+        if node_class is None:
+            raise ValueError(f"未知的AST节点类型编号: {class_code}")
+        return node_class
+
+    @staticmethod
+    def _decode_record(class_code: int, record: bytes) -> IbcBaseAstNode:
+        """解码单个节点记录，按字段名直接构造节点"""
+        node_class = IbcAstBinaryFormat._get_node_class(class_code)
+        try:
+            values: Dict[str, Any] = json.loads(bytes(record))
+            for name, members in _CLASS_LAYOUTS[class_code][1]:
+                if name in values:
+                    values[name] = members[values[name]]
+            return node_class(**values)
+        except (ValueError, KeyError, TypeError) as e:
+            raise ValueError(f"AST节点记录损坏: {e}") from e
+
@@ -1,9 +1,12 @@
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Mapping, Optional, Tuple
 
 # 导入专门的管理器类
+from data_store.global_symbol_index import (GlobalSymbolIndex,
+                                            get_global_symbol_index)
 from data_store.ibc_file_manager import IbcFileManager
 from data_store.symbol_table_manager import SymbolTableManager
-from data_store.verify_data_manager import VerifyDataManager
+from data_store.verify_data_manager import (VerifyDataManager,
+                                            VerifyDataSession)
 from typedef.ibc_data_types import IbcBaseAstNode, SymbolMetadata
 
 
@@ -53,14 +56,14 @@ class IbcDataStore:
     # 委托给 IbcFileManager
     
     def build_ast_path(self, ibc_root: str, file_path: str) -> str:
-        """构建AST文件路径: ibc_root/file_path_ibc_ast.json
+        """构建AST文件路径: ibc_root/file_path_ibc_ast.bin
         
         委托给 IbcFileManager.build_ast_path
         """
         return IbcFileManager.build_ast_path(ibc_root, file_path)
     
     def save_ast(self, ast_path: str, ast_dict: Dict[int, IbcBaseAstNode]) -> None:
-        """保存AST到JSON文件
+        """以二进制格式保存AST
         
         委托给 IbcFileManager.save_ast
         """
@@ -73,10 +76,38 @@ class IbcDataStore:
         """
         return IbcFileManager.load_ast(ast_path)
     
+    def load_ast_subtree(self, ast_path: str, root_uid: int) -> Dict[int, IbcBaseAstNode]:
+        """只加载以root_uid为根的AST子树，文件或节点不存在时返回空字典
+        
+        委托给 IbcFileManager.load_ast_subtree
+        """
+        return IbcFileManager.load_ast_subtree(ast_path, root_uid)
+    
+    def export_ast_json(self, json_path: str, ast_dict: Dict[int, IbcBaseAstNode]) -> None:
+        """将AST导出为JSON文件
+        
+        委托给 IbcFileManager.export_ast_json
+        """
+        return IbcFileManager.export_ast_json(json_path, ast_dict)
+    
     # ==================== 校验数据管理 ====================
     # 委托给 VerifyDataManager
     # 新版：统一verify文件管理（保存在 icp_proj_data/icp_verify_data.json）
     
+    def open_verify_data_session(self, data_dir_path: str) -> VerifyDataSession:
+        """打开校验数据会话，批量修改校验数据后统一提交
+        
+        委托给 VerifyDataManager.open_session
+        """
+        return VerifyDataManager.open_session(data_dir_path)
+    
+    def load_all_verify_data(self, data_dir_path: str) -> Dict[str, Dict[str, str]]:
+        """一次性加载统一verify文件中全部文件的校验数据
+        
+        委托给 VerifyDataManager.load_all_verify_data
+        """
+        return VerifyDataManager.load_all_verify_data(data_dir_path)
+    
     def load_file_verify_data(self, data_dir_path: str, file_path: str) -> Dict[str, str]:
         """从统一的verify文件中加载指定文件的校验数据
         
@@ -189,7 +220,7 @@ class IbcDataStore:
         ibc_root: str,
         dependent_relation: Dict[str, List[str]],
         current_file_path: str
-    ) -> Dict[str, Tuple[Dict[str, Any], Dict[str, SymbolMetadata]]]:
+    ) -> Dict[str, Tuple[Dict[str, Any], Mapping[str, SymbolMetadata]]]:
         """根据依赖关系为单个文件批量加载依赖符号数据
         
         委托给 SymbolTableManager.load_dependency_symbol_tables
@@ -208,6 +239,34 @@ class IbcDataStore:
         """
         return SymbolTableManager.is_dependency_symbol_tables_valid(ibc_root, dependent_relation, current_file_path)
         
+    def invalidate_symbols_cache(self, symbols_path: Optional[str] = None) -> None:
+        """使符号表的进程内缓存失效，symbols_path为None时清空全部缓存
+        
+        委托给 SymbolTableManager.invalidate_symbols_cache
+        """
+        return SymbolTableManager.invalidate_symbols_cache(symbols_path)
+        
+    def set_symbols_storage_mode(self, mode: str) -> None:
+        """设置符号表的写入模式（directory/sharded）
+        
+        委托给 SymbolTableManager.set_storage_mode
+        """
+        return SymbolTableManager.set_storage_mode(mode)
+        
+    def compact_symbols(self, symbols_path: str) -> int:
+        """将目录下的符号表分片合并回symbols.json，返回合并的分片数量
+        
+        委托给 SymbolTableManager.compact_symbols
+        """
+        return SymbolTableManager.compact_symbols(symbols_path)
+        
+    def get_global_symbol_index(self, ibc_root: str) -> GlobalSymbolIndex:
+        """获取ibc_root对应的全局符号索引，可按完整路径、名称、类型、可见性和文件查找符号
+        
+        委托给 global_symbol_index.get_global_symbol_index
+        """
+        return get_global_symbol_index(ibc_root)
+        
     def update_symbol_info(
         self,
         symbols_path: str,
@@ -2,9 +2,13 @@ import json
 import os
 from typing import Any, Dict
 
+from data_store.ibc_ast_binary_format import IbcAstBinaryFormat
 from typedef.ibc_data_types import (BehaviorStepNode, ClassNode, FunctionNode,
                                     IbcBaseAstNode, ModuleNode, VariableNode)
 
+_AST_BINARY_SUFFIX = "_ibc_ast.bin"
+_AST_LEGACY_JSON_SUFFIX = "_ibc_ast.json"
+
 
 class IbcFileManager:
     """IBC文件操作管理器
@@ -81,7 +85,7 @@ class IbcFileManager:
     
     @staticmethod
     def build_ast_path(ibc_root: str, file_path: str) -> str:
-        """构建AST文件路径: ibc_root/file_path_ibc_ast.json
+        """构建AST文件路径: ibc_root/file_path_ibc_ast.bin
         
         Args:
             ibc_root: IBC文件根目录
@@ -92,11 +96,11 @@ class IbcFileManager:
         """
         # 解决Windows和Linux路径分隔符问题
         normalized_file_path = file_path.replace('/', os.sep)
-        return os.path.join(ibc_root, f"{normalized_file_path}_ibc_ast.json")
+        return os.path.join(ibc_root, f"{normalized_file_path}{_AST_BINARY_SUFFIX}")
     
     @staticmethod
     def save_ast(ast_path: str, ast_dict: Dict[int, IbcBaseAstNode]) -> None:
-        """保存AST到JSON文件
+        """以二进制格式保存AST（格式见 IbcAstBinaryFormat）
         
         Args:
             ast_path: AST文件路径
@@ -110,15 +114,9 @@ class IbcFileManager:
             if directory and not os.path.exists(directory):
                 os.makedirs(directory)
             
-            # 序列化AST节点
-            serializable_dict = {}
-            for uid, node in ast_dict.items():
-                node_dict = node.to_dict()
-                node_dict["_class_type"] = type(node).__name__
-                serializable_dict[str(uid)] = node_dict
-            
-            with open(ast_path, 'w', encoding='utf-8') as f:
-                json.dump(serializable_dict, f, ensure_ascii=False, indent=2)
+            data = IbcAstBinaryFormat.encode(ast_dict)
+            with open(ast_path, 'wb') as f:
+                f.write(data)
         except (IOError, OSError, ValueError) as e:
             raise IOError(f"保存AST失败 [{ast_path}]: {e}") from e
     
@@ -126,6 +124,8 @@ class IbcFileManager:
     def load_ast(ast_path: str) -> Dict[int, IbcBaseAstNode]:
         """加载AST字典，文件不存在时返回空字典
         
+        同时兼容二进制格式与JSON格式；二进制文件不存在时，尝试读取同名的旧版JSON文件
+        
         Args:
             ast_path: AST文件路径
             
@@ -135,23 +135,104 @@ class IbcFileManager:
         Raises:
             IOError: 加载失败时抛出
         """
-        if not os.path.exists(ast_path):
+        ast_path = IbcFileManager._resolve_existing_ast_path(ast_path)
+        if not ast_path:
             return {}
         
         try:
-            with open(ast_path, 'r', encoding='utf-8') as f:
-                serializable_dict = json.load(f)
+            with open(ast_path, 'rb') as f:
+                data = f.read()
+            if IbcAstBinaryFormat.is_binary_data(data):
+                return IbcAstBinaryFormat.decode(data)
+            return IbcFileManager._deserialize_ast_json(json.loads(data.decode('utf-8')))
+        except (IOError, OSError, ValueError, EOFError, TypeError) as e:
+            raise IOError(f"加载AST失败 [{ast_path}]: {e}") from e
+    
+    @staticmethod
+    def load_ast_subtree(ast_path: str, root_uid: int) -> Dict[int, IbcBaseAstNode]:
+        """只加载以root_uid为根的AST子树，文件或节点不存在时返回空字典
+        
+        二进制格式下只读取索引区与子树节点的记录；JSON格式下退化为完整加载后截取子树
+        
+        Args:
+            ast_path: AST文件路径
+            root_uid: 子树根节点uid
             
-            # 反序列化AST节点
-            ast_dict: Dict[int, IbcBaseAstNode] = {}
-            for uid_str, node_dict in serializable_dict.items():
-                uid = int(uid_str)
-                node = IbcFileManager._create_node_from_dict(node_dict)
-                ast_dict[uid] = node
+        Returns:
+            Dict[int, IbcBaseAstNode]: 子树节点字典
             
-            return ast_dict
-        except (IOError, OSError, ValueError) as e:
+        Raises:
+            IOError: 加载失败时抛出
+        """
+        ast_path = IbcFileManager._resolve_existing_ast_path(ast_path)
+        if not ast_path:
+            return {}
+        
+        try:
+            with open(ast_path, 'rb') as f:
+                if IbcAstBinaryFormat.is_binary_file(f):
+                    return IbcAstBinaryFormat.read_subtree(f, root_uid)
+        except (IOError, OSError, ValueError, EOFError, TypeError) as e:
             raise IOError(f"加载AST失败 [{ast_path}]: {e}") from e
+        
+        ast_dict = IbcFileManager.load_ast(ast_path)
+        subtree: Dict[int, IbcBaseAstNode] = {}
+        pending = [root_uid]
+        while pending:
+            uid = pending.pop()
+            if uid in ast_dict and uid not in subtree:
+                subtree[uid] = ast_dict[uid]
+                pending.extend(ast_dict[uid].children_uids)
+        return subtree
+    
+    @staticmethod
+    def export_ast_json(json_path: str, ast_dict: Dict[int, IbcBaseAstNode]) -> None:
+        """将AST导出为便于阅读的JSON文件，导出的文件可由load_ast直接加载
+        
+        Args:
+            json_path: JSON文件路径
+            ast_dict: AST节点字典 {节点uid: AST节点对象}
+            
+        Raises:
+            IOError: 导出失败时抛出
+        """
+        try:
+            directory = os.path.dirname(json_path)
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+            
+            # 序列化AST节点
+            serializable_dict = {}
+            for uid, node in ast_dict.items():
+                node_dict = node.to_dict()
+                node_dict["_class_type"] = type(node).__name__
+                serializable_dict[str(uid)] = node_dict
+            
+            with open(json_path, 'w', encoding='utf-8') as f:
+                json.dump(serializable_dict, f, ensure_ascii=False, indent=2)
+        except (IOError, OSError, ValueError) as e:
+            raise IOError(f"导出AST失败 [{json_path}]: {e}") from e
+    
+    @staticmethod
+    def _resolve_existing_ast_path(ast_path: str) -> str:
+        """返回实际存在的AST文件路径，二进制文件不存在时回退到旧版JSON文件，均不存在时返回空字符串"""
+        if os.path.exists(ast_path):
+            return ast_path
+        if ast_path.endswith(_AST_BINARY_SUFFIX):
+            legacy_path = ast_path[:-len(_AST_BINARY_SUFFIX)] + _AST_LEGACY_JSON_SUFFIX
+            if os.path.exists(legacy_path):
+                return legacy_path
+        return ""
+    
+    @staticmethod
+    def _deserialize_ast_json(serializable_dict: Dict[str, Any]) -> Dict[int, IbcBaseAstNode]:
+        """反序列化JSON格式的AST节点"""
+        ast_dict: Dict[int, IbcBaseAstNode] = {}
+        for uid_str, node_dict in serializable_dict.items():
+            uid = int(uid_str)
+            node = IbcFileManager._create_node_from_dict(node_dict)
+            ast_dict[uid] = node
+        return ast_dict
     
     @staticmethod
     def _create_node_from_dict(node_dict: Dict[str, Any]) -> IbcBaseAstNode:
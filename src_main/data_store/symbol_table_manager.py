@@ -1,9 +1,37 @@
 import json
 import os
-from typing import Any, Dict, List, Tuple
+import threading
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
 
 from typedef.ibc_data_types import SymbolMetadata, create_symbol_metadata
 
+# 存储模式：目录级单文件（默认，与旧版格式一致）或按文件分片
+STORAGE_MODE_DIRECTORY = "directory"
+STORAGE_MODE_SHARDED = "sharded"
+
+# 分片目录与symbols.json位于同一目录，每个文件一个分片: dir/symbols.d/<文件名>.json
+SHARD_DIR_NAME = 'symbols.d'
+_SHARD_SUFFIX = '.json'
+
+
+@dataclass
+class _DirSymbolsCacheEntry:
+    """目录级符号表的进程内缓存项"""
+    # 解析时symbols.json的 (st_mtime_ns, st_size)，文件不存在时为None
+    dir_stamp: Optional[Tuple[int, int]]
+    # 分片对应的文件名 -> 解析时分片的 (st_mtime_ns, st_size)
+    shard_stamps: Dict[str, Tuple[int, int]]
+    # symbols.json解析得到的原始数据
+    dir_data: Dict[str, Any]
+    # 分片对应的文件名 -> 分片解析得到的原始数据
+    shard_data: Dict[str, Any]
+    # 合并后的目录级符号数据，同一文件的分片优先于symbols.json中的条目
+    dir_symbols: Dict[str, Any]
+    # 文件名 -> (符号树, 只读符号元数据)，按需转换后复用；文件内容变化时替换为新对象
+    file_symbols: Dict[str, Tuple[Dict[str, Any], Mapping[str, SymbolMetadata]]] = field(default_factory=dict)
+
 
 class SymbolTableManager:
     """符号表管理器
@@ -16,6 +44,18 @@ class SymbolTableManager:
     
     所有方法均为静态方法，可独立使用。
     
+    缓存：
+    已解析的symbols.json按路径缓存在进程内，以文件的修改时间和大小判断是否过期，
+    save_symbols写入后立即失效，保证每个symbols.json在每次变更后最多解析一次。
+    多次重试、多个文件共享同一依赖时不再重复读取和解析。
+    
+    存储模式：
+    - directory（默认）：整个目录的符号写入同一个symbols.json，格式与旧版一致
+    - sharded：每个文件的符号单独写入 symbols.d/<文件名>.json，保存时只写当前文件，
+      不同文件的并发保存互不覆盖；compact_symbols可将分片合并回symbols.json
+    两种模式下的写入均先写临时文件再原子替换，读取时总是合并symbols.json与分片（分片优先），
+    因此load_symbols等读取接口在两种模式下行为一致。
+    
     说明：
     符号表采用目录级存储，一个symbols.json包含该目录下所有文件的符号信息。
     存储结构示例：
@@ -31,6 +71,33 @@ class SymbolTableManager:
     }
     """
     
+    # 规范化的symbols.json路径 -> 缓存项
+    _dir_symbols_cache: Dict[str, _DirSymbolsCacheEntry] = {}
+    
+    # 符号表保存监听器，参数为 (symbols_path, 写入的目录级符号数据)
+    _save_listeners: List[Callable[[str, Dict[str, Any]], None]] = []
+    
+    _storage_mode: str = STORAGE_MODE_DIRECTORY
+    
+    @staticmethod
+    def set_storage_mode(mode: str) -> None:
+        """设置符号表的写入模式，仅影响之后的保存
+        
+        Args:
+            mode: STORAGE_MODE_DIRECTORY 或 STORAGE_MODE_SHARDED
+            
+        Raises:
+            ValueError: 未知的存储模式
+        """
+        if mode not in (STORAGE_MODE_DIRECTORY, STORAGE_MODE_SHARDED):
+            raise ValueError(f"未知的符号表存储模式: {mode}")
+        SymbolTableManager._storage_mode = mode
+    
+    @staticmethod
+    def get_storage_mode() -> str:
+        """获取当前的符号表写入模式"""
+        return SymbolTableManager._storage_mode
+    
     @staticmethod
     def build_symbols_path(ibc_root: str, file_path: str) -> str:
         """构建符号表路径（目录级）: ibc_root/dir/symbols.json
@@ -58,6 +125,9 @@ class SymbolTableManager:
     ) -> None:
         """保存符号信息（目录级存储，自动合并）
         
+        directory模式下重写整个symbols.json，并移除已合并进去的分片；
+        sharded模式下只写入当前文件的分片。
+        
         Args:
             symbols_path: 目录级符号表文件路径
             file_name: 文件名（不含扩展名）
@@ -67,29 +137,42 @@ class SymbolTableManager:
         Raises:
             IOError: 保存失败时抛出
         """
-        # 加载目录级符号数据
-        dir_symbols = SymbolTableManager._load_dir_symbols(symbols_path)
+        # 加载目录级符号数据（浅拷贝，避免写入失败时污染缓存）
+        entry = SymbolTableManager._get_cache_entry(symbols_path)
+        dir_symbols = dict(entry.dir_symbols) if entry is not None else {}
         
         # 将SymbolMetadata对象转换为字典以便JSON序列化
         symbols_metadata_dict = {path: meta.to_dict() for path, meta in symbols_metadata.items()}
             
-        dir_symbols[file_name] = {
+        file_symbol_data = {
             "symbols_tree": symbols_tree,
             "symbols_metadata": symbols_metadata_dict,
         }
+        dir_symbols[file_name] = file_symbol_data
             
         # 保存回文件
         try:
-            os.makedirs(os.path.dirname(symbols_path), exist_ok=True)
-            with open(symbols_path, 'w', encoding='utf-8') as f:
-                json.dump(dir_symbols, f, ensure_ascii=False, indent=2)
+            if SymbolTableManager._storage_mode == STORAGE_MODE_SHARDED:
+                shard_path = os.path.join(SymbolTableManager._build_shard_dir(symbols_path), file_name + _SHARD_SUFFIX)
+                SymbolTableManager._write_json_atomic(shard_path, file_symbol_data, indent=None)
+            else:
+                SymbolTableManager._write_json_atomic(symbols_path, dir_symbols, indent=2)
+                if entry is not None:
+                    SymbolTableManager._remove_merged_shards(symbols_path, entry.shard_stamps)
         except Exception as e:
             raise IOError(f"保存符号表失败 [{symbols_path}]: {e}") from e
+        finally:
+            SymbolTableManager.invalidate_symbols_cache(symbols_path)
+        
+        for listener in list(SymbolTableManager._save_listeners):
+            listener(symbols_path, dir_symbols)
     
     @staticmethod
     def load_symbols(symbols_path: str, file_name: str) -> Tuple[Dict[str, Any], Dict[str, SymbolMetadata]]:
         """加载单个文件的符号树和元数据，文件不存在或无数据时返回空结构
         
+        返回的符号树和元数据均为新建对象，调用方可以自由修改后再通过save_symbols保存。
+        
         Args:
             symbols_path: 目录级符号表文件路径
             file_name: 文件名（不含扩展名）
@@ -103,29 +186,123 @@ class SymbolTableManager:
         if not file_symbol_data:
             return {}, {}
             
-        symbols_tree = file_symbol_data.get("symbols_tree", {})
-        symbols_metadata_dict = file_symbol_data.get("symbols_metadata", {})
+        return SymbolTableManager._convert_file_symbols(file_symbol_data)
+    
+    @staticmethod
+    def load_shared_symbols(symbols_path: str, file_name: str) -> Tuple[Dict[str, Any], Mapping[str, SymbolMetadata]]:
+        """加载单个文件的符号树和元数据（共享缓存对象，只读）
         
-        # 将字典转换为SymbolMetadata对象
-        symbols_metadata: Dict[str, SymbolMetadata] = {}
-        for path, meta_dict in symbols_metadata_dict.items():
-            try:
-                symbols_metadata[path] = create_symbol_metadata(meta_dict)
-            except ValueError as e:
-                # 如果无法识别符号类型，跳过该符号
-                print(f"警告: 无法加载符号 {path}: {e}")
-                continue
-
-        return symbols_tree, symbols_metadata
+        与load_symbols不同，文件未变化时多次调用返回同一组对象，调用方不得修改；
+        文件内容变化后返回新的对象，因此对象标识可以作为内容是否变化的依据。
+        符号元数据以只读映射返回，修改时直接报错。
+        
+        Args:
+            symbols_path: 目录级符号表文件路径
+            file_name: 文件名（不含扩展名）
+            
+        Returns:
+            Tuple[Dict, Dict]: (符号树, 符号元数据字典)，不存在时返回({}, {})
+        """
+        entry = SymbolTableManager._get_cache_entry(symbols_path)
+        if entry is None:
+            return {}, {}
+        
+        file_symbols = entry.file_symbols.get(file_name)
+        if file_symbols is None:
+            file_symbol_data = entry.dir_symbols.get(file_name, {})
+            if not file_symbol_data:
+                return {}, {}
+            symbols_tree, symbols_metadata = SymbolTableManager._convert_file_symbols(file_symbol_data)
+            file_symbols = (symbols_tree, MappingProxyType(symbols_metadata))
+            entry.file_symbols[file_name] = file_symbols
+        return file_symbols
+    
+    @staticmethod
+    def compact_symbols(symbols_path: str) -> int:
+        """将目录下的所有分片合并回symbols.json并删除分片
+        
+        合并期间被其他写入者更新的分片会保留，下次读取时仍以分片为准。
+        
+        Args:
+            symbols_path: 目录级符号表文件路径
+            
+        Returns:
+            int: 合并的分片数量
+            
+        Raises:
+            IOError: 读取或写入失败时抛出
+        """
+        entry = SymbolTableManager._get_cache_entry(symbols_path)
+        if entry is None or not entry.shard_stamps:
+            return 0
+        
+        try:
+            SymbolTableManager._write_json_atomic(symbols_path, entry.dir_symbols, indent=2)
+            SymbolTableManager._remove_merged_shards(symbols_path, entry.shard_stamps)
+        except Exception as e:
+            raise IOError(f"合并符号表分片失败 [{symbols_path}]: {e}") from e
+        finally:
+            SymbolTableManager.invalidate_symbols_cache(symbols_path)
+        return len(entry.shard_stamps)
+    
+    @staticmethod
+    def get_symbols_stamp(symbols_path: str) -> Optional[Tuple[Any, ...]]:
+        """获取目录级符号表（symbols.json及其分片）当前的修改标记，用于判断内容是否变化
+        
+        Returns:
+            Optional[Tuple]: 可比较的修改标记，symbols.json与分片均不存在时返回None
+        """
+        dir_stamp = SymbolTableManager._stat_stamp(symbols_path)
+        shard_stamps = SymbolTableManager._scan_shard_stamps(symbols_path)
+        if dir_stamp is None and not shard_stamps:
+            return None
+        return dir_stamp, tuple(sorted(shard_stamps.items()))
+    
+    @staticmethod
+    def load_dir_symbols(symbols_path: str) -> Dict[str, Any]:
+        """加载目录级符号表的原始数据 {文件名: {"symbols_tree", "symbols_metadata"}}
+        
+        返回的字典来自缓存，调用方只读使用，文件不存在时返回空字典。
+        """
+        return SymbolTableManager._load_dir_symbols(symbols_path)
+    
+    @staticmethod
+    def add_save_listener(listener: Callable[[str, Dict[str, Any]], None]) -> None:
+        """注册符号表保存监听器，每次save_symbols成功写入后以 (symbols_path, 目录级符号数据) 调用
+        
+        目录级符号数据为刚写入文件的完整内容，监听器只读使用。
+        """
+        if listener not in SymbolTableManager._save_listeners:
+            SymbolTableManager._save_listeners.append(listener)
+    
+    @staticmethod
+    def remove_save_listener(listener: Callable[[str, Dict[str, Any]], None]) -> None:
+        """移除符号表保存监听器，未注册时忽略"""
+        if listener in SymbolTableManager._save_listeners:
+            SymbolTableManager._save_listeners.remove(listener)
+    
+    @staticmethod
+    def invalidate_symbols_cache(symbols_path: Optional[str] = None) -> None:
+        """使符号表缓存失效
+        
+        Args:
+            symbols_path: 目录级符号表文件路径，为None时清空全部缓存
+        """
+        if symbols_path is None:
+            SymbolTableManager._dir_symbols_cache.clear()
+        else:
+            SymbolTableManager._dir_symbols_cache.pop(os.path.abspath(symbols_path), None)
     
     @staticmethod
     def load_dependency_symbol_tables(
         ibc_root: str,
         dependent_relation: Dict[str, List[str]],
         current_file_path: str
-    ) -> Dict[str, Tuple[Dict[str, Any], Dict[str, SymbolMetadata]]]:
+    ) -> Dict[str, Tuple[Dict[str, Any], Mapping[str, SymbolMetadata]]]:
         """根据依赖关系为单个文件批量加载依赖符号数据
         
+        依赖符号数据来自进程内缓存，符号表未变化时多次调用返回同一组对象，调用方只读使用（符号元数据为只读映射）。
+        
         Args:
             ibc_root: IBC文件根目录
             dependent_relation: 依赖关系字典 {文件路径: [依赖文件路径列表]}
@@ -138,15 +315,12 @@ class SymbolTableManager:
         if not dependencies:
             return {}
     
-        result: Dict[str, Tuple[Dict[str, Any], Dict[str, SymbolMetadata]]] = {}
+        result: Dict[str, Tuple[Dict[str, Any], Mapping[str, SymbolMetadata]]] = {}
     
         for dep_file_path in dependencies:
             symbols_path = SymbolTableManager.build_symbols_path(ibc_root, dep_file_path)
-            if not os.path.exists(symbols_path):
-                continue
-    
             file_name = os.path.basename(dep_file_path)
-            symbols_tree, symbols_metadata = SymbolTableManager.load_symbols(symbols_path, file_name)
+            symbols_tree, symbols_metadata = SymbolTableManager.load_shared_symbols(symbols_path, file_name)
     
             if not symbols_tree and not symbols_metadata:
                 continue
@@ -184,9 +358,6 @@ class SymbolTableManager:
     
         for dep_file_path in dependencies:
             symbols_path = SymbolTableManager.build_symbols_path(ibc_root, dep_file_path)
-            if not os.path.exists(symbols_path):
-                return False
-    
             file_name = os.path.basename(dep_file_path)
             dir_symbols = SymbolTableManager._load_dir_symbols(symbols_path)
             file_symbol_data = dir_symbols.get(file_name, {})
@@ -288,6 +459,8 @@ class SymbolTableManager:
     def _load_dir_symbols(symbols_path: str) -> Dict[str, Any]:
         """内部方法：加载目录级符号表，文件不存在时返回空字典
         
+        返回的字典来自缓存，调用方不得修改。
+        
         Args:
             symbols_path: 目录级符号表文件路径
             
@@ -297,11 +470,176 @@ class SymbolTableManager:
         Raises:
             IOError: 读取失败时抛出
         """
-        if not os.path.exists(symbols_path):
-            return {}
+        entry = SymbolTableManager._get_cache_entry(symbols_path)
+        return entry.dir_symbols if entry is not None else {}
+    
+    @staticmethod
+    def _get_cache_entry(symbols_path: str) -> Optional[_DirSymbolsCacheEntry]:
+        """内部方法：获取目录级符号表的缓存项
+        
+        symbols.json或任一分片的修改时间、大小变化时重新构建缓存项，只重新解析发生变化的文件。
+        
+        Returns:
+            Optional[_DirSymbolsCacheEntry]: 缓存项，symbols.json与分片均不存在时返回None
+            
+        Raises:
+            IOError: 读取失败时抛出
+        """
+        cache_key = os.path.abspath(symbols_path)
+        try:
+            dir_stamp = SymbolTableManager._stat_stamp(symbols_path)
+            shard_stamps = SymbolTableManager._scan_shard_stamps(symbols_path)
+        except OSError as e:
+            raise IOError(f"读取符号表失败 [{symbols_path}]: {e}") from e
+        
+        entry = SymbolTableManager._dir_symbols_cache.get(cache_key)
+        if dir_stamp is None and not shard_stamps:
+            SymbolTableManager._dir_symbols_cache.pop(cache_key, None)
+            return None
+        if entry is not None and entry.dir_stamp == dir_stamp and entry.shard_stamps == shard_stamps:
+            return entry
         
+        # 只重新解析变化的symbols.json或分片
+        # 分片在扫描后被删除（例如其他写入者正在合并）时，本次结果不写入缓存，下次重新扫描
+        cacheable = True
         try:
-            with open(symbols_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            if entry is not None and entry.dir_stamp == dir_stamp:
+                dir_data = entry.dir_data
+            else:
+                dir_data = SymbolTableManager._read_json(symbols_path) if dir_stamp is not None else {}
+            
+            shard_dir = SymbolTableManager._build_shard_dir(symbols_path)
+            shard_data: Dict[str, Any] = {}
+            for file_name, stamp in shard_stamps.items():
+                if entry is not None and entry.shard_stamps.get(file_name) == stamp:
+                    shard_data[file_name] = entry.shard_data[file_name]
+                    continue
+                try:
+                    shard_data[file_name] = SymbolTableManager._read_json(
+                        os.path.join(shard_dir, file_name + _SHARD_SUFFIX)
+                    )
+                except FileNotFoundError:
+                    cacheable = False
         except Exception as e:
+            SymbolTableManager._dir_symbols_cache.pop(cache_key, None)
             raise IOError(f"读取符号表失败 [{symbols_path}]: {e}") from e
+        
+        dir_symbols = dict(dir_data)
+        dir_symbols.update(shard_data)
+        new_entry = _DirSymbolsCacheEntry(
+            dir_stamp=dir_stamp,
+            shard_stamps=shard_stamps,
+            dir_data=dir_data,
+            shard_data=shard_data,
+            dir_symbols=dir_symbols,
+        )
+        if entry is not None:
+            # 原始数据未变化的文件沿用已转换的符号对象
+            for file_name, file_symbols in entry.file_symbols.items():
+                if file_name in dir_symbols and dir_symbols[file_name] is entry.dir_symbols.get(file_name):
+                    new_entry.file_symbols[file_name] = file_symbols
+        
+        if cacheable:
+            SymbolTableManager._dir_symbols_cache[cache_key] = new_entry
+        else:
+            SymbolTableManager._dir_symbols_cache.pop(cache_key, None)
+        return new_entry
+    
+    @staticmethod
+    def _build_shard_dir(symbols_path: str) -> str:
+        """内部方法：symbols.json对应的分片目录"""
+        return os.path.join(os.path.dirname(symbols_path), SHARD_DIR_NAME)
+    
+    @staticmethod
+    def _stat_stamp(path: str) -> Optional[Tuple[int, int]]:
+        """内部方法：文件的 (st_mtime_ns, st_size)，文件不存在时返回None"""
+        try:
+            stat_result = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return stat_result.st_mtime_ns, stat_result.st_size
+    
+    @staticmethod
+    def _scan_shard_stamps(symbols_path: str) -> Dict[str, Tuple[int, int]]:
+        """内部方法：扫描分片目录，返回 {文件名: (st_mtime_ns, st_size)}，忽略写入中的临时文件"""
+        try:
+            dir_entries = os.scandir(SymbolTableManager._build_shard_dir(symbols_path))
+        except (FileNotFoundError, NotADirectoryError):
+            return {}
+        
+        shard_stamps: Dict[str, Tuple[int, int]] = {}
+        with dir_entries:
+            for dir_entry in dir_entries:
+                if not dir_entry.name.endswith(_SHARD_SUFFIX):
+                    continue
+                try:
+                    stat_result = dir_entry.stat()
+                except FileNotFoundError:
+                    continue
+                shard_stamps[dir_entry.name[:-len(_SHARD_SUFFIX)]] = (stat_result.st_mtime_ns, stat_result.st_size)
+        return shard_stamps
+    
+    @staticmethod
+    def _remove_merged_shards(symbols_path: str, shard_stamps: Dict[str, Tuple[int, int]]) -> None:
+        """内部方法：删除内容已写入symbols.json的分片，读取后又被更新过的分片保留"""
+        shard_dir = SymbolTableManager._build_shard_dir(symbols_path)
+        for file_name, stamp in shard_stamps.items():
+            shard_path = os.path.join(shard_dir, file_name + _SHARD_SUFFIX)
+            if SymbolTableManager._stat_stamp(shard_path) != stamp:
+                continue
+            try:
+                os.remove(shard_path)
+            except FileNotFoundError:
+                pass
+        if shard_stamps:
+            try:
+                os.rmdir(shard_dir)
+            except OSError:
+                # 分片目录非空（有新的分片）或已被删除
+                pass
+    
+    @staticmethod
+    def _read_json(path: str) -> Any:
+        """内部方法：读取JSON文件"""
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
+    @staticmethod
+    def _write_json_atomic(path: str, data: Any, indent: Optional[int]) -> None:
+        """内部方法：先写入同目录下的临时文件再原子替换，读取方不会看到写了一半的文件"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=indent)
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+    
+    @staticmethod
+    def _convert_file_symbols(file_symbol_data: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, SymbolMetadata]]:
+        """内部方法：将单个文件的原始符号数据转换为新建的符号树和SymbolMetadata对象"""
+        symbols_tree = SymbolTableManager._copy_tree(file_symbol_data.get("symbols_tree", {}))
+        symbols_metadata_dict = file_symbol_data.get("symbols_metadata", {})
+        
+        # 将字典转换为SymbolMetadata对象
+        symbols_metadata: Dict[str, SymbolMetadata] = {}
+        for path, meta_dict in symbols_metadata_dict.items():
+            try:
+                symbols_metadata[path] = create_symbol_metadata(meta_dict)
+            except ValueError as e:
+                # 如果无法识别符号类型，跳过该符号
+                print(f"警告: 无法加载符号 {path}: {e}")
+                continue
+
+        return symbols_tree, symbols_metadata
+    
+    @staticmethod
+    def _copy_tree(node: Dict[str, Any]) -> Dict[str, Any]:
+        """内部方法：复制符号树的各层字典，避免调用方修改缓存中的原始数据"""
+        return {key: SymbolTableManager._copy_tree(value) if isinstance(value, dict) else value
+                for key, value in node.items()}
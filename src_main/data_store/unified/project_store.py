@@ -2,6 +2,7 @@ import json
 import os
 from typing import Any, Dict, List, Optional, Tuple
 
+from data_store.ibc_ast_binary_format import IbcAstBinaryFormat
 from libs.dir_json_funcs import DirJsonFuncs
 from typedef.ibc_data_types import (BehaviorStepNode, ClassNode, FunctionNode,
                                     IbcBaseAstNode, ModuleNode, SymbolMetadata,
@@ -96,16 +97,66 @@ class ProjectStore:
     # --- AST ---
 
     def build_ast_path(self, file_path: str) -> str:
-        """Returns the full path to the AST file."""
-        # Legacy format: file_path + "_ibc_ast.json"
+        """Returns the full path to the binary AST file."""
         # file_path is like "utils/my_util"
         ibc_dir = self.path_manager.get_ibc_dir()
         normalized_path = file_path.replace('/', os.sep)
+        return os.path.join(ibc_dir, f"{normalized_path}_ibc_ast.bin")
+
+    def build_ast_json_path(self, file_path: str) -> str:
+        """Returns the full path to the JSON AST file (legacy format, now export only)."""
+        ibc_dir = self.path_manager.get_ibc_dir()
+        normalized_path = file_path.replace('/', os.sep)
         return os.path.join(ibc_dir, f"{normalized_path}_ibc_ast.json")
 
     def save_ast(self, file_path: str, ast_dict: Dict[int, IbcBaseAstNode]):
         path = self.build_ast_path(file_path)
         os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            data = IbcAstBinaryFormat.encode(ast_dict)
+            with open(path, 'wb') as f:
+                f.write(data)
+        except Exception as e:
+            print(f"Error saving AST {file_path}: {e}")
+
+    def load_ast(self, file_path: str) -> Dict[int, IbcBaseAstNode]:
+        path = self.build_ast_path(file_path)
+        if not os.path.exists(path):
+            # Fall back to an AST saved in the legacy JSON format
+            return self._load_ast_json(file_path)
+
+        try:
+            with open(path, 'rb') as f:
+                return IbcAstBinaryFormat.decode(f.read())
+        except Exception as e:
+            print(f"Error loading AST {file_path}: {e}")
+            return {}
+
+    def load_ast_subtree(self, file_path: str, root_uid: int) -> Dict[int, IbcBaseAstNode]:
+        """Loads only the subtree rooted at root_uid, reading just the index and the records it needs."""
+        path = self.build_ast_path(file_path)
+        if not os.path.exists(path):
+            ast_dict = self._load_ast_json(file_path)
+            subtree = {}
+            pending = [root_uid]
+            while pending:
+                uid = pending.pop()
+                if uid in ast_dict and uid not in subtree:
+                    subtree[uid] = ast_dict[uid]
+                    pending.extend(ast_dict[uid].children_uids)
+            return subtree
+
+        try:
+            with open(path, 'rb') as f:
+                return IbcAstBinaryFormat.read_subtree(f, root_uid)
+        except Exception as e:
+            print(f"Error loading AST subtree {file_path}: {e}")
+            return {}
+
+    def export_ast_json(self, file_path: str, ast_dict: Dict[int, IbcBaseAstNode]):
+        """Writes a human-readable JSON copy of the AST next to the binary file."""
+        path = self.build_ast_json_path(file_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
         
         serializable_dict = {}
         for uid, node in ast_dict.items():
@@ -117,10 +168,10 @@ class ProjectStore:
             with open(path, 'w', encoding='utf-8') as f:
                 json.dump(serializable_dict, f, ensure_ascii=False, indent=2)
         except Exception as e:
-            print(f"Error saving AST {file_path}: {e}")
+            print(f"Error exporting AST {file_path}: {e}")
 
-    def load_ast(self, file_path: str) -> Dict[int, IbcBaseAstNode]:
-        path = self.build_ast_path(file_path)
+    def _load_ast_json(self, file_path: str) -> Dict[int, IbcBaseAstNode]:
+        path = self.build_ast_json_path(file_path)
         if not os.path.exists(path):
             return {}
         
@@ -1,7 +1,178 @@
 """验证数据管理器 - 专门处理IBC文件校验码的存储与加载"""
+import copy
 import json
 import os
-from typing import Dict, List
+import threading
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+VERIFY_FILE_NAME = 'icp_verify_data.json'
+
+# 当前进程中处于打开状态的校验数据会话 {verify文件绝对路径: 会话}
+_active_sessions: Dict[str, 'VerifyDataSession'] = {}
+_active_sessions_lock = threading.Lock()
+
+
+class _VerifyFileLock:
+    """verify文件的进程间互斥锁，通过对同目录下的 .lock 文件加排他锁实现
+    
+    锁基于每次打开的文件句柄，同一进程内的不同线程同样互斥。
+    """
+    
+    def __init__(self, verify_file_path: str):
+        self.lock_path = f"{verify_file_path}.lock"
+        self._lock_file = None
+    
+    def __enter__(self) -> '_VerifyFileLock':
+        os.makedirs(os.path.dirname(self.lock_path) or '.', exist_ok=True)
+        self._lock_file = open(self.lock_path, 'a+b')
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX)
+            else:
+                self._lock_file.seek(0)
+                while True:
+                    try:
+                        # LK_LOCK 重试约10秒后仍失败会抛出异常，此时继续等待
+                        msvcrt.locking(self._lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        continue
+        except BaseException:
+            self._lock_file.close()
+            self._lock_file = None
+            raise
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+            else:
+                self._lock_file.seek(0)
+                msvcrt.locking(self._lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self._lock_file.close()
+            self._lock_file = None
+
+
+class VerifyDataSession:
+    """校验数据会话 - verify文件的写回缓存
+    
+    会话内首次读取时加载一次verify文件，之后的读取与修改都在内存中进行，修改按顺序记录为待提交操作。
+    提交时加文件锁，重新读取磁盘上的最新内容，按顺序重放待提交操作，再写入临时文件后原子替换，
+    因此并行的进程各自提交也不会互相覆盖对方的修改，中途中断也不会留下写了一半的verify文件。
+    
+    会话以上下文管理器使用，退出时自动提交；发生异常时丢弃尚未提交的修改。
+    会话打开期间，VerifyDataManager 中针对同一数据目录的读写会自动使用该会话。
+    同一进程内对同一数据目录重复打开会话时返回同一个会话对象，最外层退出时才提交。
+    """
+    
+    def __init__(self, data_dir_path: str):
+        self.data_dir_path = data_dir_path
+        self.verify_file_path = os.path.abspath(os.path.join(data_dir_path, VERIFY_FILE_NAME))
+        self._lock = threading.RLock()
+        self._depth = 0
+        # 内存中的校验数据，首次读取时才加载verify文件
+        self._data: Optional[Dict[str, Dict[str, str]]] = None
+        # 待提交操作: (文件路径, 是否整体替换, 数据)
+        self._pending: List[Tuple[str, bool, Dict[str, str]]] = []
+    
+    def __enter__(self) -> 'VerifyDataSession':
+        with _active_sessions_lock:
+            with self._lock:
+                self._depth += 1
+            _active_sessions.setdefault(self.verify_file_path, self)
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        with _active_sessions_lock:
+            with self._lock:
+                self._depth -= 1
+                is_outermost = self._depth == 0
+            if is_outermost and _active_sessions.get(self.verify_file_path) is self:
+                del _active_sessions[self.verify_file_path]
+        if not is_outermost:
+            return
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+    
+    @property
+    def has_pending_changes(self) -> bool:
+        """是否存在尚未提交的修改"""
+        with self._lock:
+            return bool(self._pending)
+    
+    def get(self, file_path: str) -> Dict[str, str]:
+        """获取指定文件的校验数据副本，不存在时返回空字典"""
+        with self._lock:
+            return dict(self._load().get(file_path, {}))
+    
+    def get_all(self) -> Dict[str, Dict[str, str]]:
+        """获取全部文件的校验数据副本"""
+        with self._lock:
+            return copy.deepcopy(self._load())
+    
+    def save(self, file_path: str, verify_data: Dict[str, str]) -> None:
+        """整体替换指定文件的校验数据"""
+        with self._lock:
+            if self._data is not None:
+                self._data[file_path] = dict(verify_data)
+            self._pending.append((file_path, True, dict(verify_data)))
+    
+    def update(self, file_path: str, updates: Dict[str, str]) -> None:
+        """更新指定文件校验数据中的特定字段，保留其他字段不变"""
+        with self._lock:
+            if self._data is not None:
+                self._data.setdefault(file_path, {}).update(updates)
+            self._pending.append((file_path, False, dict(updates)))
+    
+    def commit(self) -> None:
+        """将待提交的修改合并到磁盘上的最新内容并原子写回
+        
+        Raises:
+            IOError: 保存失败时抛出，待提交的修改保留，可再次提交
+        """
+        with self._lock:
+            if not self._pending:
+                return
+            try:
+                with _VerifyFileLock(self.verify_file_path):
+                    all_verify_data = self._apply_pending(VerifyDataManager._read_verify_file(self.verify_file_path))
+                    VerifyDataManager._write_verify_file(self.verify_file_path, all_verify_data)
+            except Exception as e:
+                raise IOError(f"保存verify文件失败 [{self.verify_file_path}]: {e}") from e
+            self._data = all_verify_data
+            self._pending = []
+    
+    def rollback(self) -> None:
+        """丢弃尚未提交的修改，之后的读取重新加载磁盘上的内容"""
+        with self._lock:
+            self._pending = []
+            self._data = None
+    
+    def _load(self) -> Dict[str, Dict[str, str]]:
+        """内部方法：首次读取时加载verify文件，并重放尚未提交的修改"""
+        if self._data is None:
+            self._data = self._apply_pending(VerifyDataManager._read_verify_file(self.verify_file_path))
+        return self._data
+    
+    def _apply_pending(self, all_verify_data: Dict[str, Dict[str, str]]) -> Dict[str, Dict[str, str]]:
+        """内部方法：按顺序将待提交操作应用到给定的校验数据上"""
+        for file_path, is_replace, data in self._pending:
+            if is_replace:
+                all_verify_data[file_path] = dict(data)
+            else:
+                all_verify_data.setdefault(file_path, {}).update(data)
+        return all_verify_data
 
 
 class VerifyDataManager:
@@ -26,10 +197,45 @@ class VerifyDataManager:
             "ibc_verify_code": "xyz789..."
         }
     }
+    
+    新版verify文件的写入均在文件锁保护下合并最新内容后原子替换。
+    需要连续修改多个文件的校验数据时，应通过 open_session 打开会话批量提交，
+    避免每次修改都完整读写一次verify文件。
     """
     
     # ==================== 新版统一verify文件管理 ====================
     
+    @staticmethod
+    def open_session(data_dir_path: str) -> VerifyDataSession:
+        """打开校验数据会话，以上下文管理器使用
+        
+        当前进程中该数据目录已有打开的会话时返回该会话（嵌套使用）。
+        
+        Example:
+            >>> with VerifyDataManager.open_session(data_dir_path) as session:
+            ...     for file_path in file_paths:
+            ...         session.update(file_path, {"ibc_verify_code": md5_dict[file_path]})
+        """
+        session = VerifyDataManager._get_active_session(data_dir_path)
+        return session if session is not None else VerifyDataSession(data_dir_path)
+    
+    @staticmethod
+    def load_all_verify_data(data_dir_path: str) -> Dict[str, Dict[str, str]]:
+        """一次性加载统一verify文件中全部文件的校验数据
+        
+        需要逐个检查大量文件时使用，避免每个文件都重新读取和解析verify文件。
+        
+        Args:
+            data_dir_path: 数据目录路径（通常为 icp_proj_data）
+        
+        Returns:
+            Dict[str, Dict[str, str]]: {文件路径: 校验数据}，文件不存在或读取失败时返回空字典
+        """
+        session = VerifyDataManager._get_active_session(data_dir_path)
+        if session is not None:
+            return session.get_all()
+        return VerifyDataManager._read_verify_file(os.path.join(data_dir_path, VERIFY_FILE_NAME))
+    
     @staticmethod
     def load_file_verify_data(data_dir_path: str, file_path: str) -> Dict[str, str]:
         """从统一的verify文件中加载指定文件的校验数据
@@ -41,23 +247,18 @@ class VerifyDataManager:
         Returns:
             Dict[str, str]: 该文件的校验数据，不存在时返回空字典
         """
-        verify_file_path = os.path.join(data_dir_path, 'icp_verify_data.json')
-        
-        if not os.path.exists(verify_file_path):
-            return {}
-        
-        try:
-            with open(verify_file_path, 'r', encoding='utf-8') as f:
-                all_verify_data = json.load(f)
-            return all_verify_data.get(file_path, {})
-        except Exception as e:
-            # 不抛出异常，返回空字典，避免阻塞流程
-            return {}
+        session = VerifyDataManager._get_active_session(data_dir_path)
+        if session is not None:
+            return session.get(file_path)
+        all_verify_data = VerifyDataManager._read_verify_file(os.path.join(data_dir_path, VERIFY_FILE_NAME))
+        return all_verify_data.get(file_path, {})
     
     @staticmethod
     def save_file_verify_data(data_dir_path: str, file_path: str, verify_data: Dict[str, str]) -> None:
         """将指定文件的校验数据保存到统一的verify文件中
         
+        有打开的会话时只写入会话，由会话统一提交。
+        
         Args:
             data_dir_path: 数据目录路径（通常为 icp_proj_data）
             file_path: 文件路径（如 "src/ball_physics/ball"）
@@ -66,28 +267,8 @@ class VerifyDataManager:
         Raises:
             IOError: 保存失败时抛出
         """
-        verify_file_path = os.path.join(data_dir_path, 'icp_verify_data.json')
-        
-        # 加载所有verify数据
-        all_verify_data = {}
-        if os.path.exists(verify_file_path):
-            try:
-                with open(verify_file_path, 'r', encoding='utf-8') as f:
-                    all_verify_data = json.load(f)
-            except Exception as e:
-                # 读取失败时使用空字典
-                all_verify_data = {}
-        
-        # 更新当前文件的数据
-        all_verify_data[file_path] = verify_data
-        
-        # 保存回文件
-        try:
-            os.makedirs(data_dir_path, exist_ok=True)
-            with open(verify_file_path, 'w', encoding='utf-8') as f:
-                json.dump(all_verify_data, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            raise IOError(f"保存verify文件失败 [{verify_file_path}]: {e}") from e
+        with VerifyDataManager.open_session(data_dir_path) as session:
+            session.save(file_path, verify_data)
     
     @staticmethod
     def update_file_verify_data(data_dir_path: str, file_path: str, updates: Dict[str, str]) -> None:
@@ -95,6 +276,7 @@ class VerifyDataManager:
         
         此方法会自动加载现有数据，合并更新，然后保存。
         相比 save_file_verify_data，此方法只更新指定的字段，保留其他字段不变。
+        有打开的会话时只写入会话，由会话统一提交。
         
         Args:
             data_dir_path: 数据目录路径（通常为 icp_proj_data）
@@ -109,14 +291,8 @@ class VerifyDataManager:
             ...     {"ibc_verify_code": "abc123"}
             ... )
         """
-        # 加载现有的验证数据
-        verify_data = VerifyDataManager.load_file_verify_data(data_dir_path, file_path)
-        
-        # 合并更新
-        verify_data.update(updates)
-        
-        # 保存回去
-        VerifyDataManager.save_file_verify_data(data_dir_path, file_path, verify_data)
+        with VerifyDataManager.open_session(data_dir_path) as session:
+            session.update(file_path, updates)
     
     @staticmethod
     def batch_update_ibc_verify_codes(
@@ -126,6 +302,8 @@ class VerifyDataManager:
     ) -> None:
         """批量更新所有ibc文件的MD5校验码到统一的verify文件
         
+        所有文件的校验码在同一个会话中修改，最后只写入一次verify文件。
+        
         Args:
             data_dir_path: 数据目录路径（通常为 icp_proj_data）
             ibc_root: IBC根目录路径
@@ -134,27 +312,64 @@ class VerifyDataManager:
         from data_store.ibc_file_manager import IbcFileManager
         from libs.ibc_funcs import IbcFuncs
         
-        for file_path in file_paths:
-            ibc_path = IbcFileManager.build_ibc_path(ibc_root, file_path)
-            
-            if not os.path.exists(ibc_path):
-                continue
-            
-            try:
-                ibc_content = IbcFileManager.load_ibc_content(ibc_path)
-                if not ibc_content:
-                    continue
+        with VerifyDataManager.open_session(data_dir_path) as session:
+            for file_path in file_paths:
+                ibc_path = IbcFileManager.build_ibc_path(ibc_root, file_path)
                 
-                # 计算MD5
-                current_md5 = IbcFuncs.calculate_text_md5(ibc_content)
+                if not os.path.exists(ibc_path):
+                    continue
                 
-                # 使用 update 方法只更新 ibc_verify_code 字段
-                VerifyDataManager.update_file_verify_data(data_dir_path, file_path, {
-                    'ibc_verify_code': current_md5
-                })
-            except Exception as e:
-                # 单个文件失败不影响其他文件
-                continue
+                try:
+                    ibc_content = IbcFileManager.load_ibc_content(ibc_path)
+                    if not ibc_content:
+                        continue
+                    
+                    # 计算MD5
+                    current_md5 = IbcFuncs.calculate_text_md5(ibc_content)
+                    
+                    # 只更新 ibc_verify_code 字段
+                    session.update(file_path, {
+                        'ibc_verify_code': current_md5
+                    })
+                except Exception as e:
+                    # 单个文件失败不影响其他文件
+                    continue
+    
+    @staticmethod
+    def _get_active_session(data_dir_path: str) -> Optional[VerifyDataSession]:
+        """内部方法：获取当前进程中该数据目录已打开的会话"""
+        verify_file_path = os.path.abspath(os.path.join(data_dir_path, VERIFY_FILE_NAME))
+        with _active_sessions_lock:
+            return _active_sessions.get(verify_file_path)
+    
+    @staticmethod
+    def _read_verify_file(verify_file_path: str) -> Dict[str, Dict[str, str]]:
+        """内部方法：读取verify文件，不存在或读取失败时返回空字典（不抛出异常，避免阻塞流程）"""
+        if not os.path.exists(verify_file_path):
+            return {}
+        
+        try:
+            with open(verify_file_path, 'r', encoding='utf-8') as f:
+                all_verify_data = json.load(f)
+            return all_verify_data if isinstance(all_verify_data, dict) else {}
+        except Exception as e:
+            return {}
+    
+    @staticmethod
+    def _write_verify_file(verify_file_path: str, all_verify_data: Dict[str, Dict[str, str]]) -> None:
+        """内部方法：先写入同目录下的临时文件再原子替换，读取方不会看到写了一半的verify文件"""
+        os.makedirs(os.path.dirname(verify_file_path), exist_ok=True)
+        temp_path = f"{verify_file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(all_verify_data, f, indent=2, ensure_ascii=False)
+            os.replace(temp_path, verify_file_path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
     
     # ==================== 旧版校验数据管理（等待废弃，保留以保持向后兼容） ====================
     
@@ -60,6 +60,7 @@ class LLMGenerateState(FlowState):
             
         # 5. Clean Result and Store
         cleaned_content = ChatResponseCleaner.clean_code_block_markers(response)
+        ctx.last_response = response
         ctx.last_generated_content = cleaned_content
         
         return self.next_state
@@ -90,6 +91,8 @@ class ValidationState(FlowState):
         
         if is_valid:
             print(f"    {Colors.OKGREEN}Validation Passed{Colors.ENDC}")
+            # Only validated responses go into the response cache
+            ctx.chat_handler.accept_response(ctx.last_sys_prompt, ctx.last_user_prompt, ctx.last_response)
             return self.success_state
         else:
             issue_count = ctx.issue_recorder.get_issue_count()
@@ -149,6 +152,7 @@ class AnalysisAndFixState(FlowState):
         )
         
         if success:
+            ctx.chat_handler.accept_response(analysis_sys_prompt, analysis_user_prompt, fix_suggestion_raw)
             ctx.fix_suggestion = fix_suggestion_raw
             print(f"    [Diagnosis] Fix suggestion received: {fix_suggestion_raw[:50]}...")
         else:
@@ -197,6 +201,7 @@ class LLMRetryExecutionState(FlowState):
         ctx.last_user_prompt = retry_user_prompt
         # Sys prompt remains the same as base
         sys_prompt = ctx.base_sys_prompt
+        ctx.last_sys_prompt = sys_prompt
         
         # 2. Call API
         response, success = await ctx.chat_handler.get_role_response(
@@ -211,6 +216,7 @@ class LLMRetryExecutionState(FlowState):
 
         # 3. Clean Result
         cleaned_content = ChatResponseCleaner.clean_code_block_markers(response)
+        ctx.last_response = response
         ctx.last_generated_content = cleaned_content
         
         return self.next_state
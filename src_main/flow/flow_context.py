@@ -32,6 +32,7 @@ class FlowContext:
     
     # Process Artifacts
     last_generated_content: Optional[str] = None
+    last_response: str = ""  # Raw model response, committed to the response cache once validated
     last_sys_prompt: str = ""
     last_user_prompt: str = ""
     
@@ -50,6 +51,7 @@ class FlowContext:
         self.current_file_path = file_path
         self.current_attempt = 0
         self.last_generated_content = None
+        self.last_response = ""
         self.last_sys_prompt = ""
         self.last_user_prompt = ""
         self.base_sys_prompt = ""
@@ -0,0 +1,180 @@
+import json
+from collections import deque
+from typing import Dict, Iterable, List
+
+
+class DependencyGraph:
+    """文件依赖图
+
+    基于依赖关系表（icp_dir_content_with_depend.json 中的 dependent_relation）一次性构建：
+    - 文件路径与整数编号的双向映射，依赖表中只作为依赖出现的文件同样分配编号
+    - 正向邻接表（文件 -> 直接依赖）与反向邻接表（文件 -> 直接依赖它的文件）
+    - 传递闭包位集：每个文件的全部（直接与间接）依赖、全部依赖它的文件，以Python整数按位保存
+    - 依赖深度：文件到最底层依赖的最长依赖链长度，无依赖的文件为0
+
+    构建后“A是否（间接）依赖B”为一次位运算；列出全部依赖方/依赖项只与结果数量k相关。
+    依赖表在构建后发生变化时需要重新构建。
+    """
+
+    def __init__(self, dependent_relation: Dict[str, List[str]]):
+        self.file_paths: List[str] = []
+        self.file_ids: Dict[str, int] = {}
+
+        for file_path, dependencies in dependent_relation.items():
+            self._add_file(file_path)
+            for dep_path in dependencies or []:
+                self._add_file(dep_path)
+
+        file_count = len(self.file_paths)
+        self._dependencies: List[List[int]] = [[] for _ in range(file_count)]
+        self._dependents: List[List[int]] = [[] for _ in range(file_count)]
+        self._direct_bits: List[int] = [0] * file_count
+        for file_path, dependencies in dependent_relation.items():
+            file_id = self.file_ids[file_path]
+            for dep_id in dict.fromkeys(self.file_ids[dep_path] for dep_path in dependencies or []):
+                self._dependencies[file_id].append(dep_id)
+                self._dependents[dep_id].append(file_id)
+                self._direct_bits[file_id] |= 1 << dep_id
+
+        self._dependency_bits: List[int] = [0] * file_count
+        self._dependent_bits: List[int] = [0] * file_count
+        self._depths: List[int] = [-1] * file_count
+        self.has_cycle = not self._build_closure()
+
+    @classmethod
+    def load(cls, depend_json_path: str) -> 'DependencyGraph':
+        """从依赖分析结果文件（icp_dir_content_with_depend.json）构建依赖图
+
+        Raises:
+            IOError: 读取或解析失败时抛出
+        """
+        try:
+            with open(depend_json_path, 'r', encoding='utf-8') as f:
+                dir_json_dict = json.load(f)
+        except Exception as e:
+            raise IOError(f"读取依赖分析结果失败 [{depend_json_path}]: {e}") from e
+        return cls(dir_json_dict.get('dependent_relation', {}))
+
+    def _add_file(self, file_path: str) -> None:
+        if file_path not in self.file_ids:
+            self.file_ids[file_path] = len(self.file_paths)
+            self.file_paths.append(file_path)
+
+    def _build_closure(self) -> bool:
+        """按拓扑顺序计算传递闭包与依赖深度，存在循环依赖时返回False
+
+        存在循环依赖时改为逐个文件广度优先计算闭包，环上及（间接）依赖环的文件深度为-1。
+        """
+        file_count = len(self.file_paths)
+        remaining = [len(dependencies) for dependencies in self._dependencies]
+        queue = deque(file_id for file_id in range(file_count) if remaining[file_id] == 0)
+        topo_order: List[int] = []
+        while queue:
+            file_id = queue.popleft()
+            topo_order.append(file_id)
+            bits = 0
+            depth = 0
+            for dep_id in self._dependencies[file_id]:
+                bits |= self._dependency_bits[dep_id] | (1 << dep_id)
+                depth = max(depth, self._depths[dep_id] + 1)
+            self._dependency_bits[file_id] = bits
+            self._depths[file_id] = depth
+            for dependent_id in self._dependents[file_id]:
+                remaining[dependent_id] -= 1
+                if remaining[dependent_id] == 0:
+                    queue.append(dependent_id)
+
+        if len(topo_order) == file_count:
+            for file_id in reversed(topo_order):
+                bits = 0
+                for dependent_id in self._dependents[file_id]:
+                    bits |= self._dependent_bits[dependent_id] | (1 << dependent_id)
+                self._dependent_bits[file_id] = bits
+            return True
+
+        for file_id in range(file_count):
+            self._dependency_bits[file_id] = self._reachable_bits(file_id, self._dependencies)
+            self._dependent_bits[file_id] = self._reachable_bits(file_id, self._dependents)
+        return False
+
+    @staticmethod
+    def _reachable_bits(start_id: int, adjacency: List[List[int]]) -> int:
+        """沿邻接表从start_id出发可到达的文件位集（不含start_id自身，除非处于环上）"""
+        bits = 0
+        queue = deque(adjacency[start_id])
+        while queue:
+            file_id = queue.popleft()
+            if bits >> file_id & 1:
+                continue
+            bits |= 1 << file_id
+            queue.extend(adjacency[file_id])
+        return bits
+
+    def _paths_of(self, bits: int) -> List[str]:
+        """位集中的文件路径，按编号顺序排列"""
+        paths = []
+        while bits:
+            low_bit = bits & -bits
+            paths.append(self.file_paths[low_bit.bit_length() - 1])
+            bits ^= low_bit
+        return paths
+
+    def __contains__(self, file_path: str) -> bool:
+        return file_path in self.file_ids
+
+    def __len__(self) -> int:
+        return len(self.file_paths)
+
+    def get_dependencies(self, file_path: str) -> List[str]:
+        """文件的直接依赖，保持依赖表中的顺序"""
+        file_id = self.file_ids.get(file_path)
+        if file_id is None:
+            return []
+        return [self.file_paths[dep_id] for dep_id in self._dependencies[file_id]]
+
+    def get_dependents(self, file_path: str) -> List[str]:
+        """直接依赖该文件的文件"""
+        file_id = self.file_ids.get(file_path)
+        if file_id is None:
+            return []
+        return [self.file_paths[dependent_id] for dependent_id in self._dependents[file_id]]
+
+    def get_all_dependencies(self, file_path: str) -> List[str]:
+        """文件的全部直接与间接依赖"""
+        file_id = self.file_ids.get(file_path)
+        return self._paths_of(self._dependency_bits[file_id]) if file_id is not None else []
+
+    def get_all_dependents(self, file_path: str) -> List[str]:
+        """直接或间接依赖该文件的全部文件，即该文件变化时需要随之更新的文件"""
+        file_id = self.file_ids.get(file_path)
+        return self._paths_of(self._dependent_bits[file_id]) if file_id is not None else []
+
+    def get_all_dependents_of(self, file_paths: Iterable[str]) -> List[str]:
+        """直接或间接依赖给定任一文件的全部文件（不含给定文件本身，除非它依赖其他给定文件）"""
+        bits = 0
+        for file_path in file_paths:
+            file_id = self.file_ids.get(file_path)
+            if file_id is not None:
+                bits |= self._dependent_bits[file_id]
+        return self._paths_of(bits)
+
+    def is_direct_dependency(self, file_path: str, dep_path: str) -> bool:
+        """dep_path是否为file_path的直接依赖"""
+        file_id = self.file_ids.get(file_path)
+        dep_id = self.file_ids.get(dep_path)
+        if file_id is None or dep_id is None:
+            return False
+        return bool(self._direct_bits[file_id] >> dep_id & 1)
+
+    def is_reachable(self, file_path: str, dep_path: str) -> bool:
+        """file_path是否直接或间接依赖dep_path"""
+        file_id = self.file_ids.get(file_path)
+        dep_id = self.file_ids.get(dep_path)
+        if file_id is None or dep_id is None:
+            return False
+        return bool(self._dependency_bits[file_id] >> dep_id & 1)
+
+    def get_depth(self, file_path: str) -> int:
+        """依赖深度：无依赖的文件为0，否则为直接依赖的最大深度加1；未知文件或处于循环依赖中时为-1"""
+        file_id = self.file_ids.get(file_path)
+        return self._depths[file_id] if file_id is not None else -1
@@ -0,0 +1,270 @@
+import contextvars
+import heapq
+import io
+import sys
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Tuple
+
+from libs.dependency_graph import DependencyGraph
+
+
+# 当前上下文的输出缓冲区，提交到异步运行时的协程继承调用方的上下文，其输出同样写入该缓冲区
+_capture_buffer: contextvars.ContextVar[Optional[io.StringIO]] = contextvars.ContextVar(
+    'file_task_capture_buffer', default=None
+)
+
+
+
+class _TaskCancelScope:
+    """一次并行调度的取消范围：调度被中断时通知仍在处理的文件停止"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._callbacks: Dict[int, Callable[[], None]] = {}
+        self._next_id = 0
+        self.cancelled = False
+
+    def add_callback(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """注册取消时调用的回调，返回注销函数；已取消时立即调用"""
+        with self._lock:
+            if not self.cancelled:
+                callback_id = self._next_id
+                self._next_id += 1
+                self._callbacks[callback_id] = callback
+                return lambda: self._remove_callback(callback_id)
+        callback()
+        return lambda: None
+
+    def _remove_callback(self, callback_id: int) -> None:
+        with self._lock:
+            self._callbacks.pop(callback_id, None)
+
+    def cancel(self) -> None:
+        with self._lock:
+            self.cancelled = True
+            callbacks = list(self._callbacks.values())
+            self._callbacks.clear()
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                pass
+
+
+# 当前上下文所属的取消范围，与输出缓冲区一样由提交到异步运行时的协程继承
+_cancel_scope: contextvars.ContextVar[Optional[_TaskCancelScope]] = contextvars.ContextVar(
+    'file_task_cancel_scope', default=None
+)
+
+
+def is_task_cancelled() -> bool:
+    """当前文件任务所属的调度是否已被中断，不在并行调度的任务中时返回False"""
+    scope = _cancel_scope.get()
+    return scope is not None and scope.cancelled
+
+
+def on_task_cancel(callback: Callable[[], None]) -> Callable[[], None]:
+    """注册当前文件任务被中断时调用的回调（如取消进行中的请求），返回注销函数
+
+    不在并行调度的任务中时不注册；所属调度已被中断时立即调用回调。
+    """
+    scope = _cancel_scope.get()
+    if scope is None:
+        return lambda: None
+    return scope.add_callback(callback)
+
+
+class _ThreadOutputRouter(io.TextIOBase):
+    """按上下文分流的标准输出
+
+    开启捕获的工作线程（及其提交到异步运行时的协程）写入各自的缓冲区，其余输出直接写入原始输出。
+    """
+
+    def __init__(self, target):
+        super().__init__()
+        self._target = target
+
+    @property
+    def encoding(self):
+        return getattr(self._target, 'encoding', 'utf-8')
+
+    def isatty(self) -> bool:
+        return self._target.isatty()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        buffer = _capture_buffer.get()
+        if buffer is not None:
+            return buffer.write(text)
+        return self._target.write(text)
+
+    def flush(self) -> None:
+        if _capture_buffer.get() is None:
+            self._target.flush()
+
+    def begin_capture(self) -> io.StringIO:
+        buffer = io.StringIO()
+        _capture_buffer.set(buffer)
+        return buffer
+
+    def end_capture(self) -> str:
+        buffer = _capture_buffer.get()
+        _capture_buffer.set(None)
+        return buffer.getvalue() if buffer is not None else ""
+
+    def write_through(self, text: str) -> None:
+        """绕过捕获直接写入原始输出"""
+        self._target.write(text)
+        self._target.flush()
+
+
+class FileTaskScheduler:
+    """按依赖关系调度逐文件任务
+
+    文件的全部依赖（仅计入本次调度的文件）成功完成后立即开始处理该文件，
+    相互独立的文件并行处理，同时处理的文件数不超过max_workers。
+
+    - max_workers为1时在当前线程中按文件列表顺序逐个处理，输出与逐文件循环完全一致
+    - 并行时每个文件的输出先写入各自的缓冲区，文件处理结束后整体输出，不同文件的输出不会交错
+    - 任一文件失败（返回False或抛出异常）后不再开始新的文件，等待已开始的文件结束后返回
+    - 调度被中断（如Ctrl-C）时不再等待已开始的文件：通过 on_task_cancel 注册的回调被调用，
+      is_task_cancelled 返回True，已捕获的输出立即写出后重新抛出中断
+    - 存在循环依赖时，没有可开始的文件时按文件列表顺序开始下一个文件，与逐文件循环一致
+    """
+
+    def __init__(self, dependency_graph: DependencyGraph, file_list: List[str], max_workers: int = 1):
+        """
+        Args:
+            dependency_graph: 依赖图
+            file_list: 按依赖顺序排列的待处理文件列表（被依赖的文件在前）
+            max_workers: 同时处理的最大文件数
+        """
+        self.dependency_graph = dependency_graph
+        self.file_list = file_list
+        self.max_workers = max(1, int(max_workers))
+        self.completed_files: List[str] = []
+        self.failed_files: List[str] = []
+        # 处理时抛出异常的文件 -> 异常
+        self.errors: Dict[str, BaseException] = {}
+
+    @property
+    def skipped_files(self) -> List[str]:
+        """因失败而未开始处理的文件，按文件列表顺序排列"""
+        finished = set(self.completed_files) | set(self.failed_files)
+        return [file_path for file_path in self.file_list if file_path not in finished]
+
+    def run(self, task: Callable[[str], bool]) -> bool:
+        """处理全部文件，全部成功时返回True
+
+        Args:
+            task: 单文件处理函数，参数为文件路径，返回是否成功；并行时会在工作线程中调用
+        """
+        self.completed_files = []
+        self.failed_files = []
+        self.errors = {}
+        if self.max_workers == 1 or len(self.file_list) <= 1:
+            for file_path in self.file_list:
+                if not self._run_task(task, file_path):
+                    return False
+            return True
+        return self._run_parallel(task)
+
+    def _run_task(self, task: Callable[[str], bool], file_path: str) -> bool:
+        try:
+            success = bool(task(file_path))
+        except Exception as e:
+            self.errors[file_path] = e
+            success = False
+        (self.completed_files if success else self.failed_files).append(file_path)
+        return success
+
+    def _run_parallel(self, task: Callable[[str], bool]) -> bool:
+        file_index = {file_path: index for index, file_path in enumerate(self.file_list)}
+        waiting_deps = {
+            file_path: {dep for dep in self.dependency_graph.get_dependencies(file_path) if dep in file_index}
+            for file_path in self.file_list
+        }
+        ready: List[int] = [file_index[f] for f in self.file_list if not waiting_deps[f]]
+        heapq.heapify(ready)
+        started = set()
+        running: Dict[Future, str] = {}
+
+        router = _ThreadOutputRouter(sys.stdout)
+        cancel_scope = _TaskCancelScope()
+        # 文件路径 -> 正在处理的文件的输出缓冲区，中断时写出
+        buffers: Dict[str, io.StringIO] = {}
+        original_stdout = sys.stdout
+        sys.stdout = router
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            while True:
+                if not self.failed_files:
+                    if not ready and not running and len(started) < len(self.file_list):
+                        # 循环依赖：按文件列表顺序开始下一个尚未开始的文件
+                        heapq.heappush(ready, next(i for i, f in enumerate(self.file_list) if f not in started))
+                    while ready and len(running) < self.max_workers:
+                        file_path = self.file_list[heapq.heappop(ready)]
+                        started.add(file_path)
+                        future = executor.submit(self._run_captured, router, cancel_scope, buffers, task, file_path)
+                        running[future] = file_path
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in sorted(done, key=lambda f: file_index[running[f]]):
+                    file_path = running.pop(future)
+                    success, output, error = future.result()
+                    router.write_through(output)
+                    if error is not None:
+                        self.errors[file_path] = error
+                    if not success:
+                        self.failed_files.append(file_path)
+                        continue
+                    self.completed_files.append(file_path)
+                    for dependent in self.dependency_graph.get_dependents(file_path):
+                        deps = waiting_deps.get(dependent)
+                        if deps is None or dependent in started or file_path not in deps:
+                            continue
+                        deps.discard(file_path)
+                        if not deps:
+                            heapq.heappush(ready, file_index[dependent])
+        except BaseException:
+            # 被中断（如Ctrl-C）：通知已开始的文件停止，不等待它们结束，写出已捕获的输出后重新抛出
+            cancel_scope.cancel()
+            executor.shutdown(wait=False, cancel_futures=True)
+            for file_path in sorted(running.values(), key=file_index.__getitem__):
+                buffer = buffers.get(file_path)
+                if buffer is not None:
+                    router.write_through(buffer.getvalue())
+            raise
+        else:
+            executor.shutdown(wait=True)
+        finally:
+            sys.stdout = original_stdout
+        return not self.failed_files
+
+    @staticmethod
+    def _run_captured(
+        router: _ThreadOutputRouter,
+        cancel_scope: _TaskCancelScope,
+        buffers: Dict[str, io.StringIO],
+        task: Callable[[str], bool],
+        file_path: str
+    ) -> Tuple[bool, str, Optional[BaseException]]:
+        """在工作线程中处理单个文件，返回 (是否成功, 捕获的输出, 异常)"""
+        buffers[file_path] = router.begin_capture()
+        scope_token = _cancel_scope.set(cancel_scope)
+        error = None
+        try:
+            success = bool(task(file_path))
+        except Exception as e:
+            success = False
+            error = e
+        finally:
+            _cancel_scope.reset(scope_token)
+            output = router.end_capture()
+            buffers.pop(file_path, None)
+        return success, output, error
@@ -0,0 +1,176 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+_CACHE_FILE_SUFFIX = '.json'
+
+
+class LlmResponseCache:
+    """模型响应的磁盘缓存
+
+    以「模型名称 + 系统提示词哈希 + 用户提示词哈希」为键，保存一次完整成功的模型响应文本。
+    崩溃后重新执行命令、或修改无关配置后重新执行时，内容完全相同的请求直接返回缓存的响应，
+    配合仅回放模式（replay-only）可以离线、确定地重新执行整个流程。
+
+    - 未设置缓存目录时缓存处于关闭状态，get/put 均不生效
+    - 读取时可指定有效期，超过有效期的条目视为未命中并被删除
+    - 缓存总大小超过上限时，按最近使用时间淘汰（LRU），使用时间记录在文件的修改时间上
+    - 写入采用临时文件 + 重命名，多进程同时写入同一条目时不会读到半截文件
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024):
+        self.cache_dir = ""
+        self.max_bytes = max_bytes
+        # 缓存条目索引：键 -> 文件大小，按最近使用顺序排列（末尾为最近使用）
+        self._index: Optional["OrderedDict[str, int]"] = None
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hit_count = 0
+        self.miss_count = 0
+
+    def set_cache_dir(self, cache_dir: str, max_bytes: Optional[int] = None) -> None:
+        """设置缓存目录（为空字符串时关闭缓存）"""
+        with self._lock:
+            self.cache_dir = cache_dir
+            if max_bytes is not None:
+                self.max_bytes = max_bytes
+            self._index = None
+            self._total_bytes = 0
+
+    def is_enabled(self) -> bool:
+        """缓存是否开启"""
+        return bool(self.cache_dir)
+
+    @staticmethod
+    def build_key(model: str, sys_prompt: str, user_prompt: str) -> str:
+        """根据模型名称与提示词构建缓存键"""
+        digest = hashlib.sha256()
+        for part in (
+            model,
+            hashlib.sha256(sys_prompt.encode('utf-8')).hexdigest(),
+            hashlib.sha256(user_prompt.encode('utf-8')).hexdigest(),
+        ):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def get(self, key: str, ttl_seconds: Optional[float] = None) -> Optional[str]:
+        """读取缓存的响应，未命中、已过期或缓存损坏时返回None
+
+        Args:
+            key: 缓存键
+            ttl_seconds: 有效期（秒），None表示不过期
+        """
+        if not self.is_enabled():
+            return None
+
+        with self._lock:
+            cache_path = self._build_cache_path(key)
+            try:
+                with open(cache_path, 'r', encoding='utf-8') as f:
+                    entry = json.load(f)
+                response = entry['response']
+                created_at = float(entry.get('created_at', 0))
+            except FileNotFoundError:
+                self.miss_count += 1
+                return None
+            except Exception:
+                # 缓存文件损坏（例如写入过程中进程被终止），直接丢弃
+                self._remove_entry(key)
+                self.miss_count += 1
+                return None
+
+            if ttl_seconds is not None and time.time() - created_at > ttl_seconds:
+                self._remove_entry(key)
+                self.miss_count += 1
+                return None
+
+            try:
+                os.utime(cache_path)
+            except OSError:
+                pass
+            index = self._get_index()
+            if key in index:
+                index.move_to_end(key)
+            self.hit_count += 1
+            return response
+
+    def put(self, key: str, response: str, model: str = "") -> bool:
+        """写入响应，返回是否写入成功；写入失败不影响调用流程"""
+        if not self.is_enabled():
+            return False
+
+        with self._lock:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                data = json.dumps(
+                    {'model': model, 'created_at': time.time(), 'response': response},
+                    ensure_ascii=False
+                ).encode('utf-8')
+                fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+                os.replace(temp_path, self._build_cache_path(key))
+            except Exception:
+                return False
+
+            index = self._get_index()
+            self._total_bytes += len(data) - index.pop(key, 0)
+            index[key] = len(data)
+            self._evict()
+            return True
+
+    def clear(self) -> None:
+        """清空缓存目录中的所有条目"""
+        if not self.is_enabled():
+            return
+        with self._lock:
+            for key in list(self._get_index()):
+                self._remove_entry(key)
+
+    def _evict(self) -> None:
+        """按最近使用顺序淘汰条目，直到总大小不超过上限"""
+        index = self._get_index()
+        while self._total_bytes > self.max_bytes and len(index) > 1:
+            oldest_key = next(iter(index))
+            self._remove_entry(oldest_key)
+
+    def _remove_entry(self, key: str) -> None:
+        """删除单个缓存条目"""
+        try:
+            os.remove(self._build_cache_path(key))
+        except OSError:
+            pass
+        if self._index is not None and key in self._index:
+            self._total_bytes -= self._index.pop(key)
+
+    def _get_index(self) -> "OrderedDict[str, int]":
+        """获取缓存条目索引，首次使用时按文件修改时间从磁盘重建"""
+        if self._index is None:
+            entries = []
+            if os.path.isdir(self.cache_dir):
+                for entry in os.scandir(self.cache_dir):
+                    if entry.is_file() and entry.name.endswith(_CACHE_FILE_SUFFIX):
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, entry.name[:-len(_CACHE_FILE_SUFFIX)], stat.st_size))
+            entries.sort()
+            self._index = OrderedDict((key, size) for _, key, size in entries)
+            self._total_bytes = sum(self._index.values())
+        return self._index
+
+    def _build_cache_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + _CACHE_FILE_SUFFIX)
+
+
+# 单例实例
+_instance = LlmResponseCache()
+
+
+def get_instance() -> LlmResponseCache:
+    """获取模型响应缓存单例"""
+    return _instance
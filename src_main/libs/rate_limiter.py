@@ -0,0 +1,92 @@
+import asyncio
+import threading
+import time
+from typing import Callable, Optional
+
+
+class TokenBucket:
+    """令牌桶：按固定速率补充令牌，容量为一分钟的配额
+
+    取令牌时直接扣除（允许欠账），并返回还清欠账所需的等待时间。
+    先到的请求先扣除，因此排队等待的请求按到达顺序依次放行，不会相互饿死。
+    """
+
+    def __init__(self, rate_per_minute: float, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            rate_per_minute: 每分钟补充的令牌数
+            clock: 单调时钟，测试时可替换
+        """
+        self.capacity = float(rate_per_minute)
+        self._rate = self.capacity / 60
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        """扣除令牌，返回扣除后需要等待的时间（秒），令牌充足时为0
+
+        单次扣除量不超过桶容量，避免超大请求永远无法放行。
+        """
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self._rate)
+            self._updated = now
+            self._tokens -= min(float(amount), self.capacity)
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self._rate
+
+
+class RateLimiter:
+    """按每分钟请求数与每分钟token数限制请求速率
+
+    同一处理器的所有并发请求共享同一个限速器：请求前调用 acquire 等待配额，
+    响应结束后通过 record_tokens 补记请求前无法预知的输出token数。
+    未配置的限制不生效。
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self._request_bucket = TokenBucket(requests_per_minute, clock) if requests_per_minute else None
+        self._token_bucket = TokenBucket(tokens_per_minute, clock) if tokens_per_minute else None
+
+    def is_enabled(self) -> bool:
+        """是否配置了任一限制"""
+        return self._request_bucket is not None or self._token_bucket is not None
+
+    def reserve(self, tokens: int = 0) -> float:
+        """为一次请求扣除配额，返回需要等待的时间（秒）"""
+        delay = 0.0
+        if self._request_bucket is not None:
+            delay = max(delay, self._request_bucket.reserve(1))
+        if self._token_bucket is not None and tokens > 0:
+            delay = max(delay, self._token_bucket.reserve(tokens))
+        return delay
+
+    async def acquire(self, tokens: int = 0) -> float:
+        """等待一次请求的配额，返回实际等待的时间（秒）
+
+        Args:
+            tokens: 预计本次请求消耗的token数（通常为输入部分的估算值）
+        """
+        delay = self.reserve(tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+    def record_tokens(self, tokens: int) -> None:
+        """补记已消耗的token数（如输出部分），影响后续请求的等待时间"""
+        if self._token_bucket is not None and tokens > 0:
+            self._token_bucket.reserve(tokens)
+
+
+def estimate_tokens(text: str) -> int:
+    """粗略估算文本的token数：中日韩字符按每字1个token，其余字符按每4个字符1个token"""
+    cjk_count = sum(1 for ch in text if '\u2e80' <= ch <= '\u9fff' or '\uac00' <= ch <= '\ud7af' or '\uf900' <= ch <= '\ufaff')
+    return cjk_count + (len(text) - cjk_count + 3) // 4
@@ -0,0 +1,89 @@
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Optional
+
+# 可重试的HTTP状态码：请求超时、冲突、限流；5xx服务端错误同样可重试
+_RETRYABLE_STATUS_CODES = (408, 409, 429)
+
+
+class RetryPolicy:
+    """异步请求的重试策略：指数退避 + 抖动，并遵循服务端返回的 Retry-After
+
+    第attempt次失败（从0开始）后的基础等待时间为 base_delay * 2^attempt，不超过 max_delay，
+    实际等待时间在基础等待时间的一半到全部之间随机选取，避免并发请求在同一时刻集中重试。
+    服务端给出 Retry-After 时，等待时间不少于该值（同样不超过 max_delay）。
+    """
+
+    def __init__(
+        self,
+        max_retry: int = 3,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        rng: Optional[random.Random] = None
+    ):
+        """
+        Args:
+            max_retry: 最大尝试次数（含第一次请求）
+            base_delay: 第一次重试前的基础等待时间（秒）
+            max_delay: 单次等待时间上限（秒）
+            rng: 随机数生成器，测试时可传入固定种子的实例
+        """
+        self.max_retry = max(1, int(max_retry))
+        self.base_delay = max(0.0, float(base_delay))
+        self.max_delay = max(self.base_delay, float(max_delay))
+        self._rng = rng or random.Random()
+
+    def should_retry(self, attempt: int, error: Optional[BaseException] = None) -> bool:
+        """第attempt次尝试（从0开始）失败后是否继续重试"""
+        return attempt < self.max_retry - 1 and is_retryable_error(error)
+
+    def get_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """第attempt次尝试（从0开始）失败后，下一次重试前的等待时间（秒）"""
+        backoff = min(self.max_delay, self.base_delay * (2 ** attempt))
+        delay = self._rng.uniform(backoff / 2, backoff)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_delay))
+        return delay
+
+
+def is_retryable_error(error: Optional[BaseException]) -> bool:
+    """请求失败是否值得重试
+
+    没有HTTP状态码的错误（连接中断、超时、流式响应中途失败等）以及限流、服务端错误可以重试，
+    其余客户端错误（如认证失败、请求参数错误）重试也不会成功。
+    """
+    status_code = getattr(error, 'status_code', None)
+    if not isinstance(status_code, int):
+        return True
+    return status_code in _RETRYABLE_STATUS_CODES or status_code >= 500
+
+
+def parse_retry_after(error: Optional[BaseException]) -> Optional[float]:
+    """从请求错误的响应头中解析服务端建议的等待时间（秒），没有时返回None
+
+    依次读取 retry-after-ms（毫秒）与 retry-after（秒数或HTTP日期）。
+    """
+    response = getattr(error, 'response', None)
+    headers: Any = getattr(response, 'headers', None)
+    if not headers:
+        return None
+
+    value = headers.get('retry-after-ms') or headers.get('Retry-After-Ms')
+    if value is not None:
+        try:
+            return max(0.0, float(value) / 1000)
+        except (TypeError, ValueError):
+            pass
+
+    value = headers.get('retry-after') or headers.get('Retry-After')
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError):
+        return None
@@ -0,0 +1,230 @@
+import re
+from typing import List, Optional
+
+_JSON_WHITESPACE = ' \t\n\r'
+_JSON_LITERALS = {'t': 'true', 'f': 'false', 'n': 'null'}
+_JSON_NUMBER_CHARS = frozenset('0123456789+-.eE')
+_JSON_NUMBER_PATTERN = re.compile(r'-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?')
+_JSON_ESCAPE_CHARS = frozenset('"\\/bfnrt')
+_HEX_DIGITS = frozenset('0123456789abcdefABCDEF')
+
+# JsonPrefixValidator 的期望状态
+_EXPECT_ROOT = 'root'
+_EXPECT_VALUE = 'value'
+_EXPECT_VALUE_OR_ARRAY_END = 'value_or_array_end'
+_EXPECT_KEY_OR_OBJECT_END = 'key_or_object_end'
+_EXPECT_KEY = 'key'
+_EXPECT_COLON = 'colon'
+_EXPECT_COMMA_OR_OBJECT_END = 'comma_or_object_end'
+_EXPECT_COMMA_OR_ARRAY_END = 'comma_or_array_end'
+
+
+class StreamValidator:
+    """模型流式输出的增量校验器基类
+
+    逐段接收流式输出，一旦能够证明输出不合法（无论后续内容如何都无法修正）即返回错误信息，
+    调用方据此提前终止请求，节省注定失败的生成所耗费的时间与token。
+    只在确定不合法时报错，无法判断时一律放行，最终结果仍以完整校验为准。
+
+    与 ChatResponseCleaner.clean_code_block_markers 保持一致：开头的代码块标记行（```xxx）被跳过，
+    正文由子类的 _feed_body 校验；子类确认正文结束（如遇到结尾的代码块标记）后置 finished 为True，
+    其后的内容不再校验。
+    """
+
+    def __init__(self):
+        self.error: Optional[str] = None
+        self.finished = False
+        # 正文开始前的缓冲，用于识别开头的代码块标记行
+        self._head = ""
+        self._in_body = False
+
+    def feed(self, chunk: str) -> Optional[str]:
+        """接收一段输出，返回错误信息；尚不能证明不合法时返回None"""
+        if self.error is not None or self.finished:
+            return self.error
+
+        if not self._in_body:
+            self._head += chunk
+            stripped = self._head.lstrip()
+            if not stripped:
+                return None
+            if stripped.startswith('```') or '```'.startswith(stripped):
+                # 开头是（或可能是）代码块标记，等待标记行结束
+                newline_pos = stripped.find('\n')
+                if newline_pos == -1:
+                    return None
+                chunk = stripped[newline_pos + 1:]
+            else:
+                chunk = stripped
+            self._head = ""
+            self._in_body = True
+
+        if chunk:
+            self.error = self._feed_body(chunk)
+        return self.error
+
+    def _feed_body(self, text: str) -> Optional[str]:
+        """校验一段正文，返回错误信息；由子类实现"""
+        raise NotImplementedError
+
+
+class JsonPrefixValidator(StreamValidator):
+    """JSON前缀校验器
+
+    逐字符运行JSON语法的下推自动机，当前缀已不可能是任何合法JSON的前缀时报错，
+    例如根节点不是对象/数组、缺少逗号或冒号、字段名不是字符串、字符串中出现未转义的控制字符等。
+    根节点闭合后正文结束，其后的内容（如结尾的代码块标记）不再校验。
+    """
+
+    def __init__(self, root_types: str = '{['):
+        """
+        Args:
+            root_types: 允许的根节点起始字符，'{' 表示必须是对象，'[' 表示必须是数组
+        """
+        super().__init__()
+        self.root_types = root_types
+        self._stack: List[str] = []
+        self._expect = _EXPECT_ROOT
+        self._in_string = False
+        self._string_is_key = False
+        self._escape = False
+        self._unicode_remaining = 0
+        # 尚未读到的字面量剩余部分（true/false/null）
+        self._literal = ""
+        # 正在读取的数字
+        self._number = ""
+        self._line = 1
+        self._column = 0
+
+    def _feed_body(self, text: str) -> Optional[str]:
+        for ch in text:
+            if ch == '\n':
+                self._line += 1
+                self._column = 0
+            else:
+                self._column += 1
+            error = self._feed_char(ch)
+            if error is not None:
+                return f"JSON第{self._line}行第{self._column}列: {error}"
+            if self.finished:
+                break
+        return None
+
+    def _feed_char(self, ch: str) -> Optional[str]:
+        if self._in_string:
+            return self._feed_string_char(ch)
+
+        if self._literal:
+            if ch != self._literal[0]:
+                return f"无效的字面量，期望 '{self._literal[0]}'，实际为 {ch!r}"
+            self._literal = self._literal[1:]
+            if not self._literal:
+                self._end_value()
+            return None
+
+        if self._number:
+            if ch in _JSON_NUMBER_CHARS:
+                self._number += ch
+                return None
+            if not _JSON_NUMBER_PATTERN.fullmatch(self._number):
+                return f"无效的数字: {self._number}"
+            self._number = ""
+            self._end_value()
+
+        if ch in _JSON_WHITESPACE:
+            return None
+
+        expect = self._expect
+        if expect in (_EXPECT_ROOT, _EXPECT_VALUE, _EXPECT_VALUE_OR_ARRAY_END):
+            if expect == _EXPECT_VALUE_OR_ARRAY_END and ch == ']':
+                self._stack.pop()
+                self._end_value()
+                return None
+            if expect == _EXPECT_ROOT and ch not in self.root_types:
+                expected = "或".join(f"'{c}'" for c in self.root_types)
+                return f"JSON应以 {expected} 开头，实际为 {ch!r}"
+            return self._start_value(ch)
+
+        if expect in (_EXPECT_KEY_OR_OBJECT_END, _EXPECT_KEY):
+            if expect == _EXPECT_KEY_OR_OBJECT_END and ch == '}':
+                self._stack.pop()
+                self._end_value()
+                return None
+            if ch != '"':
+                return f"期望字段名（双引号字符串），实际为 {ch!r}"
+            self._in_string = True
+            self._string_is_key = True
+            return None
+
+        if expect == _EXPECT_COLON:
+            if ch != ':':
+                return f"字段名后期望 ':'，实际为 {ch!r}"
+            self._expect = _EXPECT_VALUE
+            return None
+
+        if expect == _EXPECT_COMMA_OR_OBJECT_END:
+            if ch == ',':
+                self._expect = _EXPECT_KEY
+            elif ch == '}':
+                self._stack.pop()
+                self._end_value()
+            else:
+                return f"期望 ',' 或 '}}'，实际为 {ch!r}"
+            return None
+
+        # _EXPECT_COMMA_OR_ARRAY_END
+        if ch == ',':
+            self._expect = _EXPECT_VALUE
+        elif ch == ']':
+            self._stack.pop()
+            self._end_value()
+        else:
+            return f"期望 ',' 或 ']'，实际为 {ch!r}"
+        return None
+
+    def _feed_string_char(self, ch: str) -> Optional[str]:
+        if self._unicode_remaining:
+            if ch not in _HEX_DIGITS:
+                return f"无效的\\u转义，实际为 {ch!r}"
+            self._unicode_remaining -= 1
+        elif self._escape:
+            if ch == 'u':
+                self._unicode_remaining = 4
+            elif ch not in _JSON_ESCAPE_CHARS:
+                return f"无效的转义字符 \\{ch}"
+            self._escape = False
+        elif ch == '\\':
+            self._escape = True
+        elif ch == '"':
+            self._in_string = False
+            if self._string_is_key:
+                self._expect = _EXPECT_COLON
+            else:
+                self._end_value()
+        elif ord(ch) < 0x20:
+            return "字符串中不能包含未转义的控制字符（如换行）"
+        return None
+
+    def _start_value(self, ch: str) -> Optional[str]:
+        if ch in '{[':
+            self._stack.append(ch)
+            self._expect = _EXPECT_KEY_OR_OBJECT_END if ch == '{' else _EXPECT_VALUE_OR_ARRAY_END
+        elif ch == '"':
+            self._in_string = True
+            self._string_is_key = False
+        elif ch in _JSON_LITERALS:
+            self._literal = _JSON_LITERALS[ch][1:]
+        elif ch == '-' or '0' <= ch <= '9':
+            self._number = ch
+        else:
+            return f"期望一个JSON值，实际为 {ch!r}"
+        return None
+
+    def _end_value(self) -> None:
+        """一个值读取完毕，根据所在容器确定下一步期望的内容"""
+        if not self._stack:
+            self.finished = True
+        elif self._stack[-1] == '{':
+            self._expect = _EXPECT_COMMA_OR_OBJECT_END
+        else:
+            self._expect = _EXPECT_COMMA_OR_ARRAY_END
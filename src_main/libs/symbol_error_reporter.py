@@ -1,6 +1,6 @@
-import difflib
-from typing import Any, Dict, List, Set
+from typing import Any, Dict, Iterable, List, Set
 
+from libs.symbol_suggestion_index import SymbolSuggestionIndex
 from typedef.ibc_data_types import (ClassMetadata, FunctionMetadata,
                                     SymbolMetadata, VariableMetadata)
 from utils.issue_recorder import IbcIssueRecorder
@@ -22,6 +22,9 @@ class SymbolErrorReporter:
         """
         self.ibc_issue_recorder = ibc_issue_recorder
         self.local_symbols = local_symbols
+        
+        # 本地符号名的模糊建议索引，构建一次后供所有未找到符号的错误复用
+        self.suggestion_index = SymbolSuggestionIndex(path.split('.')[-1] for path in local_symbols)
     
     def collect_candidates(
         self,
@@ -38,42 +41,41 @@ class SymbolErrorReporter:
             List[str]: 候选符号名称列表
         """
         candidates = []
+        seen: Set[str] = set()
         
-        # 从局部符号收集
-        candidates.extend(local_symbols_dict.keys())
-        
-        # 从本地符号收集
-        for path in self.local_symbols:
-            name = path.split('.')[-1]
-            if name not in candidates:
-                candidates.append(name)
-        
-        # 从导入的模块收集
-        for alias in import_aliases:
-            if alias not in candidates:
-                candidates.append(alias)
+        # 依次从局部符号、本地符号、导入的模块收集，保持首次出现的顺序
+        local_names = (path.split('.')[-1] for path in self.local_symbols)
+        for names in (local_symbols_dict.keys(), local_names, import_aliases):
+            for name in names:
+                if name not in seen:
+                    seen.add(name)
+                    candidates.append(name)
         
         return candidates
     
     def find_similar_symbols(
         self,
         symbol_name: str,
-        candidates: List[str],
+        candidates: Iterable[str],
         max_suggestions: int = 3,
         cutoff: float = 0.3
     ) -> List[str]:
         """查找相似的符号
         
+        在本地符号名的建议索引与candidates中共同查找，结果与对两者之和调用difflib.get_close_matches一致
+        
         Args:
             symbol_name: 要查找的符号名
-            candidates: 候选符号列表
+            candidates: 本地符号之外的候选符号（如局部符号、导入的模块别名）
             max_suggestions: 最大建议数量
             cutoff: 相似度阈值
             
         Returns:
             List[str]: 相似符号列表
         """
-        return difflib.get_close_matches(symbol_name, candidates, n=max_suggestions, cutoff=cutoff)
+        return self.suggestion_index.get_close_matches(
+            symbol_name, n=max_suggestions, cutoff=cutoff, extra_candidates=candidates
+        )
     
     def generate_suggestion(self, similar_symbols: List[str]) -> str:
         """生成建议信息
@@ -107,11 +109,8 @@ class SymbolErrorReporter:
         parts = ref.split('.')
         first_part = parts[0]
         
-        # 收集候选符号
-        candidates = self.collect_candidates(context_local_symbols, import_aliases)
-        
-        # 模糊匹配
-        matches = self.find_similar_symbols(first_part, candidates)
+        # 模糊匹配：本地符号已在建议索引中，只需额外提供局部符号与导入的模块别名
+        matches = self.find_similar_symbols(first_part, [*context_local_symbols, *import_aliases])
         suggestion = self.generate_suggestion(matches)
         
         # 确定错误类型
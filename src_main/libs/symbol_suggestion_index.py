@@ -0,0 +1,163 @@
+import difflib
+import heapq
+from collections import Counter
+from typing import Dict, Iterable, List, Set, Tuple
+
+# 与difflib一致：待匹配文本达到该长度时SequenceMatcher会启用autojunk，此时直接退回difflib
+_AUTOJUNK_MIN_LENGTH = 200
+
+# 首轮查找的相似度下限：拼写错误通常能找到足够多高于该值的候选，无需放宽到调用方给出的阈值
+_FIRST_PASS_FLOOR = 0.7
+
+
+class SymbolSuggestionIndex:
+    """符号名模糊建议索引
+
+    对固定的一组符号名预先建立「长度分桶 + 字符倒排表」，查询结果与
+    difflib.get_close_matches(word, names, n, cutoff) 完全一致，但只对可能进入前n名的候选计算相似度：
+    - 按长度分桶，各桶的相似度上界（real_quick_ratio）只取决于长度，上界低于当前第n名时跳过整桶
+    - 桶内按前缀过滤生成候选：公共字符数至少为C时，候选必然包含查询中最稀有的 len(word)-C+1 个字符之一
+    - 候选的公共字符数即quick_ratio上界，上界不足时不再计算精确相似度
+
+    索引应在符号表确定后构建一次，供多次查询复用。
+    """
+
+    def __init__(self, names: Iterable[str]):
+        self.names: List[str] = []
+        self._name_set: Set[str] = set()
+        self._char_counts: List[Dict[str, int]] = []
+        # 长度 -> {(字符, k): 该字符至少出现k次的名称下标列表}
+        self._postings: Dict[int, Dict[Tuple[str, int], List[int]]] = {}
+
+        for name in names:
+            if name in self._name_set:
+                continue
+            name_id = len(self.names)
+            char_counts = dict(Counter(name))
+            self.names.append(name)
+            self._name_set.add(name)
+            self._char_counts.append(char_counts)
+            bucket = self._postings.setdefault(len(name), {})
+            for char, count in char_counts.items():
+                for k in range(1, count + 1):
+                    bucket.setdefault((char, k), []).append(name_id)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._name_set
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def get_close_matches(
+        self,
+        word: str,
+        n: int = 3,
+        cutoff: float = 0.6,
+        extra_candidates: Iterable[str] = ()
+    ) -> List[str]:
+        """查找最相似的符号名，结果与对「索引中的名称 + extra_candidates」调用difflib.get_close_matches一致
+
+        Args:
+            word: 要查找的符号名
+            n: 最大建议数量
+            cutoff: 相似度阈值
+            extra_candidates: 额外的候选名（如当前作用域的局部符号），逐个计算相似度
+
+        Returns:
+            List[str]: 按相似度从高到低排列的符号名列表
+        """
+        if not n > 0:
+            raise ValueError(f"n must be > 0: {n!r}")
+        if not 0.0 <= cutoff <= 1.0:
+            raise ValueError(f"cutoff must be in [0.0, 1.0]: {cutoff!r}")
+
+        extra_names = [name for name in dict.fromkeys(extra_candidates) if name not in self._name_set]
+        if not word or cutoff <= 0.0 or len(word) >= _AUTOJUNK_MIN_LENGTH:
+            # 边界情况下上界剪枝不成立，直接使用difflib
+            return difflib.get_close_matches(word, self.names + extra_names, n=n, cutoff=cutoff)
+
+        # 首轮只考虑相似度不低于下限的候选；若已凑满n个，其余候选不可能进入前n名
+        if cutoff < _FIRST_PASS_FLOOR:
+            top = self._search(word, n, _FIRST_PASS_FLOOR, extra_names)
+            if len(top) >= n:
+                return [name for _, name in sorted(top, reverse=True)]
+        top = self._search(word, n, cutoff, extra_names)
+        return [name for _, name in sorted(top, reverse=True)]
+
+    def _search(self, word: str, n: int, cutoff: float, extra_names: List[str]) -> List[Tuple[float, str]]:
+        """返回相似度不低于cutoff的前n个 (相似度, 名称)，以最小堆形式保存"""
+        matcher = difflib.SequenceMatcher()
+        matcher.set_seq2(word)
+        # 堆顶为当前第n名
+        top: List[Tuple[float, str]] = []
+
+        def offer(name: str) -> None:
+            matcher.set_seq1(name)
+            score = matcher.ratio()
+            if score < cutoff:
+                return
+            if len(top) < n:
+                heapq.heappush(top, (score, name))
+            elif (score, name) > top[0]:
+                heapq.heapreplace(top, (score, name))
+
+        def threshold() -> float:
+            """候选的相似度上界低于该值时不可能进入前n名"""
+            return max(cutoff, top[0][0]) if len(top) >= n else cutoff
+
+        for name in extra_names:
+            matcher.set_seq1(name)
+            if matcher.real_quick_ratio() >= cutoff and matcher.quick_ratio() >= cutoff:
+                offer(name)
+
+        word_length = len(word)
+        word_counts = Counter(word)
+        word_elements = [(char, k) for char, count in word_counts.items() for k in range(1, count + 1)]
+
+        # 按长度带来的上界从高到低遍历各桶
+        length_bounds = sorted(
+            ((2.0 * min(word_length, length) / (word_length + length), length) for length in self._postings),
+            reverse=True
+        )
+        for length_bound, length in length_bounds:
+            bucket_threshold = threshold()
+            if length_bound < bucket_threshold:
+                break
+
+            total_length = word_length + length
+            required_common = self._min_common_count(bucket_threshold, total_length)
+
+            # 前缀过滤：只从最稀有的 len(word)-C+1 个查询字符的倒排表中取候选
+            bucket = self._postings[length]
+            elements = sorted(word_elements, key=lambda element: len(bucket.get(element, ())))
+            candidate_ids: Set[int] = set()
+            for element in elements[:word_length - required_common + 1]:
+                candidate_ids.update(bucket.get(element, ()))
+
+            quick_bounds = []
+            for name_id in candidate_ids:
+                char_counts = self._char_counts[name_id]
+                common = 0
+                for char, word_count in word_counts.items():
+                    count = char_counts.get(char)
+                    if count:
+                        common += count if count < word_count else word_count
+                quick_bounds.append((2.0 * common / total_length, name_id))
+            quick_bounds.sort(reverse=True)
+
+            for quick_bound, name_id in quick_bounds:
+                if quick_bound < threshold():
+                    break
+                offer(self.names[name_id])
+
+        return top
+
+    @staticmethod
+    def _min_common_count(threshold: float, total_length: int) -> int:
+        """相似度（2*公共字符数/总长度）不低于threshold所需的最少公共字符数，与difflib的浮点计算方式一致"""
+        common = max(1, int(threshold * total_length / 2.0))
+        while common > 1 and 2.0 * (common - 1) / total_length >= threshold:
+            common -= 1
+        while 2.0 * common / total_length < threshold:
+            common += 1
+        return common
@@ -0,0 +1,92 @@
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from libs.dependency_graph import DependencyGraph
+
+
+@dataclass
+class UpdateReason:
+    """文件需要更新（或引起依赖方更新）的原因"""
+    file_path: str
+    reason: str = ""  # 文件自身检查得到的原因，依赖传播时为空
+    caused_by: str = ""  # 依赖传播时，引起更新的直接依赖文件
+
+
+class UpdateInvalidationEngine:
+    """更新状态失效引擎
+
+    cmd_handler 在执行前判断哪些文件需要重新生成，统一分两个阶段：
+    1. 逐个文件检查自身状态（校验码变化、产物缺失等），得到直接需要更新的文件
+    2. 对未标记的文件检查产物是否被手动修改，被修改的文件自身无需更新，但依赖它的文件需要更新
+
+    需要更新的文件及被手动修改的文件，沿依赖图的反向邻接表向所有（间接）依赖方传播。
+    传播以广度优先进行，每个文件最多展开一次，整体为 O(文件数 + 依赖边数)。
+    每个被标记的文件都记录原因，依赖传播记录引起更新的直接依赖文件。
+
+    各阶段的具体检查由调用方以回调形式提供，检查中的输出也由调用方负责。
+    """
+
+    def __init__(self, dependency_graph: DependencyGraph, file_list: List[str]):
+        """
+        Args:
+            dependency_graph: 依赖图
+            file_list: 按依赖顺序排列的文件列表（被依赖的文件在前）
+        """
+        self.dependency_graph = dependency_graph
+        self.file_list = file_list
+        self.need_update_flag_dict: Dict[str, bool] = {file_path: False for file_path in file_list}
+        # 需要更新的文件 -> 原因，按标记顺序排列
+        self.update_reasons: Dict[str, UpdateReason] = {}
+        # 被手动修改、引起依赖方更新的文件 -> 原因
+        self.manual_change_reasons: Dict[str, UpdateReason] = {}
+        self._expanded: set = set()
+
+    def evaluate(
+        self,
+        check_file: Callable[[str], Optional[str]],
+        check_manual_change: Optional[Callable[[str], Optional[str]]] = None
+    ) -> Dict[str, bool]:
+        """执行两阶段检查并传播，返回 {文件路径: 是否需要更新}
+
+        Args:
+            check_file: 检查文件自身是否需要更新，返回原因，无需更新时返回None
+            check_manual_change: 检查未标记文件的产物是否被手动修改，返回原因，未修改时返回None；
+                只对检查时尚未被标记（包括依赖传播）的文件调用
+        """
+        for file_path in self.file_list:
+            reason = check_file(file_path)
+            if reason is not None:
+                self._mark(UpdateReason(file_path=file_path, reason=reason))
+        for file_path in self.file_list:
+            if self.need_update_flag_dict.get(file_path, False):
+                self._propagate(file_path)
+            elif check_manual_change is not None:
+                reason = check_manual_change(file_path)
+                if reason is not None:
+                    self.manual_change_reasons[file_path] = UpdateReason(file_path=file_path, reason=reason)
+                    self._propagate(file_path)
+        return self.need_update_flag_dict
+
+    def get_propagated_updates(self) -> List[UpdateReason]:
+        """因依赖传播而需要更新的文件，按传播顺序排列"""
+        return [reason for reason in self.update_reasons.values() if reason.caused_by]
+
+    def _mark(self, reason: UpdateReason) -> None:
+        self.need_update_flag_dict[reason.file_path] = True
+        self.update_reasons.setdefault(reason.file_path, reason)
+
+    def _propagate(self, start_path: str) -> None:
+        """从start_path出发广度优先标记所有（间接）依赖方，已展开过的文件不再重复展开"""
+        if start_path in self._expanded:
+            return
+        self._expanded.add(start_path)
+        queue = deque([start_path])
+        while queue:
+            file_path = queue.popleft()
+            for dependent in self.dependency_graph.get_dependents(file_path):
+                if not self.need_update_flag_dict.get(dependent, False):
+                    self._mark(UpdateReason(file_path=dependent, caused_by=file_path))
+                if dependent not in self._expanded:
+                    self._expanded.add(dependent)
+                    queue.append(dependent)
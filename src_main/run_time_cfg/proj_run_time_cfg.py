@@ -1,8 +1,9 @@
 import json
 import os
 import sys
+from typing import Optional
 
-from typedef.ai_data_types import ChatApiConfig, EmbeddingApiConfig
+from typedef.ai_data_types import ChatApiConfig, EmbeddingApiConfig, ResponseCacheMode
 
 # 运行过程中目标工程相关配置信息管理
 
@@ -117,9 +118,75 @@ class ProjRunTimeCfg:
         return ChatApiConfig(
             base_url=chat_config.get('api-url', ''),
             api_key=chat_config.get('api-key', ''),
-            model=chat_config.get('model', '')
+            model=chat_config.get('model', ''),
+            max_connections=self._get_optional_limit(chat_config, 'max-connections'),
+            max_keepalive_connections=self._get_optional_limit(chat_config, 'max-keepalive-connections'),
+            response_cache_mode=self._get_response_cache_mode(chat_config),
+            response_cache_ttl_hours=self._get_response_cache_ttl_hours(chat_config),
+            requests_per_minute=self._get_optional_limit(chat_config, 'requests-per-minute'),
+            tokens_per_minute=self._get_optional_limit(chat_config, 'tokens-per-minute'),
+            retry_max_delay=self._get_retry_max_delay(chat_config)
         )
     
+    def get_max_concurrent_requests(self, handler_type: str) -> int:
+        """获取指定类型的处理器允许同时进行的最大请求数，未配置时为1（逐个请求）"""
+        api_config = self._load_api_config()
+        value = api_config.get(handler_type, {}).get('max-concurrent-requests', 1)
+        try:
+            return max(1, int(value))
+        except (TypeError, ValueError):
+            print(f"警告: {handler_type} 的 max-concurrent-requests 配置无效: {value}，使用默认值1")
+            return 1
+    
+    def get_ibc_stream_max_errors(self, handler_type: str) -> int:
+        """获取生成IBC时流式校验提前终止所需的错误数，未配置时为3"""
+        api_config = self._load_api_config()
+        value = api_config.get(handler_type, {}).get('ibc-stream-max-errors', 3)
+        try:
+            return max(1, int(value))
+        except (TypeError, ValueError):
+            print(f"警告: {handler_type} 的 ibc-stream-max-errors 配置无效: {value}，使用默认值3")
+            return 3
+    
+    def _get_optional_limit(self, handler_config: dict, key: str) -> Optional[int]:
+        """获取可选的数量限制配置项（连接池大小、限速等），未配置或无效时返回None（使用默认行为）"""
+        value = handler_config.get(key)
+        if value is None:
+            return None
+        try:
+            return max(1, int(value))
+        except (TypeError, ValueError):
+            print(f"警告: {key} 配置无效: {value}，使用默认值")
+            return None
+    
+    def _get_response_cache_mode(self, handler_config: dict) -> str:
+        """获取响应缓存模式，未配置或无效时关闭缓存"""
+        value = handler_config.get('response-cache', ResponseCacheMode.OFF)
+        if value not in ResponseCacheMode.ALL:
+            print(f"警告: response-cache 配置无效: {value}，可选值为 {', '.join(ResponseCacheMode.ALL)}，已关闭响应缓存")
+            return ResponseCacheMode.OFF
+        return value
+    
+    def _get_response_cache_ttl_hours(self, handler_config: dict) -> Optional[float]:
+        """获取响应缓存有效期（小时），未配置或无效时不过期"""
+        value = handler_config.get('response-cache-ttl-hours')
+        if value is None:
+            return None
+        try:
+            return max(0.0, float(value))
+        except (TypeError, ValueError):
+            print(f"警告: response-cache-ttl-hours 配置无效: {value}，缓存将不会过期")
+            return None
+    
+    def _get_retry_max_delay(self, handler_config: dict) -> float:
+        """获取重试等待时间上限（秒），未配置或无效时为60秒"""
+        value = handler_config.get('retry-max-delay', 60.0)
+        try:
+            return max(0.0, float(value))
+        except (TypeError, ValueError):
+            print(f"警告: retry-max-delay 配置无效: {value}，使用默认值60秒")
+            return 60.0
+    
     def get_embedding_handler_config(self, handler_type: str) -> EmbeddingApiConfig:
         """获取指定类型的嵌入处理器配置"""
         api_config = self._load_api_config()
@@ -127,7 +194,12 @@ class ProjRunTimeCfg:
         return EmbeddingApiConfig(
             base_url=embedding_config.get('api-url', ''),
             api_key=embedding_config.get('api-key', ''),
-            model=embedding_config.get('model', '')
+            model=embedding_config.get('model', ''),
+            max_connections=self._get_optional_limit(embedding_config, 'max-connections'),
+            max_keepalive_connections=self._get_optional_limit(embedding_config, 'max-keepalive-connections'),
+            requests_per_minute=self._get_optional_limit(embedding_config, 'requests-per-minute'),
+            tokens_per_minute=self._get_optional_limit(embedding_config, 'tokens-per-minute'),
+            retry_max_delay=self._get_retry_max_delay(embedding_config)
         )
 
 
@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from typing import Optional
 
 # ====== Chat 相关类型定义 ======
 
@@ -8,6 +9,17 @@ class ChatResponseStatus:
     CLIENT_NOT_INITIALIZED = "CLIENT_NOT_INITIALIZED"  # 客户端未初始化
     STREAM_FAILED = "STREAM_FAILED"  # 流式响应失败
     ROLE_NOT_FOUND = "ROLE_NOT_FOUND"  # 角色不存在
+    OUTPUT_INVALID = "OUTPUT_INVALID"  # 流式输出已被校验器判定不合法，提前终止
+
+
+class ResponseCacheMode:
+    """模型响应缓存模式"""
+    OFF = "off"  # 不使用缓存
+    READ_WRITE = "read-write"  # 命中时直接返回缓存，未命中时请求模型并写入缓存
+    RECORD = "record"  # 总是请求模型，并用新的响应覆盖缓存
+    REPLAY_ONLY = "replay-only"  # 只从缓存读取，从不访问网络，未命中时视为失败
+
+    ALL = (OFF, READ_WRITE, RECORD, REPLAY_ONLY)
 
 
 @dataclass
@@ -16,6 +28,17 @@ class ChatApiConfig:
     base_url: str
     api_key: str
     model: str
+    # 连接池限制，None时使用SDK默认值
+    max_connections: Optional[int] = None
+    max_keepalive_connections: Optional[int] = None
+    # 响应缓存模式与有效期（小时），有效期为None时不过期
+    response_cache_mode: str = ResponseCacheMode.OFF
+    response_cache_ttl_hours: Optional[float] = None
+    # 限速（每分钟请求数、每分钟token数），None时不限制
+    requests_per_minute: Optional[int] = None
+    tokens_per_minute: Optional[int] = None
+    # 重试等待时间上限（秒）
+    retry_max_delay: float = 60.0
 
     def is_config_valid(self):
         return self.base_url != "" and self.api_key != "" and self.model != ""
@@ -36,6 +59,14 @@ class EmbeddingApiConfig:
     base_url: str
     api_key: str
     model: str
+    # 连接池限制，None时使用SDK默认值
+    max_connections: Optional[int] = None
+    max_keepalive_connections: Optional[int] = None
+    # 限速（每分钟请求数、每分钟token数），None时不限制
+    requests_per_minute: Optional[int] = None
+    tokens_per_minute: Optional[int] = None
+    # 重试等待时间上限（秒）
+    retry_max_delay: float = 60.0
 
     def is_config_valid(self):
         return self.base_url != "" and self.api_key != "" and self.model != ""
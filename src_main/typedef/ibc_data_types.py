@@ -55,6 +55,9 @@ class IbcKeywords(Enum):
 
 class Token:
     """Token类"""
+    # token数量与源码字符数同量级，使用__slots__省去每个实例的__dict__
+    __slots__ = ('type', 'value', 'line_num')
+
     def __init__(self, type: IbcTokenType, value: str, line_num: int):
         self.type: IbcTokenType = type
         self.value: str = value
@@ -1,5 +1,5 @@
-from dataclasses import dataclass
-from typing import Any, Dict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
 
 
 @dataclass
@@ -75,3 +75,58 @@ class CodeIssue(IssueBase):
         loc_str = f" ({loc})" if loc else ""
         context_str = f"\n    Context: {self.line_content.strip()}" if self.line_content else ""
         return f"[{self.severity.upper()}]{loc_str} {self.message}{context_str}"
+
+
+@dataclass
+class IbcFileCheckResult:
+    """单个IBC文件的批量校验结果"""
+    file_path: str  # 文件路径
+    syntax_issues: List[IbcIssue] = field(default_factory=list)  # 词法/语法错误
+    reference_issues: List[IbcIssue] = field(default_factory=list)  # 符号引用问题
+    symbols_count: int = 0  # 符号数量
+    reference_checked: bool = False  # 是否完成了符号引用验证（依赖不可用时跳过）
+    error: str = ""  # 分析过程中出现的非预期异常
+
+    def is_valid(self) -> bool:
+        """是否通过校验"""
+        return not self.syntax_issues and not self.reference_issues and not self.error
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典"""
+        return {
+            "file_path": self.file_path,
+            "syntax_issues": [issue.to_dict() for issue in self.syntax_issues],
+            "reference_issues": [issue.to_dict() for issue in self.reference_issues],
+            "symbols_count": self.symbols_count,
+            "reference_checked": self.reference_checked,
+            "error": self.error
+        }
+
+
+@dataclass
+class IbcBatchCheckReport:
+    """IBC批量校验汇总报告"""
+    file_results: List[IbcFileCheckResult] = field(default_factory=list)  # 按依赖顺序排列的单文件结果
+    elapsed_seconds: float = 0.0  # 总耗时
+
+    def get_invalid_results(self) -> List[IbcFileCheckResult]:
+        """获取未通过校验的文件结果"""
+        return [result for result in self.file_results if not result.is_valid()]
+
+    def get_issue_count(self) -> int:
+        """获取问题总数"""
+        return sum(len(result.syntax_issues) + len(result.reference_issues) for result in self.file_results)
+
+    def is_all_valid(self) -> bool:
+        """是否全部通过校验"""
+        return all(result.is_valid() for result in self.file_results)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典"""
+        return {
+            "file_count": len(self.file_results),
+            "invalid_file_count": len(self.get_invalid_results()),
+            "issue_count": self.get_issue_count(),
+            "elapsed_seconds": self.elapsed_seconds,
+            "file_results": [result.to_dict() for result in self.file_results]
+        }
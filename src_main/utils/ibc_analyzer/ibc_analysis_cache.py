@@ -0,0 +1,222 @@
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from collections import OrderedDict
+from dataclasses import asdict
+from typing import Any, Dict, Optional, Tuple
+
+from typedef.ibc_data_types import (BehaviorStepNode, ClassNode, FunctionNode,
+                                    IbcBaseAstNode, ModuleNode, SymbolMetadata,
+                                    VariableNode, create_symbol_metadata)
+
+# 决定分析结果的模块，任一源码变化都会使旧缓存自动失效
+_ANALYZER_MODULES = (
+    'typedef.ibc_data_types',
+    'utils.ibc_analyzer.ibc_analyzer',
+    'utils.ibc_analyzer.ibc_lexer',
+    'utils.ibc_analyzer.ibc_parser',
+    'utils.ibc_analyzer.ibc_parser_state',
+    'utils.ibc_analyzer.ibc_symbol_processor',
+)
+
+_CACHE_FILE_SUFFIX = '.json'
+# 旧版以pickle保存的缓存条目，不再读取，重建索引时删除
+_LEGACY_CACHE_FILE_SUFFIX = '.pkl'
+
+# 缓存条目中AST节点的类名 -> 节点类
+_NODE_CLASSES = {
+    node_class.__name__: node_class
+    for node_class in (IbcBaseAstNode, ModuleNode, ClassNode, FunctionNode, VariableNode, BehaviorStepNode)
+}
+
+AnalysisResult = Tuple[Dict[int, IbcBaseAstNode], Dict[str, Any], Dict[str, SymbolMetadata]]
+
+
+class IbcAnalysisCache:
+    """IBC分析结果的磁盘缓存
+
+    以「分析器版本戳 + 预处理后文本」的MD5为键，保存 analyze_ibc_content 的AST、符号树与符号元数据。
+    只缓存无语法错误的分析结果，因此命中时无需再向issue recorder补记任何信息。
+
+    - 未设置缓存目录时缓存处于关闭状态，get/put 均不生效
+    - 缓存总大小超过上限时，按最近使用时间淘汰（LRU），使用时间记录在文件的修改时间上
+    - 写入采用临时文件 + 重命名，多进程同时写入同一条目时不会读到半截文件
+    - 条目以JSON保存（AST节点经 to_dict/from_dict 转换），缓存目录位于用户项目中，
+      读取时不会执行任何代码
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.cache_dir = ""
+        self.max_bytes = max_bytes
+        self._version_stamp = ""
+        # 缓存条目索引：键 -> 文件大小，按最近使用顺序排列（末尾为最近使用）
+        self._index: Optional["OrderedDict[str, int]"] = None
+        self._total_bytes = 0
+        self.hit_count = 0
+        self.miss_count = 0
+
+    def set_cache_dir(self, cache_dir: str, max_bytes: Optional[int] = None) -> None:
+        """设置缓存目录（为空字符串时关闭缓存）"""
+        self.cache_dir = cache_dir
+        if max_bytes is not None:
+            self.max_bytes = max_bytes
+        self._index = None
+        self._total_bytes = 0
+
+    def is_enabled(self) -> bool:
+        """缓存是否开启"""
+        return bool(self.cache_dir)
+
+    def build_key(self, preprocessed_text: str) -> str:
+        """根据预处理后的文本构建缓存键"""
+        digest = hashlib.md5(self._get_version_stamp().encode('utf-8'))
+        digest.update(preprocessed_text.encode('utf-8'))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[AnalysisResult]:
+        """读取缓存的分析结果，未命中或缓存损坏时返回None"""
+        if not self.is_enabled():
+            return None
+
+        cache_path = self._build_cache_path(key)
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                result = _decode_result(json.load(f))
+            os.utime(cache_path)
+        except FileNotFoundError:
+            self.miss_count += 1
+            return None
+        except Exception:
+            # 缓存文件损坏（例如写入过程中进程被终止），直接丢弃
+            self._remove_entry(key)
+            self.miss_count += 1
+            return None
+
+        index = self._get_index()
+        if key in index:
+            index.move_to_end(key)
+        self.hit_count += 1
+        return result
+
+    def put(self, key: str, result: AnalysisResult) -> None:
+        """写入分析结果，写入失败不影响分析流程"""
+        if not self.is_enabled():
+            return
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            data = json.dumps(_encode_result(result), ensure_ascii=False).encode('utf-8')
+            fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, self._build_cache_path(key))
+        except Exception as e:
+            print(f"Warning: 写入IBC分析缓存失败: {e}")
+            return
+
+        index = self._get_index()
+        self._total_bytes += len(data) - index.pop(key, 0)
+        index[key] = len(data)
+        self._evict()
+
+    def clear(self) -> None:
+        """清空缓存目录中的所有条目"""
+        if not self.is_enabled():
+            return
+        for key in list(self._get_index()):
+            self._remove_entry(key)
+
+    def _evict(self) -> None:
+        """按最近使用顺序淘汰条目，直到总大小不超过上限"""
+        index = self._get_index()
+        while self._total_bytes > self.max_bytes and len(index) > 1:
+            oldest_key = next(iter(index))
+            self._remove_entry(oldest_key)
+
+    def _remove_entry(self, key: str) -> None:
+        """删除单个缓存条目"""
+        try:
+            os.remove(self._build_cache_path(key))
+        except OSError:
+            pass
+        if self._index is not None and key in self._index:
+            self._total_bytes -= self._index.pop(key)
+
+    def _get_index(self) -> "OrderedDict[str, int]":
+        """获取缓存条目索引，首次使用时按文件修改时间从磁盘重建"""
+        if self._index is None:
+            entries = []
+            if os.path.isdir(self.cache_dir):
+                for entry in os.scandir(self.cache_dir):
+                    if entry.is_file() and entry.name.endswith(_LEGACY_CACHE_FILE_SUFFIX):
+                        try:
+                            os.remove(entry.path)
+                        except OSError:
+                            pass
+                    elif entry.is_file() and entry.name.endswith(_CACHE_FILE_SUFFIX):
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, entry.name[:-len(_CACHE_FILE_SUFFIX)], stat.st_size))
+            entries.sort()
+            self._index = OrderedDict((key, size) for _, key, size in entries)
+            self._total_bytes = sum(self._index.values())
+        return self._index
+
+    def _build_cache_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + _CACHE_FILE_SUFFIX)
+
+    def _get_version_stamp(self) -> str:
+        """分析器版本戳：由相关模块的源码计算得到"""
+        if not self._version_stamp:
+            digest = hashlib.md5()
+            for module_name in _ANALYZER_MODULES:
+                module_file = getattr(sys.modules.get(module_name), '__file__', None)
+                if module_file and os.path.exists(module_file):
+                    with open(module_file, 'rb') as f:
+                        digest.update(f.read())
+                else:
+                    digest.update(module_name.encode('utf-8'))
+            self._version_stamp = digest.hexdigest()
+        return self._version_stamp
+
+
+def _encode_result(result: AnalysisResult) -> Dict[str, Any]:
+    """将分析结果转换为可JSON序列化的字典"""
+    ast_dict, symbols_tree, symbols_metadata = result
+    ast_data = {}
+    for uid, node in ast_dict.items():
+        node_dict = node.to_dict()
+        node_dict["_class_type"] = type(node).__name__
+        ast_data[str(uid)] = node_dict
+    return {
+        "ast": ast_data,
+        "symbols_tree": symbols_tree,
+        # 保留全部字段（to_dict会省略空值），读取时可原样还原
+        "symbols_metadata": {path: asdict(meta) for path, meta in symbols_metadata.items()},
+    }
+
+
+def _decode_result(data: Dict[str, Any]) -> AnalysisResult:
+    """由缓存条目的字典还原分析结果
+
+    Raises:
+        KeyError/ValueError/TypeError: 条目格式不正确时抛出
+    """
+    ast_dict = {
+        int(uid): _NODE_CLASSES[node_dict.pop("_class_type")].from_dict(node_dict)
+        for uid, node_dict in data["ast"].items()
+    }
+    symbols_metadata = {
+        path: create_symbol_metadata(meta_dict) for path, meta_dict in data["symbols_metadata"].items()
+    }
+    return ast_dict, data["symbols_tree"], symbols_metadata
+
+
+# 单例实例
+_instance = IbcAnalysisCache()
+
+
+def get_instance() -> IbcAnalysisCache:
+    """获取IBC分析缓存单例"""
+    return _instance
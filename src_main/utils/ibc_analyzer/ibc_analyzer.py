@@ -3,21 +3,31 @@ from typing import Any, Dict, List, Optional, Tuple
 from typedef.exception_types import IbcAnalyzerError
 from typedef.ibc_data_types import (AstNodeType, IbcBaseAstNode, IbcKeywords,
                                     IbcTokenType, SymbolMetadata, Token)
+from utils.ibc_analyzer.ibc_analysis_cache import \
+    get_instance as get_ibc_analysis_cache
 from utils.ibc_analyzer.ibc_lexer import IbcLexer
-from utils.ibc_analyzer.ibc_parser import IbcParser
+from utils.ibc_analyzer.ibc_parser import IbcParser, IbcStreamParser
 from utils.ibc_analyzer.ibc_symbol_processor import IbcSymbolProcessor
 from utils.issue_recorder import IbcIssueRecorder
 
 
 def analyze_ibc_content(
     text: str, 
-    ibc_issue_recorder: Optional[IbcIssueRecorder] = None
+    ibc_issue_recorder: Optional[IbcIssueRecorder] = None,
+    streaming: bool = False,
+    recover_errors: bool = False
 ) -> Tuple[Dict, Dict, Dict[str, SymbolMetadata]]:
     """分析IBC代码，返回AST字典以及符号树/符号元数据
     
+    若已为 IbcAnalysisCache 设置缓存目录，相同文本的无错误分析结果会直接从磁盘缓存读取。
+    
     Args:
         text: 待分析的IBC代码文本
         ibc_issue_recorder: 可选的问题记录器，用于记录分析过程中的错误信息
+        streaming: 是否使用流式流水线（词法分析按需产出token，解析器边拉取边解析），
+            遇到语法错误时不会再分析其后的内容
+        recover_errors: 是否启用错误恢复模式。启用后遇到语法错误时跳过出错语句继续分析，
+            所有错误都会记录到issue_recorder，并返回由其余内容构成的部分AST及符号
         
     Returns:
         Tuple[Dict, Dict, Dict[str, SymbolMetadata]]: 
@@ -33,49 +43,81 @@ def analyze_ibc_content(
         # 预处理中文特殊标点符号
         text = preprocess_cn_text(text)
 
-        # 词法分析
-        lexer = IbcLexer(text)
-        tokens = lexer.tokenize()
-        
-        # 语法分析
-        parser = IbcParser(tokens)
+        # 已开启分析缓存时，相同文本直接复用之前的分析结果，跳过解析
+        analysis_cache = get_ibc_analysis_cache()
+        cache_key = ""
+        if analysis_cache.is_enabled():
+            cache_key = analysis_cache.build_key(text)
+            cached_result = analysis_cache.get(cache_key)
+            if cached_result is not None:
+                return cached_result
+
+        lexer = IbcLexer(text, recover_errors=recover_errors)
+        if streaming:
+            # 流式流水线：词法分析与语法分析交替进行
+            parser = IbcStreamParser(lexer.iter_tokens(), recover_errors=recover_errors)
+        else:
+            # 词法分析
+            tokens = lexer.tokenize()
+            
+            # 语法分析
+            parser = IbcParser(tokens, recover_errors=recover_errors)
         ast_dict = parser.parse()
 
+        # 错误恢复模式下按行号顺序记录全部词法/语法错误
+        recovered_errors: List[IbcAnalyzerError] = [*lexer.errors, *parser.errors]
+        for error in sorted(recovered_errors, key=lambda err: err.line_num):
+            record_analyzer_error(error, text, ibc_issue_recorder)
+
         # 基于AST构建符号树和元数据
         symbol_processor = IbcSymbolProcessor(ast_dict)
         symbols_tree, symbols_metadata = symbol_processor.build_symbol_tree()
+
+        # 只缓存无错误的分析结果
+        if cache_key and not recovered_errors:
+            analysis_cache.put(cache_key, (ast_dict, symbols_tree, symbols_metadata))
         
         return ast_dict, symbols_tree, symbols_metadata
 
     except IbcAnalyzerError as e:
-        # 根据行号，从text原始文本中提取行内容
-        line_content = e.line_content
-        if not line_content and e.line_num > 0:
-            lines = text.split('\n')
-            if 0 < e.line_num <= len(lines):
-                line_content = lines[e.line_num - 1].rstrip()
-        
-        # 记录错误信息到issue recorder
-        if ibc_issue_recorder is not None:
-            ibc_issue_recorder.record_issue(
-                message=e.message,
-                line_num=e.line_num,
-                line_content=line_content if line_content else ""
-            )
-        
-        # 打印错误信息
-        if line_content:
-            print(f"IBC分析错误: {e.message}")
-            print(f"  行号: {e.line_num}")
-            print(f"  内容: {line_content}")
-        else:
-            print(f"IBC分析错误: {e.message}")
-            if e.line_num > 0:
-                print(f"  行号: {e.line_num}")
+        record_analyzer_error(e, text, ibc_issue_recorder)
         
         # IbcAnalyzerError不再向上抛出，返回空结构
         return {}, {}, {}
+
+
+def record_analyzer_error(
+    e: IbcAnalyzerError, 
+    text: str, 
+    ibc_issue_recorder: Optional[IbcIssueRecorder] = None
+) -> None:
+    """将IBC分析错误记录到issue recorder并打印"""
+    # 根据行号，从text原始文本中提取行内容
+    line_content = e.line_content
+    if not line_content and e.line_num > 0:
+        lines = text.split('\n')
+        if 0 < e.line_num <= len(lines):
+            line_content = lines[e.line_num - 1].rstrip()
+    
+    # 记录错误信息到issue recorder
+    if ibc_issue_recorder is not None:
+        ibc_issue_recorder.record_issue(
+            message=e.message,
+            line_num=e.line_num,
+            line_content=line_content if line_content else ""
+        )
     
+    # 打印错误信息
+    if line_content:
+        print(f"IBC分析错误: {e.message}")
+        print(f"  行号: {e.line_num}")
+        print(f"  内容: {line_content}")
+    else:
+        print(f"IBC分析错误: {e.message}")
+        if e.line_num > 0:
+            print(f"  行号: {e.line_num}")
+
+
 def preprocess_cn_text(text: str) -> str:
     """将中文文本中的关键标点符号替换为英文形式"""
     text = text.replace("，", ", ")
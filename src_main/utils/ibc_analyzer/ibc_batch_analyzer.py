@@ -0,0 +1,241 @@
+import contextlib
+import io
+import os
+import time
+from concurrent.futures import (FIRST_COMPLETED, Executor, Future,
+                                ProcessPoolExecutor, wait)
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from libs.dependency_graph import DependencyGraph
+from libs.dir_json_funcs import DirJsonFuncs
+from typedef.ibc_data_types import IbcBaseAstNode, SymbolMetadata
+from typedef.issue_recorder_types import (IbcBatchCheckReport,
+                                          IbcFileCheckResult, IbcIssue)
+from utils.ibc_analyzer.ibc_analyzer import analyze_ibc_content
+from utils.ibc_analyzer.ibc_symbol_ref_resolver import SymbolRefResolver
+from utils.ibc_analyzer.ibc_visible_symbol_builder import VisibleSymbolBuilder
+from utils.issue_recorder import IbcIssueRecorder
+
+# 单文件的分析结果：AST、符号树、符号元数据以及语法错误
+_ParseResult = Tuple[Dict[int, IbcBaseAstNode], Dict[str, Any], Dict[str, SymbolMetadata], List[IbcIssue]]
+
+# 工作进程内的符号引用解析上下文，由进程池初始化函数设置
+_worker_context: Dict[str, Any] = {}
+
+
+def _init_worker_context(
+    proj_root_dict: Dict[str, Any],
+    dependent_relation: Dict[str, List[str]],
+    external_library_dependencies: Dict[str, str]
+) -> None:
+    """初始化当前进程的符号引用解析上下文，项目级数据每个进程只传递一次"""
+    _worker_context['proj_root_dict'] = proj_root_dict
+    _worker_context['dependent_relation'] = dependent_relation
+    _worker_context['dependency_graph'] = DependencyGraph(dependent_relation)
+    _worker_context['external_library_dependencies'] = external_library_dependencies
+    with contextlib.redirect_stdout(io.StringIO()):
+        _worker_context['visible_symbol_builder'] = VisibleSymbolBuilder(proj_root_dict=proj_root_dict)
+
+
+def _parse_ibc_file(ibc_content: str) -> _ParseResult:
+    """词法/语法分析并构建符号表，以错误恢复模式一次收集全部语法错误"""
+    issue_recorder = IbcIssueRecorder()
+    # 单文件过程输出由汇总报告代替，批量分析时不逐文件打印
+    with contextlib.redirect_stdout(io.StringIO()):
+        ast_dict, symbols_tree, symbols_metadata = analyze_ibc_content(
+            ibc_content, issue_recorder, recover_errors=True
+        )
+    return ast_dict, symbols_tree, symbols_metadata, issue_recorder.get_issues()
+
+
+def _resolve_ibc_file(
+    file_path: str,
+    ast_dict: Dict[int, IbcBaseAstNode],
+    local_symbols_tree: Dict[str, Any],
+    local_symbols_metadata: Dict[str, SymbolMetadata],
+    dependency_symbol_tables: Dict[str, Tuple[Dict[str, Any], Dict[str, SymbolMetadata]]]
+) -> List[IbcIssue]:
+    """基于依赖文件的符号表验证单个文件内的全部符号引用"""
+    issue_recorder = IbcIssueRecorder()
+    with contextlib.redirect_stdout(io.StringIO()):
+        visible_symbols_tree, visible_symbols_metadata = _worker_context['visible_symbol_builder'].build_visible_symbol_tree(
+            current_file_path=file_path,
+            dependency_symbol_tables=dependency_symbol_tables,
+            include_local_symbols=True,
+            local_symbols_tree=local_symbols_tree,
+            local_symbols_metadata=local_symbols_metadata
+        )
+        ref_resolver = SymbolRefResolver(
+            ast_dict=ast_dict,
+            symbols_tree=visible_symbols_tree,
+            symbols_metadata=visible_symbols_metadata,
+            ibc_issue_recorder=issue_recorder,
+            proj_root_dict=_worker_context['proj_root_dict'],
+            dependent_relation=_worker_context['dependent_relation'],
+            current_file_path=file_path,
+            external_library_dependencies=_worker_context['external_library_dependencies'],
+            dependency_graph=_worker_context['dependency_graph']
+        )
+        ref_resolver.resolve_all_references()
+    return issue_recorder.get_issues()
+
+
+class _InlineExecutor(Executor):
+    """在当前进程内同步执行任务的执行器，用于单进程模式，调度逻辑与进程池完全一致"""
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        future: Future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+class IbcBatchAnalyzer:
+    """IBC批量分析器：对整个项目的IBC代码进行并行分析与校验
+
+    分两类任务在同一个进程池中调度：
+    - 分析任务：词法/语法分析与符号表构建，各文件之间互不依赖，全部立即提交
+    - 引用验证任务：当前文件及其所有依赖文件的分析任务完成后立即提交，只受数据依赖约束
+
+    依赖文件未参与本次分析或分析失败（无符号数据）时，跳过该文件的符号引用验证，
+    与 CmdHandlerIbcGen 中依赖符号表不可用时的处理一致。
+    """
+
+    def __init__(
+        self,
+        proj_root_dict: Dict[str, Any],
+        dependent_relation: Dict[str, List[str]],
+        external_library_dependencies: Optional[Dict[str, str]] = None,
+        max_workers: Optional[int] = None
+    ):
+        """
+        Args:
+            proj_root_dict: 项目根目录字典
+            dependent_relation: 依赖关系
+            external_library_dependencies: 外部库依赖字典（来自refined_requirements.json）
+            max_workers: 进程数，默认为CPU核数；为1时在当前进程内顺序执行
+        """
+        self.proj_root_dict = proj_root_dict
+        self.dependent_relation = dependent_relation
+        self.external_library_dependencies = external_library_dependencies or {}
+        self.max_workers = max_workers or os.cpu_count() or 1
+
+        self.dependency_graph = DependencyGraph(dependent_relation)
+
+    def analyze_files(
+        self,
+        ibc_contents: Dict[str, str],
+        file_order: Optional[List[str]] = None
+    ) -> IbcBatchCheckReport:
+        """批量分析并校验IBC代码
+
+        Args:
+            ibc_contents: 文件路径到IBC代码内容的映射
+            file_order: 报告中的文件顺序，默认使用 DirJsonFuncs.build_file_creation_order 得到的依赖顺序
+
+        Returns:
+            IbcBatchCheckReport: 汇总报告
+        """
+        start_time = time.perf_counter()
+        file_list = self._build_file_list(ibc_contents, file_order)
+        results = {file_path: IbcFileCheckResult(file_path=file_path) for file_path in file_list}
+
+        if self.max_workers > 1 and len(file_list) > 1:
+            executor: Executor = ProcessPoolExecutor(
+                max_workers=min(self.max_workers, len(file_list)),
+                initializer=_init_worker_context,
+                initargs=(self.proj_root_dict, self.dependent_relation, self.external_library_dependencies)
+            )
+        else:
+            _init_worker_context(self.proj_root_dict, self.dependent_relation, self.external_library_dependencies)
+            executor = _InlineExecutor()
+
+        with executor:
+            self._schedule(executor, ibc_contents, file_list, results)
+
+        return IbcBatchCheckReport(
+            file_results=[results[file_path] for file_path in file_list],
+            elapsed_seconds=time.perf_counter() - start_time
+        )
+
+    def _build_file_list(self, ibc_contents: Dict[str, str], file_order: Optional[List[str]]) -> List[str]:
+        """确定参与分析的文件及其顺序"""
+        if file_order is None:
+            file_order = DirJsonFuncs.build_file_creation_order(self.dependent_relation)
+        file_list = [file_path for file_path in file_order if file_path in ibc_contents]
+        ordered = set(file_list)
+        file_list.extend(file_path for file_path in ibc_contents if file_path not in ordered)
+        return file_list
+
+    def _schedule(
+        self,
+        executor: Executor,
+        ibc_contents: Dict[str, str],
+        file_list: List[str],
+        results: Dict[str, IbcFileCheckResult]
+    ) -> None:
+        """提交分析任务，并在数据依赖满足时提交引用验证任务"""
+        parse_results: Dict[str, _ParseResult] = {}
+        pending: Dict[Future, Tuple[str, str]] = {}
+        resolve_submitted: Set[str] = set()
+
+        for file_path in file_list:
+            future = executor.submit(_parse_ibc_file, ibc_contents[file_path])
+            pending[future] = ('parse', file_path)
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                task_type, file_path = pending.pop(future)
+                result = results[file_path]
+                try:
+                    task_result = future.result()
+                except Exception as e:
+                    result.error = f"{type(e).__name__}: {e}"
+                    continue
+
+                if task_type == 'resolve':
+                    result.reference_issues = task_result
+                    result.reference_checked = True
+                    # 引用验证完成后只有符号表仍被依赖方使用，释放AST
+                    ast_dict, symbols_tree, symbols_metadata, _ = parse_results[file_path]
+                    parse_results[file_path] = ({}, symbols_tree, symbols_metadata, [])
+                    continue
+
+                ast_dict, symbols_tree, symbols_metadata, syntax_issues = task_result
+                result.syntax_issues = syntax_issues
+                result.symbols_count = len(symbols_metadata)
+                if not ast_dict:
+                    continue
+                parse_results[file_path] = task_result
+
+                # 当前文件以及所有依赖它、已完成分析的文件，可能已满足引用验证条件
+                for candidate in [file_path, *self.dependency_graph.get_dependents(file_path)]:
+                    if candidate in resolve_submitted or candidate not in parse_results:
+                        continue
+                    dependency_symbol_tables = self._collect_dependency_symbol_tables(candidate, parse_results)
+                    if dependency_symbol_tables is None:
+                        continue
+                    resolve_submitted.add(candidate)
+                    candidate_ast, candidate_tree, candidate_metadata, _ = parse_results[candidate]
+                    resolve_future = executor.submit(
+                        _resolve_ibc_file, candidate, candidate_ast, candidate_tree,
+                        candidate_metadata, dependency_symbol_tables
+                    )
+                    pending[resolve_future] = ('resolve', candidate)
+
+    def _collect_dependency_symbol_tables(
+        self,
+        file_path: str,
+        parse_results: Dict[str, _ParseResult]
+    ) -> Optional[Dict[str, Tuple[Dict[str, Any], Dict[str, SymbolMetadata]]]]:
+        """收集依赖文件的符号表，存在尚不可用的依赖时返回None"""
+        dependency_symbol_tables = {}
+        for dep_path in self.dependent_relation.get(file_path, []):
+            dep_result = parse_results.get(dep_path)
+            if dep_result is None:
+                return None
+            dependency_symbol_tables[dep_path] = (dep_result[1], dep_result[2])
+        return dependency_symbol_tables
@@ -0,0 +1,191 @@
+from array import array
+from collections.abc import Mapping
+from dataclasses import fields
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Type
+
+from typedef.ibc_data_types import (AstNodeType, BehaviorStepNode, ClassNode,
+                                    FunctionNode, IbcBaseAstNode, ModuleNode,
+                                    VariableNode, VisibilityTypes)
+
+# 节点类编码表，编码即下标
+_NODE_CLASSES: Tuple[Type[IbcBaseAstNode], ...] = (
+    IbcBaseAstNode, ModuleNode, ClassNode, FunctionNode, VariableNode, BehaviorStepNode
+)
+_NODE_CLASS_CODES: Dict[Type[IbcBaseAstNode], int] = {cls: code for code, cls in enumerate(_NODE_CLASSES)}
+_NODE_TYPES: Tuple[AstNodeType, ...] = tuple(AstNodeType)
+_NODE_TYPE_CODES: Dict[AstNodeType, int] = {t: code for code, t in enumerate(_NODE_TYPES)}
+_VISIBILITIES: Tuple[VisibilityTypes, ...] = tuple(VisibilityTypes)
+_VISIBILITY_CODES: Dict[VisibilityTypes, int] = {v: code for code, v in enumerate(_VISIBILITIES)}
+
+# 以驻留字符串下标列存储的文本字段
+_STRING_FIELDS = ("identifier", "content", "external_desc", "intent_comment")
+# 由列直接表示的结构字段
+_COLUMN_FIELDS = frozenset(("uid", "parent_uid", "children_uids", "node_type", "line_number", "visibility")
+                           + _STRING_FIELDS)
+# 其余字段（参数字典、引用列表、new_block_flag 等）仅在非默认值时稀疏存储
+_EXTRA_FIELDS: Dict[Type[IbcBaseAstNode], Tuple[str, ...]] = {
+    cls: tuple(f.name for f in fields(cls) if f.name not in _COLUMN_FIELDS)
+    for cls in _NODE_CLASSES
+}
+_CLASS_STRING_FIELDS: Dict[Type[IbcBaseAstNode], Tuple[str, ...]] = {
+    cls: tuple(f.name for f in fields(cls) if f.name in _STRING_FIELDS)
+    for cls in _NODE_CLASSES
+}
+
+_NO_ROW = -1
+
+
+class IbcCompactAst(Mapping):
+    """紧凑AST容器：以列式数组存储AST节点
+
+    对外提供与 Dict[int, IbcBaseAstNode] 相同的只读接口（get / [] / items / values / in / len），
+    IbcSymbolProcessor、SymbolRefResolver、SymbolReplacer 等只读消费者可以直接使用。
+
+    内部存储：
+    - 每个节点占一行，类编码、节点类型、可见性、父节点uid、行号、首子节点/下一兄弟节点均为定长数组列
+    - identifier/content/external_desc/intent_comment 以驻留字符串表下标存储，相同文本只保存一份
+    - 参数字典、引用列表等其余字段仅在取值非默认时稀疏存储
+
+    通过下标访问节点时会按列数据即时构造对应的节点对象，该对象是只读快照，修改它不会影响容器。
+    """
+
+    def __init__(self):
+        self._row_of_uid: Dict[int, int] = {}
+        self._uids = array('i')
+        self._class_codes = array('b')
+        self._type_codes = array('b')
+        self._visibility_codes = array('b')
+        self._parent_uids = array('i')
+        self._line_numbers = array('i')
+        self._first_child = array('i')
+        self._last_child = array('i')
+        self._next_sibling = array('i')
+        self._string_columns: Dict[str, array] = {name: array('i') for name in _STRING_FIELDS}
+        self._extras: Dict[int, Dict[str, Any]] = {}
+        # 驻留字符串表，下标0固定为空字符串
+        self._strings: List[str] = [""]
+        self._string_ids: Dict[str, int] = {"": 0}
+
+    # ==================== 构建与转换 ====================
+
+    @classmethod
+    def from_ast_dict(cls, ast_dict: Dict[int, IbcBaseAstNode]) -> 'IbcCompactAst':
+        """由现有的AST字典构建紧凑容器，子节点顺序与 children_uids 保持一致"""
+        compact = cls()
+        for node in ast_dict.values():
+            compact._append_row(node)
+        for node in ast_dict.values():
+            for child_uid in node.children_uids:
+                compact._link_child(node.uid, child_uid)
+        return compact
+
+    def to_ast_dict(self) -> Dict[int, IbcBaseAstNode]:
+        """转换回 Dict[int, IbcBaseAstNode] 形式"""
+        return {uid: self._build_node(row) for row, uid in enumerate(self._uids)}
+
+    def _append_row(self, node: IbcBaseAstNode) -> None:
+        """追加一个节点行（不处理子节点关系）"""
+        if node.uid in self._row_of_uid:
+            raise ValueError(f"重复的AST节点uid: {node.uid}")
+
+        node_cls = type(node)
+        self._row_of_uid[node.uid] = len(self._uids)
+        self._uids.append(node.uid)
+        self._class_codes.append(_NODE_CLASS_CODES[node_cls])
+        self._type_codes.append(_NODE_TYPE_CODES[node.node_type])
+        self._visibility_codes.append(_VISIBILITY_CODES[node.visibility])
+        self._parent_uids.append(node.parent_uid)
+        self._line_numbers.append(node.line_number)
+        self._first_child.append(_NO_ROW)
+        self._last_child.append(_NO_ROW)
+        self._next_sibling.append(_NO_ROW)
+
+        for name, column in self._string_columns.items():
+            column.append(self._intern(getattr(node, name, "")))
+
+        extras = {}
+        for name in _EXTRA_FIELDS[node_cls]:
+            value = getattr(node, name)
+            if value:
+                extras[name] = value.copy() if isinstance(value, (dict, list)) else value
+        if extras:
+            self._extras[node.uid] = extras
+
+    def _link_child(self, parent_uid: int, child_uid: int) -> None:
+        """将子节点挂到父节点的子节点链表末尾，O(1)"""
+        parent_row = self._row_of_uid[parent_uid]
+        child_row = self._row_of_uid[child_uid]
+        last_row = self._last_child[parent_row]
+        if last_row == _NO_ROW:
+            self._first_child[parent_row] = child_row
+        else:
+            self._next_sibling[last_row] = child_row
+        self._last_child[parent_row] = child_row
+
+    def _intern(self, text: str) -> int:
+        """返回字符串在驻留表中的下标"""
+        string_id = self._string_ids.get(text)
+        if string_id is None:
+            string_id = len(self._strings)
+            self._strings.append(text)
+            self._string_ids[text] = string_id
+        return string_id
+
+    # ==================== 只读接口 ====================
+
+    def __getitem__(self, uid: int) -> IbcBaseAstNode:
+        return self._build_node(self._row_of_uid[uid])
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._uids)
+
+    def __len__(self) -> int:
+        return len(self._uids)
+
+    def __contains__(self, uid: object) -> bool:
+        return uid in self._row_of_uid
+
+    def get_node_type(self, uid: int) -> Optional[AstNodeType]:
+        """获取节点类型，不构造节点对象"""
+        row = self._row_of_uid.get(uid)
+        return None if row is None else _NODE_TYPES[self._type_codes[row]]
+
+    def get_parent_uid(self, uid: int) -> Optional[int]:
+        """获取父节点uid，不构造节点对象"""
+        row = self._row_of_uid.get(uid)
+        return None if row is None else self._parent_uids[row]
+
+    def get_identifier(self, uid: int) -> str:
+        """获取节点标识符，不构造节点对象"""
+        row = self._row_of_uid.get(uid)
+        return "" if row is None else self._strings[self._string_columns["identifier"][row]]
+
+    def iter_children_uids(self, uid: int) -> Iterator[int]:
+        """按顺序遍历子节点uid，不构造节点对象"""
+        row = self._row_of_uid.get(uid)
+        child_row = _NO_ROW if row is None else self._first_child[row]
+        while child_row != _NO_ROW:
+            yield self._uids[child_row]
+            child_row = self._next_sibling[child_row]
+
+    def _build_node(self, row: int) -> IbcBaseAstNode:
+        """根据列数据构造节点对象"""
+        uid = self._uids[row]
+        node_cls = _NODE_CLASSES[self._class_codes[row]]
+        kwargs: Dict[str, Any] = {
+            "uid": uid,
+            "parent_uid": self._parent_uids[row],
+            "children_uids": list(self.iter_children_uids(uid)),
+            "node_type": _NODE_TYPES[self._type_codes[row]],
+            "line_number": self._line_numbers[row],
+            "visibility": _VISIBILITIES[self._visibility_codes[row]],
+        }
+        for name in _CLASS_STRING_FIELDS[node_cls]:
+            kwargs[name] = self._strings[self._string_columns[name][row]]
+
+        extras = self._extras.get(uid)
+        if extras:
+            # 拷贝可变容器，保证返回的节点与容器内部数据互不影响
+            for name, value in extras.items():
+                kwargs[name] = value.copy() if isinstance(value, (dict, list)) else value
+        return node_cls(**kwargs)
@@ -0,0 +1,362 @@
+import bisect
+import dataclasses
+import hashlib
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from typedef.exception_types import IbcAnalyzerError
+from typedef.ibc_data_types import (AstNodeType, IbcBaseAstNode, IbcTokenType,
+                                    SymbolMetadata, Token)
+from utils.ibc_analyzer.ibc_analyzer import (analyze_ibc_content,
+                                             preprocess_cn_text,
+                                             record_analyzer_error)
+from utils.ibc_analyzer.ibc_lexer import IbcLexer
+from utils.ibc_analyzer.ibc_parser import IbcStreamParser
+from utils.ibc_analyzer.ibc_symbol_processor import IbcSymbolProcessor
+from utils.issue_recorder import IbcIssueRecorder
+
+
+@dataclass
+class IbcAnalysisSegment:
+    """顶层分段：从一个干净检查点开始的连续行区间，以及该区间内产生的顶层AST节点"""
+    start_line: int
+    end_line: int
+    content_hash: str
+    top_uids: List[int] = field(default_factory=list)
+
+
+class _CheckpointInvalidated(Exception):
+    """解析起点的检查点被证明不干净，增量分析无法从该点恢复"""
+
+
+class IbcCheckpointParser(IbcStreamParser):
+    """记录干净检查点的流式解析器
+
+    干净检查点是指：某个无缩进的非空行，在其首个内容token被处理之前，解析器恰好处于
+    仅有顶层状态、没有暂存的描述/意图注释、也没有延续行或多行函数声明遗留状态的位置。
+    从干净检查点开始，用全新的解析器继续解析得到的结果与完整解析一致。
+
+    唯一的例外是检查点之后尚未创建任何节点时就出现了缩进：此时缩进会挂到检查点之前的节点上，
+    该检查点随即作废。若作废的恰好是本次解析的起点，则抛出 _CheckpointInvalidated。
+    """
+
+    def __init__(
+        self,
+        token_iter: Iterable[Token],
+        lines: List[str],
+        start_line: int = 1,
+        stop_predicate: Optional[Callable[[int], bool]] = None
+    ):
+        super().__init__(token_iter)
+        self.lines = lines
+        self.start_line = start_line
+        self.stop_predicate = stop_predicate
+        # 检查点列表：(行号, 此时根节点已有的子节点数, 此时已分配的最大uid)
+        self.checkpoints: List[Tuple[int, int, int]] = []
+        # 因 stop_predicate 提前结束时所在的检查点行号
+        self.stopped_line = 0
+        self._last_content_line = 0
+
+    def parse(self) -> Dict[int, IbcBaseAstNode]:
+        """执行解析，在每个干净检查点处记录位置，并在 stop_predicate 满足时提前结束"""
+        while not self._is_at_end():
+            token = self._peek_token()
+            if self._is_checkpoint(token):
+                self.checkpoints.append((
+                    token.line_num,
+                    len(self.ast_nodes[0].children_uids),
+                    self.uid_generator.get_current_uid()
+                ))
+                if self.stop_predicate is not None and self.stop_predicate(token.line_num):
+                    self.stopped_line = token.line_num
+                    break
+            self._parse_token(self._consume_token())
+
+        return self.ast_nodes
+
+    def _handle_indent(self, token: Token) -> None:
+        """处理缩进前，作废那些之后尚未创建节点的检查点"""
+        while self.checkpoints and self.last_ast_node_uid <= self.checkpoints[-1][2]:
+            line_num = self.checkpoints.pop()[0]
+            if line_num == self.start_line and self.start_line > 1:
+                raise _CheckpointInvalidated()
+        super()._handle_indent(token)
+
+    def _is_checkpoint(self, token: Token) -> bool:
+        """判断当前token是否位于干净检查点"""
+        if token.type in (IbcTokenType.NEWLINE, IbcTokenType.INDENT, IbcTokenType.DEDENT, IbcTokenType.EOF):
+            return False
+
+        # 只在每行首个内容token处判断一次
+        if token.line_num <= self._last_content_line:
+            return False
+        self._last_content_line = token.line_num
+
+        line = self.lines[token.line_num - 1]
+        if line[:1].isspace():
+            return False
+
+        return (
+            len(self.state_stack) == 1
+            and not self.is_pass_token_to_state
+            and not self.pending_description
+            and not self.pending_intent_comment
+            and self.func_pending_indent_level == 0
+            and self.continuation_dedent_to_absorb == 0
+            and not self.continuation_needs_new_block
+        )
+
+
+class IbcIncrementalAnalyzer:
+    """增量IBC分析器
+
+    适用于同一份IBC代码被反复小幅修改后重新分析的场景（手工编辑、AI修复重试等）。
+    分析器保存上一次分析的文本、AST以及顶层分段信息，再次分析时：
+    - 通过逐行比较公共前缀/后缀得到变化的行区间
+    - 从变化区间之前最近的干净检查点开始，只对变化部分重新词法/语法分析
+    - 新解析出的分段一旦重新与旧文本对齐（位于未变化后缀中的旧检查点），立即停止分析，
+      后续分段的AST节点直接复用（仅平移行号）
+    - 重新解析出的分段若与某个被替换的旧分段内容哈希一致，则复用旧分段的节点，保持uid稳定
+
+    符号树与符号元数据仍基于完整AST重新构建，开销与节点数成正比，远小于词法/语法分析。
+    分析失败时清空保存的状态，下一次调用将重新执行完整分析。
+    """
+
+    def __init__(self):
+        self.lines: List[str] = []
+        self.ast_dict: Dict[int, IbcBaseAstNode] = {}
+        self.segments: List[IbcAnalysisSegment] = []
+        self.symbols_tree: Dict = {}
+        self.symbols_metadata: Dict[str, SymbolMetadata] = {}
+        self.next_uid = 1
+        # 最近一次分析中实际重新解析的行区间 (起始行, 结束行)，无重新解析时为 (0, 0)
+        self.last_reparsed_range: Tuple[int, int] = (0, 0)
+
+    def reset(self) -> None:
+        """清空保存的分析状态"""
+        self.__init__()
+
+    def analyze(
+        self,
+        text: str,
+        ibc_issue_recorder: Optional[IbcIssueRecorder] = None,
+        recover_errors: bool = False
+    ) -> Tuple[Dict, Dict, Dict[str, SymbolMetadata]]:
+        """分析IBC代码，返回值与 analyze_ibc_content 一致
+
+        Args:
+            text: 待分析的IBC代码文本（完整文本，分析器自行与上一次的文本比较得到变化区间）
+            ibc_issue_recorder: 可选的问题记录器，用于记录分析过程中的错误信息
+            recover_errors: 存在语法错误时是否改用错误恢复模式完整分析一遍，
+                以便一次记录全部错误并返回部分AST（该结果不作为下一次增量分析的基础）
+        """
+        text = preprocess_cn_text(text)
+        new_lines = text.split('\n') if text else [""]
+
+        try:
+            if not self.segments:
+                self._full_analyze(text, new_lines)
+            else:
+                try:
+                    self._incremental_analyze(text, new_lines)
+                except _CheckpointInvalidated:
+                    self._full_analyze(text, new_lines)
+        except IbcAnalyzerError as e:
+            self.reset()
+            if recover_errors:
+                return analyze_ibc_content(text, ibc_issue_recorder, recover_errors=True)
+            record_analyzer_error(e, text, ibc_issue_recorder)
+            return {}, {}, {}
+
+        return self.ast_dict, self.symbols_tree, self.symbols_metadata
+
+    def _full_analyze(self, text: str, new_lines: List[str]) -> None:
+        """完整分析，同时建立分段信息"""
+        parser = self._create_parser(text, new_lines, 1, None)
+        new_ast = parser.parse()
+
+        self.segments = self._build_segments(parser, new_ast, new_lines, 1, len(new_lines))
+        self.next_uid = parser.uid_generator.get_current_uid() + 1
+        self.last_reparsed_range = (1, len(new_lines))
+        self._commit(new_lines, new_ast)
+
+    def _incremental_analyze(self, text: str, new_lines: List[str]) -> None:
+        """基于上一次分析结果的增量分析"""
+        old_lines = self.lines
+        old_len, new_len = len(old_lines), len(new_lines)
+
+        # 计算公共前缀/后缀行数
+        max_common = min(old_len, new_len)
+        prefix = 0
+        while prefix < max_common and old_lines[prefix] == new_lines[prefix]:
+            prefix += 1
+        if prefix == old_len == new_len:
+            self.last_reparsed_range = (0, 0)
+            return
+        suffix = 0
+        while suffix < max_common - prefix and old_lines[old_len - 1 - suffix] == new_lines[new_len - 1 - suffix]:
+            suffix += 1
+
+        first_dirty = prefix + 1
+        new_dirty_end = new_len - suffix
+        line_delta = new_len - old_len
+
+        # 找到包含首个变化行的分段；若变化行恰好是分段首行，则该行可能并入上一分段，需再回退一段
+        seg_starts = [seg.start_line for seg in self.segments]
+        seg_index = bisect.bisect_right(seg_starts, first_dirty) - 1
+        if seg_index > 0 and seg_starts[seg_index] == first_dirty:
+            seg_index -= 1
+        restart_line = self.segments[seg_index].start_line
+
+        # 未变化后缀中的旧分段起点（换算为新行号）均可作为重新对齐的位置；
+        # 文件首行的解析行为与其余行不同，平移到首行的分段不能直接复用
+        old_seg_by_new_start = {
+            seg.start_line + line_delta: i
+            for i, seg in enumerate(self.segments)
+            if i > seg_index and seg.start_line + line_delta > max(new_dirty_end, restart_line, 1)
+        }
+
+        parser = self._create_parser(text, new_lines, restart_line, lambda line: line in old_seg_by_new_start)
+        region_ast = parser.parse()
+
+        if parser.stopped_line:
+            region_end = parser.stopped_line - 1
+            resync_index = old_seg_by_new_start[parser.stopped_line]
+        else:
+            region_end = new_len
+            resync_index = len(self.segments)
+        self.next_uid = parser.uid_generator.get_current_uid() + 1
+        self.last_reparsed_range = (restart_line, region_end)
+
+        new_ast = dict(self.ast_dict)
+
+        # 移除被替换分段的节点，按内容哈希登记以便复用
+        replaced: Dict[str, List[IbcAnalysisSegment]] = {}
+        for seg in self.segments[seg_index:resync_index]:
+            replaced.setdefault(seg.content_hash, []).append(seg)
+            for uid in self._collect_subtree_uids(self.ast_dict, seg.top_uids):
+                del new_ast[uid]
+
+        # 重新解析区间的分段：内容哈希一致则复用旧节点，否则采用新解析出的节点
+        region_segments = self._build_segments(parser, region_ast, new_lines, restart_line, region_end)
+        for seg in region_segments:
+            candidates = replaced.get(seg.content_hash)
+            if candidates:
+                old_seg = candidates.pop(0)
+                self._copy_subtree(self.ast_dict, new_ast, old_seg.top_uids, seg.start_line - old_seg.start_line)
+                seg.top_uids = old_seg.top_uids
+            else:
+                self._copy_subtree(region_ast, new_ast, seg.top_uids, 0)
+
+        # 后缀分段：节点直接复用，仅平移行号
+        suffix_segments = []
+        for seg in self.segments[resync_index:]:
+            if line_delta:
+                self._copy_subtree(self.ast_dict, new_ast, seg.top_uids, line_delta)
+                seg = IbcAnalysisSegment(
+                    start_line=seg.start_line + line_delta,
+                    end_line=seg.end_line + line_delta,
+                    content_hash=seg.content_hash,
+                    top_uids=seg.top_uids
+                )
+            suffix_segments.append(seg)
+
+        self.segments = self.segments[:seg_index] + region_segments + suffix_segments
+
+        # 根节点重新按分段顺序挂接顶层节点
+        root = IbcBaseAstNode(uid=0, node_type=AstNodeType.DEFAULT)
+        for seg in self.segments:
+            root.children_uids.extend(seg.top_uids)
+        new_ast[0] = root
+
+        self._commit(new_lines, new_ast)
+
+    def _create_parser(
+        self,
+        text: str,
+        new_lines: List[str],
+        start_line: int,
+        stop_predicate: Optional[Callable[[int], bool]]
+    ) -> IbcCheckpointParser:
+        """创建从 start_line 开始的检查点解析器，uid从 next_uid 开始分配"""
+        lexer = IbcLexer(text)
+        lexer.line_num = start_line - 1
+
+        parser = IbcCheckpointParser(lexer.iter_tokens(), new_lines, start_line, stop_predicate)
+        parser.uid_generator.uid = self.next_uid - 1
+        parser.last_ast_node_uid = self.next_uid - 1
+        # 除文件首行外，检查点之前必然已经出现过NEWLINE
+        parser.is_new_line_start = start_line > 1
+        return parser
+
+    def _build_segments(
+        self,
+        parser: IbcCheckpointParser,
+        region_ast: Dict[int, IbcBaseAstNode],
+        new_lines: List[str],
+        start_line: int,
+        end_line: int
+    ) -> List[IbcAnalysisSegment]:
+        """根据解析器记录的检查点，将 [start_line, end_line] 区间切分为顶层分段"""
+        root_children = region_ast[0].children_uids
+        boundaries = [(start_line, 0)]
+        for line_num, child_count, _ in parser.checkpoints:
+            if start_line < line_num <= end_line:
+                boundaries.append((line_num, child_count))
+
+        segments = []
+        for i, (seg_start, child_begin) in enumerate(boundaries):
+            if i + 1 < len(boundaries):
+                seg_end = boundaries[i + 1][0] - 1
+                child_end = boundaries[i + 1][1]
+            else:
+                seg_end = end_line
+                child_end = len(root_children)
+            segments.append(IbcAnalysisSegment(
+                start_line=seg_start,
+                end_line=seg_end,
+                content_hash=self._hash_segment(new_lines, seg_start, seg_end),
+                top_uids=list(root_children[child_begin:child_end])
+            ))
+        return segments
+
+    @staticmethod
+    def _hash_segment(lines: List[str], start_line: int, end_line: int) -> str:
+        """计算分段内容哈希；文件首行开始的分段解析行为不同，单独区分"""
+        head = "1" if start_line == 1 else "0"
+        return hashlib.md5((head + '\n'.join(lines[start_line - 1:end_line])).encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _collect_subtree_uids(ast_dict: Dict[int, IbcBaseAstNode], top_uids: List[int]) -> List[int]:
+        """收集若干顶层节点及其全部子孙节点的uid"""
+        result = []
+        stack = list(top_uids)
+        while stack:
+            uid = stack.pop()
+            node = ast_dict.get(uid)
+            if node is None:
+                continue
+            result.append(uid)
+            stack.extend(node.children_uids)
+        return result
+
+    def _copy_subtree(
+        self,
+        src_ast: Dict[int, IbcBaseAstNode],
+        dst_ast: Dict[int, IbcBaseAstNode],
+        top_uids: List[int],
+        line_delta: int
+    ) -> None:
+        """将子树节点复制到目标AST；行号需要平移时生成新的节点对象，避免修改上一次返回的AST"""
+        for uid in self._collect_subtree_uids(src_ast, top_uids):
+            node = src_ast[uid]
+            if line_delta:
+                node = dataclasses.replace(node, line_number=node.line_number + line_delta)
+            dst_ast[uid] = node
+
+    def _commit(self, new_lines: List[str], new_ast: Dict[int, IbcBaseAstNode]) -> None:
+        """保存本次分析结果并重建符号树"""
+        self.lines = new_lines
+        self.ast_dict = new_ast
+        symbol_processor = IbcSymbolProcessor(new_ast)
+        self.symbols_tree, self.symbols_metadata = symbol_processor.build_symbol_tree()
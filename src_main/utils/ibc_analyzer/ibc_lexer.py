@@ -1,13 +1,67 @@
-from typing import List
+import re
+from typing import Iterator, List
 
 from typedef.exception_types import LexerError
 from typedef.ibc_data_types import IbcKeywords, IbcTokenType, Token
 
+# 特殊符号集合，与参考实现中的 special_chars 保持一致
+_SPECIAL_CHARS = '(){}[],:\\=$+-*/%<>!&|'
+
+# 关键字集合，模块加载时构建一次
+_KEYWORD_VALUES = frozenset(kw.value for kw in IbcKeywords)
+
+# 字符类别表：特殊符号 -> token类型
+_PUNCT_TOKEN_TYPES = {
+    '(': IbcTokenType.LPAREN,
+    ')': IbcTokenType.RPAREN,
+    '{': IbcTokenType.LBRACE,
+    '}': IbcTokenType.RBRACE,
+    '[': IbcTokenType.LBRACKET,
+    ']': IbcTokenType.RBRACKET,
+    ',': IbcTokenType.COMMA,
+    ':': IbcTokenType.COLON,
+    '=': IbcTokenType.EQUAL,
+    '\\': IbcTokenType.BACKSLASH,
+    '+': IbcTokenType.PLUS,
+    '-': IbcTokenType.MINUS,
+    '*': IbcTokenType.MULTIPLY,
+    '/': IbcTokenType.DIVIDE,
+    '%': IbcTokenType.MODULO,
+    '<': IbcTokenType.LESS,
+    '>': IbcTokenType.GREATER,
+    '!': IbcTokenType.EXCLAMATION,
+    '&': IbcTokenType.AMPERSAND,
+    '|': IbcTokenType.PIPE,
+}
+
+# 单遍扫描使用的主正则，分支顺序即匹配优先级：
+# - ref: $引用，内容直到空白或特殊符号为止（$本身不计入）
+# - self_ref: self.引用，要求处于行首或紧跟空白/特殊符号之后
+# - punct: 单个特殊符号
+# - text: 连续的非特殊字符（包括空白），遇到合法的self.引用起点时截断
+_SPECIAL_CLASS = re.escape(_SPECIAL_CHARS)
+_PUNCT_CLASS = re.escape(''.join(_PUNCT_TOKEN_TYPES))
+_SELF_REF_START = rf'(?<![^{_SPECIAL_CLASS}\s])self\.'
+_MASTER_PATTERN = re.compile(
+    rf'\$(?P<ref>[^{_SPECIAL_CLASS}\s]*)'
+    rf'|{_SELF_REF_START}(?P<self_ref>[^{_SPECIAL_CLASS}\s]*)'
+    rf'|(?P<punct>[{_PUNCT_CLASS}])'
+    rf'|(?P<text>(?:(?!{_SELF_REF_START})[^{_SPECIAL_CLASS}])+)'
+)
+
 
 class IbcLexer:
-    """Intent Behavior Code 词法分析器"""
-    def __init__(self, text: str) -> None:
+    """Intent Behavior Code 词法分析器
+    
+    默认使用基于预编译主正则的单遍扫描器逐行分词；
+    reference_mode=True 时使用逐字符判断的参考实现，便于对比两者输出。
+    recover_errors=True 时遇到词法错误不直接抛出，而是记录到 errors 中并跳过出错行继续分析。
+    """
+    def __init__(self, text: str, reference_mode: bool = False, recover_errors: bool = False) -> None:
         self.text: str = text
+        self.reference_mode = reference_mode
+        self.recover_errors = recover_errors
+        self.errors: List[LexerError] = []
         # 修复：正确处理空字符串的情况
         self.lines: list[str] = text.split(sep='\n') if text else []
         self.line_num = 0
@@ -69,11 +123,12 @@ class IbcLexer:
             # 使用空格和冒号作为分隔符分割字符串。整个Lexer仅在识别关键字时会出现空格 split
             parts = striped_line.replace(':', ' ', 1).split()
 
-        first_part: str = parts[0]
-        if first_part not in [kw.value for kw in IbcKeywords]:
+        # 只有冒号的行分割后没有任何内容，按普通内容处理
+        if not parts or parts[0] not in _KEYWORD_VALUES:
             self.is_keyword_line = False
             return striped_line
         
+        first_part: str = parts[0]
         self.is_keyword_line = True
         self.tokens.append(Token(type=IbcTokenType.KEYWORDS, value=first_part, line_num=self.line_num))
 
@@ -84,7 +139,11 @@ class IbcLexer:
     
     def _tokenize_line(self, content_line: str) -> None:
         """对当前行进行词法分析"""
-        # 检查是否包含符号引用（$或self.）
+        if not self.reference_mode:
+            self._scan_line(content_line)
+            return
+        
+        # 参考实现：检查是否包含符号引用（$或self.）
         has_dollar = '$' in content_line
         has_self_ref = 'self.' in content_line
         
@@ -97,6 +156,51 @@ class IbcLexer:
         self._tokenize_text_part(content_line)
         return
     
+    def _scan_line(self, content_line: str) -> None:
+        """单遍扫描当前行，输出与参考实现（_tokenize_line_with_refs/_tokenize_text_part）完全一致的token序列
+        
+        由 _MASTER_PATTERN 一次性切分出 $引用、self.引用、特殊符号与普通文本。
+        与参考实现保持一致：夹在行首/引用与行尾/引用之间、仅由空白组成的文本片段会被丢弃。
+        """
+        tokens = self.tokens
+        line_num = self.line_num
+        # 上一个匹配是否为片段边界（行首或引用）
+        after_boundary = True
+        # 紧跟在边界之后的纯空白文本，需要看到下一个匹配才能决定是否保留
+        pending_blank = None
+        
+        for match in _MASTER_PATTERN.finditer(content_line):
+            kind = match.lastgroup
+            if kind == 'text' or kind == 'punct':
+                if pending_blank is not None:
+                    tokens.append(pending_blank)
+                    pending_blank = None
+                value = match.group(kind)
+                if kind == 'punct':
+                    tokens.append(Token(_PUNCT_TOKEN_TYPES[value], value, line_num))
+                elif after_boundary and value.isspace():
+                    pending_blank = Token(IbcTokenType.IDENTIFIER, value, line_num)
+                else:
+                    tokens.append(Token(IbcTokenType.IDENTIFIER, value, line_num))
+                after_boundary = False
+                continue
+            
+            # 引用是片段边界，前面挂起的纯空白片段直接丢弃
+            pending_blank = None
+            after_boundary = True
+            if kind == 'ref':
+                ref_content = match.group('ref')
+                if ref_content:
+                    tokens.append(Token(IbcTokenType.REF_IDENTIFIER, ref_content, line_num))
+                else:
+                    print(f"Warning: Line {line_num}: Empty reference identifier after $, will be removed")
+            else:
+                ref_content = match.group('self_ref')
+                if ref_content:
+                    tokens.append(Token(IbcTokenType.SELF_REF_IDENTIFIER, ref_content, line_num))
+                else:
+                    print(f"Warning: Line {line_num}: Empty reference after 'self.', will be removed")
+    
     def _tokenize_line_with_refs(self, content_line: str) -> None:
         """处理包含符号引用的行使用$作为起始标记，后续连续的非保留符号作为引用内容，包含 . 符号 
         同时支持识别 self.开头的引用（不需要$前缀）
@@ -233,60 +337,107 @@ class IbcLexer:
                 self.tokens.append(Token(IbcTokenType.IDENTIFIER, identifier, self.line_num))
 
     def tokenize(self) -> List[Token]:
-        """执行词法分析"""
+        """执行词法分析，一次性返回完整的token列表"""
+        self.tokens = list(self.iter_tokens())
+        return self.tokens
+    
+    def iter_tokens(self) -> Iterator[Token]:
+        """惰性执行词法分析，逐行产出token
+        
+        每分析完一行即产出该行的token并清空行缓冲，调用方停止迭代后剩余的行不会再被分析，
+        因此下游解析器在遇到语法错误时可以直接中止整个流水线。
+        """
         # 空文件也应该添加NEWLINE和EOF
         if not self.lines:
-            self.tokens.append(Token(IbcTokenType.NEWLINE, '', 1))
-            self.tokens.append(Token(IbcTokenType.EOF, '', 1))
-            return self.tokens
+            yield Token(IbcTokenType.NEWLINE, '', 1)
+            yield Token(IbcTokenType.EOF, '', 1)
+            return
         
         # 处理每一行
         while self._get_next_line():
-            # 跳过空行（注释行已在 _get_next_line 中处理）
-            striped_line = self.current_line.strip()
-            if not striped_line:
-                self.tokens.append(Token(IbcTokenType.NEWLINE, '', self.line_num))
-                continue
-
-            # 处理缩进
-            indent_level = self._calc_indent_level(self.current_line)
-            current_indent = self.indent_stack[-1]
-            if indent_level > current_indent:
-                # 根据缩进差值添加相应数量的 INDENT token
-                indent_diff = indent_level - current_indent
-                for _ in range(indent_diff):
-                    self.tokens.append(Token(IbcTokenType.INDENT, "", self.line_num))
-                    current_indent += 1
-                    self.indent_stack.append(current_indent)
-            elif indent_level < current_indent:
-                # 减少缩进
-                while self.indent_stack and self.indent_stack[-1] > indent_level:
-                    self.tokens.append(Token(IbcTokenType.DEDENT, "", self.line_num))
-                    self.indent_stack.pop()
-                
-                # 检查缩进是否对齐
-                if not self.indent_stack or self.indent_stack[-1] != indent_level:
-                    raise LexerError(
-                        message="Inconsistent indentation",
-                        line_num=self.line_num
-                    )
-            
-            # 识别并处理行开头可能存在的关键字
-            content_line: str = self._process_keyword(striped_line)
-
-            # 处理行
-            self._tokenize_line(content_line)
-            
-            # 每行结束后添加换行符
-            self.tokens.append(Token(IbcTokenType.NEWLINE, '', self.line_num))
+            yield from self._tokenize_line_by_mode()
         
         # 文件结束前处理剩余的DEDENT
         while len(self.indent_stack) > 1:
-            self.tokens.append(Token(IbcTokenType.DEDENT, "", self.line_num))
+            yield Token(IbcTokenType.DEDENT, "", self.line_num)
             self.indent_stack.pop()
         
         # 添加最终的换行符和EOF
-        self.tokens.append(Token(IbcTokenType.NEWLINE, '', self.line_num))
-        self.tokens.append(Token(IbcTokenType.EOF, '', self.line_num))
+        yield Token(IbcTokenType.NEWLINE, '', self.line_num)
+        yield Token(IbcTokenType.EOF, '', self.line_num)
+    
+    def feed_line(self, line: str) -> List[Token]:
+        """增量词法分析：追加一行文本并立即分析，返回该行产出的token
         
-        return self.tokens
+        用于边接收边分析的场景（如流式输出校验）：以空文本构造后逐行调用，
+        同一行产出的token与 iter_tokens 完全一致，但不会产出文件结束时的DEDENT/NEWLINE/EOF。
+        尚未分析的行（如空文本构造时的占位空行）会被新行替换。
+        recover_errors=True 时出错行的错误记录到 errors，否则抛出 LexerError。
+        """
+        self.lines[self.line_num:] = [line]
+        self._get_next_line()
+        return self._tokenize_line_by_mode()
+    
+    def _tokenize_line_by_mode(self) -> List[Token]:
+        """按是否启用错误恢复分析 _get_next_line 读取到的当前行，返回该行的token"""
+        if self.recover_errors:
+            self._tokenize_current_line_with_recovery()
+        else:
+            self._tokenize_current_line()
+        return self._drain_tokens()
+    
+    def _drain_tokens(self) -> List[Token]:
+        """取出并清空当前行缓冲中的token"""
+        line_tokens = self.tokens
+        self.tokens = []
+        return line_tokens
+    
+    def _tokenize_current_line_with_recovery(self) -> None:
+        """错误恢复模式下分析当前行：出错时记录错误，该行只保留已产生的缩进token并以换行结束"""
+        try:
+            self._tokenize_current_line()
+        except LexerError as e:
+            self.errors.append(e)
+            self.tokens = [token for token in self.tokens
+                           if token.type in (IbcTokenType.INDENT, IbcTokenType.DEDENT)]
+            self.tokens.append(Token(IbcTokenType.NEWLINE, '', self.line_num))
+
+    def _tokenize_current_line(self) -> None:
+        """对 _get_next_line 读取到的当前行执行缩进、关键字与行内容分析，结果写入行缓冲"""
+        # 跳过空行（注释行已在 _get_next_line 中处理）
+        striped_line = self.current_line.strip()
+        if not striped_line:
+            self.tokens.append(Token(IbcTokenType.NEWLINE, '', self.line_num))
+            return
+
+        # 处理缩进
+        indent_level = self._calc_indent_level(self.current_line)
+        current_indent = self.indent_stack[-1]
+        if indent_level > current_indent:
+            # 根据缩进差值添加相应数量的 INDENT token
+            indent_diff = indent_level - current_indent
+            for _ in range(indent_diff):
+                self.tokens.append(Token(IbcTokenType.INDENT, "", self.line_num))
+                current_indent += 1
+                self.indent_stack.append(current_indent)
+        elif indent_level < current_indent:
+            # 减少缩进
+            while self.indent_stack and self.indent_stack[-1] > indent_level:
+                self.tokens.append(Token(IbcTokenType.DEDENT, "", self.line_num))
+                self.indent_stack.pop()
+            
+            # 检查缩进是否对齐
+            if not self.indent_stack or self.indent_stack[-1] != indent_level:
+                raise LexerError(
+                    message="Inconsistent indentation",
+                    line_num=self.line_num
+                )
+        
+        # 识别并处理行开头可能存在的关键字
+        content_line: str = self._process_keyword(striped_line)
+
+        # 处理行
+        self._tokenize_line(content_line)
+        
+        # 每行结束后添加换行符
+        self.tokens.append(Token(IbcTokenType.NEWLINE, '', self.line_num))
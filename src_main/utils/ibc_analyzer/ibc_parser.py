@@ -1,5 +1,5 @@
 from enum import Enum
-from typing import Any, Callable, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
 from typedef.exception_types import IbcParserError
 from typedef.ibc_data_types import (AstNodeType, BehaviorStepNode, ClassNode,
@@ -21,6 +21,10 @@ from utils.ibc_analyzer.ibc_parser_uid_generator import IbcParserUidGenerator
 
 # TODO: 目前设计模式不完善，后处理也许应该整合到整个状态处理逻辑里，不应该零散分布。
 # 仍存在较多vibe内容，但基本都review过
+# 承载代码块内容的状态，错误恢复时状态栈只回退到这些状态
+_BLOCK_STATES = (TopLevelState, ClassContentState, FuncContentState)
+
+
 class ParserMainState(Enum):
     """Parser主循环状态枚举"""
     PASS_THROUGH_MODE = "PASS_THROUGH_MODE"  # token透传模式
@@ -34,7 +38,7 @@ class ParserMainState(Enum):
 class IbcParser:
     """IBC代码解析器"""
     
-    def __init__(self, tokens: List[Token]):
+    def __init__(self, tokens: List[Token], recover_errors: bool = False):
         self.tokens = tokens
         self.pos = 0
         self.uid_generator = IbcParserUidGenerator()
@@ -62,26 +66,101 @@ class IbcParser:
         self.continuation_dedent_to_absorb = 0  # 需要吸收的DEDENT数量
         self.continuation_needs_new_block = False  # 是否需要在吸收完DEDENT后创建新代码块
 
+        # 错误恢复模式：遇到语法错误时记录下来，跳过出错语句后继续解析，最终返回部分AST
+        self.recover_errors = recover_errors
+        self.errors: List[IbcParserError] = []
+        self.is_skipping = False  # 是否正在跳过出错语句
+        self.lex_indent_level = 0  # 已消费token对应的词法缩进层级
+        self.stmt_indent_level = 0  # 当前语句起始行的词法缩进层级
+
     def parse(self) -> Dict[int, IbcBaseAstNode]:
         """执行解析"""
         while not self._is_at_end():
-            token = self._consume_token()
-            self.line_num = token.line_num
-
-            # 阶段1：决定当前token应该被如何处理
-            main_state = self._determine_main_state(token)
-            
-            # 阶段2：执行token处理
-            self._execute_token_processing(token, main_state)
-            
-            # 阶段3：token后处理
-            self._post_process_token(token)
-            
-            # 阶段4：处理状态机弹出后的额外动作
-            self._handle_post_pop_actions(token)
+            self.feed_token(self._consume_token())
             
         return self.ast_nodes
+
+    def feed_token(self, token: Token) -> None:
+        """增量语法分析：处理一个token，解析结果累积在 ast_nodes 中
+        
+        用于边接收边分析的场景（如流式输出校验）：以空token列表构造后按顺序推入token，
+        处理方式与 parse 逐个处理token时完全一致，解析器不向后前瞻。
+        recover_errors=True 时错误记录到 errors，否则抛出 IbcParserError。
+        """
+        if self.recover_errors:
+            self._parse_token_with_recovery(token)
+        else:
+            self._parse_token(token)
+
+    def _parse_token_with_recovery(self, token: Token) -> None:
+        """错误恢复模式下处理单个token
         
+        出错后跳过当前语句以及其后缩进更深的行（通常是出错声明的代码块），
+        直到遇到缩进层级不深于出错语句的下一行时，按词法缩进层级回退状态栈并恢复解析。
+        """
+        if token.type == IbcTokenType.INDENT:
+            self.lex_indent_level += 1
+        elif token.type == IbcTokenType.DEDENT:
+            self.lex_indent_level -= 1
+
+        is_stmt_start = self.is_new_line_start and not self.is_pass_token_to_state and \
+            token.type not in (IbcTokenType.INDENT, IbcTokenType.DEDENT, IbcTokenType.NEWLINE)
+
+        if self.is_skipping:
+            if not is_stmt_start or self.lex_indent_level > self.stmt_indent_level:
+                self._update_new_line_flag(token)
+                return
+            self._resync_state_stack()
+            self.is_skipping = False
+
+        if is_stmt_start:
+            self.stmt_indent_level = self.lex_indent_level
+            current_state_obj = self.state_stack[-1][0]
+            if isinstance(current_state_obj, _BLOCK_STATES) and current_state_obj.block_indent_level is None:
+                current_state_obj.block_indent_level = self.lex_indent_level
+
+        try:
+            self._parse_token(token)
+        except IbcParserError as e:
+            self.errors.append(e)
+            self._enter_skipping(token)
+
+    def _enter_skipping(self, token: Token) -> None:
+        """记录错误后进入跳过模式，清理出错语句遗留的解析状态"""
+        self.is_skipping = True
+        self.is_pass_token_to_state = False
+        # INDENT/DEDENT只出现在行首，出错于它们时当前行内容仍可作为新语句的开始
+        self.is_new_line_start = token.type in (IbcTokenType.NEWLINE, IbcTokenType.INDENT, IbcTokenType.DEDENT)
+        self.pending_description = ""
+        self.pending_intent_comment = ""
+        self.func_pending_indent_level = 0
+        self.continuation_dedent_to_absorb = 0
+        self.continuation_needs_new_block = False
+
+    def _resync_state_stack(self) -> None:
+        """按当前词法缩进层级回退状态栈：弹出未完成的语句状态，以及内容缩进比当前行更深的代码块状态"""
+        while len(self.state_stack) > 1:
+            state_obj = self.state_stack[-1][0]
+            if isinstance(state_obj, _BLOCK_STATES) and \
+                    (state_obj.block_indent_level is None or state_obj.block_indent_level <= self.lex_indent_level):
+                break
+            self.state_stack.pop()
+
+    def _parse_token(self, token: Token) -> None:
+        """处理单个token"""
+        self.line_num = token.line_num
+
+        # 阶段1：决定当前token应该被如何处理
+        main_state = self._determine_main_state(token)
+        
+        # 阶段2：执行token处理
+        self._execute_token_processing(token, main_state)
+        
+        # 阶段3：token后处理
+        self._post_process_token(token)
+        
+        # 阶段4：处理状态机弹出后的额外动作
+        self._handle_post_pop_actions(token)
 
     def _determine_main_state(self, token: Token) -> ParserMainState:
         """根据token和当前状态，决定处理模式"""
@@ -478,3 +557,32 @@ class IbcParser:
         return self._peek_token().type == IbcTokenType.EOF
     
 
+
+
+class IbcStreamParser(IbcParser):
+    """流式IBC解析器
+
+    与 IbcParser 的解析逻辑完全一致，区别仅在于token来源：按需从token迭代器（通常是
+    IbcLexer.iter_tokens()）中拉取，只保留一个token的前瞻缓冲，不持有完整的token列表。
+    解析过程中抛出异常时迭代器不再被推进，上游的惰性词法分析也随之中止。
+    """
+
+    def __init__(self, token_iter: Iterable[Token], recover_errors: bool = False):
+        super().__init__([], recover_errors)
+        self.token_iter: Iterator[Token] = iter(token_iter)
+        self.lookahead_token: Optional[Token] = None
+
+    def _peek_token(self) -> Token:
+        """查看当前token，必要时从迭代器中拉取一个token到前瞻缓冲"""
+        if self.lookahead_token is None:
+            self.lookahead_token = next(self.token_iter, None)
+            if self.lookahead_token is None:
+                return Token(IbcTokenType.EOF, "", -1)
+        return self.lookahead_token
+
+    def _consume_token(self) -> Token:
+        """消费当前token"""
+        token = self._peek_token()
+        self.lookahead_token = None
+        self.pos += 1
+        return token
@@ -39,6 +39,26 @@ class BaseState:
         self.ast_node_dict = ast_node_dict
         self.current_token: Optional[Token] = None
         self.pass_in_token_flag = False
+        # 文本内容以片段列表暂存，避免逐token字符串拼接带来的平方级开销
+        self._content_parts: List[str] = []
+        # 错误恢复模式下记录代码块内容所在的词法缩进层级，仅对代码块状态有意义
+        self.block_indent_level: Optional[int] = None
+
+    @property
+    def content(self) -> str:
+        """已收集的文本内容，仅在读取时才将片段拼接为字符串"""
+        parts = self._content_parts
+        if len(parts) > 1:
+            self._content_parts = parts = [''.join(parts)]
+        return parts[0] if parts else ""
+
+    @content.setter
+    def content(self, value: str) -> None:
+        self._content_parts = [value] if value else []
+
+    def _append_content(self, text: str) -> None:
+        """向文本内容末尾追加片段"""
+        self._content_parts.append(text)
 
     def process_token(self, token: Token) -> None:
         pass
@@ -117,7 +137,7 @@ class ModuleDeclState(BaseState):
                 self._create_module_node()
                 self.pop_flag = True
             else:
-                self.content += token.value
+                self._append_content(token.value)
                 self.sub_state = ModuleDeclSubState.EXPECTING_CONTENT
 
     def _create_module_node(self) -> None:
@@ -387,7 +407,7 @@ class DescriptionState(BaseState):
             elif token.type == IbcTokenType.IDENTIFIER:
                 # 单行模式:冒号后有内容
                 self.pass_in_token_flag = False
-                self.content += token.value
+                self._append_content(token.value)
                 self.sub_state = DescriptionSubState.EXPECTING_ONELINE
             else:
                 raise IbcParserError(
@@ -406,7 +426,7 @@ class DescriptionState(BaseState):
                     )
                 self.pop_flag = True
             else:
-                self.content += token.value
+                self._append_content(token.value)
                 # 保持在EXPECTING_ONELINE状态
         
         elif self.sub_state == DescriptionSubState.EXPECTING_MULTILINE_INDENT:
@@ -439,11 +459,11 @@ class DescriptionState(BaseState):
                 )
             elif token.type == IbcTokenType.NEWLINE:
                 # 换行,添加到内容中
-                self.content += "\n"
+                self._append_content("\n")
                 # 保持在EXPECTING_MULTILINE_CONTENT状态
             else:
                 # 收集内容
-                self.content += token.value
+                self._append_content(token.value)
                 # 保持在EXPECTING_MULTILINE_CONTENT状态
 
     def is_need_pop(self) -> bool:
@@ -480,7 +500,7 @@ class IntentCommentState(BaseState):
                     )
                 self.pop_flag = True
             else:
-                self.content += token.value
+                self._append_content(token.value)
                 # 保持在EXPECTING_CONTENT状态
 
     def is_need_pop(self) -> bool:
@@ -992,14 +1012,14 @@ class BehaviorStepState(BaseState):
         # 处理符号引用（在所有子状态下都适用）
         if token.type == IbcTokenType.REF_IDENTIFIER:
             self.symbol_refs.append(token.value.strip())
-            self.content += token.value
+            self._append_content(token.value)
             return
         
         # 处理self引用（在所有子状态下都适用）
         if token.type == IbcTokenType.SELF_REF_IDENTIFIER:
             self.self_refs.append(token.value.strip())
             # 在content中恢复self.前缀，保持原始格式
-            self.content += 'self.' + token.value
+            self._append_content('self.' + token.value)
             return
         
         # 根据子状态处理token
@@ -1020,19 +1040,19 @@ class BehaviorStepState(BaseState):
         """处理普通内容状态"""
         # 处理左括号，进入对应的括号延续行模式
         if token.type == IbcTokenType.LPAREN:
-            self.content += token.value
+            self._append_content(token.value)
             self.paren_count = 1  # 初始化计数器
             self.sub_state = BehaviorStepSubState.EXPECTING_PAREN_CONTINUATION
             self.pass_in_token_flag = True
             self.has_entered_continuation = True
         elif token.type == IbcTokenType.LBRACE:
-            self.content += token.value
+            self._append_content(token.value)
             self.brace_count = 1  # 初始化计数器
             self.sub_state = BehaviorStepSubState.EXPECTING_BRACE_CONTINUATION
             self.pass_in_token_flag = True
             self.has_entered_continuation = True
         elif token.type == IbcTokenType.LBRACKET:
-            self.content += token.value
+            self._append_content(token.value)
             self.bracket_count = 1  # 初始化计数器
             self.sub_state = BehaviorStepSubState.EXPECTING_BRACKET_CONTINUATION
             self.pass_in_token_flag = True
@@ -1052,7 +1072,7 @@ class BehaviorStepState(BaseState):
                 self.sub_state = BehaviorStepSubState.EXPECTING_COMMA_CONTINUATION
                 self.pass_in_token_flag = True
                 self.local_indent_level = 0
-                self.content += " "  # 添加空格以便后续内容连接
+                self._append_content(" ")  # 添加空格以便后续内容连接
                 self.has_entered_continuation = True
             elif content_stripped and content_stripped[-1] == "\\":
                 # 行末是反斜杠，进入反斜杠延续行模式
@@ -1066,7 +1086,7 @@ class BehaviorStepState(BaseState):
                 self.sub_state = BehaviorStepSubState.EXPECTING_COMMA_CONTINUATION
                 self.pass_in_token_flag = True
                 self.local_indent_level = 0
-                self.content += " "  # 添加空格以便后续内容连接
+                self._append_content(" ")  # 添加空格以便后续内容连接
                 self.has_entered_continuation = True
             else:
                 # 普通行结束
@@ -1075,7 +1095,7 @@ class BehaviorStepState(BaseState):
                 self.pop_flag = True
         else:
             # 收集其他内容
-            self.content += token.value
+            self._append_content(token.value)
     
     def _process_comma_continuation_state(self, token: Token) -> None:
         """处理逗号延续行状态"""
@@ -1109,7 +1129,7 @@ class BehaviorStepState(BaseState):
                 self.pop_flag = True
             elif content_stripped and (content_stripped[-1] == "," or content_stripped[-1] in "+-*/%<>!&|"):
                 # 行末是逗号或运算符，保持延续行模式
-                self.content += " "  # 添加空格以便后续内容连接
+                self._append_content(" ")  # 添加空格以便后续内容连接
             else:
                 # 行末不是逗号也不是冒号也不是运算符，直接弹出
                 self.content = content_stripped
@@ -1118,7 +1138,7 @@ class BehaviorStepState(BaseState):
                 self.pop_flag = True
         else:
             # 收集内容
-            self.content += token.value
+            self._append_content(token.value)
     
     def _process_backslash_continuation_state(self, token: Token) -> None:
         """处理反斜杠延续行状态
@@ -1164,7 +1184,7 @@ class BehaviorStepState(BaseState):
                 self.pop_flag = True
         else:
             # 收集内容
-            self.content += token.value
+            self._append_content(token.value)
     
     def _process_paren_continuation_state(self, token: Token) -> None:
         """处理小括号延续行状态"""
@@ -1185,10 +1205,10 @@ class BehaviorStepState(BaseState):
             self.local_indent_level -= 1
         elif token.type == IbcTokenType.LPAREN:
             self.paren_count += 1
-            self.content += token.value
+            self._append_content(token.value)
         elif token.type == IbcTokenType.RPAREN:
             self.paren_count -= 1
-            self.content += token.value
+            self._append_content(token.value)
             # 检查括号是否封闭
             if self.paren_count == 0:
                 # 括号封闭，退出括号延续行模式
@@ -1196,10 +1216,10 @@ class BehaviorStepState(BaseState):
                 self.pass_in_token_flag = False
         elif token.type == IbcTokenType.NEWLINE:
             # 新行，添加空格
-            self.content += " "
+            self._append_content(" ")
         else:
             # 收集其他内容
-            self.content += token.value
+            self._append_content(token.value)
     
     def _process_brace_continuation_state(self, token: Token) -> None:
         """处理花括号延续行状态"""
@@ -1220,10 +1240,10 @@ class BehaviorStepState(BaseState):
             self.local_indent_level -= 1
         elif token.type == IbcTokenType.LBRACE:
             self.brace_count += 1
-            self.content += token.value
+            self._append_content(token.value)
         elif token.type == IbcTokenType.RBRACE:
             self.brace_count -= 1
-            self.content += token.value
+            self._append_content(token.value)
             # 检查括号是否封闭
             if self.brace_count == 0:
                 # 括号封闭，退出括号延续行模式
@@ -1231,10 +1251,10 @@ class BehaviorStepState(BaseState):
                 self.pass_in_token_flag = False
         elif token.type == IbcTokenType.NEWLINE:
             # 新行，添加空格
-            self.content += " "
+            self._append_content(" ")
         else:
             # 收集其他内容
-            self.content += token.value
+            self._append_content(token.value)
     
     def _process_bracket_continuation_state(self, token: Token) -> None:
         """处理方括号延续行状态"""
@@ -1255,10 +1275,10 @@ class BehaviorStepState(BaseState):
             self.local_indent_level -= 1
         elif token.type == IbcTokenType.LBRACKET:
             self.bracket_count += 1
-            self.content += token.value
+            self._append_content(token.value)
         elif token.type == IbcTokenType.RBRACKET:
             self.bracket_count -= 1
-            self.content += token.value
+            self._append_content(token.value)
             # 检查括号是否封闭
             if self.bracket_count == 0:
                 # 括号封闭，退出括号延续行模式
@@ -1266,10 +1286,10 @@ class BehaviorStepState(BaseState):
                 self.pass_in_token_flag = False
         elif token.type == IbcTokenType.NEWLINE:
             # 新行，添加空格
-            self.content += " "
+            self._append_content(" ")
         else:
             # 收集其他内容
-            self.content += token.value
+            self._append_content(token.value)
     
     def _create_behavior_node(self) -> None:
         """创建行为步骤节点"""
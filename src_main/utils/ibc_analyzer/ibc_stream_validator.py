@@ -0,0 +1,64 @@
+from typing import List, Optional
+
+from libs.stream_validator import StreamValidator
+from typedef.exception_types import IbcAnalyzerError
+from utils.ibc_analyzer.ibc_analyzer import preprocess_cn_text
+from utils.ibc_analyzer.ibc_lexer import IbcLexer
+from utils.ibc_analyzer.ibc_parser import IbcParser
+
+
+class IbcStreamValidator(StreamValidator):
+    """IBC流式输出校验器：增量运行的词法/语法分析前端
+
+    每收到完整的一行，就通过 IbcLexer.feed_line 分析该行，并把产出的token逐个通过 IbcParser.feed_token 推给同一个解析器。
+    解析器处理token时不向后前瞻，词法分析也只依赖已读入的行，因此在某一行上出现的词法/语法错误
+    与完整分析时在该行出现的错误完全一致。
+
+    词法/语法分析均运行在错误恢复模式下：出错语句被跳过后继续校验，累计错误数达到 max_errors 时
+    才提前终止生成，使随后的修复流程一次拿到多处错误，而不是每轮只修复第一处。
+    这是节省的token与每轮可修复错误数之间的取舍：max_errors 越大，终止越晚，
+    max_errors 为1时在第一处错误即终止；终止之后的内容中的错误仍无法发现。
+    文件末尾才能发现的问题（如缺少代码块）不在此校验，仍由完整分析负责。
+    """
+
+    def __init__(self, max_errors: int = 3):
+        super().__init__()
+        self.max_errors = max(1, max_errors)
+        self._line_buffer = ""
+        self._lexer = IbcLexer("", recover_errors=True)
+        self._parser = IbcParser([], recover_errors=True)
+
+    def get_errors(self) -> List[IbcAnalyzerError]:
+        """获取目前为止发现的全部词法/语法错误，按行号排序（与完整分析的错误顺序一致）"""
+        return sorted([*self._lexer.errors, *self._parser.errors], key=lambda err: err.line_num)
+
+    def _feed_body(self, text: str) -> Optional[str]:
+        self._line_buffer += text
+        *lines, self._line_buffer = self._line_buffer.split('\n')
+        for line in lines:
+            if line.strip().startswith('```'):
+                # 结尾的代码块标记，正文结束
+                self.finished = True
+                return None
+            error = self._feed_line(line)
+            if error is not None or self.finished:
+                return error
+        return None
+
+    def _feed_line(self, line: str) -> Optional[str]:
+        """分析一行完整的正文，错误数达到上限时返回错误信息"""
+        try:
+            for token in self._lexer.feed_line(preprocess_cn_text(line)):
+                self._parser.feed_token(token)
+        except IbcAnalyzerError as e:
+            # 错误恢复模式下仍抛出的错误无法跳过，直接终止
+            return f"IBC第{e.line_num}行: {e.message}"
+        except Exception:
+            # 非预期的内部错误无法证明输出不合法，停止校验，交由完整分析处理
+            self.finished = True
+            return None
+
+        errors = self.get_errors()
+        if len(errors) < self.max_errors:
+            return None
+        return "; ".join(f"IBC第{e.line_num}行: {e.message}" for e in errors)
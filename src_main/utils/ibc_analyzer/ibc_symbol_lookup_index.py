@@ -0,0 +1,199 @@
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+# 前缀树中标记“到此为一条完整路径”的键，不会与符号名冲突
+_TRIE_TERMINAL = '.'
+
+
+class DottedPathIndex:
+    """点分路径集合的查找索引
+
+    对一组点分路径（如符号元数据的键、外部库名）预先建立以下结构，使常见的路径查询均为常数时间：
+    - 完整路径与所有前缀路径的哈希集合
+    - 首段、末段以及所有后缀路径的哈希集合
+    - “前缀 + 至少一段 + 后缀”形式的嵌套后缀集合
+    - 按段组织的前缀树，用于判断索引中是否有路径是给定路径的前缀
+    """
+
+    def __init__(self, paths: Iterable[str]):
+        self.paths: Set[str] = set()
+        self.prefixes: Set[str] = set()
+        self.first_parts: Set[str] = set()
+        self.last_parts: Set[str] = set()
+        self.suffixes: Set[str] = set()
+        self.nested_suffixes: Set[Tuple[str, str]] = set()
+        self.trie: Dict[str, Any] = {}
+
+        for path in paths:
+            if not path or path in self.paths:
+                continue
+            self.paths.add(path)
+            parts = path.split('.')
+            part_count = len(parts)
+            self.first_parts.add(parts[0])
+            self.last_parts.add(parts[-1])
+
+            node = self.trie
+            for i, part in enumerate(parts):
+                self.prefixes.add('.'.join(parts[:i + 1]))
+                self.suffixes.add('.'.join(parts[i:]))
+                node = node.setdefault(part, {})
+            node[_TRIE_TERMINAL] = True
+
+            # 前缀a段、后缀s段，中间至少隔一段
+            for a in range(1, part_count - 1):
+                head = '.'.join(parts[:a])
+                for s in range(1, part_count - a):
+                    self.nested_suffixes.add((head, '.'.join(parts[part_count - s:])))
+
+    def __contains__(self, path: str) -> bool:
+        return path in self.paths
+
+    def has_prefix(self, prefix: str) -> bool:
+        """是否存在等于prefix或以“prefix.”开头的路径"""
+        return prefix in self.prefixes
+
+    def has_suffix(self, suffix: str) -> bool:
+        """是否存在等于suffix或以“.suffix”结尾的路径"""
+        return suffix in self.suffixes
+
+    def has_nested_suffix(self, base: str, suffix: str) -> bool:
+        """是否存在形如“base.任意一段或多段.suffix”的路径"""
+        return (base, suffix) in self.nested_suffixes
+
+    def contains_prefix_of(self, path: str) -> bool:
+        """索引中是否存在路径是path本身或path的前缀（按段匹配）"""
+        node = self.trie
+        for part in path.split('.'):
+            node = node.get(part)
+            if node is None:
+                return False
+            if _TRIE_TERMINAL in node:
+                return True
+        return False
+
+
+class SymbolTreeIndex:
+    """符号树的查找索引
+
+    - 完整路径哈希集合：精确路径查询
+    - 名称出现表：每个名称在树中的所有出现位置（按先序排列），用于跨任意层级的通配查找
+    - 跳层表：每个节点的孙节点名称到首个包含它的子节点的映射，用于允许跳过一层的路径查找
+
+    索引按构建时的符号树生成，符号树的键发生变化后需要重新构建。
+    """
+
+    def __init__(self, symbols_tree: Dict[str, Any]):
+        # 持有符号树引用，保证按对象定位节点时节点对象始终有效
+        self._root = symbols_tree
+        self.paths: Set[Tuple[str, ...]] = set()
+
+        # 树节点（字典）的先序区间与深度，下标为节点编号，0为根
+        self._enter: List[int] = []
+        self._exit: List[int] = []
+        self._depth: List[int] = []
+        self._node_ids: Dict[int, int] = {}
+
+        # 名称 -> 出现位置列表 [[父节点先序号, 遮蔽深度, 值的节点编号或None]]
+        # 遮蔽深度：父节点的祖先中直接包含同名键的最深者的深度，没有则为-1
+        self._occurrences: Dict[str, List[List[Any]]] = {}
+        self._occurrence_keys: Dict[str, List[int]] = {}
+
+        # 节点编号 -> {孙节点名称: 首个包含该名称的子节点中对应的值}
+        self._skip_maps: List[Dict[str, Any]] = []
+
+        self._index_node(symbols_tree, (), 0, {})
+        self._occurrence_keys = {
+            name: [parent_enter for parent_enter, _, _ in occurrences]
+            for name, occurrences in self._occurrences.items()
+        }
+
+    def _index_node(self, node: Dict[str, Any], path: Tuple[str, ...], depth: int,
+                    ancestor_key_depths: Dict[str, List[int]]) -> int:
+        """先序遍历建立索引，返回节点编号"""
+        node_id = len(self._enter)
+        enter = node_id
+        self._enter.append(enter)
+        self._exit.append(enter)
+        self._depth.append(depth)
+        self._node_ids[id(node)] = node_id
+        skip_map: Dict[str, Any] = {}
+        self._skip_maps.append(skip_map)
+
+        occurrences: Dict[str, List[Any]] = {}
+        for key, value in node.items():
+            self.paths.add(path + (key,))
+            key_depths = ancestor_key_depths.get(key)
+            occurrence = [enter, key_depths[-1] if key_depths else -1, None]
+            self._occurrences.setdefault(key, []).append(occurrence)
+            occurrences[key] = occurrence
+            if isinstance(value, dict):
+                for grandchild_key, grandchild_value in value.items():
+                    skip_map.setdefault(grandchild_key, grandchild_value)
+
+        # 当前节点直接包含的键，对其子树中的同名出现构成遮蔽
+        for key in node:
+            ancestor_key_depths.setdefault(key, []).append(depth)
+        for key, value in node.items():
+            if isinstance(value, dict):
+                occurrences[key][2] = self._index_node(value, path + (key,), depth + 1, ancestor_key_depths)
+        for key in node:
+            ancestor_key_depths[key].pop()
+
+        self._exit[node_id] = len(self._enter)
+        return node_id
+
+    def has_path(self, path_parts: Sequence[str]) -> bool:
+        """从根开始的精确路径是否存在"""
+        return tuple(path_parts) in self.paths
+
+    def has_path_with_skips(self, path_parts: Sequence[str]) -> bool:
+        """从根开始逐段查找，当前层找不到某段时允许从首个包含它的子节点中取得
+
+        与逐层扫描兄弟节点的结果一致，每段只需一次哈希查找。
+        """
+        current: Any = self._root
+        for part in path_parts:
+            if not isinstance(current, dict):
+                return False
+            if part in current:
+                current = current[part]
+                continue
+            skip_map = self._get_skip_map(current)
+            if skip_map is None or part not in skip_map:
+                return False
+            current = skip_map[part]
+        return True
+
+    def search(self, path_parts: Sequence[str]) -> bool:
+        """通配层级查找：path_parts中的每一段可以出现在上一段之下的任意深度
+
+        某节点直接包含目标段时只沿该键继续查找，不再深入该节点的其他子树，与递归搜索的结果一致。
+        """
+        if not path_parts:
+            return True
+        return self._search_from(0, path_parts, 0)
+
+    def _search_from(self, node_id: int, path_parts: Sequence[str], part_idx: int) -> bool:
+        occurrences = self._occurrences.get(path_parts[part_idx])
+        if not occurrences:
+            return False
+
+        # 父节点位于当前子树内、且未被子树内的同名键遮蔽的出现位置
+        keys = self._occurrence_keys[path_parts[part_idx]]
+        node_depth = self._depth[node_id]
+        is_last = part_idx == len(path_parts) - 1
+        start = bisect_left(keys, self._enter[node_id])
+        end = bisect_left(keys, self._exit[node_id], start)
+        for _, shadow_depth, child_id in occurrences[start:end]:
+            if shadow_depth >= node_depth:
+                continue
+            if is_last:
+                return True
+            if child_id is not None and self._search_from(child_id, path_parts, part_idx + 1):
+                return True
+        return False
+
+    def _get_skip_map(self, node: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        node_id = self._node_ids.get(id(node))
+        return self._skip_maps[node_id] if node_id is not None else None
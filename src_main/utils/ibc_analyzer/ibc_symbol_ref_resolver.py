@@ -3,16 +3,23 @@
 
 import difflib
 import re
+from collections import ChainMap
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any, Dict, List, Optional, Set, Tuple
+from typing import Any, Dict, List, Mapping, Optional, Set, Tuple
 
+from libs.dependency_graph import DependencyGraph
+from libs.symbol_suggestion_index import SymbolSuggestionIndex
 from typedef.ibc_data_types import (BehaviorStepNode, ClassMetadata, ClassNode,
                                     FileMetadata, FolderMetadata,
                                     FunctionMetadata, FunctionNode,
                                     IbcBaseAstNode, ModuleNode, SymbolMetadata,
                                     VariableMetadata, VariableNode,
                                     VisibilityTypes)
+from utils.ibc_analyzer.ibc_symbol_lookup_index import (DottedPathIndex,
+                                                        SymbolTreeIndex)
+from utils.ibc_analyzer.ibc_visible_symbol_builder import \
+    VisibleSymbolMetadata
 from utils.issue_recorder import IbcIssueRecorder
 
 
@@ -57,11 +64,32 @@ class ReferenceContext:
     - scope_chain: 作用域链（从内到外）
     - local_symbols: 当前可见的局部符号
     - line_num: 行号
+    - symbol_scope_uid: 定义了当前可见局部符号的最内层作用域UID，局部符号相同的引用共用该值
     """
     node_uid: int
     scope_chain: List[Tuple[ScopeType, int]]  # [(作用域类型, 节点UID), ...]
-    local_symbols: Dict[str, SymbolMetadata]  # {符号名: SymbolMetadata对象}
+    local_symbols: Mapping[str, SymbolMetadata]  # {符号名: SymbolMetadata对象}
     line_num: int
+    symbol_scope_uid: int = 0
+
+
+@dataclass
+class ScopeTable:
+    """作用域符号表
+    
+    每个作用域（类、函数、行为步骤以及顶层）对应一张表，通过parent链接到外层作用域：
+    - symbols: 本作用域直接定义的局部符号（函数参数与局部变量、类成员）
+    - visible_symbols: 本作用域内可见的全部局部符号，内层符号遮蔽外层同名符号
+    - scope_chain: 从本作用域到顶层的作用域链（从内到外）
+    - symbol_scope_uid: 定义了visible_symbols的最内层作用域，本作用域未定义符号时沿用外层的值
+    """
+    scope_type: ScopeType
+    node_uid: int
+    symbols: Dict[str, SymbolMetadata]
+    parent: Optional['ScopeTable']
+    visible_symbols: ChainMap
+    scope_chain: List[Tuple[ScopeType, int]]
+    symbol_scope_uid: int = 0
 
 
 @dataclass
@@ -74,6 +102,7 @@ class ResolvedSymbol:
     visibility: str             # 可见性
     is_valid: bool              # 是否有效
     error_message: str = ""     # 错误信息
+    issue_messages: List[str] = field(default_factory=list)  # 验证时记录的问题信息，按记录顺序排列
 
 
 class SymbolRefResolver:
@@ -104,7 +133,8 @@ class SymbolRefResolver:
         proj_root_dict: Dict[str, Any],
         dependent_relation: Dict[str, List[str]],
         current_file_path: str,
-        external_library_dependencies: Optional[Dict[str, str]] = None
+        external_library_dependencies: Optional[Dict[str, str]] = None,
+        dependency_graph: Optional[DependencyGraph] = None
     ):
         """
         初始化符号引用解析器
@@ -118,6 +148,7 @@ class SymbolRefResolver:
             dependent_relation: 依赖关系
             current_file_path: 当前文件路径
             external_library_dependencies: 外部库依赖字典（来自refined_requirements.json）
+            dependency_graph: 由dependent_relation构建的依赖图，多个解析器可共享；未提供时自行构建
         """
         self.ast_dict = ast_dict
         self.symbols_tree = symbols_tree
@@ -125,17 +156,38 @@ class SymbolRefResolver:
         self.ibc_issue_recorder = ibc_issue_recorder
         self.proj_root_dict = proj_root_dict
         self.dependent_relation = dependent_relation
+        self.dependency_graph = dependency_graph or DependencyGraph(dependent_relation)
         self.current_file_path = current_file_path
         self.external_library_dependencies = external_library_dependencies or {}
         
         # 先提取外部库依赖集合（_build_import_scopes需要使用）
         self.external_libraries: Set[str] = self._extract_external_libraries()
+        self.external_library_index = DottedPathIndex(self.external_libraries)
+        
+        # 符号查找索引，使每次引用验证不再随符号树规模线性增长
+        self.symbol_tree_index = SymbolTreeIndex(self.symbols_tree)
+        self.metadata_index = DottedPathIndex(self.symbols_metadata)
         
         # 解析module声明，构建ImportScope列表
         self.import_scopes: List[ImportScope] = self._build_import_scopes()
         
         # 本地符号表（当前文件定义的符号）
         self.local_symbols: Dict[str, SymbolMetadata] = self._extract_local_symbols()
+        self.local_symbol_index = DottedPathIndex(self.local_symbols)
+        
+        # 符号未找到时的模糊建议索引，首次报错时构建
+        self._suggestion_index: Optional[SymbolSuggestionIndex] = None
+        # 可引用module的提示信息，首次报错时构建
+        self._available_modules_hint: Optional[str] = None
+        
+        # 作用域符号表：节点UID -> 包含该节点的最内层作用域（作用域节点对应其自身的作用域）
+        self.scope_tables: Dict[int, ScopeTable] = self._build_scope_tables()
+        
+        # 引用解析结果缓存：(引用字符串, 局部符号所属作用域UID) -> 解析结果
+        # 同一函数内的重复引用只完整验证一次，之后按各自行号重放记录的问题
+        self.resolution_cache: Dict[Tuple[str, int], ResolvedSymbol] = {}
+        self.resolution_hit_count = 0
+        self.resolution_miss_count = 0
     
     def _build_import_scopes(self) -> List[ImportScope]:
         """从AST中解析所有module声明，构建ImportScope列表"""
@@ -242,16 +294,8 @@ class SymbolRefResolver:
         if not module_path:
             return False
         
-        # 检查路径的所有前缀（从最长到最短）
-        parts = module_path.split('.')
-        for i in range(len(parts), 0, -1):
-            prefix = '.'.join(parts[:i])
-            if prefix in self.external_libraries:
-                return True
-        
-        # 兼容性：也检查第一级
-        top_level = parts[0]
-        return top_level in self.external_libraries
+        # 沿外部库前缀树按段匹配，任一前缀命中即为外部库
+        return self.external_library_index.contains_prefix_of(module_path)
     
     def _extract_external_libraries(self) -> Set[str]:
         """从external_library_dependencies中提取外部库依赖
@@ -273,11 +317,17 @@ class SymbolRefResolver:
     def _extract_local_symbols(self) -> Dict[str, SymbolMetadata]:
         """提取本地符号（当前文件定义的符号）
         
-        从symbols_metadata中筛选出有__is_local__标记的符号
+        从symbols_metadata中筛选出有__is_local__标记的符号。
+        传入的是VisibleSymbolMetadata时本地符号都在本地层中，只需扫描该层
         """
         local_symbols = {}
         
-        for path, meta in self.symbols_metadata.items():
+        if isinstance(self.symbols_metadata, VisibleSymbolMetadata):
+            candidates = self.symbols_metadata.local_layer
+        else:
+            candidates = self.symbols_metadata
+        
+        for path, meta in candidates.items():
             if isinstance(meta, (ClassMetadata, FunctionMetadata, VariableMetadata)):
                 if meta.__is_local__:
                     local_symbols[path] = meta
@@ -315,133 +365,260 @@ class SymbolRefResolver:
             for self_ref in node.self_refs:
                 self._validate_self_reference(self_ref, node, context)
     
-    def _build_reference_context(self, node_uid: int, line_num: int) -> ReferenceContext:
-        """构建引用上下文
+    def _build_scope_tables(self) -> Dict[int, ScopeTable]:
+        """为AST中的每个作用域构建一次符号表，并记录每个节点所属的最内层作用域
         
-        从当前节点向上追溯，构建作用域链和可见符号表
+        每个节点只在首次到达时处理一次，总耗时与AST规模成线性关系
         """
-        scope_chain = []
-        local_symbols = {}
-        
-        current_uid = node_uid
-        visited = set()  # 防止循环
-        
-        while current_uid in self.ast_dict and current_uid not in visited:
-            visited.add(current_uid)
-            node = self.ast_dict[current_uid]
+        top_level = ScopeTable(
+            scope_type=ScopeType.TOP_LEVEL,
+            node_uid=0,
+            symbols={},
+            parent=None,
+            visible_symbols=ChainMap(),
+            scope_chain=[(ScopeType.TOP_LEVEL, 0)]
+        )
+        scope_tables: Dict[int, ScopeTable] = {}
+        
+        for start_uid in self.ast_dict:
+            # 向上追溯到已建表的祖先或顶层，沿途未建表的节点按从内到外的顺序暂存
+            pending: List[int] = []
+            visited: Set[int] = set()  # 防止循环
+            outer_scope = top_level
+            current_uid = start_uid
+            while current_uid in self.ast_dict and current_uid not in visited:
+                if current_uid in scope_tables:
+                    outer_scope = scope_tables[current_uid]
+                    break
+                visited.add(current_uid)
+                pending.append(current_uid)
+                current_uid = self.ast_dict[current_uid].parent_uid
+                if current_uid == 0:
+                    break
             
-            if isinstance(node, FunctionNode):
-                scope_chain.append((ScopeType.FUNCTION, current_uid))
-                # 收集函数参数作为局部符号
-                for param_name, param_desc in node.params.items():
-                    local_symbols[param_name] = VariableMetadata(
+            # 从外到内依次建表
+            for uid in reversed(pending):
+                outer_scope = self._create_scope_table(uid, self.ast_dict[uid], outer_scope)
+                scope_tables[uid] = outer_scope
+        
+        return scope_tables
+    
+    def _create_scope_table(self, uid: int, node: IbcBaseAstNode, outer_scope: ScopeTable) -> ScopeTable:
+        """为作用域节点创建符号表，非作用域节点直接归属外层作用域"""
+        symbols: Dict[str, SymbolMetadata] = {}
+        
+        if isinstance(node, FunctionNode):
+            scope_type = ScopeType.FUNCTION
+            # 收集函数参数作为局部符号
+            for param_name, param_desc in node.params.items():
+                symbols[param_name] = VariableMetadata(
+                    type='var',
+                    visibility='local',
+                    scope='function',
+                    description=param_desc
+                )
+            # 收集函数内的局部变量
+            for child_uid in node.children_uids:
+                child = self.ast_dict.get(child_uid)
+                if isinstance(child, VariableNode):
+                    symbols[child.identifier] = VariableMetadata(
                         type='var',
                         visibility='local',
                         scope='function',
-                        description=param_desc
+                        description=getattr(child, 'external_desc', '') or getattr(child, 'content', '')
                     )
-                # 收集函数内的局部变量
-                for child_uid in node.children_uids:
-                    child = self.ast_dict.get(child_uid)
-                    if isinstance(child, VariableNode):
-                        local_symbols[child.identifier] = VariableMetadata(
-                            type='var',
-                            visibility='local',
-                            scope='function',
-                            description=getattr(child, 'external_desc', '') or getattr(child, 'content', '')
-                        )
-            
-            elif isinstance(node, ClassNode):
-                scope_chain.append((ScopeType.CLASS, current_uid))
-                # 收集类成员
-                for child_uid in node.children_uids:
-                    child = self.ast_dict.get(child_uid)
-                    if isinstance(child, VariableNode):
-                        local_symbols[child.identifier] = VariableMetadata(
-                            type='var',
-                            visibility=child.visibility.value,
-                            scope='class',
-                            description=getattr(child, 'external_desc', '') or getattr(child, 'content', '')
-                        )
-                    elif isinstance(child, FunctionNode):
-                        local_symbols[child.identifier] = FunctionMetadata(
-                            type='func',
-                            visibility=child.visibility.value,
-                            description=getattr(child, 'external_desc', ''),
-                            parameters=getattr(child, 'params', {})
-                        )
-            
-            elif isinstance(node, BehaviorStepNode):
-                scope_chain.append((ScopeType.BEHAVIOR, current_uid))
-            
-            # 向上追溯
-            current_uid = node.parent_uid
-            if current_uid == 0:
-                scope_chain.append((ScopeType.TOP_LEVEL, 0))
-                break
+        
+        elif isinstance(node, ClassNode):
+            scope_type = ScopeType.CLASS
+            # 收集类成员
+            for child_uid in node.children_uids:
+                child = self.ast_dict.get(child_uid)
+                if isinstance(child, VariableNode):
+                    symbols[child.identifier] = VariableMetadata(
+                        type='var',
+                        visibility=child.visibility.value,
+                        scope='class',
+                        description=getattr(child, 'external_desc', '') or getattr(child, 'content', '')
+                    )
+                elif isinstance(child, FunctionNode):
+                    symbols[child.identifier] = FunctionMetadata(
+                        type='func',
+                        visibility=child.visibility.value,
+                        description=getattr(child, 'external_desc', ''),
+                        parameters=getattr(child, 'params', {})
+                    )
+        
+        elif isinstance(node, BehaviorStepNode):
+            scope_type = ScopeType.BEHAVIOR
+        
+        else:
+            return outer_scope
+        
+        return ScopeTable(
+            scope_type=scope_type,
+            node_uid=uid,
+            symbols=symbols,
+            parent=outer_scope,
+            visible_symbols=outer_scope.visible_symbols.new_child(symbols) if symbols else outer_scope.visible_symbols,
+            scope_chain=[(scope_type, uid), *outer_scope.scope_chain],
+            symbol_scope_uid=uid if symbols else outer_scope.symbol_scope_uid
+        )
+    
+    def _build_reference_context(self, node_uid: int, line_num: int) -> ReferenceContext:
+        """构建引用上下文
+        
+        直接取节点所属作用域的预计算符号表
+        """
+        scope_table = self.scope_tables.get(node_uid)
+        if scope_table is None:
+            return ReferenceContext(node_uid=node_uid, scope_chain=[], local_symbols={}, line_num=line_num)
         
         return ReferenceContext(
             node_uid=node_uid,
-            scope_chain=scope_chain,
-            local_symbols=local_symbols,
-            line_num=line_num
+            scope_chain=scope_table.scope_chain,
+            local_symbols=scope_table.visible_symbols,
+            line_num=line_num,
+            symbol_scope_uid=scope_table.symbol_scope_uid
         )
     
+    def get_resolution_cache_stats(self) -> Dict[str, Any]:
+        """获取引用解析缓存的命中统计"""
+        total = self.resolution_hit_count + self.resolution_miss_count
+        return {
+            'hits': self.resolution_hit_count,
+            'misses': self.resolution_miss_count,
+            'hit_rate': self.resolution_hit_count / total if total else 0.0,
+            'size': len(self.resolution_cache)
+        }
+    
     def _validate_symbol_reference(self, ref: str, context: ReferenceContext) -> None:
         """验证符号引用
         
+        解析结果只取决于引用字符串与可见的局部符号，按 (引用, 局部符号所属作用域) 缓存。
+        命中缓存时不再重新验证，只按当前引用的行号重新记录问题。
+        """
+        if not ref:
+            return
+        
+        cache_key = (ref, context.symbol_scope_uid)
+        resolved = self.resolution_cache.get(cache_key)
+        if resolved is not None:
+            self.resolution_hit_count += 1
+            for message in resolved.issue_messages:
+                self.ibc_issue_recorder.record_issue(
+                    message=message,
+                    line_num=context.line_num,
+                    line_content=""
+                )
+            return
+        
+        self.resolution_miss_count += 1
+        issue_count = self.ibc_issue_recorder.get_issue_count()
+        resolved = self._resolve_symbol_reference(ref, context)
+        resolved.issue_messages = [
+            issue.message for issue in self.ibc_issue_recorder.get_issues()[issue_count:]
+        ]
+        if resolved.issue_messages:
+            resolved.is_valid = False
+            resolved.error_message = resolved.issue_messages[-1]
+        self.resolution_cache[cache_key] = resolved
+    
+    def _resolve_symbol_reference(self, ref: str, context: ReferenceContext) -> ResolvedSymbol:
+        """按解析优先级验证符号引用，验证失败时直接记录问题
+        
         解析优先级：
         1. 上下文局部符号（函数参数、局部变量、类成员）
         2. 本地文件顶层符号
         3. 通过module导入的外部符号
         """
-        if not ref:
-            return
-        
         # 解析引用路径
         parts = ref.split('.')
         first_part = parts[0]
         
         # 跳过self引用（由_validate_self_reference处理）
         if first_part == "self":
-            return
+            return ResolvedSymbol(
+                original_ref=ref,
+                resolved_path=ref,
+                symbol_type="",
+                source="self",
+                visibility="",
+                is_valid=True
+            )
         
         # 早期检查：如果引用的第一部分是外部库，直接跳过验证
         # 这是一个额外的安全检查，确保第三方库符号不会被错误地标记为未找到
         if self._is_reference_to_external_library(ref):
-            return
+            return ResolvedSymbol(
+                original_ref=ref,
+                resolved_path=ref,
+                symbol_type="",
+                source="external",
+                visibility="",
+                is_valid=True
+            )
         
         # 策略1: 检查上下文局部符号
         if first_part in context.local_symbols:
             # 找到局部符号
             local_meta = context.local_symbols[first_part]
+            visibility = local_meta.visibility if isinstance(local_meta, (ClassMetadata, FunctionMetadata, VariableMetadata)) else 'unknown'
+            resolved = ResolvedSymbol(
+                original_ref=ref,
+                resolved_path=ref,
+                symbol_type=local_meta.type,
+                source="local",
+                visibility=visibility,
+                is_valid=True
+            )
             
             # 检查可见性：如果是类成员，需要验证是否可以访问
             if not self._check_local_visibility(local_meta, context):
-                visibility = local_meta.visibility if isinstance(local_meta, (ClassMetadata, FunctionMetadata, VariableMetadata)) else 'unknown'
                 self.ibc_issue_recorder.record_issue(
                     message=f"可见性错误：符号'{first_part}'在当前作用域中不可访问（{visibility}）",
                     line_num=context.line_num,
                     line_content=""
                 )
-                return
+                return resolved
             
             # 如果是多部分引用，验证子路径
             if len(parts) > 1:
                 # 暂时跳过子路径验证，因为需要类型推导
                 pass
-            return
+            return resolved
         
         # 策略2: 检查本地文件顶层符号
         if self._check_local_top_level_symbol(ref, context):
-            return
+            return ResolvedSymbol(
+                original_ref=ref,
+                resolved_path=ref,
+                symbol_type="",
+                source="local",
+                visibility="",
+                is_valid=True
+            )
         
         # 策略3: 检查module导入的符号
         if self._check_imported_symbol(ref, context):
-            return
+            return ResolvedSymbol(
+                original_ref=ref,
+                resolved_path=ref,
+                symbol_type="",
+                source="import",
+                visibility="",
+                is_valid=True
+            )
         
         # 未找到符号，记录错误
         self._record_symbol_not_found(ref, context)
+        return ResolvedSymbol(
+            original_ref=ref,
+            resolved_path="",
+            symbol_type="",
+            source="",
+            visibility="",
+            is_valid=False
+        )
     
     def _check_local_visibility(self, local_meta: SymbolMetadata, context: ReferenceContext) -> bool:
         """检查局部符号的可见性
@@ -476,32 +653,19 @@ class SymbolRefResolver:
         parts = ref.split('.')
         first_part = parts[0]
         
-        # 检查符号树的根节点
-        if first_part in self.symbols_tree:
-            # 检查是否是本地符号
-            if first_part in self.local_symbols:
-                return True
-            # 即使不在local_symbols中，也检查symbols_metadata
-            for path, meta in self.local_symbols.items():
-                if path == first_part or path.split('.')[0] == first_part:
-                    return True
+        # 检查符号树的根节点，且是本地符号或本地符号的首段
+        if first_part in self.symbols_tree and first_part in self.local_symbol_index.first_parts:
+            return True
         
         # 检查完整路径在本地符号中
         full_path = '.'.join(parts)
-        if full_path in self.local_symbols:
+        if full_path in self.local_symbol_index:
             return True
         
-        # 检查是否是本地符号的子符号
-        for local_path in self.local_symbols:
-            # 检查是否匹配最后一部分
-            local_parts = local_path.split('.')
-            if local_parts[-1] == first_part:
-                return True
-            # 检查是否是完整路径匹配
-            if local_path == full_path or local_path.endswith('.' + full_path):
-                return True
-        
-        return False
+        # 检查是否是本地符号的子符号：匹配某个本地符号的最后一部分，或匹配其路径后缀
+        if first_part in self.local_symbol_index.last_parts:
+            return True
+        return self.local_symbol_index.has_suffix(full_path)
     
     def _check_imported_symbol(self, ref: str, context: ReferenceContext) -> bool:
         """检查是否是通过module导入的符号
@@ -602,18 +766,12 @@ class SymbolRefResolver:
                 return True
         
         # 策略4: 模糊匹配（可能是嵌套的类/函数）
-        for meta_path in self.symbols_metadata:
-            if meta_path.startswith(module_path + '.'):
-                relative = meta_path[len(module_path) + 1:]
-                # 匹配完整路径或末尾匹配
-                if relative == symbol_path:
-                    return True
-                # 匹配第一个部分（对于深层嵌套的情况）
-                if relative.startswith(symbol_path + '.') or relative.endswith('.' + symbol_path):
-                    return True
-                # 匹配第一级符号
-                if remaining_parts and relative.split('.')[0] == remaining_parts[0]:
-                    return True
+        # 匹配第一级符号（也涵盖完整路径匹配与以symbol_path开头的深层嵌套）
+        if remaining_parts and self.metadata_index.has_prefix(f"{module_path}.{remaining_parts[0]}"):
+            return True
+        # 末尾匹配：module_path与symbol_path之间隔有其他层级
+        if self.metadata_index.has_nested_suffix(module_path, symbol_path):
+            return True
         
         # 策略5: 检查第一部分是否是导入路径下的子符号（如 physics.apply_force 中的 physics）
         if remaining_parts:
@@ -643,58 +801,16 @@ class SymbolRefResolver:
         
         需要检查 src.engine.physics.apply_force 或 src.engine.physics.*.apply_force
         """
-        # 构建完整路径并在符号树中查找
+        # 在符号树中按顺序查找，某一层找不到时允许到首个包含它的子节点中查找
         full_path_parts = base_path.split('.') + path_parts
-        
-        # 在符号树中按顺序查找
-        current = self.symbols_tree
-        for part in full_path_parts:
-            if isinstance(current, dict) and part in current:
-                current = current[part]
-            else:
-                # 找不到直接路径，尝试在当前节点的子节点中查找
-                if isinstance(current, dict):
-                    found = False
-                    for key, value in current.items():
-                        if isinstance(value, dict) and part in value:
-                            current = value[part]
-                            found = True
-                            break
-                    if not found:
-                        return False
-                else:
-                    return False
-        
-        return True
+        return self.symbol_tree_index.has_path_with_skips(full_path_parts)
     
     def _check_symbol_path_in_tree(self, path_parts: List[str]) -> bool:
         """从符号树根开始检查路径是否存在
         
-        递归搜索符号树中是否包含给定的路径
+        每一段可以位于上一段之下的任意深度
         """
-        def search_in_dict(d: Dict, parts: List[str], start_idx: int) -> bool:
-            if start_idx >= len(parts):
-                return True
-            
-            target = parts[start_idx]
-            if not isinstance(d, dict):
-                return False
-            
-            # 直接匹配
-            if target in d:
-                if start_idx == len(parts) - 1:
-                    return True
-                return search_in_dict(d[target], parts, start_idx + 1)
-            
-            # 递归搜索子节点
-            for key, value in d.items():
-                if isinstance(value, dict):
-                    if search_in_dict(value, parts, start_idx):
-                        return True
-            
-            return False
-        
-        return search_in_dict(self.symbols_tree, path_parts, 0)
+        return self.symbol_tree_index.search(path_parts)
     
     def _check_symbol_in_tree(self, base_path: str, path_parts: List[str]) -> bool:
         """在符号树中检查路径是否存在
@@ -706,52 +822,25 @@ class SymbolRefResolver:
         Returns:
             bool: 路径是否存在
         """
-        # 将base_path转换为部分列表
-        base_parts = base_path.split('.')
-        
-        # 从符号树根开始遍历
-        current = self.symbols_tree
-        
-        # 先导航到base_path
-        for part in base_parts:
-            if isinstance(current, dict) and part in current:
-                current = current[part]
-            else:
-                return False
-        
-        # 然后检查path_parts
-        for part in path_parts:
-            if isinstance(current, dict) and part in current:
-                current = current[part]
-            else:
-                return False
-        
-        return True
+        return self.symbol_tree_index.has_path(base_path.split('.') + list(path_parts))
+    
+    def _get_suggestion_index(self) -> SymbolSuggestionIndex:
+        """获取本地符号名与导入的模块别名的模糊建议索引"""
+        if self._suggestion_index is None:
+            names = [path.split('.')[-1] for path in self.local_symbols]
+            names.extend(import_scope.alias for import_scope in self.import_scopes)
+            self._suggestion_index = SymbolSuggestionIndex(names)
+        return self._suggestion_index
     
     def _record_symbol_not_found(self, ref: str, context: ReferenceContext) -> None:
         """记录符号未找到的错误，并提供建议"""
         parts = ref.split('.')
         first_part = parts[0]
         
-        # 收集候选符号
-        candidates = []
-        
-        # 从局部符号收集
-        candidates.extend(context.local_symbols.keys())
-        
-        # 从本地符号收集
-        for path in self.local_symbols:
-            name = path.split('.')[-1]
-            if name not in candidates:
-                candidates.append(name)
-        
-        # 从导入的模块收集
-        for import_scope in self.import_scopes:
-            if import_scope.alias not in candidates:
-                candidates.append(import_scope.alias)
-        
-        # 模糊匹配
-        matches = difflib.get_close_matches(first_part, candidates, n=3, cutoff=0.3)
+        # 模糊匹配：本地符号与导入的模块别名在建议索引中，局部符号随作用域变化，作为额外候选
+        matches = self._get_suggestion_index().get_close_matches(
+            first_part, n=3, cutoff=0.3, extra_candidates=context.local_symbols.keys()
+        )
         
         if matches:
             suggestion = f"你是否想引用: {', '.join(matches)}？"
@@ -819,10 +908,13 @@ class SymbolRefResolver:
         Returns:
             str: 格式化的可用module列表，如果为空则返回空字符串
         """
+        if self._available_modules_hint is not None:
+            return self._available_modules_hint
+        
         hint_lines = []
         
         # 1. 来自依赖关系表的内部模块
-        dependencies = self.dependent_relation.get(self.current_file_path, [])
+        dependencies = self.dependency_graph.get_dependencies(self.current_file_path)
         if dependencies:
             hint_lines.append("【内部模块依赖】")
             for dep_path in dependencies:
@@ -842,10 +934,8 @@ class SymbolRefResolver:
                 hint_lines.append(f"  - module {lib_name}  # {lib_desc}")
         
         # 如果没有任何可用module，返回空字符串
-        if not hint_lines:
-            return ""
-        
-        return "\n".join(hint_lines)
+        self._available_modules_hint = "\n".join(hint_lines)
+        return self._available_modules_hint
     
     def _check_if_indirect_dependency(self, module_path: str) -> bool:
         """检查模块是否为间接依赖
@@ -862,25 +952,8 @@ class SymbolRefResolver:
         # 将模块路径转换为文件路径格式
         file_path = module_path.replace('.', '/')
         
-        # 获取当前文件的直接依赖列表
-        direct_dependencies = self.dependent_relation.get(self.current_file_path, [])
-        
-        # 检查是否在直接依赖列表中
-        if file_path not in direct_dependencies:
-            # 不在直接依赖中，可能是间接依赖
-            # 进一步检查：是否是某个直接依赖的依赖
-            for direct_dep in direct_dependencies:
-                indirect_deps = self.dependent_relation.get(direct_dep, [])
-                if file_path in indirect_deps:
-                    # 确认是间接依赖
-                    return True
-            
-            # 即使不是直接的二层依贖，也可能是更深层的间接依赖
-            # 或者完全不相关的模块
-            # 这里简化处理：只要不在直接依赖中，就认为是间接或无关
-            return True
-        
-        return False
+        # 不在直接依赖中的模块，无论是更深层的间接依赖还是完全无关的模块，都不允许直接引用，统一按间接依赖处理
+        return not self.dependency_graph.is_direct_dependency(self.current_file_path, file_path)
     
     def _validate_self_reference(
         self, 
@@ -921,57 +994,18 @@ class SymbolRefResolver:
         if not isinstance(class_node, ClassNode):
             return
         
-        # 构建类的成员符号表
-        class_members: Dict[str, SymbolMetadata] = {}
-        for child_uid in class_node.children_uids:
-            child = self.ast_dict.get(child_uid)
-            if isinstance(child, VariableNode):
-                class_members[child.identifier] = VariableMetadata(
-                    type='var',
-                    visibility=child.visibility.value,
-                    description=getattr(child, 'external_desc', '') or getattr(child, 'content', '')
-                )
-            elif isinstance(child, FunctionNode):
-                class_members[child.identifier] = FunctionMetadata(
-                    type='func',
-                    visibility=child.visibility.value,
-                    description=getattr(child, 'external_desc', ''),
-                    parameters=getattr(child, 'params', {})
-                )
-        
-        # 还要收集函数内的参数和局部变量（可以通过self引用的）
-        func_uid = None
+        # 可通过self引用的符号：类成员，以及所在函数的参数和局部变量
+        member_scopes = [self.scope_tables[class_uid]]
         for scope_type, uid in context.scope_chain:
             if scope_type == ScopeType.FUNCTION:
-                func_uid = uid
+                member_scopes.append(self.scope_tables[uid])
                 break
         
-        if func_uid:
-            func_node = self.ast_dict.get(func_uid)
-            if isinstance(func_node, FunctionNode):
-                # 函数参数
-                for param_name, param_desc in func_node.params.items():
-                    class_members[param_name] = VariableMetadata(
-                        type='var',
-                        visibility='local',
-                        scope='function',
-                        description=param_desc
-                    )
-                # 函数局部变量
-                for child_uid in func_node.children_uids:
-                    child = self.ast_dict.get(child_uid)
-                    if isinstance(child, VariableNode):
-                        class_members[child.identifier] = VariableMetadata(
-                            type='var',
-                            visibility='local',
-                            scope='function',
-                            description=getattr(child, 'external_desc', '') or getattr(child, 'content', '')
-                        )
-        
         # 验证first_part是否在类成员中
-        if first_part not in class_members:
+        if not any(first_part in scope_table.symbols for scope_table in member_scopes):
             # 模糊匹配建议
-            matches = difflib.get_close_matches(first_part, class_members.keys(), n=3, cutoff=0.3)
+            member_names = list(dict.fromkeys(name for scope_table in member_scopes for name in scope_table.symbols))
+            matches = difflib.get_close_matches(first_part, member_names, n=3, cutoff=0.3)
             if matches:
                 suggestion = f"你是否想引用: {', '.join(matches)}？"
             else:
@@ -1,6 +1,8 @@
 import json
 import os
-from typing import Any, Dict, List, Optional, Set, Tuple
+from collections import ChainMap
+from types import MappingProxyType
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Set, Tuple
 
 from libs.dir_json_funcs import DirJsonFuncs
 from typedef.ibc_data_types import (ClassMetadata, FileMetadata,
@@ -8,8 +10,95 @@ from typedef.ibc_data_types import (ClassMetadata, FileMetadata,
                                     SymbolMetadata, VariableMetadata)
 
 
+class VisibleSymbolMetadata(ChainMap):
+    """可见符号元数据的分层视图
+    
+    maps[0]为本地符号层（唯一可写的层），其后依次为后加入、先加入的依赖元数据层。
+    按键查找（[]、get、in）逐层进行，命中第一个包含该键的层即返回，不触发合并。
+    遍历与计数时才按优先级从低到高将各层合并为一个字典并缓存，键的顺序及同名键的取值与逐个写入同一字典时一致。
+    写入本地层时同步更新合并结果。
+    """
+    
+    def __init__(self, *maps: Mapping[str, SymbolMetadata]):
+        super().__init__(*maps)
+        self._merged: Optional[Dict[str, SymbolMetadata]] = None
+    
+    def _get_merged(self) -> Dict[str, SymbolMetadata]:
+        if self._merged is None:
+            merged: Dict[str, SymbolMetadata] = {}
+            for mapping in reversed(self.maps):
+                merged.update(mapping)
+            self._merged = merged
+        return self._merged
+    
+    @property
+    def local_layer(self) -> Dict[str, SymbolMetadata]:
+        """本地符号层，即当前文件自身定义的符号"""
+        return self.maps[0]
+    
+    def __getitem__(self, key: str) -> SymbolMetadata:
+        for mapping in self.maps:
+            if key in mapping:
+                return mapping[key]
+        return self.__missing__(key)
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        for mapping in self.maps:
+            if key in mapping:
+                return mapping[key]
+        return default
+    
+    def __contains__(self, key: object) -> bool:
+        return any(key in mapping for mapping in self.maps)
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._get_merged())
+    
+    def __len__(self) -> int:
+        return len(self._get_merged())
+    
+    def items(self):
+        return self._get_merged().items()
+    
+    def __setitem__(self, key: str, value: SymbolMetadata) -> None:
+        # 本地层优先级最高，直接覆盖合并结果即可
+        self.maps[0][key] = value
+        if self._merged is not None:
+            self._merged[key] = value
+    
+    def __delitem__(self, key: str) -> None:
+        # 删除后可能露出依赖层中的同名键，需要重新合并
+        super().__delitem__(key)
+        self._merged = None
+    
+    def pop(self, key: str, *args: Any) -> Any:
+        self._merged = None
+        return super().pop(key, *args)
+    
+    def popitem(self) -> Tuple[str, SymbolMetadata]:
+        self._merged = None
+        return super().popitem()
+    
+    def clear(self) -> None:
+        self._merged = None
+        super().clear()
+
+
 class VisibleSymbolBuilder:
-    """可见符号表构建器（基于符号树+元数据）"""
+    """可见符号表构建器（基于符号树+元数据）
+    
+    构建结果与依赖文件的符号表共享数据，不再逐个复制依赖符号：
+    - 可见符号树直接引用依赖文件的符号子树，只为目录节点和文件节点创建新的字典（写时复制）
+    - 可见符号元数据为VisibleSymbolMetadata分层视图，只记录各层的引用，首次读取时才合并
+    - 每个依赖文件的元数据层（带完整路径前缀、已过滤private符号）构建一次后冻结缓存，
+      构建开销与依赖文件数量成正比
+    
+    元数据层只对只读的依赖符号元数据（MappingProxyType，如 SymbolTableManager.load_shared_symbols 的结果）
+    按对象标识缓存：共享缓存在符号表内容变化时返回新对象，只读映射也无法被原地修改，因此缓存不会过期。
+    普通字典可能被调用方原地修改，每次构建都重新生成元数据层。
+    
+    依赖文件的符号表在构建后应视为只读。
+    """
     
     def __init__(self, proj_root_dict: Dict):
         """初始化可见符号表构建器
@@ -19,33 +108,42 @@ class VisibleSymbolBuilder:
         """
         self.proj_root_dict = proj_root_dict
         
+        # 依赖文件的冻结元数据层缓存：文件路径键 -> (只读源符号元数据, 元数据层)
+        self._file_metadata_layers: Dict[str, Tuple[Mapping[str, SymbolMetadata], Mapping[str, SymbolMetadata]]] = {}
+        
         print(f"初始化可见符号表构建器")
         print(f"  项目文件总数: {len(DirJsonFuncs.get_all_file_paths(proj_root_dict))}")
     
     def build_visible_symbol_tree(
         self, 
         current_file_path: str,
-        dependency_symbol_tables: Dict[str, Tuple[Dict[str, Any], Dict[str, SymbolMetadata]]],
+        dependency_symbol_tables: Dict[str, Tuple[Dict[str, Any], Mapping[str, SymbolMetadata]]],
         include_local_symbols: bool = False,
         local_symbols_tree: Optional[Dict[str, Any]] = None,
         local_symbols_metadata: Optional[Dict[str, SymbolMetadata]] = None
-    ) -> Tuple[Dict[str, Any], Dict[str, SymbolMetadata]]:
+    ) -> Tuple[Dict[str, Any], VisibleSymbolMetadata]:
         """构建当前文件的可见符号树
         
         Args:
             current_file_path: 当前正在处理的文件路径（relative path，仅用于日志输出）
             dependency_symbol_tables: 依赖文件路径到 (symbols_tree, symbols_metadata) 的映射
                 - symbols_tree: 单文件内部的符号树
-                - symbols_metadata: 单文件内部的符号元数据
+                - symbols_metadata: 单文件内部的符号元数据，只读映射时其元数据层会被缓存复用
             include_local_symbols: 是否包含当前文件自己的符号（用于符号引用验证）
             local_symbols_tree: 当前文件自己的符号树
             local_symbols_metadata: 当前文件自己的符号元数据
+        
+        Returns:
+            Tuple[Dict[str, Any], VisibleSymbolMetadata]: 可见符号树与可见符号元数据，键的顺序与逐个合并时一致
         """
         print(f"开始构建可见符号树: {current_file_path}")
         
         # 合并后的可见符号树和元数据
         symbols_tree: Dict[str, Any] = {}
-        symbols_metadata: Dict[str, SymbolMetadata] = {}
+        # 依赖元数据层按加入顺序排列，后加入的层优先
+        metadata_layers: List[Mapping[str, SymbolMetadata]] = []
+        # 本次构建中新建的树节点，其余节点均与依赖文件共享，写入前需要复制
+        owned_nodes: Set[int] = {id(symbols_tree)}
         
         if not dependency_symbol_tables:
             print(f"  当前文件无可用依赖符号")
@@ -63,12 +161,16 @@ class VisibleSymbolBuilder:
                 # 将单文件符号树插入到整体树中（保持与原有目录结构一致）
                 self._insert_file_symbols_into_tree(
                     tree=symbols_tree,
-                    metadata=symbols_metadata,
+                    metadata_layers=metadata_layers,
                     file_path=dep_file_path,
                     file_symbols_tree=file_symbols_tree,
                     file_symbols_metadata=file_symbols_metadata,
+                    owned_nodes=owned_nodes,
                 )
         
+        # 首层为本地符号层，写入只会落在该层
+        symbols_metadata = VisibleSymbolMetadata({}, *reversed(metadata_layers))
+        
         # 如果需要包含本地符号，则将本地符号合并到可见符号树中
         if include_local_symbols and local_symbols_tree and local_symbols_metadata:
             print(f"  正在合并本地符号到可见符号树...")
@@ -87,19 +189,22 @@ class VisibleSymbolBuilder:
     def _insert_file_symbols_into_tree(
         self,
         tree: Dict[str, Any],
-        metadata: Dict[str, SymbolMetadata],
+        metadata_layers: List[Mapping[str, SymbolMetadata]],
         file_path: str,
         file_symbols_tree: Dict[str, Any],
-        file_symbols_metadata: Dict[str, SymbolMetadata],
+        file_symbols_metadata: Mapping[str, SymbolMetadata],
+        owned_nodes: Set[int],
     ) -> None:
         """将单个文件的符号树和元数据插入到总符号树中
             
         - 目录结构仍然根据 file_path 来创建
-        - 文件节点下挂载该文件的符号树
+        - 文件节点下挂载该文件的符号树（直接引用，不复制）
         - 元数据的 key 由 "dir.dir.file" + 文件内符号路径 拼接而成
+        - 本次新建的目录、文件节点元数据作为一层，文件内部的符号元数据作为其后的一层
         """
         # 解析文件路径
         path_parts = file_path.split('/')
+        structure_metadata: Dict[str, SymbolMetadata] = {}
             
         # 构建目录节点
         current_node = tree
@@ -109,53 +214,75 @@ class VisibleSymbolBuilder:
             path_key = '.'.join(current_path_parts)
             if part not in current_node:
                 current_node[part] = {}
-                metadata[path_key] = FolderMetadata(type="folder")
-            current_node = current_node[part]
+                owned_nodes.add(id(current_node[part]))
+                structure_metadata[path_key] = FolderMetadata(type="folder")
+            current_node = self._get_writable_child(current_node, part, owned_nodes)
             
         # 文件节点
         file_name = path_parts[-1]
         current_path_parts.append(file_name)
         file_path_key = '.'.join(current_path_parts)
             
+        # 文件节点首次出现时直接共享该文件的符号树，否则复制后合并
         if file_name not in current_node:
-            current_node[file_name] = {}
-        file_node = current_node[file_name]
+            current_node[file_name] = file_symbols_tree
+        elif file_symbols_tree:
+            file_node = self._get_writable_child(current_node, file_name, owned_nodes)
+            file_node.update(file_symbols_tree)
             
         # 文件元数据
         file_desc = self._get_file_description(file_path)
         file_metadata = FileMetadata(type="file", description=file_desc)
-        metadata[file_path_key] = file_metadata
-            
-        # 将文件内部的符号树挂载到 file_node 下
-        # 这里直接拷贝结构，避免修改原始树
-        for symbol_name, symbol_subtree in file_symbols_tree.items():
-            file_node[symbol_name] = self._deep_copy_tree(symbol_subtree)
+        structure_metadata[file_path_key] = file_metadata
+        metadata_layers.append(structure_metadata)
             
-        # 整合文件内部的符号元数据到全局 metadata
-        # 文件内部的 key 是相对路径，例如 "ClassName.method"
+        # 整合文件内部的符号元数据
+        metadata_layers.append(self._get_file_metadata_layer(file_path_key, file_symbols_metadata))
+    
+    def _get_file_metadata_layer(
+        self,
+        file_path_key: str,
+        file_symbols_metadata: Mapping[str, SymbolMetadata]
+    ) -> Mapping[str, SymbolMetadata]:
+        """获取依赖文件的冻结元数据层，只读的依赖符号元数据对象不变时复用缓存
+        
+        文件内部的 key 是相对路径，例如 "ClassName.method"，层中的 key 带有文件路径前缀
+        """
+        is_read_only = isinstance(file_symbols_metadata, MappingProxyType)
+        cached = self._file_metadata_layers.get(file_path_key)
+        if is_read_only and cached is not None and cached[0] is file_symbols_metadata:
+            return cached[1]
+        
+        layer: Dict[str, SymbolMetadata] = {}
         for relative_path, meta in file_symbols_metadata.items():
             full_path = f"{file_path_key}.{relative_path}" if relative_path else file_path_key
             # 过滤掉 private 符号，仅保留非 private 的符号元数据
             if isinstance(meta, (ClassMetadata, FunctionMetadata, VariableMetadata)):
                 if meta.visibility == "private" or (isinstance(meta, VariableMetadata) and meta.scope == "local"):
                     continue
-            metadata[full_path] = meta
+            layer[full_path] = meta
         
+        frozen_layer = MappingProxyType(layer)
+        if is_read_only:
+            self._file_metadata_layers[file_path_key] = (file_symbols_metadata, frozen_layer)
+        else:
+            self._file_metadata_layers.pop(file_path_key, None)
+        return frozen_layer
+    
     @staticmethod
-    def _deep_copy_tree(tree: Dict[str, Any]) -> Dict[str, Any]:
-        """对符号树进行浅层递归复制，避免修改源结构"""
-        new_tree: Dict[str, Any] = {}
-        for key, value in tree.items():
-            if isinstance(value, dict):
-                new_tree[key] = VisibleSymbolBuilder._deep_copy_tree(value)
-            else:
-                new_tree[key] = value
-        return new_tree
+    def _get_writable_child(node: Dict[str, Any], key: str, owned_nodes: Set[int]) -> Dict[str, Any]:
+        """获取可写入的子节点，子节点与依赖文件共享时先复制一层（写时复制）"""
+        child = node[key]
+        if id(child) not in owned_nodes:
+            child = dict(child)
+            node[key] = child
+            owned_nodes.add(id(child))
+        return child
     
     def _merge_local_symbols(
         self,
         symbols_tree: Dict[str, Any],
-        symbols_metadata: Dict[str, SymbolMetadata],
+        symbols_metadata: VisibleSymbolMetadata,
         local_symbols_tree: Dict[str, Any],
         local_symbols_metadata: Dict[str, SymbolMetadata],
         current_file_path: str
@@ -163,14 +290,14 @@ class VisibleSymbolBuilder:
         """将当前文件的本地符号合并到可见符号树中
         
         Args:
-            symbols_tree: 总符号树（会被原地修改）
-            symbols_metadata: 总符号元数据（会被原地修改）
+            symbols_tree: 总符号树（根节点会被原地修改）
+            symbols_metadata: 总符号元数据（写入首层的本地符号层）
             local_symbols_tree: 当前文件的符号树
             local_symbols_metadata: 当前文件的符号元数据
             current_file_path: 当前文件路径
         
         注意：
-            - 本地符号直接挂载到根节点，不需要文件路径前缀
+            - 本地符号直接挂载到根节点，不需要文件路径前缀，子树直接引用不复制
             - 本地符号包含所有可见性（private/local也包含）
             - 元数据中会添加特殊标记 '__is_local__': True，用于优先级判断
         """
@@ -183,7 +310,7 @@ class VisibleSymbolBuilder:
         for symbol_name, symbol_subtree in local_symbols_tree.items():
             if symbol_name in symbols_tree:
                 print(f"      警告: 本地符号 '{symbol_name}' 与依赖符号重名，本地符号优先")
-            symbols_tree[symbol_name] = self._deep_copy_tree(symbol_subtree)
+            symbols_tree[symbol_name] = symbol_subtree
             local_symbol_count += 1
         
         # 合并本地符号元数据
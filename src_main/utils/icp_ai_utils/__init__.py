@@ -1,4 +1,5 @@
+from .async_runtime import AsyncRuntime, get_async_runtime
 from .icp_chat_inst import ICPChatInsts
 from .icp_embedding_inst import ICPEmbeddingInsts
 
-__all__ = ['ICPChatInsts', 'ICPEmbeddingInsts']
+__all__ = ['AsyncRuntime', 'get_async_runtime', 'ICPChatInsts', 'ICPEmbeddingInsts']
@@ -0,0 +1,159 @@
+import asyncio
+import atexit
+import contextvars
+import threading
+from concurrent.futures import CancelledError
+from typing import Any, Coroutine, Dict, Optional, Tuple
+
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+from libs.file_task_scheduler import is_task_cancelled, on_task_cancel
+
+# 未配置时的连接池限制，与 openai SDK 的默认值一致
+DEFAULT_MAX_CONNECTIONS = 1000
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 100
+
+
+class AsyncRuntime:
+    """应用级异步运行时 - 单例模式
+
+    在后台守护线程中运行一个长期存在的事件循环，所有对模型服务的异步请求都提交到该循环执行：
+    - run() 供同步代码（各cmd_handler）调用，阻塞等待协程完成并返回结果
+    - 相同服务地址与密钥共享同一个 AsyncOpenAI 客户端及其连接池，
+      连接在多次请求、多个处理器与并行的工作线程之间复用，不再为每次请求重新建立TCP/TLS连接
+
+    提交的协程在调用方的上下文（contextvars）副本中运行，调用方线程设置的上下文变量在协程中同样可见。
+    进程退出时自动关闭客户端并停止事件循环。
+
+    注意: 这是单例类，请使用 get_instance() 获取实例，不要直接实例化
+    """
+
+    _instance: Optional['AsyncRuntime'] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        # (服务地址, 密钥, 最大连接数, 最大保持连接数) -> 客户端
+        self._clients: Dict[Tuple[str, str, Optional[int], Optional[int]], AsyncOpenAI] = {}
+        atexit.register(self.shutdown)
+
+    @classmethod
+    def get_instance(cls) -> 'AsyncRuntime':
+        """获取运行时单例"""
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def get_loop(self) -> asyncio.AbstractEventLoop:
+        """获取后台事件循环，首次调用时启动"""
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                loop = asyncio.new_event_loop()
+                ready = threading.Event()
+
+                def run_loop():
+                    asyncio.set_event_loop(loop)
+                    loop.call_soon(ready.set)
+                    loop.run_forever()
+
+                self._thread = threading.Thread(target=run_loop, name="icp-async-runtime", daemon=True)
+                self._thread.start()
+                ready.wait()
+                self._loop = loop
+            return self._loop
+
+    def run(self, coro: Coroutine[Any, Any, Any], timeout: Optional[float] = None) -> Any:
+        """在后台事件循环中运行协程并阻塞等待结果
+
+        Args:
+            coro: 要运行的协程
+            timeout: 等待超时时间（秒），None表示一直等待
+
+        在并行调度的文件任务中调用时，调度被中断后立即取消协程，之后的调用直接抛出CancelledError。
+
+        Raises:
+            RuntimeError: 在后台事件循环所在线程中调用（会导致死锁）
+            CancelledError: 所属的文件任务调度已被中断
+        """
+        loop = self.get_loop()
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("不能在异步运行时的事件循环线程中同步等待协程，请直接使用 await")
+        if is_task_cancelled():
+            coro.close()
+            raise CancelledError("文件任务调度已被中断")
+
+        # 在调用方上下文的副本中提交，协程创建的任务继承该上下文
+        context = contextvars.copy_context()
+        future = context.run(asyncio.run_coroutine_threadsafe, coro, loop)
+        remove_cancel_callback = on_task_cancel(future.cancel)
+        try:
+            return future.result(timeout)
+        except BaseException:
+            # 超时或被中断时取消仍在运行的协程
+            future.cancel()
+            raise
+        finally:
+            remove_cancel_callback()
+
+    def get_openai_client(
+        self,
+        base_url: str,
+        api_key: str,
+        max_connections: Optional[int] = None,
+        max_keepalive_connections: Optional[int] = None
+    ) -> AsyncOpenAI:
+        """获取共享的 AsyncOpenAI 客户端，相同参数返回同一个客户端
+
+        客户端只能在本运行时的事件循环中使用。
+
+        Args:
+            base_url: 服务地址
+            api_key: API密钥
+            max_connections: 连接池最大连接数，None时使用SDK默认值
+            max_keepalive_connections: 连接池最大保持连接数，None时使用SDK默认值
+        """
+        key = (base_url, api_key, max_connections, max_keepalive_connections)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                http_client = DefaultAsyncHttpxClient(limits=httpx.Limits(
+                    max_connections=max_connections or DEFAULT_MAX_CONNECTIONS,
+                    max_keepalive_connections=max_keepalive_connections or DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+                ))
+                # 重试由 ICPChatInsts/ICPEmbeddingInsts 的重试策略统一负责，关闭SDK内部的重试
+                client = AsyncOpenAI(base_url=base_url, api_key=api_key, http_client=http_client, max_retries=0)
+                self._clients[key] = client
+            return client
+
+    def shutdown(self) -> None:
+        """关闭所有共享客户端并停止后台事件循环"""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            clients = list(self._clients.values())
+            self._loop = None
+            self._thread = None
+            self._clients = {}
+        if loop is None or loop.is_closed():
+            return
+
+        async def close_clients():
+            await asyncio.gather(*(client.close() for client in clients), return_exceptions=True)
+
+        try:
+            asyncio.run_coroutine_threadsafe(close_clients(), loop).result(timeout=5)
+        except Exception:
+            pass
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=5)
+        if not loop.is_running():
+            loop.close()
+
+
+def get_async_runtime() -> AsyncRuntime:
+    """获取应用级异步运行时"""
+    return AsyncRuntime.get_instance()
@@ -1,9 +1,11 @@
 import asyncio
 from typing import Callable, Optional
 
-from openai import AsyncOpenAI
+from libs.stream_validator import StreamValidator
 from typedef.ai_data_types import ChatApiConfig, ChatResponseStatus
 
+from .async_runtime import get_async_runtime
+
 
 class ChatInterface:
     """Chat接口类，使用标准OpenAI API，仅提供基础功能封装"""
@@ -18,16 +20,20 @@ class ChatInterface:
         self.base_url = api_config.base_url
         self.api_key = api_config.api_key
         self.model = api_config.model
+        self.max_connections = api_config.max_connections
+        self.max_keepalive_connections = api_config.max_keepalive_connections
         self.client = None
         self._init_client()
 
     def _init_client(self):
         """初始化客户端连接，不含重试逻辑"""
         try:
-            # 使用标准 OpenAI SDK 初始化客户端
-            self.client = AsyncOpenAI(
-                base_url=self.base_url,
-                api_key=self.api_key,
+            # 从异步运行时获取共享客户端，相同服务的请求复用同一个连接池
+            self.client = get_async_runtime().get_openai_client(
+                self.base_url,
+                self.api_key,
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive_connections,
             )
         except Exception as e:
             print(f"ChatInterface 客户端初始化失败: {e}")
@@ -68,7 +74,9 @@ class ChatInterface:
         self, 
         sys_prompt: str, 
         user_prompt: str, 
-        callback: Callable[[str], None]
+        callback: Callable[[str], None],
+        on_error: Optional[Callable[[Exception], None]] = None,
+        validator: Optional[StreamValidator] = None
     ) -> str:
         """
         流式响应，不含重试机制
@@ -77,9 +85,12 @@ class ChatInterface:
             sys_prompt: 系统提示词
             user_prompt: 用户提示词
             callback: 回调函数，用于接收流式响应内容
+            on_error: 可选的回调函数，请求失败时接收异常（用于判断是否重试及读取 Retry-After）
+            validator: 可选的流式输出校验器，逐段校验已收到的内容，
+                一旦判定输出不合法即关闭流，不再等待注定失败的剩余输出
             
         Returns:
-            str: 响应状态码 (SUCCESS, CLIENT_NOT_INITIALIZED, STREAM_FAILED)
+            str: 响应状态码 (SUCCESS, CLIENT_NOT_INITIALIZED, STREAM_FAILED, OUTPUT_INVALID)
         """
         # 检查客户端是否已初始化
         if self.client is None:
@@ -105,10 +116,12 @@ class ChatInterface:
                     delta = chunk.choices[0].delta
                     if delta.content:
                         # 确保传递给callback的是字符串类型
-                        if isinstance(delta.content, str):
-                            callback(delta.content)
-                        else:
-                            callback(str(delta.content))
+                        content = delta.content if isinstance(delta.content, str) else str(delta.content)
+                        callback(content)
+                        if validator is not None and validator.feed(content) is not None:
+                            # 关闭流即断开连接，服务端随之停止生成
+                            await stream.close()
+                            return ChatResponseStatus.OUTPUT_INVALID
             
             # 成功完成流式响应
             return ChatResponseStatus.SUCCESS
@@ -116,4 +129,6 @@ class ChatInterface:
         except Exception as e:
             # 流式响应失败
             print(f"流式响应失败: {e}")
+            if on_error is not None:
+                on_error(e)
             return ChatResponseStatus.STREAM_FAILED
\ No newline at end of file
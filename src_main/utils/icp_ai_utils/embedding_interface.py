@@ -1,8 +1,9 @@
-from typing import List, Optional, Union
+from typing import Callable, List, Optional, Union
 
-from openai import AsyncOpenAI
 from typedef.ai_data_types import EmbeddingApiConfig, EmbeddingStatus
 
+from .async_runtime import get_async_runtime
+
 
 class EmbeddingInterface:
     """Embedding接口类，使用标准OpenAI API，仅提供基础功能封装"""
@@ -17,16 +18,20 @@ class EmbeddingInterface:
         self.base_url = api_config.base_url
         self.api_key = api_config.api_key
         self.model = api_config.model
+        self.max_connections = api_config.max_connections
+        self.max_keepalive_connections = api_config.max_keepalive_connections
         self.client = None
         self._init_client()
 
     def _init_client(self):
         """初始化客户端连接，不含重试逻辑"""
         try:
-            # 使用标准 OpenAI SDK 初始化异步客户端
-            self.client = AsyncOpenAI(
-                base_url=self.base_url,
-                api_key=self.api_key,
+            # 从异步运行时获取共享客户端，相同服务的请求复用同一个连接池
+            self.client = get_async_runtime().get_openai_client(
+                self.base_url,
+                self.api_key,
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive_connections,
             )
         except Exception as e:
             print(f"EmbeddingInterface 客户端初始化失败: {e}")
@@ -55,12 +60,17 @@ class EmbeddingInterface:
             print(f"嵌入服务连接验证失败: {e}")
             return False
 
-    async def embed_query(self, texts: Union[str, List[str]]) -> tuple[str, Union[List[float], List[List[float]]]]:
+    async def embed_query(
+        self,
+        texts: Union[str, List[str]],
+        on_error: Optional[Callable[[Exception], None]] = None
+    ) -> tuple[str, Union[List[float], List[List[float]]]]:
         """
         嵌入文本，不含重试机制
         
         Args:
             texts: 单个文本或文本列表
+            on_error: 可选的回调函数，请求失败时接收异常（用于判断是否重试及读取 Retry-After）
             
         Returns:
             tuple: (status, embeddings) - 状态码和嵌入向量
@@ -89,4 +99,6 @@ class EmbeddingInterface:
             
         except Exception as e:
             print(f"Embedding请求失败: {e}")
+            if on_error is not None:
+                on_error(e)
             return (EmbeddingStatus.REQUEST_FAILED, [])
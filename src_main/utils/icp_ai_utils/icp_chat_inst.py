@@ -1,10 +1,15 @@
 import asyncio
 import time
-from typing import Dict, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 
-from typedef.ai_data_types import ChatApiConfig, ChatResponseStatus
+from libs.llm_response_cache import get_instance as get_llm_response_cache
+from libs.rate_limiter import RateLimiter, estimate_tokens
+from libs.retry_policy import RetryPolicy, parse_retry_after
+from libs.stream_validator import StreamValidator
+from typedef.ai_data_types import ChatApiConfig, ChatResponseStatus, ResponseCacheMode
 from typedef.cmd_data_types import Colors
 
+from .async_runtime import get_async_runtime
 from .chat_interface import ChatInterface
 
 
@@ -32,6 +37,11 @@ class ICPChatInsts:
         self._is_initialized: bool = False
         self._max_retry: int = 3
         self._retry_delay: float = 1.0
+        self._retry_policy: RetryPolicy = RetryPolicy()
+        # 同一handler的所有并发请求共享的限速器，未配置限速时为None
+        self._rate_limiter: Optional[RateLimiter] = None
+        self._response_cache_mode: str = ResponseCacheMode.OFF
+        self._response_cache_ttl_seconds: Optional[float] = None
     
     @classmethod
     def get_instance(cls, handler_key: str = 'coder_handler') -> 'ICPChatInsts':
@@ -96,9 +106,25 @@ class ICPChatInsts:
         if force_reinit:
             self.reset()
         
-        # 保存重试配置
+        # 保存重试与限速配置
         self._max_retry = max_retry
         self._retry_delay = retry_delay
+        self._retry_policy = RetryPolicy(max_retry, retry_delay, api_config.retry_max_delay)
+        rate_limiter = RateLimiter(api_config.requests_per_minute, api_config.tokens_per_minute)
+        self._rate_limiter = rate_limiter if rate_limiter.is_enabled() else None
+        
+        # 保存响应缓存配置
+        self._response_cache_mode = api_config.response_cache_mode
+        self._response_cache_ttl_seconds = (
+            api_config.response_cache_ttl_hours * 3600 if api_config.response_cache_ttl_hours is not None else None
+        )
+        
+        # 仅回放模式从不访问网络，跳过连接验证
+        if self._response_cache_mode == ResponseCacheMode.REPLAY_ONLY:
+            self._chat_interface = ChatInterface(api_config)
+            self._is_initialized = True
+            print(f"ChatInterface 以仅回放模式初始化 (handler: {self._handler_key}, 模型: {api_config.model})，所有响应均从缓存读取")
+            return True
         
         # 带重试的初始化
         for attempt in range(max_retry):
@@ -107,7 +133,7 @@ class ICPChatInsts:
                 if self._chat_interface.client is not None:
                     # 进行真实的连接验证
                     print(f"ChatInterface 客户端创建成功，正在验证连接...")
-                    is_connected = asyncio.run(
+                    is_connected = get_async_runtime().run(
                         self._chat_interface.verify_connection()
                     )
                     
@@ -167,7 +193,8 @@ class ICPChatInsts:
         role_name: str,
         sys_prompt: str,
         user_prompt: str,
-        print_output: bool = True
+        print_output: bool = True,
+        validator_factory: Optional[Callable[[], StreamValidator]] = None
     ) -> Tuple[str, bool]:
         """获取AI响应(包装ChatInterface的stream_response并添加重试机制)
         
@@ -176,9 +203,15 @@ class ICPChatInsts:
             sys_prompt: 系统提示词
             user_prompt: 用户提示词
             print_output: 是否打印流式输出（默认True）
+            validator_factory: 可选的流式输出校验器工厂，每次请求创建一个新的校验器。
+                输出被判定不合法时提前终止生成，返回已生成的部分内容且视为成功，
+                由调用方的完整校验给出准确的错误信息并决定如何重新生成
             
         Returns:
             Tuple[str, bool]: (响应内容, 是否成功)
+            
+        Note:
+            新生成的响应不会自动写入响应缓存，调用方校验通过后需调用 accept_response 写入。
         """
         if print_output:
             print(f"    {role_name}正在生成响应...")
@@ -188,10 +221,27 @@ class ICPChatInsts:
             print(f"\n{Colors.FAIL}错误: ChatInterface未初始化 (handler: {self._handler_key}){Colors.ENDC}")
             return ("", False)
         
+        # 响应缓存：内容完全相同的请求直接返回缓存的响应
+        response_cache = get_llm_response_cache()
+        if self._response_cache_mode in (ResponseCacheMode.READ_WRITE, ResponseCacheMode.REPLAY_ONLY) \
+                and response_cache.is_enabled():
+            cache_key = response_cache.build_key(self._chat_interface.model, sys_prompt, user_prompt)
+            cached_response = response_cache.get(cache_key, self._response_cache_ttl_seconds)
+            if cached_response is not None:
+                if print_output:
+                    print(cached_response, end="", flush=True)
+                    print(f"\n    {role_name}运行完毕（命中响应缓存）。")
+                return (cached_response, True)
+        if self._response_cache_mode == ResponseCacheMode.REPLAY_ONLY:
+            print(f"\n{Colors.FAIL}错误: 仅回放模式下未找到缓存的响应 (handler: {self._handler_key}){Colors.ENDC}")
+            return ("", False)
+        
         # 带重试机制的流式响应
+        prompt_tokens = estimate_tokens(sys_prompt) + estimate_tokens(user_prompt)
         for attempt in range(self._max_retry):
             # 定义内部callback用于收集响应内容
             response_content = ""
+            errors: List[Exception] = []
             
             def collect_and_print(content: str) -> None:
                 nonlocal response_content
@@ -199,31 +249,98 @@ class ICPChatInsts:
                 if print_output:
                     print(content, end="", flush=True)
             
+            # 等待限速配额，避免并发请求集中触发服务端限流
+            if self._rate_limiter is not None:
+                await self._rate_limiter.acquire(prompt_tokens)
+            
+            validator = validator_factory() if validator_factory is not None else None
             status = await self._chat_interface.stream_response(
                 sys_prompt=sys_prompt,
                 user_prompt=user_prompt,
-                callback=collect_and_print
+                callback=collect_and_print,
+                on_error=errors.append,
+                validator=validator
             )
             
+            if self._rate_limiter is not None:
+                self._rate_limiter.record_tokens(estimate_tokens(response_content))
+            
             # 成功则返回收集到的内容
             if status == ChatResponseStatus.SUCCESS:
                 if print_output:
                     print(f"\n    {role_name}运行完毕。")
                 return (response_content, True)
             
+            # 输出已注定不合法，提前终止，部分内容交由调用方校验后重新生成
+            if status == ChatResponseStatus.OUTPUT_INVALID:
+                print(f"\n    {Colors.WARNING}警告: 输出校验失败，已提前终止生成: {validator.error}{Colors.ENDC}")
+                return (response_content, True)
+            
             # 客户端未初始化，不需要重试
             if status == ChatResponseStatus.CLIENT_NOT_INITIALIZED:
                 print(f"\n{Colors.FAIL}错误: ChatInterface客户端未初始化{Colors.ENDC}")
                 return ("", False)
             
-            # 流式响应失败，清空当前收集到的内容并重试
-            if attempt < self._max_retry - 1:
-                print(f"\n{Colors.FAIL}流式响应失败，正在重试 ({attempt + 1}/{self._max_retry})...{Colors.ENDC}")
-                response_content = ""
-                time.sleep(self._retry_delay)
+            # 流式响应失败，按重试策略退避后重试（认证失败、参数错误等不可重试的错误直接返回）
+            error = errors[-1] if errors else None
+            if self._retry_policy.should_retry(attempt, error):
+                delay = self._retry_policy.get_delay(attempt, parse_retry_after(error))
+                print(f"\n{Colors.FAIL}流式响应失败，{delay:.1f}秒后重试 ({attempt + 1}/{self._max_retry})...{Colors.ENDC}")
+                await asyncio.sleep(delay)
                 continue
+            if attempt < self._max_retry - 1:
+                print(f"\n{Colors.FAIL}错误: 流式响应失败且不可重试: {error}{Colors.ENDC}")
+                return ("", False)
 
         # 重试失败
         print(f"\n{Colors.FAIL}错误: 流式响应失败 (已重试 {self._max_retry} 次){Colors.ENDC}")
         return ("", False)
+
+    def accept_response(self, sys_prompt: str, user_prompt: str, response_content: str) -> None:
+        """调用方确认响应可用后，将其写入响应缓存
+        
+        响应只有在调用方校验通过后才写入缓存：若未通过校验的响应也被缓存，重新运行时会原样命中，
+        基于它构建的修复提示词同样会命中缓存，同一文件每次都会以相同的方式失败。
+        仅在 read-write 与 record 模式下生效。
+        
+        Args:
+            sys_prompt: 获取该响应时使用的系统提示词
+            user_prompt: 获取该响应时使用的用户提示词
+            response_content: get_role_response 返回的响应内容
+        """
+        if self._response_cache_mode not in (ResponseCacheMode.READ_WRITE, ResponseCacheMode.RECORD):
+            return
+        response_cache = get_llm_response_cache()
+        if not response_content or self._chat_interface is None or not response_cache.is_enabled():
+            return
+        cache_key = response_cache.build_key(self._chat_interface.model, sys_prompt, user_prompt)
+        if not response_cache.put(cache_key, response_content, self._chat_interface.model):
+            print(f"    {Colors.WARNING}警告: 写入模型响应缓存失败{Colors.ENDC}")
+
+    def get_role_response_sync(
+        self,
+        role_name: str,
+        sys_prompt: str,
+        user_prompt: str,
+        print_output: bool = True,
+        validator_factory: Optional[Callable[[], StreamValidator]] = None
+    ) -> Tuple[str, bool]:
+        """同步获取AI响应，供cmd_handler等同步代码调用
+        
+        在应用级异步运行时的事件循环中执行get_role_response并阻塞等待结果，
+        请求复用共享客户端的连接池，可在多个工作线程中同时调用。
+        
+        Args:
+            role_name: 角色名称(用于日志输出)
+            sys_prompt: 系统提示词
+            user_prompt: 用户提示词
+            print_output: 是否打印流式输出（默认True）
+            validator_factory: 可选的流式输出校验器工厂，参见 get_role_response
+            
+        Returns:
+            Tuple[str, bool]: (响应内容, 是否成功)
+        """
+        return get_async_runtime().run(
+            self.get_role_response(role_name, sys_prompt, user_prompt, print_output, validator_factory)
+        )
     
\ No newline at end of file
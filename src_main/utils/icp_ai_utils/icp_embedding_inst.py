@@ -2,9 +2,12 @@ import asyncio
 import time
 from typing import Dict, List, Optional, Tuple
 
+from libs.rate_limiter import RateLimiter, estimate_tokens
+from libs.retry_policy import RetryPolicy, parse_retry_after
 from typedef.ai_data_types import EmbeddingApiConfig, EmbeddingStatus
 from typedef.cmd_data_types import Colors
 
+from .async_runtime import get_async_runtime
 from .embedding_interface import EmbeddingInterface
 
 
@@ -32,6 +35,9 @@ class ICPEmbeddingInsts:
         self._is_initialized: bool = False
         self._max_retry: int = 3
         self._retry_delay: float = 1.0
+        self._retry_policy: RetryPolicy = RetryPolicy()
+        # 同一handler的所有并发请求共享的限速器，未配置限速时为None
+        self._rate_limiter: Optional[RateLimiter] = None
     
     @classmethod
     def get_instance(cls, handler_key: str = 'embedding_handler') -> 'ICPEmbeddingInsts':
@@ -99,6 +105,9 @@ class ICPEmbeddingInsts:
         # 保存重试配置
         self._max_retry = max_retry
         self._retry_delay = retry_delay
+        self._retry_policy = RetryPolicy(max_retry, retry_delay, api_config.retry_max_delay)
+        rate_limiter = RateLimiter(api_config.requests_per_minute, api_config.tokens_per_minute)
+        self._rate_limiter = rate_limiter if rate_limiter.is_enabled() else None
         
         # 带重试的初始化
         for attempt in range(max_retry):
@@ -107,7 +116,7 @@ class ICPEmbeddingInsts:
                 if self._embedding_interface.client is not None:
                     # 进行真实的连接验证
                     print(f"EmbeddingInterface 客户端创建成功，正在验证连接...")
-                    is_connected = asyncio.run(
+                    is_connected = get_async_runtime().run(
                         self._embedding_interface.verify_connection()
                     )
                     
@@ -188,8 +197,14 @@ class ICPEmbeddingInsts:
             return (EmbeddingStatus.CLIENT_NOT_INITIALIZED, [])
         
         # 带重试机制的调用
+        input_tokens = sum(estimate_tokens(text) for text in texts)
         for attempt in range(self._max_retry):
-            status, embeddings = await self._embedding_interface.embed_query(texts)
+            # 等待限速配额，避免并发请求集中触发服务端限流
+            if self._rate_limiter is not None:
+                await self._rate_limiter.acquire(input_tokens)
+            
+            errors: List[Exception] = []
+            status, embeddings = await self._embedding_interface.embed_query(texts, on_error=errors.append)
             
             if status == EmbeddingStatus.SUCCESS:
                 if print_output:
@@ -202,12 +217,14 @@ class ICPEmbeddingInsts:
                     print(f"\n{Colors.FAIL}错误: EmbeddingInterface客户端未初始化{Colors.ENDC}")
                 return (status, [])
             
-            # 请求失败，重试
-            if attempt < self._max_retry - 1:
-                if print_output:
-                    print(f"\n{Colors.FAIL}嵌入请求失败，正在重试 ({attempt + 1}/{self._max_retry})...{Colors.ENDC}")
-                time.sleep(self._retry_delay)
-                continue
+            # 请求失败，按重试策略退避后重试（不可重试的错误直接结束）
+            error = errors[-1] if errors else None
+            if not self._retry_policy.should_retry(attempt, error):
+                break
+            delay = self._retry_policy.get_delay(attempt, parse_retry_after(error))
+            if print_output:
+                print(f"\n{Colors.FAIL}嵌入请求失败，{delay:.1f}秒后重试 ({attempt + 1}/{self._max_retry})...{Colors.ENDC}")
+            await asyncio.sleep(delay)
         
         # 重试失败
         if print_output:
@@ -242,8 +259,14 @@ class ICPEmbeddingInsts:
             return (EmbeddingStatus.CLIENT_NOT_INITIALIZED, [])
         
         # 带重试机制的调用
+        input_tokens = estimate_tokens(text)
         for attempt in range(self._max_retry):
-            status, embedding = await self._embedding_interface.embed_query(text)
+            # 等待限速配额，避免并发请求集中触发服务端限流
+            if self._rate_limiter is not None:
+                await self._rate_limiter.acquire(input_tokens)
+            
+            errors: List[Exception] = []
+            status, embedding = await self._embedding_interface.embed_query(text, on_error=errors.append)
             
             if status == EmbeddingStatus.SUCCESS:
                 if print_output:
@@ -256,12 +279,14 @@ class ICPEmbeddingInsts:
                     print(f"\n{Colors.FAIL}错误: EmbeddingInterface客户端未初始化{Colors.ENDC}")
                 return (status, [])
             
-            # 请求失败，重试
-            if attempt < self._max_retry - 1:
-                if print_output:
-                    print(f"\n{Colors.FAIL}嵌入请求失败，正在重试 ({attempt + 1}/{self._max_retry})...{Colors.ENDC}")
-                time.sleep(self._retry_delay)
-                continue
+            # 请求失败，按重试策略退避后重试（不可重试的错误直接结束）
+            error = errors[-1] if errors else None
+            if not self._retry_policy.should_retry(attempt, error):
+                break
+            delay = self._retry_policy.get_delay(attempt, parse_retry_after(error))
+            if print_output:
+                print(f"\n{Colors.FAIL}嵌入请求失败，{delay:.1f}秒后重试 ({attempt + 1}/{self._max_retry})...{Colors.ENDC}")
+            await asyncio.sleep(delay)
         
         # 重试失败
         if print_output: